@@ -13,4 +13,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Importado após o setup do Django (o módulo usa settings e models)
+from tickets.event_stream import STREAM_PATH, ticket_event_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """
+    Encaminha o stream SSE de eventos de chamados para a aplicação ASGI dedicada
+    (conexões longas, sem passar pelo Django) e todo o resto para o Django.
+    """
+    if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+        return await ticket_event_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
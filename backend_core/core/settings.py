@@ -1,6 +1,9 @@
 from pathlib import Path
+import importlib.util
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Caminho base do projeto (diretório pai do diretório onde este arquivo está)
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -9,7 +12,12 @@ SECRET_KEY = os.environ.get(
     'SECRET_KEY', 'django-insecure-default-key-change-in-prod')
 
 # Modo de depuração (Não usar True em produção)
-DEBUG = os.environ.get('DEBUG', 'True') == 'True'
+# Padrão False: com DEBUG ativo o Django guarda em memória todas as queries executadas
+# por requisição. O ambiente de desenvolvimento define DEBUG=True explicitamente (.env).
+DEBUG = os.environ.get('DEBUG', 'False') == 'True'
+
+# Perfil do servidor (ver entrypoint.sh e gunicorn.conf.py): dev, wsgi (gthread) ou asgi (Uvicorn)
+SERVER_PROFILE = os.environ.get('SERVER_PROFILE', 'dev')
 
 # Hosts permitidos para acessar a aplicação
 ALLOWED_HOSTS = ['*']
@@ -46,6 +54,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Log de queries independente do DEBUG (ativado por DB_QUERY_LOG)
+    'tickets.middleware.QueryLoggingMiddleware',
 ]
 
 # Configuração da URL principal de roteamento
@@ -73,6 +83,13 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 # Configuração do Banco de Dados
 # Suporte híbrido: PostgreSQL (Docker/Prod) ou SQLite (Dev Local)
+
+# Conexões persistentes: reutiliza a conexão por até DB_CONN_MAX_AGE segundos em vez
+# de reconectar a cada requisição. No perfil asgi as views síncronas rodam em threads
+# do executor do asgiref e cada thread manteria a própria conexão aberta sem limite
+# (esgotando max_connections), por isso a reutilização é desligada nesse perfil.
+DB_CONN_MAX_AGE = 0 if SERVER_PROFILE == 'asgi' else int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+
 if os.environ.get('DB_ENGINE') == 'django.db.backends.postgresql':
     DATABASES = {
         'default': {
@@ -82,6 +99,15 @@ if os.environ.get('DB_ENGINE') == 'django.db.backends.postgresql':
             'PASSWORD': os.environ.get('DB_PASSWORD'),
             'HOST': os.environ.get('DB_HOST'),
             'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Verifica a conexão reutilizada antes do uso (descarta conexões quebradas)
+            'CONN_HEALTH_CHECKS': True,
+            # Com um pooler em modo transação (ex: PgBouncer) cursores do lado do servidor
+            # não são suportados e devem ser desativados
+            'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', 'False') == 'True',
+            'OPTIONS': {
+                'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', '5')),
+            },
         }
     }
 else:
@@ -89,9 +115,131 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
         }
     }
 
+# Log de queries independente do DEBUG (ver tickets/middleware.py)
+# DB_QUERY_LOG=True registra contagem/tempo de queries por requisição e queries lentas
+DB_QUERY_LOG = os.environ.get('DB_QUERY_LOG', 'False') == 'True'
+DB_SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', '100'))
+
+# Fila de criação assíncrona de chamados (alimentada pelo Webhook)
+# Produção: URL da fila Amazon SQS. Desenvolvimento: arquivo SQLite local compartilhado.
+TICKET_QUEUE_URL = os.environ.get('TICKET_QUEUE_URL')
+TICKET_QUEUE_PATH = os.environ.get('TICKET_QUEUE_PATH', str(BASE_DIR / 'ticket_queue.sqlite3'))
+
+# Detecção de chamados quase duplicados (MinHash/LSH, ver tickets/dedup.py)
+# Chamados abertos nas últimas TICKET_DEDUP_WINDOW_HOURS com descrição semelhante
+# (Jaccard >= TICKET_DEDUP_THRESHOLD) são vinculados ao incidente principal
+TICKET_DEDUP_ENABLED = os.environ.get('TICKET_DEDUP_ENABLED', 'True') == 'True'
+TICKET_DEDUP_WINDOW_HOURS = float(os.environ.get('TICKET_DEDUP_WINDOW_HOURS', '24'))
+TICKET_DEDUP_THRESHOLD = float(os.environ.get('TICKET_DEDUP_THRESHOLD', '0.6'))
+TICKET_DEDUP_NUM_PERM = int(os.environ.get('TICKET_DEDUP_NUM_PERM', '64'))
+TICKET_DEDUP_BANDS = int(os.environ.get('TICKET_DEDUP_BANDS', '16'))
+TICKET_DEDUP_MIN_TERMS = int(os.environ.get('TICKET_DEDUP_MIN_TERMS', '3'))
+# Intervalo (s) entre sincronizações do índice em memória com chamados criados por outros workers
+TICKET_DEDUP_SYNC_INTERVAL = float(os.environ.get('TICKET_DEDUP_SYNC_INTERVAL', '1'))
+
+# Feed de alterações de chamados via SSE (ver tickets/changefeed.py), servido pelo perfil asgi
+TICKET_EVENTS_ENABLED = os.environ.get('TICKET_EVENTS_ENABLED', 'True') == 'True'
+# Intervalo (s) entre consultas de eventos novos (uma consulta por processo, não por conexão)
+TICKET_EVENTS_POLL_INTERVAL = float(os.environ.get('TICKET_EVENTS_POLL_INTERVAL', '0.5'))
+# Intervalo (s) dos comentários de keep-alive enviados às conexões ociosas
+TICKET_EVENTS_HEARTBEAT = float(os.environ.get('TICKET_EVENTS_HEARTBEAT', '15'))
+# Eventos pendentes por conexão antes de desconectar um cliente lento
+TICKET_EVENTS_QUEUE_SIZE = int(os.environ.get('TICKET_EVENTS_QUEUE_SIZE', '100'))
+# Eventos reenviados na retomada por Last-Event-ID e retenção da tabela de eventos
+TICKET_EVENTS_BACKLOG_LIMIT = int(os.environ.get('TICKET_EVENTS_BACKLOG_LIMIT', '500'))
+TICKET_EVENTS_RETENTION_HOURS = float(os.environ.get('TICKET_EVENTS_RETENTION_HOURS', '72'))
+
+# Arquivamento de chamados encerrados (ver tickets/archive.py e o comando archive_tickets)
+TICKET_ARCHIVE_AFTER_DAYS = int(os.environ.get('TICKET_ARCHIVE_AFTER_DAYS', '90'))
+TICKET_ARCHIVE_BATCH_SIZE = int(os.environ.get('TICKET_ARCHIVE_BATCH_SIZE', '1000'))
+# Pausa (s) entre lotes, para não competir com o tráfego da API
+TICKET_ARCHIVE_PAUSE = float(os.environ.get('TICKET_ARCHIVE_PAUSE', '0.2'))
+
+# Exportação em streaming (GET /api/tickets/export/, /api/budgets/export/; ver tickets/exports.py)
+# Linhas lidas do banco por bloco e tamanho (bytes) de cada pedaço enviado ao cliente
+EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', '2000'))
+EXPORT_FLUSH_BYTES = int(os.environ.get('EXPORT_FLUSH_BYTES', '65536'))
+
+# Cache da aplicação (memória local por padrão; CACHE_BACKEND/CACHE_LOCATION permitem
+# usar, por exemplo, o cache em arquivo ou em banco compartilhado entre workers)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'nexus-default'),
+    }
+}
+
+# Memória de conversa do Chat (ver tickets/conversation_memory.py)
+CHAT_MEMORY_CACHE_ALIAS = 'default'
+# Nos perfis wsgi/asgi as mensagens de uma sessão caem em qualquer processo do Gunicorn:
+# com um cache local por processo o histórico se perderia entre os workers, então um
+# cache compartilhado (ex: DatabaseCache ou RedisCache) passa a ser obrigatório.
+PROCESS_LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+if SERVER_PROFILE in ('wsgi', 'asgi') and CACHES[CHAT_MEMORY_CACHE_ALIAS]['BACKEND'] in PROCESS_LOCAL_CACHE_BACKENDS:
+    web_concurrency = int(os.environ.get('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1))
+    if web_concurrency > 1:
+        raise ImproperlyConfigured(
+            f"A memória de conversa do Chat exige um cache compartilhado entre os {web_concurrency} workers "
+            f"(SERVER_PROFILE={SERVER_PROFILE}): defina CACHE_BACKEND (ex: "
+            f"django.core.cache.backends.db.DatabaseCache) e CACHE_LOCATION, ou WEB_CONCURRENCY=1."
+        )
+# Sessões sem atividade por este tempo (s) são descartadas
+CHAT_MEMORY_IDLE_TTL = int(os.environ.get('CHAT_MEMORY_IDLE_TTL', '1800'))
+# Turnos completos mantidos literalmente; os mais antigos vão para o resumo
+CHAT_MEMORY_WINDOW = int(os.environ.get('CHAT_MEMORY_WINDOW', '4'))
+# Limites de tokens do resumo acumulado e do histórico enviado ao modelo
+CHAT_MEMORY_SUMMARY_MAX_TOKENS = int(os.environ.get('CHAT_MEMORY_SUMMARY_MAX_TOKENS', '300'))
+CHAT_MEMORY_MAX_PROMPT_TOKENS = int(os.environ.get('CHAT_MEMORY_MAX_PROMPT_TOKENS', '800'))
+# Tamanho máximo do contexto recuperado guardado para reutilização
+CHAT_MEMORY_CONTEXT_MAX_CHARS = int(os.environ.get('CHAT_MEMORY_CONTEXT_MAX_CHARS', '6000'))
+# Sobreposição mínima de termos (Jaccard) para considerar a pergunta do mesmo assunto
+CHAT_MEMORY_TOPIC_OVERLAP = float(os.environ.get('CHAT_MEMORY_TOPIC_OVERLAP', '0.3'))
+
+# Controle de admissão da API de Chat (ver tickets/admission.py)
+CHAT_ADMISSION_ENABLED = os.environ.get('CHAT_ADMISSION_ENABLED', 'True') == 'True'
+# Onde ficam os baldes: 'memory' (por processo) ou 'cache' (cache do Django, compartilhável)
+CHAT_ADMISSION_STORE = os.environ.get('CHAT_ADMISSION_STORE', 'memory')
+CHAT_ADMISSION_CACHE_ALIAS = 'default'
+# Limite por cliente (fichas/s e rajada) e prioridade na fila (menor é atendida antes)
+CHAT_ADMISSION_CLASSES = {
+    'agent': {
+        'rate': float(os.environ.get('CHAT_AGENT_RATE', '1.0')),
+        'burst': float(os.environ.get('CHAT_AGENT_BURST', '10')),
+        'priority': 0,
+    },
+    'anonymous': {
+        'rate': float(os.environ.get('CHAT_ANONYMOUS_RATE', '0.2')),
+        'burst': float(os.environ.get('CHAT_ANONYMOUS_BURST', '5')),
+        'priority': 1,
+    },
+}
+# Limite global (cota do Bedrock). Com o store 'memory' o limite vale por processo:
+# divida a cota pelo número de workers (WEB_CONCURRENCY)
+CHAT_GLOBAL_RATE = float(os.environ.get('CHAT_GLOBAL_RATE', '2.0'))
+CHAT_GLOBAL_BURST = float(os.environ.get('CHAT_GLOBAL_BURST', '5'))
+# Requisições aguardando ficha global por processo e espera máxima (s) antes do 429.
+# Cada requisição na fila prende uma thread do worker durante a espera: no perfil wsgi
+# a fila fica limitada a GUNICORN_THREADS - 1 (sempre sobra uma thread para os demais
+# endpoints); no perfil asgi as views síncronas dividem uma única thread por processo
+# e a requisição sem ficha global é recusada na hora.
+CHAT_ADMISSION_QUEUE_SIZE = int(os.environ.get('CHAT_ADMISSION_QUEUE_SIZE', '20'))
+if SERVER_PROFILE == 'wsgi':
+    CHAT_ADMISSION_QUEUE_SIZE = min(CHAT_ADMISSION_QUEUE_SIZE, int(os.environ.get('GUNICORN_THREADS', '4')) - 1)
+elif SERVER_PROFILE == 'asgi':
+    CHAT_ADMISSION_QUEUE_SIZE = 0
+CHAT_ADMISSION_MAX_WAIT = float(os.environ.get('CHAT_ADMISSION_MAX_WAIT', '5'))
+# Cabeçalho com o IP real do cliente atrás de um balanceador (ex: HTTP_X_FORWARDED_FOR); vazio usa REMOTE_ADDR.
+# Vale a entrada mais à direita, acrescentada pelo balanceador (as demais vêm do cliente)
+CHAT_CLIENT_IP_HEADER = os.environ.get('CHAT_CLIENT_IP_HEADER', '')
+
 # Validação de senhas
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -117,5 +265,48 @@ USE_TZ = True
 # Arquivos estáticos (CSS, JavaScript, Images)
 STATIC_URL = 'static/'
 
+# Arquivos gerados pela aplicação (ex: PDFs de orçamentos)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = Path(os.environ.get('MEDIA_ROOT', BASE_DIR / 'media'))
+
+# URL pública do Backend, usada para montar links absolutos (ex: Budget.pdf_url)
+PUBLIC_BASE_URL = os.environ.get('PUBLIC_BASE_URL', 'http://localhost:8000')
+
+# Renderização de PDFs de orçamento em segundo plano
+# Número de threads do pool e tamanho/espera máxima de cada lote de renderização
+BUDGET_PDF_WORKERS = int(os.environ.get('BUDGET_PDF_WORKERS', '2'))
+BUDGET_PDF_BATCH_SIZE = int(os.environ.get('BUDGET_PDF_BATCH_SIZE', '20'))
+BUDGET_PDF_BATCH_WAIT = float(os.environ.get('BUDGET_PDF_BATCH_WAIT', '0.5'))
+
+# Renderers/parsers da API: JSON com orjson (ver tickets/renderers.py) e, com o
+# pacote msgpack instalado, MessagePack negociado por Content-Type/Accept
+API_MSGPACK_ENABLED = (
+    os.environ.get('API_MSGPACK_ENABLED', 'True') == 'True' and importlib.util.find_spec('msgpack') is not None
+)
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'tickets.renderers.OrjsonRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ] + (['tickets.renderers.MessagePackRenderer'] if API_MSGPACK_ENABLED else []),
+    'DEFAULT_PARSER_CLASSES': [
+        'tickets.renderers.OrjsonParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ] + (['tickets.renderers.MessagePackParser'] if API_MSGPACK_ENABLED else []),
+}
+
+# Logs enviados ao console (stdout), coletados pelo Docker/CloudWatch
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'default': {'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'default'},
+    },
+    'root': {'handlers': ['console'], 'level': os.environ.get('LOG_LEVEL', 'INFO')},
+}
+
 # Configuração da chave primária padrão para modelos
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
@@ -10,3 +12,7 @@ urlpatterns = [
     # Prefixo 'api/' para organizar os endpoints da API
     path('api/', include('tickets.urls')),
 ]
+
+# Em desenvolvimento o próprio Django serve os arquivos gerados (PDFs de orçamento).
+# Em produção eles devem ser servidos por um storage/CDN dedicado.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -19,7 +19,30 @@ fi
 # Isso cria as tabelas necessárias no banco de dados
 echo "Aplicando migrações do banco de dados..."
 python manage.py migrate
+# Tabela do cache em banco (CACHE_BACKEND=...DatabaseCache); sem esse backend não faz nada
+python manage.py createcachetable
 
-# Inicia o servidor de desenvolvimento do Django acessível externamente (0.0.0.0)
-# exec "$@" permite que o comando passado no CMD do Dockerfile assuma o PID 1
-exec "$@"
+# Se um comando foi passado explicitamente (CMD/command), ele assume o PID 1
+if [ "$#" -gt 0 ]
+then
+    exec "$@"
+fi
+
+# Caso contrário, o servidor é escolhido pelo perfil definido em SERVER_PROFILE:
+#   dev  -> servidor de desenvolvimento do Django (processo único, hot reload)
+#   wsgi -> Gunicorn com workers gthread (produção)
+#   asgi -> Gunicorn com workers Uvicorn (produção, streaming)
+case "${SERVER_PROFILE:-dev}" in
+    wsgi)
+        echo "Iniciando Gunicorn (WSGI)..."
+        exec gunicorn core.wsgi:application -c gunicorn.conf.py
+        ;;
+    asgi)
+        echo "Iniciando Gunicorn + Uvicorn (ASGI)..."
+        exec gunicorn core.asgi:application -c gunicorn.conf.py
+        ;;
+    *)
+        echo "Iniciando servidor de desenvolvimento..."
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+esac
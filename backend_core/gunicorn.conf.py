@@ -0,0 +1,35 @@
+import multiprocessing
+import os
+
+# Configuração do Gunicorn para o perfil de produção do Backend.
+# O perfil é escolhido pela variável SERVER_PROFILE (ver entrypoint.sh):
+#   wsgi -> workers 'gthread' servindo core.wsgi (padrão, endpoints síncronos)
+#   asgi -> workers Uvicorn servindo core.asgi (streaming e conexões longas)
+
+SERVER_PROFILE = os.environ.get('SERVER_PROFILE', 'wsgi')
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Processos: padrão (2 x CPUs) + 1, ajustável por WEB_CONCURRENCY
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+
+if SERVER_PROFILE == 'asgi':
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    # Threads por processo: as chamadas ao Bedrock/OpenSearch são dominadas por I/O
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Tempo máximo de uma requisição (a geração no Bedrock pode levar dezenas de segundos)
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', '5'))
+
+# Recicla workers periodicamente (com jitter para não reiniciarem todos juntos)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', '2000'))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', '200'))
+
+# Logs de acesso e erro no stdout (coletados pelo Docker)
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
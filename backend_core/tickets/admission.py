@@ -0,0 +1,150 @@
+import heapq
+import itertools
+import threading
+import time
+
+# --- Controle de Admissão do Chat ---
+# Cada pergunta ao Chat consome uma ficha do balde do cliente e uma do balde
+# global (cota do Bedrock). Sem ficha no balde do cliente a requisição é recusada
+# na hora; sem ficha no global ela aguarda em uma fila limitada, por ordem de
+# prioridade (agentes autenticados antes do chat anônimo). Com a fila cheia ou
+# após a espera máxima, a requisição é descartada (429 com Retry-After) e a ficha
+# do cliente é devolvida, o que mantém a latência estável para quem foi admitido.
+# Este módulo não depende do Django (ver tickets/throttling.py para a integração).
+
+
+class AdmissionRejected(Exception):
+    """Requisição recusada; `retry_after` é a espera sugerida em segundos."""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Requisição recusada ({reason}); tente novamente em {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class MemoryBucketStore:
+    """Estado dos baldes (fichas, último reabastecimento) em memória do processo."""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now, cost=1.0):
+        """
+        Reabastece o balde `key` (`rate` fichas/s, no máximo `burst`) e tenta retirar `cost`.
+        Retorna 0.0 se retirou ou os segundos até haver fichas suficientes.
+        """
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now, rate, burst))[:2]
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            taken = tokens >= cost
+            if taken:
+                tokens -= cost
+            self._buckets[key] = (tokens, now, rate, burst)
+            if len(self._buckets) > self.max_keys:
+                self._discard_full(now)
+        if taken:
+            return 0.0
+        return (cost - tokens) / rate if rate > 0 else float('inf')
+
+    def refund(self, key, rate, burst, now, amount=1.0):
+        """Devolve `amount` fichas ao balde `key` (nunca acima de `burst`)."""
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is None:
+                # Balde ausente equivale a cheio
+                return
+            tokens = min(burst, state[0] + (now - state[1]) * rate + amount)
+            self._buckets[key] = (tokens, now, rate, burst)
+
+    def _discard_full(self, now):
+        # Balde cheio equivale a ausente: descarta os de clientes inativos
+        self._buckets = {
+            key: state for key, state in self._buckets.items()
+            if state[0] + (now - state[1]) * state[2] < state[3]
+        }
+
+
+class AdmissionController:
+    """
+    Baldes por cliente e global com fila de espera limitada e classes de prioridade.
+
+    `classes` mapeia o nome da classe para {'rate', 'burst', 'priority'} (menor
+    prioridade é atendida antes); o balde global usa `global_rate`/`global_burst`.
+    """
+
+    def __init__(self, classes, global_rate, global_burst, queue_size=20, max_wait=5.0,
+                 store=None, global_store=None, clock=time.monotonic):
+        self.classes = classes
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.store = store or MemoryBucketStore()
+        self.global_store = global_store or self.store
+        self._clock = clock
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _take_global(self):
+        return self.global_store.take('__global__', self.global_rate, self.global_burst, self._clock())
+
+    def acquire(self, client_key, client_class):
+        """
+        Admite a requisição (retorna os segundos aguardados na fila) ou levanta AdmissionRejected.
+        """
+        limits = self.classes[client_class]
+        started = self._clock()
+        bucket = f"{client_class}:{client_key}"
+        wait = self.store.take(bucket, limits['rate'], limits['burst'], started)
+        if wait > 0:
+            raise AdmissionRejected('limite_cliente', wait)
+
+        try:
+            return self._acquire_global(limits['priority'], started)
+        except AdmissionRejected:
+            # Recusa por sobrecarga global: a ficha do cliente é devolvida, senão na
+            # sobrecarga os clientes bem-comportados também esgotariam o próprio balde
+            self.store.refund(bucket, limits['rate'], limits['burst'], self._clock())
+            raise
+
+    def _acquire_global(self, priority, started):
+        """Retira a ficha do balde global, aguardando na fila por ordem de prioridade."""
+        entry = (priority, next(self._sequence))
+        with self._condition:
+            if not self._waiting:
+                wait = self._take_global()
+                if wait == 0:
+                    return 0.0
+            if len(self._waiting) >= self.queue_size:
+                raise AdmissionRejected('fila_cheia', self._estimated_wait())
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if self._waiting[0] == entry:
+                        wait = self._take_global()
+                        if wait == 0:
+                            return self._clock() - started
+                    else:
+                        wait = 1.0 / self.global_rate if self.global_rate > 0 else self.max_wait
+                    remaining = self.max_wait - (self._clock() - started)
+                    if remaining <= 0:
+                        raise AdmissionRejected('tempo_de_espera', self._estimated_wait())
+                    self._condition.wait(min(remaining, wait))
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                # O próximo da fila pode tentar a ficha (ou assumir a frente)
+                self._condition.notify_all()
+
+    def _estimated_wait(self):
+        """Tempo aproximado para a fila atual ser atendida pelo balde global."""
+        if self.global_rate <= 0:
+            return self.max_wait
+        return (len(self._waiting) + 1) / self.global_rate
+
+    def waiting(self):
+        with self._condition:
+            return len(self._waiting)
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class TicketsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tickets'
+    verbose_name = "Chamados e Orçamentos"
+
+    def ready(self):
+        # Registra os signals que mantêm as tabelas de estatísticas
+        from . import signals  # noqa: F401
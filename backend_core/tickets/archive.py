@@ -0,0 +1,79 @@
+import time
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Ticket, TicketArchive
+from .stats import suspend_rollups
+
+# --- Arquivamento de Chamados Encerrados ---
+# Move os chamados RESOLVED/CLOSED sem atualização há mais de N dias para
+# TicketArchive em lotes curtos: cada lote é uma transação própria (copia e
+# apaga), de modo que os locks duram apenas o lote. No PostgreSQL as linhas já
+# travadas por outra transação são puladas (SKIP LOCKED) e ficam para o lote
+# seguinte. As estatísticas do painel continuam contando os arquivados.
+
+ARCHIVABLE_STATUSES = ('RESOLVED', 'CLOSED')
+
+ARCHIVE_FIELDS = (
+    'id', 'customer_name', 'customer_id', 'problem_description', 'status',
+    'created_at', 'updated_at', 'provisional_reference', 'parent_id',
+)
+
+
+def archivable_tickets(days):
+    """
+    Chamados encerrados há mais de `days` dias. Incidentes principais com duplicados
+    ainda na tabela principal esperam os duplicados (a exclusão anularia o vínculo).
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    return Ticket.objects.filter(status__in=ARCHIVABLE_STATUSES, updated_at__lt=cutoff).exclude(
+        id__in=Ticket.objects.filter(parent__isnull=False).values('parent_id')
+    )
+
+
+def archive_batch(days, batch_size):
+    """Arquiva um lote em uma transação curta; retorna a quantidade de chamados movidos."""
+    with transaction.atomic():
+        candidates = archivable_tickets(days).order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        rows = list(candidates.values(*ARCHIVE_FIELDS)[:batch_size])
+        if not rows:
+            return 0
+
+        archived_at = timezone.now()
+        # ignore_conflicts: um lote interrompido após a cópia pode ser reexecutado
+        TicketArchive.objects.bulk_create(
+            [TicketArchive(archived_at=archived_at, **row) for row in rows], ignore_conflicts=True,
+        )
+        # Os arquivados continuam nas estatísticas: a exclusão não desconta os rollups
+        with suspend_rollups():
+            Ticket.objects.filter(id__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+def archive_closed_tickets(days, batch_size=1000, pause=0.0, max_batches=None, progress=None):
+    """
+    Arquiva em lotes até não restarem candidatos (ou até `max_batches`).
+    `pause` (s) entre lotes reduz a concorrência com o tráfego da API.
+    Retorna o total de chamados arquivados.
+    """
+    total, batches = 0, 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(days, batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+        if progress:
+            progress(total)
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def get_archived_ticket(pk):
+    """Chamado arquivado pelo id, ou None."""
+    return TicketArchive.objects.filter(pk=pk).first()
@@ -0,0 +1,221 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+# Camada de invocação do AWS Bedrock compartilhada pelo Webhook e pelo serviço RAG do Backend.
+# Mantenha sincronizado com lambda_functions/bedrock_client.py.
+logger = logging.getLogger(__name__)
+
+# --- Configurações de Variáveis de Ambiente ---
+BEDROCK_REGION = os.environ.get('BEDROCK_REGION', os.environ.get('AWS_REGION', 'us-east-1'))
+
+# Lista ordenada de modelos: o primeiro é o preferencial, os demais são usados
+# apenas quando o anterior está limitado (throttling) ou indisponível.
+# Os modelos devem aceitar a Messages API com cache de prompt (ver bedrock_messages.py).
+BEDROCK_MODEL_IDS = [
+    model_id.strip()
+    for model_id in os.environ.get('BEDROCK_MODEL_IDS', 'us.anthropic.claude-3-7-sonnet-20250219-v1:0,us.anthropic.claude-3-5-haiku-20241022-v1:0').split(',')
+    if model_id.strip()
+]
+
+# Passadas pela lista de modelos (inclui a primeira). O botocore faz uma única tentativa
+# por chamada: o retry fica no laço de fallback, que respeita o prazo da requisição.
+BEDROCK_MAX_ATTEMPTS = int(os.environ.get('BEDROCK_MAX_ATTEMPTS', '3'))
+# Espera (s) antes da passada seguinte, dobrada a cada passada
+BEDROCK_RETRY_BACKOFF = float(os.environ.get('BEDROCK_RETRY_BACKOFF', '0.2'))
+
+# Número máximo de invocações simultâneas por processo (protege a cota da conta)
+BEDROCK_MAX_CONCURRENCY = int(os.environ.get('BEDROCK_MAX_CONCURRENCY', '4'))
+
+BEDROCK_CONNECT_TIMEOUT = float(os.environ.get('BEDROCK_CONNECT_TIMEOUT', '2'))
+# Teto do read timeout; com prazo, cada chamada usa o tempo restante (arredondado para cima)
+BEDROCK_READ_TIMEOUT = float(os.environ.get('BEDROCK_READ_TIMEOUT', '15'))
+
+# Tempo mínimo (segundos) para que valha a pena iniciar uma nova chamada ao modelo
+BEDROCK_MIN_CALL_SECONDS = float(os.environ.get('BEDROCK_MIN_CALL_SECONDS', '1.0'))
+
+# Códigos de erro que indicam sobrecarga ou indisponibilidade do modelo.
+# Nesses casos passamos para o próximo modelo da lista em vez de desistir.
+FALLBACK_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'ModelTimeoutException',
+    'InternalServerException',
+    'ResourceNotFoundException',
+}
+
+
+class BedrockUnavailableError(Exception):
+    """Nenhum modelo da lista de fallback respondeu dentro do prazo disponível."""
+
+
+def create_bedrock_client(region=BEDROCK_REGION, connect_timeout=BEDROCK_CONNECT_TIMEOUT,
+                          read_timeout=BEDROCK_READ_TIMEOUT):
+    """
+    Cria o cliente do Bedrock Runtime com uma única tentativa por chamada e timeouts explícitos.
+
+    Retries do botocore (e o rate limiter do modo 'adaptive') ignorariam o prazo da
+    requisição e adiariam o fallback: quem tenta de novo é o BedrockInvoker.
+    """
+    # Importação tardia: permite testar o invocador com um cliente stub sem o SDK da AWS
+    import boto3
+    from botocore.config import Config
+
+    config = Config(
+        region_name=region,
+        retries={'mode': 'standard', 'max_attempts': 1},
+        connect_timeout=connect_timeout,
+        read_timeout=read_timeout,
+        max_pool_connections=max(BEDROCK_MAX_CONCURRENCY, 10),
+    )
+    endpoint_url = os.environ.get('BEDROCK_ENDPOINT_URL') or None
+    return boto3.client(service_name='bedrock-runtime', config=config, endpoint_url=endpoint_url)
+
+
+def _error_code(error):
+    """Extrai o código de erro de uma ClientError do botocore (ou None para outros erros)."""
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        return response.get('Error', {}).get('Code')
+    return None
+
+
+class BedrockInvoker:
+    """
+    Invocador do Bedrock com cliente reutilizável, limite de concorrência,
+    prazo por chamada e fallback ordenado entre modelos.
+    """
+
+    def __init__(self, client=None, model_ids=None, max_concurrency=BEDROCK_MAX_CONCURRENCY,
+                 min_call_seconds=BEDROCK_MIN_CALL_SECONDS, max_attempts=BEDROCK_MAX_ATTEMPTS,
+                 retry_backoff=BEDROCK_RETRY_BACKOFF, client_factory=None, sleep=time.sleep):
+        """
+        Args:
+            client: Cliente bedrock-runtime (ou stub com `invoke_model`) usado em todas as chamadas.
+                Se omitido, os clientes são criados sob demanda por `client_factory(read_timeout)`.
+            model_ids (list, optional): Modelos em ordem de preferência.
+            max_concurrency (int): Máximo de chamadas simultâneas através deste invocador.
+            min_call_seconds (float): Prazo mínimo restante para iniciar uma chamada.
+            max_attempts (int): Passadas pela lista de modelos.
+            retry_backoff (float): Espera (s) antes da segunda passada, dobrada nas seguintes.
+        """
+        self._client = client
+        self._client_factory = client_factory or (lambda read_timeout: create_bedrock_client(read_timeout=read_timeout))
+        # Um cliente por read timeout (segundos inteiros até BEDROCK_READ_TIMEOUT)
+        self._clients = {}
+        self._client_lock = threading.Lock()
+        self.model_ids = list(model_ids or BEDROCK_MODEL_IDS)
+        self.min_call_seconds = min_call_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self._sleep = sleep
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @property
+    def client(self):
+        """Cliente com o read timeout máximo (sem prazo), criado na primeira leitura."""
+        return self.client_for(None)
+
+    def client_for(self, remaining):
+        """
+        Cliente cujo read timeout cabe em `remaining` segundos (arredondado para cima,
+        limitado a BEDROCK_READ_TIMEOUT). O botocore fixa o timeout na criação do
+        cliente, então os clientes são criados uma vez por valor e reutilizados.
+        """
+        if self._client is not None:
+            return self._client
+        read_timeout = BEDROCK_READ_TIMEOUT if remaining is None else min(
+            BEDROCK_READ_TIMEOUT, max(1, math.ceil(remaining))
+        )
+        client = self._clients.get(read_timeout)
+        if client is None:
+            with self._client_lock:
+                client = self._clients.get(read_timeout)
+                if client is None:
+                    # Criação cara (modelo de serviço do botocore): feita uma vez por valor
+                    client = self._clients[read_timeout] = self._client_factory(read_timeout)
+        return client
+
+    def invoke(self, body, timeout=None):
+        """
+        Invoca o primeiro modelo disponível da lista de fallback.
+
+        Args:
+            body (dict): Payload do modelo (serializado em JSON aqui).
+            timeout (float, optional): Segundos disponíveis para a chamada completa,
+                incluindo a espera por uma vaga no limite de concorrência.
+
+        Returns:
+            tuple: (corpo da resposta decodificado, modelId que respondeu).
+
+        Raises:
+            BedrockUnavailableError: Se o prazo acabar ou todos os modelos falharem.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        payload = json.dumps(body)
+
+        # Aguarda uma vaga no limite de concorrência, sem ultrapassar o prazo da chamada
+        if deadline is None:
+            acquired = self._semaphore.acquire()
+        else:
+            acquired = self._semaphore.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        if not acquired:
+            raise BedrockUnavailableError("Limite de concorrência do Bedrock atingido dentro do prazo.")
+
+        try:
+            last_error = None
+            for attempt in range(self.max_attempts):
+                if attempt and not self._backoff(attempt, deadline):
+                    break
+                for model_id in self.model_ids:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining < self.min_call_seconds:
+                        logger.warning(f"Prazo insuficiente para invocar {model_id}. Abortando fallback.")
+                        raise BedrockUnavailableError("Nenhum modelo Bedrock disponível dentro do prazo.") from last_error
+                    try:
+                        response = self.client_for(remaining).invoke_model(
+                            modelId=model_id,
+                            body=payload,
+                            contentType='application/json',
+                            accept='application/json',
+                        )
+                        return json.loads(response['body'].read()), model_id
+                    except Exception as e:
+                        code = _error_code(e)
+                        if code is not None and code not in FALLBACK_ERROR_CODES:
+                            # Erros de validação/permissão do payload não melhoram trocando de modelo
+                            raise
+                        logger.warning(f"Modelo {model_id} indisponível ({code or type(e).__name__}). Tentando próximo.")
+                        last_error = e
+
+            raise BedrockUnavailableError("Nenhum modelo Bedrock disponível dentro do prazo.") from last_error
+        finally:
+            self._semaphore.release()
+
+    def _backoff(self, attempt, deadline):
+        """Espera antes da passada `attempt`; False se o prazo não comportar a espera e uma chamada."""
+        delay = self.retry_backoff * (2 ** (attempt - 1))
+        if deadline is not None and deadline - time.monotonic() - delay < self.min_call_seconds:
+            return False
+        self._sleep(delay)
+        return True
+
+
+# Instância padrão compartilhada por todo o processo (cliente e semáforo únicos)
+_default_invoker = None
+_default_invoker_lock = threading.Lock()
+
+
+def get_default_invoker():
+    """Retorna o invocador compartilhado do processo, criando-o na primeira chamada."""
+    global _default_invoker
+    if _default_invoker is None:
+        with _default_invoker_lock:
+            if _default_invoker is None:
+                _default_invoker = BedrockInvoker()
+    return _default_invoker
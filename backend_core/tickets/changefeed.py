@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+
+# --- Feed de Alterações de Chamados (push via Server-Sent Events) ---
+# Cada processo ASGI mantém um único "hub" que consulta a tabela de eventos
+# (id > último visto) em intervalos curtos e distribui os eventos novos às
+# conexões inscritas, indexadas por chamado e por cliente. O custo no banco é
+# uma consulta por intervalo por processo, independente do número de clientes
+# conectados; sem inscritos o hub para de consultar.
+# Este módulo não depende do Django (ver tickets/event_stream.py para o endpoint).
+
+logger = logging.getLogger(__name__)
+
+# Marcador colocado na fila para encerrar a conexão
+CLOSED = object()
+
+# Maior salto de ids acompanhado como lacuna (ids além disso são considerados perdidos)
+MAX_TRACKED_GAP = 1000
+
+
+def format_sse(event):
+    """Serializa um evento {'id', 'type', ...} no formato text/event-stream."""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n".encode('utf-8')
+
+
+class Subscription:
+    """
+    Conexão inscrita em um chamado e/ou cliente. A fila é limitada: um cliente lento
+    demais é desconectado (overflowed) e retoma pelo Last-Event-ID ao reconectar.
+    """
+
+    def __init__(self, ticket_id=None, customer_id=None, max_queued=100):
+        self.ticket_id = ticket_id
+        self.customer_id = customer_id
+        self.queue = asyncio.Queue(maxsize=max_queued + 1)
+        self.max_queued = max_queued
+        self.overflowed = False
+
+    def matches(self, event):
+        if self.ticket_id is not None and event.get('ticket_id') != self.ticket_id:
+            return False
+        if self.customer_id is not None and event.get('customer_id') != self.customer_id:
+            return False
+        return True
+
+    def push(self, event):
+        if self.queue.qsize() >= self.max_queued:
+            self.overflowed = True
+            self.close()
+            return
+        self.queue.put_nowait(event)
+
+    def close(self):
+        """Descarta os eventos pendentes e acorda o consumidor com o marcador CLOSED."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(CLOSED)
+
+
+class ChangeFeedHub:
+    """
+    Distribui os eventos de chamados às inscrições do processo.
+
+    `fetch_since(after_id, missing_ids)` é uma corrotina que retorna os eventos com
+    id > after_id ou id em missing_ids, em ordem de id. `fetch_latest_id()` retorna
+    o maior id existente (ponto de partida ao iniciar o hub).
+
+    Ids podem ser confirmados fora de ordem (transações concorrentes): um id pulado
+    é consultado novamente até aparecer ou até `gap_timeout` segundos (rollback).
+    """
+
+    def __init__(self, fetch_since, fetch_latest_id, poll_interval=0.5, gap_timeout=10.0, clock=time.monotonic):
+        self._fetch_since = fetch_since
+        self._fetch_latest_id = fetch_latest_id
+        self.poll_interval = poll_interval
+        self.gap_timeout = gap_timeout
+        self._clock = clock
+        self._by_ticket = defaultdict(set)
+        self._by_customer = defaultdict(set)
+        self._subscriptions = set()
+        self._missing = {}
+        self._task = None
+        self.last_id = None
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def subscribe(self, ticket_id=None, customer_id=None, max_queued=100):
+        """Inscreve uma conexão; o hub passa a consultar o banco se estava parado."""
+        subscription = Subscription(ticket_id, customer_id, max_queued)
+        self._subscriptions.add(subscription)
+        if ticket_id is not None:
+            self._by_ticket[ticket_id].add(subscription)
+        else:
+            self._by_customer[customer_id].add(subscription)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+        index, key = (
+            (self._by_ticket, subscription.ticket_id) if subscription.ticket_id is not None
+            else (self._by_customer, subscription.customer_id)
+        )
+        subscribers = index.get(key)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del index[key]
+
+    def dispatch(self, events):
+        """Entrega cada evento às inscrições do chamado e do cliente correspondentes."""
+        for event in events:
+            targets = self._by_ticket.get(event.get('ticket_id'), set()) | self._by_customer.get(
+                event.get('customer_id'), set()
+            )
+            for subscription in targets:
+                if subscription.matches(event):
+                    subscription.push(event)
+
+    def _track_missing(self, events):
+        now = self._clock()
+        found = {event['id'] for event in events}
+        for event_id in found:
+            self._missing.pop(event_id, None)
+        new_ids = sorted(event_id for event_id in found if event_id > self.last_id)
+        previous = self.last_id
+        for event_id in new_ids:
+            for skipped in range(max(previous + 1, event_id - MAX_TRACKED_GAP), event_id):
+                self._missing.setdefault(skipped, now)
+            previous = event_id
+        if new_ids:
+            self.last_id = new_ids[-1]
+        self._missing = {
+            event_id: seen_at for event_id, seen_at in self._missing.items()
+            if now - seen_at < self.gap_timeout
+        }
+
+    async def poll_once(self):
+        """Consulta os eventos novos (e os ids pulados) e os distribui."""
+        if self.last_id is None:
+            self.last_id = await self._fetch_latest_id() or 0
+            return []
+        events = await self._fetch_since(self.last_id, sorted(self._missing))
+        self._track_missing(events)
+        self.dispatch(events)
+        return events
+
+    async def run(self):
+        """Laço de consulta; termina quando não há mais inscrições."""
+        while self._subscriptions:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                # Falha transitória do banco: tenta de novo no próximo intervalo
+                logger.error(f"Erro na consulta dos eventos de chamados: {e}")
+            await asyncio.sleep(self.poll_interval)
+        # Sem inscritos o ponto de partida é recalculado no próximo início
+        self.last_id = None
+        self._missing.clear()
@@ -0,0 +1,151 @@
+import json
+import re
+import unicodedata
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+
+# --- Memória de Conversa do Chat ---
+# Cada sessão guarda uma janela limitada dos últimos turnos, um resumo acumulado
+# dos turnos mais antigos e o contexto recuperado na última busca. O registro é
+# serializado de forma compacta (JSON com chaves curtas + zlib) no cache do Django,
+# com expiração por inatividade: cada gravação renova o TTL da sessão.
+
+# Palavras muito frequentes ignoradas na comparação de assunto entre perguntas
+STOPWORDS = {
+    'a', 'o', 'as', 'os', 'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'no', 'na', 'nos', 'nas',
+    'um', 'uma', 'para', 'por', 'com', 'sem', 'que', 'se', 'como', 'qual', 'quais', 'eu', 'meu',
+    'minha', 'isso', 'isto', 'esse', 'essa', 'ele', 'ela', 'ao', 'aos', 'mais', 'ja', 'nao',
+    'sim', 'me', 'voce', 'pode', 'posso', 'ha', 'tem', 'ter', 'ser', 'esta', 'estou', 'sobre',
+    'entao', 'ai', 'depois', 'agora', 'ainda', 'ok',
+}
+
+# Mensagens com até este número de termos relevantes são comparadas pela presença de
+# um termo em comum (a proporção de termos compartilhados seria sempre baixa)
+SHORT_MESSAGE_TERMS = 2
+
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+def estimate_tokens(text):
+    """Estimativa barata de tokens (~4 caracteres por token) para limitar o prompt."""
+    return (len(text) + 3) // 4
+
+
+def content_terms(text):
+    """Termos relevantes da pergunta (minúsculas, sem acentos e sem stopwords)."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return {term for term in re.findall(r'\w+', text) if len(term) > 1 and term not in STOPWORDS}
+
+
+def is_valid_session_id(session_id):
+    return isinstance(session_id, str) and bool(SESSION_ID_PATTERN.match(session_id))
+
+
+def _shorten(text, max_chars):
+    text = ' '.join(text.split())
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + '...'
+
+
+class ConversationMemory:
+    """Estado de uma sessão de chat com janela, resumo e contexto reutilizável."""
+
+    def __init__(self, session_id, summary='', turns=None, retrieval_terms=None, context=''):
+        self.session_id = session_id
+        self.summary = summary
+        # Lista de pares [pergunta, resposta], do mais antigo ao mais recente
+        self.turns = turns or []
+        self.retrieval_terms = set(retrieval_terms or [])
+        self.context = context
+
+    # --- Persistência compacta ---
+
+    @staticmethod
+    def _cache():
+        return caches[settings.CHAT_MEMORY_CACHE_ALIAS]
+
+    @staticmethod
+    def _key(session_id):
+        return f"chat-memory:{session_id}"
+
+    @classmethod
+    def load(cls, session_id):
+        """Carrega a sessão do cache (ou inicia uma nova se expirada/inexistente)."""
+        raw = cls._cache().get(cls._key(session_id))
+        if raw is None:
+            return cls(session_id)
+        data = json.loads(zlib.decompress(raw))
+        return cls(session_id, data['s'], data['t'], data['q'], data['c'])
+
+    def save(self):
+        """Grava a sessão renovando o TTL de inatividade."""
+        data = {
+            's': self.summary,
+            't': self.turns,
+            'q': sorted(self.retrieval_terms),
+            'c': self.context,
+        }
+        raw = zlib.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        self._cache().set(self._key(self.session_id), raw, timeout=settings.CHAT_MEMORY_IDLE_TTL)
+
+    # --- Regras de memória ---
+
+    def is_same_topic(self, message):
+        """
+        Indica se a nova mensagem continua o assunto da última busca, caso em que o
+        contexto já recuperado pode ser reutilizado. Mensagens sem termos relevantes
+        ("e depois?", "não é isso") são tratadas como continuação; mensagens curtas (até
+        SHORT_MESSAGE_TERMS termos) precisam repetir ao menos um termo da busca, já que
+        "e a impressora?" muda de assunto mesmo sendo curta.
+        """
+        if not self.context:
+            return False
+        terms = content_terms(message)
+        if not terms:
+            return True
+        shared = terms & self.retrieval_terms
+        if len(terms) <= SHORT_MESSAGE_TERMS:
+            return bool(shared)
+        return len(shared) / len(terms | self.retrieval_terms) >= settings.CHAT_MEMORY_TOPIC_OVERLAP
+
+    def remember_retrieval(self, message, context):
+        """Guarda o contexto da busca atual (limitado em tamanho) para reutilização."""
+        self.retrieval_terms = content_terms(message)
+        self.context = context[:settings.CHAT_MEMORY_CONTEXT_MAX_CHARS]
+
+    def add_turn(self, message, answer):
+        """Adiciona um turno e dobra os que saem da janela no resumo acumulado."""
+        self.turns.append([message, answer])
+        while len(self.turns) > settings.CHAT_MEMORY_WINDOW:
+            old_message, old_answer = self.turns.pop(0)
+            entry = f"Usuário perguntou: {_shorten(old_message, 120)} / Assistente: {_shorten(old_answer, 160)}"
+            entries = [line for line in self.summary.split('\n') if line] + [entry]
+            # Resumo limitado em tokens: descarta as entradas (linhas) mais antigas inteiras
+            max_chars = settings.CHAT_MEMORY_SUMMARY_MAX_TOKENS * 4
+            while entries and len('\n'.join(entries)) > max_chars:
+                entries.pop(0)
+            self.summary = '\n'.join(entries)
+
+    def render_history(self):
+        """
+        Monta o histórico para o prompt respeitando CHAT_MEMORY_MAX_PROMPT_TOKENS.
+        Os turnos mais recentes têm prioridade; o resumo entra se ainda couber.
+        """
+        budget = settings.CHAT_MEMORY_MAX_PROMPT_TOKENS
+        recent = []
+        for message, answer in reversed(self.turns):
+            turn = f"Usuário: {message}\nAssistente: {answer}"
+            cost = estimate_tokens(turn)
+            if cost > budget:
+                break
+            recent.insert(0, turn)
+            budget -= cost
+
+        parts = []
+        if self.summary:
+            summary = f"Resumo da conversa anterior:\n{self.summary}"
+            if estimate_tokens(summary) <= budget:
+                parts.append(summary)
+
+        return "\n\n".join(parts + recent)
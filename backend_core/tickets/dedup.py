@@ -0,0 +1,145 @@
+import hashlib
+import random
+import re
+import threading
+import unicodedata
+
+# --- Detecção de Chamados Quase Duplicados (MinHash + LSH) ---
+# Cada descrição vira um conjunto de termos normalizados; a assinatura MinHash
+# aproxima a similaridade de Jaccard entre conjuntos e o LSH (bandas da
+# assinatura usadas como chave de bucket) encontra candidatos sem comparar com
+# todos os chamados. Os candidatos são confirmados pelo Jaccard exato.
+# Este módulo não depende do Django (ver tickets/duplicates.py para a integração).
+
+# Palavras sem valor para distinguir problemas (sem acentos, minúsculas)
+STOPWORDS = {
+    'a', 'o', 'as', 'os', 'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'no', 'na', 'nos', 'nas',
+    'um', 'uma', 'para', 'por', 'com', 'sem', 'que', 'se', 'meu', 'minha', 'esta', 'estao', 'nao',
+    'ao', 'aos', 'mais', 'muito', 'ja', 'foi', 'tem', 'ter', 'ser', 'apos',
+    'ola', 'bom', 'dia', 'boa', 'tarde', 'noite', 'favor', 'pelo', 'pela', 'isso', 'esse', 'essa',
+}
+
+# Primo de Mersenne 2^61 - 1 para as permutações universais (a * h + b) mod p
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def shingles(text):
+    """Conjunto de termos relevantes da descrição (sem acentos, pontuação e stopwords)."""
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+    return {term for term in re.findall(r'[a-z0-9]+', text) if len(term) > 2 and term not in STOPWORDS}
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def _hash_term(term):
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class MinHasher:
+    """Gera assinaturas MinHash com `num_perm` permutações determinísticas (pela semente)."""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, terms):
+        hashes = [_hash_term(term) for term in terms]
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._permutations
+        )
+
+
+class LSHIndex:
+    """
+    Índice incremental de chamados por similaridade da descrição.
+
+    `bands` divide a assinatura em faixas de `num_perm / bands` valores; dois chamados
+    viram candidatos se coincidirem em ao menos uma faixa. Mais bandas aumentam o
+    recall para similaridades menores, ao custo de mais candidatos a confirmar.
+    """
+
+    def __init__(self, threshold=0.6, num_perm=64, bands=16, min_terms=3, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm deve ser múltiplo de bands.")
+        self.threshold = threshold
+        self.min_terms = min_terms
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm, seed)
+        self._buckets = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+
+    def _prepare(self, text):
+        terms = shingles(text)
+        if len(terms) < self.min_terms:
+            # Descrições curtas demais ("erro", "ajuda") geram falsos positivos
+            return terms, None
+        return terms, self.hasher.signature(terms)
+
+    def add(self, key, text):
+        """Indexa um chamado. Retorna False se a descrição tiver poucos termos."""
+        terms, signature = self._prepare(text)
+        if signature is None:
+            return False
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (terms, band_keys)
+            for band_key in band_keys:
+                self._buckets.setdefault(band_key, set()).add(key)
+        return True
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band_key in entry[1]:
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query(self, text, exclude=()):
+        """
+        Retorna [(chave, similaridade), ...] dos chamados com Jaccard >= threshold,
+        do mais parecido para o menos parecido.
+        """
+        terms, signature = self._prepare(text)
+        if signature is None:
+            return []
+
+        with self._lock:
+            candidates = set()
+            for band_key in self._band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            scored = [
+                (key, jaccard(terms, self._entries[key][0]))
+                for key in candidates if key not in exclude
+            ]
+
+        matches = [(key, score) for key, score in scored if score >= self.threshold]
+        matches.sort(key=lambda item: (-item[1], item[0]))
+        return matches
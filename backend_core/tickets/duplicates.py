@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .dedup import LSHIndex
+from .models import Ticket
+
+logger = logging.getLogger(__name__)
+
+# --- Integração da Detecção de Duplicados com os Chamados ---
+# Cada processo mantém um índice LSH em memória com os incidentes principais
+# abertos (sem parent) da janela recente. O índice é aquecido do banco no
+# primeiro uso e sincronizado incrementalmente por id (id > último visto), o
+# que inclui chamados criados por outros workers e pela fila assíncrona.
+
+OPEN_STATUSES = ('OPEN', 'IN_PROGRESS')
+
+# Candidatos confirmados no banco por consulta (os mais parecidos primeiro)
+MAX_CANDIDATES = 5
+
+
+def build_index():
+    return LSHIndex(
+        threshold=settings.TICKET_DEDUP_THRESHOLD,
+        num_perm=settings.TICKET_DEDUP_NUM_PERM,
+        bands=settings.TICKET_DEDUP_BANDS,
+        min_terms=settings.TICKET_DEDUP_MIN_TERMS,
+    )
+
+
+class DuplicateDetector:
+    """Localiza o incidente principal de um novo chamado entre os abertos recentes."""
+
+    def __init__(self, index=None):
+        self.index = index or build_index()
+        self._created_at = {}
+        self._last_id = 0
+        self._last_sync = 0.0
+        self._sync_lock = threading.Lock()
+
+    def _window_start(self):
+        return timezone.now() - timedelta(hours=settings.TICKET_DEDUP_WINDOW_HOURS)
+
+    def sync(self, force=False):
+        """Indexa chamados novos desde a última sincronização e descarta os fora da janela."""
+        if not force and time.monotonic() - self._last_sync < settings.TICKET_DEDUP_SYNC_INTERVAL:
+            return
+        with self._sync_lock:
+            window_start = self._window_start()
+            rows = (
+                Ticket.objects.filter(id__gt=self._last_id, created_at__gte=window_start)
+                .order_by('id')
+                .values_list('id', 'problem_description', 'status', 'parent_id', 'created_at')
+            )
+            for ticket_id, description, status, parent_id, created_at in rows.iterator():
+                self._last_id = ticket_id
+                if parent_id is None and status in OPEN_STATUSES and self.index.add(ticket_id, description):
+                    self._created_at[ticket_id] = created_at
+
+            for ticket_id in [key for key, created in self._created_at.items() if created < window_start]:
+                self._discard(ticket_id)
+            self._last_sync = time.monotonic()
+
+    def register(self, ticket):
+        """Indexa imediatamente um chamado recém-criado neste processo."""
+        if ticket.parent_id is None and ticket.status in OPEN_STATUSES:
+            # Mesmo lock da sincronização: _created_at não muda durante a varredura da janela
+            with self._sync_lock:
+                if self.index.add(ticket.id, ticket.problem_description):
+                    self._created_at[ticket.id] = ticket.created_at
+
+    def forget(self, ticket_id):
+        with self._sync_lock:
+            self._discard(ticket_id)
+
+    def _discard(self, ticket_id):
+        # Chamado com _sync_lock adquirido
+        self.index.remove(ticket_id)
+        self._created_at.pop(ticket_id, None)
+
+    def find_parent(self, problem_description):
+        """Retorna o id do incidente principal aberto mais parecido, ou None."""
+        self.sync()
+        started = time.perf_counter()
+        matches = self.index.query(problem_description)[:MAX_CANDIDATES]
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if not matches:
+            return None
+
+        # Confirma no banco: o candidato pode ter sido fechado ou vinculado em outro worker
+        still_open = set(
+            Ticket.objects.filter(
+                id__in=[ticket_id for ticket_id, _ in matches], status__in=OPEN_STATUSES, parent__isnull=True,
+            ).values_list('id', flat=True)
+        )
+        for ticket_id, similarity in matches:
+            if ticket_id in still_open:
+                logger.info(f"Chamado quase duplicado do incidente #{ticket_id} "
+                            f"(similaridade {similarity:.2f}, consulta ao índice em {elapsed_ms:.3f} ms).")
+                return ticket_id
+            self.forget(ticket_id)
+        return None
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_duplicate_detector():
+    """Detector compartilhado do processo (None se TICKET_DEDUP_ENABLED=False)."""
+    global _detector
+    if not settings.TICKET_DEDUP_ENABLED:
+        return None
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector = DuplicateDetector()
+    return _detector
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import events
+from .changefeed import CLOSED, ChangeFeedHub, format_sse
+
+# --- Endpoint SSE de Eventos de Chamados ---
+# Aplicação ASGI montada diretamente em core/asgi.py, fora do ciclo
+# request/response do Django: cada conexão ociosa custa apenas uma corrotina e
+# uma fila em memória, sem thread nem conexão de banco própria.
+#
+#   GET /api/tickets/stream/?ticket=<id>
+#   GET /api/tickets/stream/?customer=<customer_id>
+#
+# O cabeçalho Last-Event-ID (enviado automaticamente pelo EventSource ao
+# reconectar) ou ?last_event_id= reenvia os eventos perdidos desde aquele id.
+
+STREAM_PATH = '/api/tickets/stream/'
+
+# Tempo sugerido ao EventSource antes de reconectar (ms)
+RETRY_MS = 3000
+
+_hub = None
+
+
+def _db_query(func):
+    """
+    sync_to_async de uma consulta ao banco. Fora do ciclo request/response os sinais
+    request_started/request_finished não disparam: as conexões quebradas (banco
+    reiniciado, socket derrubado) ou vencidas são descartadas aqui, antes e depois
+    da consulta, para a próxima chamada abrir uma conexão nova.
+    """
+    def query(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(query)
+
+
+def get_hub():
+    """Hub do processo, criado no primeiro uso (um por worker ASGI)."""
+    global _hub
+    if _hub is None:
+        _hub = ChangeFeedHub(
+            _db_query(events.events_since),
+            _db_query(events.latest_event_id),
+            poll_interval=settings.TICKET_EVENTS_POLL_INTERVAL,
+        )
+    return _hub
+
+
+def _cors_headers(headers):
+    # A aplicação não passa pelos middlewares do Django: replica a política do django-cors-headers
+    origin = headers.get(b'origin')
+    if origin and (
+        getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False)
+        or origin.decode('latin-1') in getattr(settings, 'CORS_ALLOWED_ORIGINS', [])
+    ):
+        return [(b'access-control-allow-origin', origin)]
+    return []
+
+
+async def _send_error(send, status, message, extra_headers):
+    body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())] + extra_headers,
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _close_on_disconnect(receive, subscription):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            subscription.close()
+            return
+
+
+def _parse_params(scope, headers):
+    """Retorna (ticket_id, customer_id, last_event_id) ou levanta ValueError com a mensagem de erro."""
+    params = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    ticket_id = params.get('ticket', [None])[0]
+    customer_id = params.get('customer', [None])[0]
+    last_event_id = headers.get(b'last-event-id', b'').decode('latin-1') or params.get('last_event_id', [None])[0]
+
+    if not ticket_id and not customer_id:
+        raise ValueError("Informe ticket ou customer")
+    try:
+        ticket_id = int(ticket_id) if ticket_id else None
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise ValueError("ticket e last_event_id devem ser inteiros")
+    return ticket_id, customer_id or None, last_event_id
+
+
+async def ticket_event_stream(scope, receive, send):
+    """Aplicação ASGI do stream de eventos de chamados (text/event-stream)."""
+    headers = dict(scope.get('headers') or [])
+    cors = _cors_headers(headers)
+    if scope['method'] != 'GET':
+        return await _send_error(send, 405, "Método não permitido", cors)
+    if not settings.TICKET_EVENTS_ENABLED:
+        return await _send_error(send, 404, "Feed de eventos desativado", cors)
+    try:
+        ticket_id, customer_id, last_event_id = _parse_params(scope, headers)
+    except ValueError as e:
+        return await _send_error(send, 400, str(e), cors)
+
+    hub = get_hub()
+    # Inscreve antes de ler o backlog: eventos gravados durante a leitura ficam na fila
+    subscription = hub.subscribe(ticket_id, customer_id, settings.TICKET_EVENTS_QUEUE_SIZE)
+    watcher = asyncio.ensure_future(_close_on_disconnect(receive, subscription))
+
+    async def write(chunk):
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                # Desliga o buffer de proxies (Nginx) para o evento sair imediatamente
+                (b'x-accel-buffering', b'no'),
+            ] + cors,
+        })
+        await write(f"retry: {RETRY_MS}\n\n".encode())
+
+        replayed = set()
+        if last_event_id is not None:
+            for event in await _db_query(events.backlog)(last_event_id, ticket_id, customer_id):
+                replayed.add(event['id'])
+                await write(format_sse(event))
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.TICKET_EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Comentário SSE: mantém a conexão viva em proxies e balanceadores
+                await write(b": keep-alive\n\n")
+                continue
+            if event is CLOSED:
+                break
+            if event['id'] in replayed:
+                replayed.discard(event['id'])
+                continue
+            await write(format_sse(event))
+
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+    finally:
+        hub.unsubscribe(subscription)
+        watcher.cancel()
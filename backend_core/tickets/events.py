@@ -0,0 +1,88 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import TicketEvent
+
+# --- Registro dos Eventos de Chamados ---
+# Criações e mudanças de status viram linhas de TicketEvent na mesma transação
+# da gravação do chamado. Os processos ASGI leem essas linhas e as enviam aos
+# clientes conectados (ver tickets/changefeed.py e tickets/event_stream.py).
+# Inserções em lote que não disparam signals (bulk_create) devem chamar
+# record_tickets_created.
+
+EVENT_FIELDS = ('id', 'ticket_id', 'customer_id', 'event_type', 'status', 'previous_status', 'created_at')
+
+
+def _event(ticket, previous_status=None):
+    return TicketEvent(
+        ticket_id=ticket.pk,
+        customer_id=ticket.customer_id,
+        event_type='created' if previous_status is None else 'status_changed',
+        status=ticket.status,
+        previous_status=previous_status,
+    )
+
+
+def ticket_saved(ticket, previous_status=None, created=False):
+    """Registra a criação ou a mudança de status (gravações sem mudança são ignoradas)."""
+    if not settings.TICKET_EVENTS_ENABLED:
+        return
+    if created:
+        _event(ticket).save()
+    elif previous_status is not None and previous_status != ticket.status:
+        _event(ticket, previous_status).save()
+
+
+def record_tickets_created(tickets):
+    """
+    Registra a criação de chamados inseridos com bulk_create. Recebe apenas os chamados
+    que o lote de fato inseriu, já com o id (com ignore_conflicts o banco não devolve os
+    ids: quem insere relê as linhas, ver drain_ticket_queue). Linhas que já existiam
+    (reentregas, outro consumidor) não geram um segundo evento 'created'.
+    """
+    if not settings.TICKET_EVENTS_ENABLED:
+        return
+    TicketEvent.objects.bulk_create([_event(ticket) for ticket in tickets if ticket.pk is not None])
+
+
+# --- Leitura (executada fora do loop assíncrono via sync_to_async) ---
+
+def _serialize(row):
+    row = dict(row)
+    row['type'] = row.pop('event_type')
+    row['created_at'] = row['created_at'].isoformat()
+    return row
+
+
+def events_since(after_id, missing_ids=(), limit=1000):
+    """Eventos com id > after_id ou id em missing_ids, em ordem de id."""
+    condition = Q(id__gt=after_id)
+    if missing_ids:
+        condition |= Q(id__in=list(missing_ids))
+    rows = TicketEvent.objects.filter(condition).order_by('id').values(*EVENT_FIELDS)[:limit]
+    return [_serialize(row) for row in rows]
+
+
+def latest_event_id():
+    return TicketEvent.objects.order_by('-id').values_list('id', flat=True).first()
+
+
+def backlog(after_id, ticket_id=None, customer_id=None, limit=None):
+    """Eventos de um chamado/cliente após `after_id` (retomada pelo Last-Event-ID)."""
+    queryset = TicketEvent.objects.filter(id__gt=after_id)
+    if ticket_id is not None:
+        queryset = queryset.filter(ticket_id=ticket_id)
+    if customer_id is not None:
+        queryset = queryset.filter(customer_id=customer_id)
+    limit = limit or settings.TICKET_EVENTS_BACKLOG_LIMIT
+    return [_serialize(row) for row in queryset.order_by('id').values(*EVENT_FIELDS)[:limit]]
+
+
+def prune(hours=None):
+    """Remove eventos mais antigos que a retenção; retorna a quantidade removida."""
+    hours = settings.TICKET_EVENTS_RETENTION_HOURS if hours is None else hours
+    deleted, _ = TicketEvent.objects.filter(created_at__lt=timezone.now() - timedelta(hours=hours)).delete()
+    return deleted
@@ -0,0 +1,191 @@
+import csv
+import itertools
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Budget, Ticket, TicketArchive
+from .renderers import dumps_json
+
+# --- Exportação de Chamados e Orçamentos (CSV/NDJSON) ---
+# As linhas são lidas em blocos (cursor do lado do servidor com .iterator() ou,
+# sem ele, paginação por id) e codificadas em pedaços de EXPORT_FLUSH_BYTES
+# enviados por StreamingHttpResponse. A memória do worker não depende do
+# número de linhas exportadas.
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+TICKET_EXPORT_FIELDS = (
+    'id', 'customer_name', 'customer_id', 'problem_description', 'status',
+    'parent_id', 'provisional_reference', 'created_at', 'updated_at',
+)
+BUDGET_EXPORT_FIELDS = ('id', 'customer_name', 'service_type', 'total_value', 'items', 'pdf_url', 'created_at')
+
+STATUSES = {status for status, _ in Ticket.STATUS_CHOICES}
+
+# Textos iniciados por estes caracteres seriam interpretados como fórmula pelo Excel/
+# LibreOffice (injeção de CSV): a célula recebe um apóstrofo na frente
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Datas no CSV com o mesmo formato do NDJSON (encoder do DRF: ISO 8601 com 'Z')
+_encoder = JSONEncoder()
+
+
+def _parse_bound(value, name, end=False):
+    """Data (YYYY-MM-DD, dia inteiro) ou data e hora ISO 8601; levanta ValueError se inválida."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"{name} deve ser uma data (AAAA-MM-DD) ou data e hora ISO 8601")
+        # 'until' com data inclui o dia inteiro
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def apply_filters(queryset, params, customer_field):
+    """
+    Filtros da exportação: since/until (created_at), status (lista separada por vírgulas)
+    e customer (`customer_field`). Levanta ValueError com a mensagem de erro.
+    """
+    if params.get('since'):
+        queryset = queryset.filter(created_at__gte=_parse_bound(params['since'], 'since'))
+    if params.get('until'):
+        until = params['until']
+        lookup = 'created_at__lt' if parse_datetime(until) is None else 'created_at__lte'
+        queryset = queryset.filter(**{lookup: _parse_bound(until, 'until', end=True)})
+    if params.get('status'):
+        statuses = [value.strip().upper() for value in params['status'].split(',') if value.strip()]
+        invalid = set(statuses) - STATUSES
+        if invalid:
+            raise ValueError(f"status inválido: {', '.join(sorted(invalid))}")
+        queryset = queryset.filter(status__in=statuses)
+    if params.get('customer'):
+        queryset = queryset.filter(**{customer_field: params['customer']})
+    return queryset
+
+
+def iterate_rows(queryset, fields, chunk_size=None):
+    """
+    Tuplas `fields` do queryset em ordem de id, lidas em blocos de `chunk_size`.
+    Com DISABLE_SERVER_SIDE_CURSORS (ex: PgBouncer em modo transação) o .iterator()
+    do PostgreSQL carregaria o resultado inteiro: usa paginação por id (keyset).
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    rows = queryset.order_by('id').values_list(*fields)
+    if not connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from rows.iterator(chunk_size=chunk_size)
+        return
+
+    id_index = fields.index('id')
+    last_id = None
+    while True:
+        page = rows.filter(id__gt=last_id) if last_id is not None else rows
+        batch = list(page[:chunk_size])
+        if not batch:
+            return
+        yield from batch
+        last_id = batch[-1][id_index]
+
+
+def ticket_rows(params, include_archived=False):
+    """Cabeçalho e linhas dos chamados (com a coluna 'archived'); arquivados ao final, se pedidos."""
+    active = apply_filters(Ticket.objects.all(), params, 'customer_id')
+    rows = (row + (False,) for row in iterate_rows(active, TICKET_EXPORT_FIELDS))
+    if include_archived:
+        archived = apply_filters(TicketArchive.objects.all(), params, 'customer_id')
+        rows = itertools.chain(rows, (row + (True,) for row in iterate_rows(archived, TICKET_EXPORT_FIELDS)))
+    return TICKET_EXPORT_FIELDS + ('archived',), rows
+
+
+def budget_rows(params):
+    """Cabeçalho e linhas dos orçamentos (status não se aplica)."""
+    if params.get('status'):
+        raise ValueError("status não se aplica a orçamentos")
+    budgets = apply_filters(Budget.objects.all(), params, 'customer_name')
+    return BUDGET_EXPORT_FIELDS, iterate_rows(budgets, BUDGET_EXPORT_FIELDS)
+
+
+class _Echo:
+    """Destino do csv.writer que apenas devolve a linha formatada."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return _encoder.default(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def _buffered(lines, flush_bytes):
+    """Agrupa as linhas codificadas em pedaços de ~flush_bytes (menos escritas no socket)."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= flush_bytes:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def csv_chunks(header, rows, flush_bytes=None):
+    writer = csv.writer(_Echo())
+    lines = itertools.chain(
+        [writer.writerow(header).encode('utf-8')],
+        (writer.writerow([_csv_value(value) for value in row]).encode('utf-8') for row in rows),
+    )
+    return _buffered(lines, flush_bytes or settings.EXPORT_FLUSH_BYTES)
+
+
+def ndjson_chunks(header, rows, flush_bytes=None):
+    lines = (dumps_json(dict(zip(header, row))) + b'\n' for row in rows)
+    return _buffered(lines, flush_bytes or settings.EXPORT_FLUSH_BYTES)
+
+
+async def _async_chunks(chunks):
+    # Sob ASGI o Django 4.2 consumiria um iterador síncrono inteiro em memória antes de
+    # enviá-lo: cada pedaço é produzido na thread da requisição (mesma conexão de banco)
+    next_chunk = sync_to_async(next)
+    while True:
+        chunk = await next_chunk(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def export_response(request, name, header, rows, export_format):
+    """StreamingHttpResponse com as linhas no formato pedido ('csv' ou 'ndjson')."""
+    encode = csv_chunks if export_format == 'csv' else ndjson_chunks
+    chunks = encode(header, rows)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[export_format])
+    filename = f"{name}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    # Desliga o buffer de proxies (Nginx): os pedaços saem à medida que são gerados
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,148 @@
+import json
+import threading
+import time
+from collections import Counter
+
+from .dedup import LSHIndex
+from .retrieval_cache import normalize_query
+
+# --- Mineração de Perguntas Frequentes (FAQ) ---
+# Extrai as perguntas de dúvida técnica dos logs (CloudWatch do Webhook ou do
+# Backend), agrupa as quase idênticas e ordena os grupos por frequência. Os
+# grupos mais frequentes têm a resposta pré-gerada pelo comando pregenerate_faq.
+# Este módulo não depende do Django (ver tickets/faq_store.py para a consulta).
+
+RAG_INTENT = 'duvida_tecnica'
+
+# Evento estruturado registrado pelo Webhook e pelo Chat a cada pergunta
+QUERY_LOG_EVENT = 'pergunta_rag'
+
+
+def _parse_json(line):
+    """Objeto JSON da linha, ignorando prefixos do CloudWatch (data, request id, nível)."""
+    start = line.find('{')
+    if start < 0:
+        return None
+    try:
+        payload = json.loads(line[start:])
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def extract_query(line):
+    """
+    Pergunta de dúvida técnica contida em uma linha de log, ou None.
+
+    Formatos aceitos:
+        {"evento": "pergunta_rag", "pergunta": "..."}        (log estruturado)
+        Evento recebido: {"body": "{\"queryResult\": ...}"}  (evento do Dialogflow)
+        {"query": "..."}                                      (lista exportada)
+    """
+    payload = _parse_json(line)
+    if payload is None:
+        return None
+
+    if payload.get('evento') == QUERY_LOG_EVENT:
+        query = payload.get('pergunta')
+    elif 'body' in payload:
+        try:
+            body = json.loads(payload['body']) if isinstance(payload['body'], str) else payload['body']
+        except ValueError:
+            return None
+        query_result = (body or {}).get('queryResult', {})
+        if query_result.get('intent', {}).get('displayName') != RAG_INTENT:
+            return None
+        query = query_result.get('queryText')
+    else:
+        query = payload.get('query')
+
+    if not isinstance(query, str) or not query.strip():
+        return None
+    return ' '.join(query.split())
+
+
+def mine_queries(lines):
+    """Counter {pergunta: ocorrências} das linhas de log."""
+    counts = Counter()
+    for line in lines:
+        query = extract_query(line)
+        if query:
+            counts[query] += 1
+    return counts
+
+
+def cluster_queries(counts, threshold=0.8, min_count=1):
+    """
+    Agrupa perguntas quase idênticas e retorna os grupos do mais frequente ao menos.
+
+    Perguntas com a mesma forma normalizada caem no mesmo grupo; grupos cujas
+    perguntas têm Jaccard >= `threshold` (via LSH) são unidos. Cada grupo é
+    {'question': variante mais frequente, 'variants': [formas normalizadas], 'count': total}.
+    """
+    # 1. Mesma forma normalizada
+    by_key = {}
+    for query, count in counts.items():
+        key = normalize_query(query)
+        if not key:
+            continue
+        entry = by_key.setdefault(key, {'count': 0, 'variants': Counter()})
+        entry['count'] += count
+        entry['variants'][query] += count
+
+    # 2. Formas quase idênticas (union-find sobre os pares encontrados pelo LSH)
+    parent = {key: key for key in by_key}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    index = LSHIndex(threshold=threshold)
+    for key in sorted(by_key, key=lambda k: (-by_key[k]['count'], k)):
+        for other, _ in index.query(key):
+            parent[find(key)] = find(other)
+        index.add(key, key)
+
+    groups = {}
+    for key, entry in by_key.items():
+        group = groups.setdefault(find(key), {'count': 0, 'keys': [], 'variants': Counter()})
+        group['count'] += entry['count']
+        group['keys'].append(key)
+        group['variants'].update(entry['variants'])
+
+    clusters = [
+        {
+            'question': group['variants'].most_common(1)[0][0],
+            'variants': sorted(group['keys']),
+            'count': group['count'],
+        }
+        for group in groups.values() if group['count'] >= min_count
+    ]
+    clusters.sort(key=lambda cluster: (-cluster['count'], cluster['question']))
+    return clusters
+
+
+class RateLimiter:
+    """Limita chamadas a `rate` por segundo entre threads (intervalo mínimo entre chamadas)."""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._next = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloqueia até o próximo horário livre; retorna o tempo esperado (s)."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            start = now if self._next is None else max(now, self._next)
+            self._next = start + self.interval
+        wait = start - now
+        if wait > 0:
+            self._sleep(wait)
+        return wait
@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+
+from .retrieval_cache import normalize_query
+
+# --- Respostas Pré-geradas (FAQ) ---
+# Snapshot em memória das respostas geradas offline para as perguntas mais
+# frequentes (comando pregenerate_faq do Backend). A consulta é um acesso a
+# dicionário pela pergunta normalizada; a resposta só é servida se tiver sido
+# gerada na geração atual do índice da base de conhecimento. O snapshot é
+# recarregado a cada FAQ_REFRESH_SECONDS em uma thread de fundo: a consulta nunca
+# espera pela carga e usa o snapshot anterior enquanto isso (nenhum, antes da
+# primeira carga). Se a carga falhar, o anterior é mantido.
+# Mantenha sincronizado com lambda_functions/faq_store.py.
+
+FAQ_ENABLED = os.environ.get('FAQ_ENABLED', 'True') == 'True'
+FAQ_REFRESH_SECONDS = float(os.environ.get('FAQ_REFRESH_SECONDS', '300'))
+
+
+class FaqStore:
+    """
+    Respostas pré-geradas indexadas por todas as variantes normalizadas da pergunta.
+    `fetch()` retorna a lista de entradas {'question', 'variants', 'answer', 'index_generation'}.
+    """
+
+    def __init__(self, fetch, refresh_seconds=FAQ_REFRESH_SECONDS, clock=time.monotonic, background=True):
+        self._fetch = fetch
+        self.refresh_seconds = refresh_seconds
+        self.background = background
+        self._clock = clock
+        self._entries = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'refresh_errors': 0}
+
+    def load(self, entries):
+        """Substitui o snapshot pelas entradas informadas."""
+        snapshot = {}
+        for entry in entries:
+            for key in [normalize_query(entry['question'])] + list(entry.get('variants') or []):
+                if key:
+                    snapshot[key] = entry
+        with self._lock:
+            self._entries = snapshot
+            self._loaded_at = self._clock()
+
+    def _refresh_if_due(self):
+        with self._lock:
+            due = self._loaded_at is None or self._clock() - self._loaded_at >= self.refresh_seconds
+            if due:
+                # Adia a próxima tentativa antes de carregar: uma única thread recarrega
+                self._loaded_at = self._clock()
+        if not due:
+            return
+        if self.background:
+            threading.Thread(target=self._refresh, name='faq-refresh', daemon=True).start()
+        else:
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            self.load(self._fetch())
+        except Exception:
+            with self._lock:
+                self._stats['refresh_errors'] += 1
+
+    def lookup(self, query, generation):
+        """
+        Entrada pré-gerada para a pergunta na geração `generation` do índice, ou None.
+        Sem geração conhecida (None) nada é servido: não há como saber se a resposta está atual.
+        """
+        self._refresh_if_due()
+        with self._lock:
+            entry = self._entries.get(normalize_query(query))
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if generation is None or entry.get('index_generation') != generation:
+                self._stats['stale'] += 1
+                return None
+            self._stats['hits'] += 1
+            return entry
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, keys=len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tickets.archive import archivable_tickets, archive_closed_tickets
+
+
+class Command(BaseCommand):
+    """
+    Move os chamados RESOLVED/CLOSED sem atualização há mais de N dias para a
+    tabela de arquivo (tickets_ticketarchive), em lotes de transação curta.
+    Chamados arquivados continuam acessíveis em GET /api/tickets/<id>/ e nas estatísticas.
+
+    Uso:
+        python manage.py archive_tickets                     # execução única (ex: cron diário)
+        python manage.py archive_tickets --days 180 --batch-size 500 --pause 1
+        python manage.py archive_tickets --dry-run
+    """
+
+    help = "Arquiva em lotes os chamados encerrados há mais de N dias."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TICKET_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=settings.TICKET_ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=settings.TICKET_ARCHIVE_PAUSE,
+                            help="Pausa (s) entre lotes.")
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help="Limita a quantidade de lotes desta execução.")
+        parser.add_argument('--dry-run', action='store_true', help="Apenas conta os chamados elegíveis.")
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_tickets(options['days']).count()
+            self.stdout.write(f"{count} chamados seriam arquivados (encerrados há mais de {options['days']} dias).")
+            return
+
+        archived = archive_closed_tickets(
+            options['days'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            max_batches=options['max_batches'],
+            progress=lambda total: self.stdout.write(f"  {total} chamados arquivados..."),
+        )
+        self.stdout.write(self.style.SUCCESS(f"{archived} chamados arquivados."))
@@ -0,0 +1,101 @@
+import io
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from tickets import renderers
+from tickets.models import Ticket
+from tickets.serializers import TicketSerializer
+
+STATUSES = [status for status, _ in Ticket.STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    """
+    Compara os codecs padrão do DRF (JSONRenderer/JSONParser) com orjson e MessagePack
+    sobre uma listagem de chamados serializada (sem banco: instâncias em memória)
+    e sobre um evento típico do Webhook do Dialogflow.
+
+    Uso:
+        python manage.py benchmark_renderers --tickets 1000,10000 --repeat 20
+    """
+
+    help = "Benchmark dos renderers/parsers da API (JSON padrão vs orjson vs MessagePack)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', default='100,1000,10000', help="Tamanhos da listagem de chamados.")
+        parser.add_argument('--repeat', type=int, default=20, help="Execuções medidas por codec.")
+        parser.add_argument('--seed', type=int, default=17)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        codecs = self._codecs()
+        self.stdout.write(f"{'carga':<18}{'codec':<14}{'render p50':>12}{'parse p50':>12}{'bytes':>12}")
+
+        for size in sorted(int(value) for value in options['tickets'].split(',')):
+            data = TicketSerializer(self._tickets(rng, size), many=True).data
+            self._compare(f"{size} chamados", data, codecs, options['repeat'])
+
+        event = {
+            'responseId': 'benchmark',
+            'session': 'projects/nexus/agent/sessions/benchmark',
+            'queryResult': {
+                'queryText': "A luz vermelha do servidor está piscando desde ontem",
+                'parameters': {'person': {'name': 'Cliente Benchmark'}, 'problem_description': "Servidor não liga"},
+                'intent': {'displayName': 'duvida_tecnica'},
+                'outputContexts': [{'name': f'contexto-{i}', 'parameters': {'valor': i}} for i in range(20)],
+            },
+        }
+        # Tamanho pequeno: mede o custo fixo por requisição do Webhook
+        self._compare("evento webhook", event, codecs, options['repeat'] * 50)
+
+        if renderers.orjson is None:
+            self.stdout.write(self.style.WARNING("orjson não instalado: OrjsonRenderer usou o JSON padrão."))
+        if renderers.msgpack is None:
+            self.stdout.write(self.style.WARNING("msgpack não instalado: MessagePack não foi medido."))
+
+    def _codecs(self):
+        codecs = {
+            'drf json': (JSONRenderer(), JSONParser()),
+            'orjson': (renderers.OrjsonRenderer(), renderers.OrjsonParser()),
+        }
+        if renderers.msgpack is not None:
+            codecs['msgpack'] = (renderers.MessagePackRenderer(), renderers.MessagePackParser())
+        return codecs
+
+    def _compare(self, label, data, codecs, repeat):
+        # Referência: o mesmo conteúdo após um ciclo JSON (datas e decimais já em texto)
+        expected = json.loads(JSONRenderer().render(data))
+        for name, (renderer, parser) in codecs.items():
+            body = renderer.render(data)
+            if parser.parse(io.BytesIO(body)) != expected:
+                self.stdout.write(self.style.ERROR(f"{name}: conteúdo decodificado difere do JSON padrão"))
+            render_ms = self._measure(lambda: renderer.render(data), repeat)
+            parse_ms = self._measure(lambda: parser.parse(io.BytesIO(body)), repeat)
+            self.stdout.write(f"{label:<18}{name:<14}{render_ms:>10.3f}ms{parse_ms:>10.3f}ms{len(body):>12}")
+
+    @staticmethod
+    def _tickets(rng, size):
+        now = timezone.now()
+        return [
+            Ticket(id=i, customer_name=f"Cliente {i}", customer_id=f"cliente-{i % 500}",
+                   problem_description="Chamado sintético: o servidor reinicia sozinho após a atualização " * 3,
+                   status=rng.choice(STATUSES), created_at=now - timedelta(minutes=i), updated_at=now)
+            for i in range(1, size + 1)
+        ]
+
+    @staticmethod
+    def _measure(function, repeat):
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        latencies.sort()
+        return latencies[len(latencies) // 2]
@@ -0,0 +1,82 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from tickets.models import Budget, Ticket
+from tickets.stats import live_stats, read_stats, reconcile, suspend_rollups
+
+BENCHMARK_CUSTOMER_ID = 'benchmark-stats'
+SERVICE_TYPES = ['Consultoria Padrão', 'Consultoria Premium', 'Desenvolvimento', 'Suporte Mensal', 'Treinamento']
+STATUSES = [status for status, _ in Ticket.STATUS_CHOICES]
+
+
+class Command(BaseCommand):
+    """
+    Mede o custo das estatísticas lidas dos rollups versus COUNT/SUM sobre as tabelas,
+    em volumes crescentes de chamados sintéticos (orçamentos: 1/10 do volume).
+
+    Uso:
+        python manage.py benchmark_stats --sizes 10000,100000,1000000
+        python manage.py benchmark_stats --cleanup
+    """
+
+    help = "Benchmark do endpoint de estatísticas (rollups vs agregação direta)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000', help="Volumes de chamados a medir.")
+        parser.add_argument('--repeat', type=int, default=30, help="Leituras medidas por estratégia.")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--cleanup', action='store_true', help="Remove os dados sintéticos e encerra.")
+        parser.add_argument('--seed', type=int, default=11)
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            with suspend_rollups():
+                Ticket.objects.filter(customer_id=BENCHMARK_CUSTOMER_ID).delete()
+                Budget.objects.filter(customer_name=BENCHMARK_CUSTOMER_ID).delete()
+            reconcile()
+            self.stdout.write(self.style.SUCCESS("Dados sintéticos removidos."))
+            return
+
+        rng = random.Random(options['seed'])
+        self.stdout.write(f"{'chamados':>10}{'rollup p50':>14}{'rollup p95':>14}{'direto p50':>14}{'direto p95':>14}")
+        for size in sorted(int(value) for value in options['sizes'].split(',')):
+            self._populate(rng, size, options['batch_size'])
+            reconcile()
+            rollup = self._measure(read_stats, options['repeat'])
+            direct = self._measure(live_stats, options['repeat'])
+            self.stdout.write(f"{size:>10}{rollup[0]:>12.2f}ms{rollup[1]:>12.2f}ms{direct[0]:>12.2f}ms{direct[1]:>12.2f}ms")
+
+    def _populate(self, rng, size, batch_size):
+        """Completa os dados sintéticos até `size` chamados e `size / 10` orçamentos."""
+        missing = size - Ticket.objects.filter(customer_id=BENCHMARK_CUSTOMER_ID).count()
+        while missing > 0:
+            count = min(batch_size, missing)
+            Ticket.objects.bulk_create([
+                Ticket(customer_name="Cliente Benchmark", customer_id=BENCHMARK_CUSTOMER_ID,
+                       problem_description="Chamado sintético de benchmark", status=rng.choice(STATUSES))
+                for _ in range(count)
+            ])
+            missing -= count
+
+        missing = size // 10 - Budget.objects.filter(customer_name=BENCHMARK_CUSTOMER_ID).count()
+        while missing > 0:
+            count = min(batch_size, missing)
+            Budget.objects.bulk_create([
+                Budget(customer_name=BENCHMARK_CUSTOMER_ID, service_type=rng.choice(SERVICE_TYPES),
+                       total_value=Decimal(rng.randint(500, 5000)))
+                for _ in range(count)
+            ])
+            missing -= count
+
+    @staticmethod
+    def _measure(function, repeat):
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        latencies.sort()
+        return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
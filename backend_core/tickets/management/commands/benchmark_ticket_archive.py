@@ -0,0 +1,110 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.archive import ARCHIVABLE_STATUSES, archive_closed_tickets
+from tickets.models import Ticket, TicketArchive
+from tickets.stats import reconcile, suspend_rollups
+
+BENCHMARK_CUSTOMER_ID = 'benchmark-arquivo'
+OPEN_STATUSES = ['OPEN', 'IN_PROGRESS']
+PAGE_SIZE = 50
+
+
+class Command(BaseCommand):
+    """
+    Mede as consultas de listagem de chamados antes e depois do arquivamento,
+    com uma massa sintética em que a maior parte dos chamados está encerrada há meses.
+
+    Uso:
+        python manage.py benchmark_ticket_archive --size 200000 --closed-ratio 0.9
+        python manage.py benchmark_ticket_archive --cleanup
+    """
+
+    help = "Benchmark da listagem de chamados antes e depois do arquivamento dos encerrados."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=200_000, help="Total de chamados sintéticos.")
+        parser.add_argument('--closed-ratio', type=float, default=0.9,
+                            help="Fração de chamados encerrados há mais de --days dias.")
+        parser.add_argument('--days', type=int, default=90)
+        parser.add_argument('--repeat', type=int, default=30, help="Execuções medidas por consulta.")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--cleanup', action='store_true', help="Remove os dados sintéticos e encerra.")
+        parser.add_argument('--seed', type=int, default=13)
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            self._cleanup()
+            self.stdout.write(self.style.SUCCESS("Dados sintéticos removidos."))
+            return
+
+        self._populate(random.Random(options['seed']), options)
+        queries = {
+            'recentes': lambda: list(Ticket.objects.order_by('-created_at')[:PAGE_SIZE]),
+            'em aberto': lambda: list(
+                Ticket.objects.filter(status__in=OPEN_STATUSES).order_by('-updated_at')[:PAGE_SIZE]
+            ),
+            'contagem': lambda: Ticket.objects.count(),
+        }
+
+        before = {name: self._measure(query, options['repeat']) for name, query in queries.items()}
+        started = time.perf_counter()
+        archived = archive_closed_tickets(options['days'], batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        after = {name: self._measure(query, options['repeat']) for name, query in queries.items()}
+
+        self.stdout.write(
+            f"{archived} chamados arquivados em {elapsed:.1f}s ({archived / max(elapsed, 1e-9):.0f}/s); "
+            f"{Ticket.objects.count()} permanecem na tabela principal."
+        )
+        self.stdout.write(f"{'consulta':<12}{'antes p50':>12}{'antes p95':>12}{'depois p50':>12}{'depois p95':>12}")
+        for name in queries:
+            self.stdout.write(
+                f"{name:<12}{before[name][0]:>10.2f}ms{before[name][1]:>10.2f}ms"
+                f"{after[name][0]:>10.2f}ms{after[name][1]:>10.2f}ms"
+            )
+        self.stdout.write("Remova os dados com --cleanup ao terminar.")
+
+    def _populate(self, rng, options):
+        """Cria os chamados sintéticos; os encerrados recebem datas anteriores ao corte."""
+        self._cleanup()
+        size, closed = options['size'], int(options['size'] * options['closed_ratio'])
+        remaining = size
+        while remaining > 0:
+            count = min(options['batch_size'], remaining)
+            Ticket.objects.bulk_create([
+                Ticket(customer_name="Cliente Benchmark", customer_id=BENCHMARK_CUSTOMER_ID,
+                       problem_description="Chamado sintético de benchmark",
+                       status=rng.choice(ARCHIVABLE_STATUSES) if size - remaining + i < closed
+                       else rng.choice(OPEN_STATUSES))
+                for i in range(count)
+            ])
+            remaining -= count
+
+        # bulk_create preenche auto_now; update() grava as datas antigas diretamente
+        old = timezone.now() - timedelta(days=options['days'] + 30)
+        Ticket.objects.filter(customer_id=BENCHMARK_CUSTOMER_ID, status__in=ARCHIVABLE_STATUSES).update(
+            created_at=old, updated_at=old,
+        )
+        reconcile()
+
+    @staticmethod
+    def _cleanup():
+        with suspend_rollups():
+            Ticket.objects.filter(customer_id=BENCHMARK_CUSTOMER_ID).delete()
+            TicketArchive.objects.filter(customer_id=BENCHMARK_CUSTOMER_ID).delete()
+        reconcile()
+
+    @staticmethod
+    def _measure(function, repeat):
+        latencies = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            function()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        latencies.sort()
+        return latencies[len(latencies) // 2], latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
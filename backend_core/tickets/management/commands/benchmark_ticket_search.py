@@ -0,0 +1,126 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tickets.metrics import percentile
+from tickets.models import Ticket
+from tickets.search import query_terms, search_tickets
+from tickets.stats import reconcile, suspend_rollups
+
+# Vocabulário dos chamados sintéticos (problemas comuns de suporte)
+SUBJECTS = ['servidor', 'impressora', 'roteador', 'banco de dados', 'firewall', 'notebook', 'VPN', 'e-mail',
+            'sistema de vendas', 'backup', 'certificado', 'switch', 'monitor', 'ERP', 'telefone IP']
+SYMPTOMS = ['não liga', 'está lento', 'reinicia sozinho', 'apresenta erro de conexão', 'não autentica',
+            'perdeu a configuração', 'mostra luz vermelha piscando', 'travou após atualização',
+            'não sincroniza', 'retorna tempo esgotado', 'ficou fora do ar', 'consome muita memória']
+DETAILS = ['desde ontem', 'após queda de energia', 'em todas as filiais', 'somente pela manhã',
+           'depois da troca de senha', 'com vários usuários afetados', 'no setor financeiro', 'intermitentemente']
+
+BENCHMARK_CUSTOMER_ID = 'benchmark-busca'
+
+
+class Command(BaseCommand):
+    """
+    Compara a busca indexada (tsvector/GIN ou FTS5) com a varredura LIKE sobre chamados sintéticos.
+
+    Uso:
+        python manage.py benchmark_ticket_search --tickets 1000000
+        python manage.py benchmark_ticket_search --skip-populate --queries 500 --explain
+        python manage.py benchmark_ticket_search --cleanup
+    """
+
+    help = "Benchmark da busca de texto completo em chamados (com geração de dados sintéticos)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=1_000_000, help="Chamados sintéticos a garantir.")
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--queries', type=int, default=200, help="Consultas medidas por estratégia.")
+        parser.add_argument('--scan-queries', type=int, default=20,
+                            help="Consultas com LIKE (lentas em volume; 0 para pular).")
+        parser.add_argument('--skip-populate', action='store_true')
+        parser.add_argument('--explain', action='store_true', help="Exibe o plano de execução da busca indexada.")
+        parser.add_argument('--cleanup', action='store_true', help="Remove os chamados sintéticos e encerra.")
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        synthetic = Ticket.objects.filter(customer_id=BENCHMARK_CUSTOMER_ID)
+        if options['cleanup']:
+            # Sem atualização por linha das estatísticas: recalcula tudo ao final
+            with suspend_rollups():
+                deleted, _ = synthetic.delete()
+            reconcile()
+            self.stdout.write(self.style.SUCCESS(f"{deleted} chamados sintéticos removidos."))
+            return
+
+        rng = random.Random(options['seed'])
+        if not options['skip_populate']:
+            self._populate(rng, options['tickets'] - synthetic.count(), options['batch_size'])
+
+        queries = [f"{rng.choice(SUBJECTS)} {rng.choice(SYMPTOMS).split()[-1]}" for _ in range(options['queries'])]
+        self.stdout.write(f"Banco: {connection.vendor} | chamados: {Ticket.objects.count()}")
+
+        self._report('indexada', [self._time(lambda q=q: search_tickets(q, limit=20)) for q in queries])
+
+        if options['scan_queries']:
+            def scan(query):
+                queryset = Ticket.objects.all()
+                for term in query_terms(query):
+                    queryset = queryset.filter(problem_description__icontains=term)
+                return queryset.count(), list(queryset.order_by('-id')[:20])
+
+            self._report('LIKE', [self._time(lambda q=q: scan(q)) for q in queries[:options['scan_queries']]])
+
+        if options['explain']:
+            self._explain(queries[0])
+
+    def _populate(self, rng, missing, batch_size):
+        created = 0
+        started = time.monotonic()
+        while created < missing:
+            size = min(batch_size, missing - created)
+            Ticket.objects.bulk_create([
+                Ticket(
+                    customer_name=f"Cliente {rng.randint(1, 50_000)}",
+                    customer_id=BENCHMARK_CUSTOMER_ID,
+                    problem_description=f"O {rng.choice(SUBJECTS)} {rng.choice(SYMPTOMS)} {rng.choice(DETAILS)}.",
+                )
+                for _ in range(size)
+            ], batch_size=size)
+            created += size
+            self.stdout.write(f"  {created}/{missing} chamados sintéticos inseridos", ending='\r')
+        if missing > 0:
+            self.stdout.write(f"\n{missing} chamados inseridos em {time.monotonic() - started:.1f}s")
+            reconcile()
+
+    @staticmethod
+    def _time(function):
+        started = time.perf_counter()
+        function()
+        return (time.perf_counter() - started) * 1000.0
+
+    def _report(self, name, latencies):
+        latencies.sort()
+        self.stdout.write(
+            f"{name:<10} consultas={len(latencies):<5} p50={percentile(latencies, 50):.1f}ms "
+            f"p95={percentile(latencies, 95):.1f}ms p99={percentile(latencies, 99):.1f}ms"
+        )
+
+    def _explain(self, query):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    "EXPLAIN ANALYZE SELECT id FROM tickets_ticket "
+                    "WHERE search_vector @@ plainto_tsquery('portuguese', %s) LIMIT 20",
+                    [query],
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute(
+                    "EXPLAIN QUERY PLAN SELECT rowid FROM tickets_ticket_fts WHERE tickets_ticket_fts MATCH %s",
+                    [' '.join(f'"{term}"' for term in query_terms(query))],
+                )
+            else:
+                return
+            for row in cursor.fetchall():
+                self.stdout.write(' | '.join(str(column) for column in row))
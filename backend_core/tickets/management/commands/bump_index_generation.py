@@ -0,0 +1,41 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets.rag_service import OPENSEARCH_INDEX, get_opensearch_client
+
+
+class Command(BaseCommand):
+    """
+    Incrementa _meta.generation do índice da base de conhecimento.
+    Execute ao final de cada ingestão: o Webhook e o Chat descartam os resultados de
+    busca em cache da geração anterior (em até INDEX_GENERATION_TTL_SECONDS).
+
+    Uso:
+        python manage.py bump_index_generation
+        python manage.py bump_index_generation --index knowledge-base-v2
+        python manage.py bump_index_generation --regenerate-faq
+    """
+
+    help = "Invalida o cache de recuperação incrementando a geração do índice no OpenSearch."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--index', default=OPENSEARCH_INDEX)
+        parser.add_argument('--regenerate-faq', action='store_true',
+                            help="Regenera em seguida as respostas pré-geradas (pregenerate_faq --refresh-stale).")
+
+    def handle(self, *args, **options):
+        client = get_opensearch_client()
+        if client is None:
+            raise CommandError("OpenSearch não configurado (OPENSEARCH_HOST).")
+
+        mappings = client.indices.get_mapping(index=options['index'])
+        for name, body in sorted(mappings.items()):
+            # put_mapping substitui o _meta inteiro: preserva as demais chaves
+            meta = dict(body.get('mappings', {}).get('_meta', {}))
+            meta['generation'] = int(meta.get('generation', 0)) + 1
+            client.indices.put_mapping(index=name, body={'_meta': meta})
+            self.stdout.write(self.style.SUCCESS(f"Índice {name}: geração {meta['generation']}."))
+
+        if options['regenerate_faq']:
+            # As respostas da geração anterior deixam de ser servidas até serem regeneradas
+            call_command('pregenerate_faq', refresh_stale=True, stdout=self.stdout, stderr=self.stderr)
@@ -0,0 +1,119 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tickets import events
+from tickets.duplicates import get_duplicate_detector
+from tickets.models import Ticket
+from tickets.serializers import TicketSerializer
+from tickets.stats import record_tickets_created
+from tickets.ticket_queue import get_ticket_queue_reader
+
+
+class Command(BaseCommand):
+    """
+    Consome a fila de chamados gravada pelo Webhook e persiste os tickets em lote.
+
+    Uso:
+        python manage.py drain_ticket_queue              # esvazia a fila e encerra
+        python manage.py drain_ticket_queue --loop       # consumidor contínuo
+    """
+
+    help = "Persiste em lote (bulk_create) os chamados enfileirados pelo Webhook."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help="Mensagens por lote de inserção.")
+        parser.add_argument('--loop', action='store_true', help="Continua aguardando novas mensagens.")
+        parser.add_argument('--idle-sleep', type=float, default=2.0, help="Pausa (s) quando a fila está vazia.")
+
+    def handle(self, *args, **options):
+        reader = get_ticket_queue_reader()
+        total = redelivered = 0
+
+        while True:
+            messages = reader.receive(options['batch_size'])
+            if not messages:
+                if not options['loop']:
+                    break
+                time.sleep(options['idle_sleep'])
+                continue
+
+            created, already_persisted = self._persist_batch(messages)
+            total += created
+            redelivered += already_persisted
+            # Confirma apenas após o commit: em caso de falha as mensagens voltam à fila
+            reader.ack([receipt for receipt, _ in messages])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} chamados persistidos a partir da fila ({redelivered} reentregas já persistidas)."
+        ))
+
+    def _persist_batch(self, messages):
+        """
+        Valida cada payload com o serializer da API e insere o lote de uma só vez.
+        Mensagens reentregues cujo protocolo provisório já foi persistido são
+        confirmadas sem nova gravação (sucesso idempotente).
+
+        Returns:
+            tuple: (chamados gravados, reentregas já persistidas).
+        """
+        detector = get_duplicate_detector()
+        references = [payload.get('provisional_reference') for _, payload in messages]
+        persisted = set(Ticket.objects.filter(
+            provisional_reference__in=[reference for reference in references if reference]
+        ).values_list('provisional_reference', flat=True))
+
+        tickets = []
+        redelivered = 0
+        for receipt, payload in messages:
+            reference = payload.get('provisional_reference')
+            if reference and reference in persisted:
+                redelivered += 1
+                continue
+            serializer = TicketSerializer(data=payload)
+            if not serializer.is_valid():
+                # Mensagem inválida não é reenfileirada (evita bloquear a fila indefinidamente)
+                self.stderr.write(f"Mensagem {receipt} descartada: {serializer.errors}")
+                continue
+            ticket = Ticket(**serializer.validated_data)
+            if detector is not None and ticket.parent_id is None:
+                # Duplicados dentro do mesmo lote são vinculados depois (link_duplicate_tickets)
+                ticket.parent_id = detector.find_parent(ticket.problem_description)
+            tickets.append(ticket)
+            # O SQS pode entregar a mesma mensagem duas vezes no mesmo lote
+            persisted.add(reference)
+
+        with transaction.atomic():
+            # ignore_conflicts: mensagens reentregues têm o mesmo provisional_reference (único)
+            Ticket.objects.bulk_create(tickets, batch_size=len(tickets) or 1, ignore_conflicts=True)
+            # bulk_create não dispara signals: as estatísticas e os eventos são registrados aqui,
+            # apenas para as linhas que este lote de fato inseriu
+            inserted = self._inserted(tickets)
+            record_tickets_created(inserted)
+            events.record_tickets_created(inserted)
+        return len(inserted), redelivered
+
+    @staticmethod
+    def _inserted(tickets):
+        """
+        Chamados do lote que o bulk_create inseriu (com o id preenchido). Com ignore_conflicts
+        o banco não informa quais linhas entraram: os chamados são relidos pelo protocolo
+        provisório, e um conflito com outro consumidor aparece como linha de created_at diferente.
+        Chamados sem protocolo não têm conflito possível e contam como inseridos.
+        """
+        references = [ticket.provisional_reference for ticket in tickets if ticket.provisional_reference]
+        rows = {
+            reference: (pk, created_at)
+            for reference, pk, created_at in Ticket.objects.filter(provisional_reference__in=references)
+            .values_list('provisional_reference', 'id', 'created_at')
+        }
+        inserted = []
+        for ticket in tickets:
+            if ticket.provisional_reference:
+                pk, created_at = rows.get(ticket.provisional_reference, (None, None))
+                if created_at != ticket.created_at:
+                    continue
+                ticket.pk = pk
+            inserted.append(ticket)
+        return inserted
@@ -0,0 +1,96 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tickets import rag_service
+from tickets.bedrock_messages import SYSTEM_PROMPT, build_user_message
+from tickets.conversation_memory import estimate_tokens
+from tickets.rag_evaluation import diff_reports, load_golden_set, run_evaluation
+
+
+class Command(BaseCommand):
+    """
+    Avalia o pipeline RAG (busca no OpenSearch + geração) com um conjunto golden de perguntas.
+
+    Uso:
+        python manage.py evaluate_rag tickets/evaluation/golden_questions.jsonl --stub-generation
+        python manage.py evaluate_rag golden.jsonl --k 5 --query-type match_and --output atual.json \\
+            --baseline referencia.json
+    """
+
+    help = "Mede recall@k, MRR e percentis de latência/tokens do pipeline RAG."
+
+    def add_arguments(self, parser):
+        parser.add_argument('golden_set', help="Arquivo JSONL com perguntas e fontes esperadas.")
+        parser.add_argument('--k', type=int, default=rag_service.RAG_TOP_K, help="Documentos recuperados por pergunta.")
+        parser.add_argument('--query-type', choices=rag_service.QUERY_TYPES, default=rag_service.RAG_QUERY_TYPE)
+        parser.add_argument('--no-rerank', action='store_true', help="Usa a ordem do OpenSearch sem reordenação.")
+        parser.add_argument('--candidates', type=int, default=rag_service.RERANK_CANDIDATES,
+                            help="Candidatos buscados para a reordenação.")
+        parser.add_argument('--context-chars', type=int, default=rag_service.RAG_CONTEXT_MAX_CHARS,
+                            help="Tamanho máximo do contexto enviado ao modelo.")
+        parser.add_argument('--workers', type=int, default=4, help="Perguntas avaliadas em paralelo.")
+        parser.add_argument('--stub-generation', action='store_true',
+                            help="Não chama o Bedrock: responde com o início do contexto (execução offline).")
+        parser.add_argument('--stub-latency-ms', type=float, default=0.0,
+                            help="Latência simulada da geração com --stub-generation.")
+        parser.add_argument('--output', help="Arquivo JSON para salvar o relatório.")
+        parser.add_argument('--baseline', help="Relatório de referência para comparação.")
+
+    def handle(self, *args, **options):
+        try:
+            cases = load_golden_set(options['golden_set'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Conjunto golden inválido: {e}")
+
+        k, query_type, context_chars = options['k'], options['query_type'], options['context_chars']
+        rerank, candidates = not options['no_rerank'], options['candidates']
+
+        def retrieve(question):
+            # Sem cache de recuperação: cada caso mede a busca real
+            documents = rag_service.retrieve_documents(
+                question, size=k, query_type=query_type, rerank=rerank, candidates=candidates, use_cache=False,
+            )
+            if documents is None:
+                raise CommandError("OpenSearch não configurado (OPENSEARCH_HOST).")
+            return documents
+
+        def generate(question, documents):
+            context = rag_service.build_context(documents, context_chars) or "Nenhuma informação específica encontrada."
+            if options['stub_generation']:
+                # Sem o modelo, os tokens são estimados (~4 caracteres por token)
+                time.sleep(options['stub_latency_ms'] / 1000.0)
+                answer = context.split('. ')[0]
+                prompt_tokens = estimate_tokens(SYSTEM_PROMPT + build_user_message(question, context))
+                return answer, prompt_tokens, estimate_tokens(answer)
+            answer, usage = rag_service.generate_bedrock_answer(question, context, intent='evaluation')
+            # Tokens de entrada incluem os lidos/gravados no cache de prompt
+            prompt_tokens = usage['input_tokens'] + usage['cache_read_input_tokens'] + usage['cache_creation_input_tokens']
+            return answer, prompt_tokens, usage['output_tokens']
+
+        config = {
+            'golden_set': options['golden_set'],
+            'query_type': query_type,
+            'context_chars': context_chars,
+            'rerank': rerank,
+            'candidates': candidates,
+            'stub_generation': options['stub_generation'],
+        }
+        report = run_evaluation(cases, retrieve, generate, k, options['workers'], config)
+
+        summary = report['summary']
+        self.stdout.write(json.dumps(summary, indent=2, ensure_ascii=False))
+        if summary['errors']:
+            self.stderr.write(f"{summary['errors']} casos falharam (ver 'error' no relatório).")
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Relatório salvo em {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline'], 'r', encoding='utf-8') as f:
+                diff = diff_reports(report, json.load(f))
+            self.stdout.write("Comparação com a referência:")
+            self.stdout.write(json.dumps(diff, indent=2, ensure_ascii=False))
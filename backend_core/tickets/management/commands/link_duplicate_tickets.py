@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tickets.duplicates import OPEN_STATUSES, build_index
+from tickets.models import Ticket
+
+
+class Command(BaseCommand):
+    """
+    Vincula, em lote, chamados abertos quase duplicados ao incidente principal mais antigo.
+    Útil após incidentes (ex: lotes da fila assíncrona) ou ao ajustar o limiar de similaridade.
+
+    Uso:
+        python manage.py link_duplicate_tickets --window-hours 48
+        python manage.py link_duplicate_tickets --dry-run
+    """
+
+    help = "Detecta chamados abertos quase duplicados (MinHash/LSH) e preenche o campo parent."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window-hours', type=float, default=settings.TICKET_DEDUP_WINDOW_HOURS)
+        parser.add_argument('--batch-size', type=int, default=1000, help="Chamados lidos/atualizados por lote.")
+        parser.add_argument('--dry-run', action='store_true', help="Apenas lista os vínculos encontrados.")
+
+    def handle(self, *args, **options):
+        index = build_index()
+        window_start = timezone.now() - timedelta(hours=options['window_hours'])
+        candidates = Ticket.objects.filter(
+            created_at__gte=window_start, status__in=OPEN_STATUSES, parent__isnull=True,
+        )
+
+        linked, scanned, last_id = 0, 0, 0
+        while True:
+            # Paginação por chave: em ordem de id, o incidente principal é sempre o mais antigo
+            batch = list(candidates.filter(id__gt=last_id).order_by('id')[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+
+            duplicates = []
+            for ticket in batch:
+                matches = index.query(ticket.problem_description)
+                if matches:
+                    ticket.parent_id = matches[0][0]
+                    duplicates.append(ticket)
+                    if options['dry_run']:
+                        self.stdout.write(f"#{ticket.id} -> #{ticket.parent_id} (similaridade {matches[0][1]:.2f})")
+                else:
+                    index.add(ticket.id, ticket.problem_description)
+
+            if duplicates and not options['dry_run']:
+                Ticket.objects.bulk_update(duplicates, ['parent'], batch_size=options['batch_size'])
+            linked += len(duplicates)
+
+        action = "seriam vinculados" if options['dry_run'] else "vinculados"
+        self.stdout.write(self.style.SUCCESS(
+            f"{scanned} chamados analisados; {linked} {action} a um incidente principal."
+        ))
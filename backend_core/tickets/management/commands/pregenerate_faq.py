@@ -0,0 +1,134 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from tickets import rag_service
+from tickets.faq_mining import RateLimiter, cluster_queries, mine_queries
+from tickets.models import FaqAnswer
+from tickets.retrieval_cache import normalize_query
+
+
+class Command(BaseCommand):
+    """
+    Pré-gera as respostas das perguntas mais frequentes dos logs (FAQ).
+
+    Lê os logs do Webhook/Chat (exportados do CloudWatch), agrupa perguntas quase
+    idênticas e gera a resposta dos grupos mais frequentes pelo mesmo pipeline do
+    Chat (busca + Bedrock), em lotes paralelos com limite de chamadas por segundo.
+    Entradas já geradas na geração atual do índice não são refeitas. Com
+    --refresh-stale, regenera as entradas de gerações anteriores (execute após
+    cada ingestão; ver bump_index_generation --regenerate-faq).
+
+    Uso:
+        python manage.py pregenerate_faq webhook.log chat.log --top 300 --min-count 3
+        python manage.py pregenerate_faq --refresh-stale --rate 1
+        aws logs tail /aws/lambda/nexus-webhook --since 7d | python manage.py pregenerate_faq -
+    """
+
+    help = "Gera e armazena as respostas das perguntas mais frequentes dos logs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('logs', nargs='*', help="Arquivos de log ('-' lê da entrada padrão).")
+        parser.add_argument('--top', type=int, default=300, help="Grupos de perguntas mais frequentes a gerar.")
+        parser.add_argument('--min-count', type=int, default=2, help="Ocorrências mínimas de um grupo.")
+        parser.add_argument('--threshold', type=float, default=0.8,
+                            help="Similaridade (Jaccard) para agrupar perguntas quase idênticas.")
+        parser.add_argument('--refresh-stale', action='store_true',
+                            help="Regenera as entradas geradas em gerações anteriores do índice.")
+        parser.add_argument('--force', action='store_true', help="Regenera também as entradas atuais.")
+        parser.add_argument('--workers', type=int, default=4, help="Gerações em paralelo.")
+        parser.add_argument('--rate', type=float, default=2.0, help="Chamadas ao Bedrock por segundo (0 = sem limite).")
+        parser.add_argument('--batch-size', type=int, default=20, help="Respostas gravadas por transação.")
+        parser.add_argument('--dry-run', action='store_true', help="Apenas lista as perguntas que seriam geradas.")
+
+    def handle(self, *args, **options):
+        if not options['logs'] and not options['refresh_stale']:
+            raise CommandError("Informe arquivos de log e/ou --refresh-stale.")
+
+        generation = rag_service.current_index_generation()
+        if generation is None:
+            raise CommandError("Geração do índice indisponível (OpenSearch não configurado ou inacessível).")
+
+        existing = {faq.key: faq for faq in FaqAnswer.objects.all()}
+        work = {}
+
+        if options['logs']:
+            counts = mine_queries(self._read_lines(options['logs']))
+            clusters = cluster_queries(counts, options['threshold'], options['min_count'])[:options['top']]
+            self.stdout.write(f"{sum(counts.values())} perguntas nos logs, {len(clusters)} grupos selecionados.")
+            for cluster in clusters:
+                key = normalize_query(cluster['question'])[:255]
+                current = existing.get(key)
+                if current and current.index_generation == generation and not options['force']:
+                    # Resposta atual: só atualiza a frequência e as variantes
+                    if not options['dry_run']:
+                        FaqAnswer.objects.filter(pk=current.pk).update(
+                            variants=cluster['variants'], query_count=cluster['count'],
+                        )
+                    continue
+                work[key] = cluster
+
+        if options['refresh_stale']:
+            for key, faq in existing.items():
+                if key not in work and (faq.index_generation != generation or options['force']):
+                    work[key] = {'question': faq.question, 'variants': faq.variants, 'count': faq.query_count}
+
+        self.stdout.write(f"{len(work)} respostas a gerar (geração do índice {generation}).")
+        if options['dry_run']:
+            for key, item in work.items():
+                self.stdout.write(f"  [{item['count']}] {item['question']}")
+            return
+
+        limiter = RateLimiter(options['rate'])
+        items = list(work.items())
+        generated, failed = 0, 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as executor:
+            for start in range(0, len(items), options['batch_size']):
+                batch = items[start:start + options['batch_size']]
+                results = list(executor.map(lambda item: self._generate(item[1], limiter), batch))
+
+                with transaction.atomic():
+                    for (key, item), (result, error) in zip(batch, results):
+                        if error:
+                            failed += 1
+                            self.stderr.write(f"Falha em '{item['question']}': {error}")
+                            continue
+                        answer, sources = result
+                        FaqAnswer.objects.update_or_create(key=key, defaults={
+                            'question': item['question'],
+                            'variants': item['variants'],
+                            'answer': answer,
+                            'sources': sources,
+                            'query_count': item['count'],
+                            'index_generation': generation,
+                        })
+                        generated += 1
+                self.stdout.write(f"{start + len(batch)}/{len(items)} processadas.")
+
+        self.stdout.write(self.style.SUCCESS(f"{generated} respostas geradas, {failed} falhas."))
+
+    def _read_lines(self, paths):
+        for path in paths:
+            if path == '-':
+                yield from sys.stdin
+                continue
+            try:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    yield from f
+            except OSError as e:
+                raise CommandError(f"Não foi possível ler {path}: {e}")
+
+    def _generate(self, item, limiter):
+        """Retorna ((resposta, ids das fontes), None) ou (None, erro)."""
+        try:
+            documents = rag_service.retrieve_documents(item['question'], use_cache=False) or []
+            context = rag_service.build_context(documents) or "Nenhuma informação específica encontrada."
+            limiter.acquire()
+            answer, _ = rag_service.generate_bedrock_answer(item['question'], context, intent='faq_pregeneration')
+            if not answer:
+                return None, "resposta vazia"
+            return (answer, [doc['id'] for doc in documents]), None
+        except Exception as e:
+            return None, str(e)
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tickets.events import prune
+
+
+class Command(BaseCommand):
+    """
+    Remove os eventos de chamados mais antigos que a retenção.
+    Clientes que reconectarem com um Last-Event-ID anterior à retenção recebem
+    apenas os eventos ainda existentes (devem recarregar /api/tickets/).
+
+    Uso:
+        python manage.py prune_ticket_events                 # execução única (ex: cron)
+        python manage.py prune_ticket_events --hours 24
+    """
+
+    help = "Apaga eventos do feed de alterações de chamados fora da janela de retenção."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=settings.TICKET_EVENTS_RETENTION_HOURS)
+
+    def handle(self, *args, **options):
+        deleted = prune(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} eventos removidos."))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tickets.stats import reconcile
+
+
+class Command(BaseCommand):
+    """
+    Recalcula as tabelas de estatísticas a partir de Ticket/Budget.
+    Corrige divergências de gravações em lote ou feitas fora do ORM.
+
+    Uso:
+        python manage.py reconcile_stats                      # execução única (ex: cron)
+        python manage.py reconcile_stats --loop --interval 3600
+    """
+
+    help = "Reconcilia as tabelas de rollup de chamados e orçamentos."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Executa periodicamente.")
+        parser.add_argument('--interval', type=float, default=3600, help="Intervalo (s) entre execuções com --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            drift = reconcile()
+            elapsed = time.monotonic() - started
+            if drift:
+                self.stdout.write(self.style.WARNING(f"{drift} linhas de estatística corrigidas em {elapsed:.1f}s."))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Estatísticas consistentes (verificadas em {elapsed:.1f}s)."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,40 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tickets.models import Budget
+from tickets.pdf_renderer import render_budgets
+
+
+class Command(BaseCommand):
+    """
+    Renderiza, em lotes, os PDFs de orçamentos que ainda não possuem pdf_url.
+    Recupera orçamentos cuja renderização em segundo plano foi interrompida (ex: restart).
+
+    Uso:
+        python manage.py render_budget_pdfs --batch-size 50
+    """
+
+    help = "Gera os PDFs pendentes de orçamentos (pdf_url vazio)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.BUDGET_PDF_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.BUDGET_PDF_WORKERS)
+
+    def handle(self, *args, **options):
+        total = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            while True:
+                # Paginação por chave (id > último) mantém cada consulta barata
+                batch = list(
+                    Budget.objects.filter(pdf_url__isnull=True, id__gt=last_id)
+                    .order_by('id')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                total += render_budgets(batch, executor)
+
+        self.stdout.write(self.style.SUCCESS(f"{total} PDFs de orçamento gerados."))
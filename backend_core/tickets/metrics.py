@@ -0,0 +1,59 @@
+import math
+import threading
+from collections import defaultdict, deque
+
+# --- Métricas do Processo do Backend ---
+# Contadores e amostras de latência mantidos em memória por processo (worker) e
+# expostos em GET /api/metrics/. As latências guardam apenas as últimas
+# METRICS_WINDOW amostras de cada série, limitando o uso de memória.
+METRICS_WINDOW = 1000
+
+_counters = defaultdict(float)
+_timings = defaultdict(lambda: deque(maxlen=METRICS_WINDOW))
+_lock = threading.Lock()
+
+
+def _key(name, labels):
+    return '|'.join([name] + [f"{label}={value}" for label, value in sorted(labels.items())])
+
+
+def increment(name, value=1, **labels):
+    """Incrementa um contador (ex: increment('RetrievalCache', Result='hit'))."""
+    with _lock:
+        _counters[_key(name, labels)] += value
+
+
+def timing(name, milliseconds, **labels):
+    """Registra uma amostra de latência em milissegundos."""
+    with _lock:
+        _timings[_key(name, labels)].append(milliseconds)
+
+
+def percentile(sorted_values, pct):
+    """
+    Percentil pelo método do posto mais próximo (nearest-rank) de uma lista já
+    ordenada (0.0 se vazia). Também usado pelos scripts de carga e pela regressão do Dialogflow.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def snapshot():
+    """Cópia dos contadores e percentis (p50/p95/p99) das latências do processo."""
+    with _lock:
+        counters = dict(_counters)
+        samples = {key: sorted(values) for key, values in _timings.items() if values}
+    return {
+        'counters': counters,
+        'timings': {
+            key: {
+                'samples': len(values),
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+            }
+            for key, values in samples.items()
+        },
+    }
@@ -0,0 +1,55 @@
+import logging
+import time
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('tickets.db')
+
+
+class QueryTimer:
+    """
+    Wrapper de execução de queries (connection.execute_wrapper) que mede o tempo
+    de cada query sem depender do DEBUG, que retém todas as queries em memória.
+    """
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.total_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms >= self.slow_query_ms:
+                logger.warning(f"Query lenta ({elapsed_ms:.1f} ms): {sql[:500]}")
+
+
+class QueryLoggingMiddleware:
+    """
+    Registra, por requisição, a quantidade e o tempo total de queries e as queries lentas.
+    Ativado por settings.DB_QUERY_LOG; quando desativado não adiciona custo algum.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.DB_QUERY_LOG
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timer = QueryTimer(settings.DB_SLOW_QUERY_MS)
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+
+        logger.info(
+            f"{request.method} {request.path} -> {response.status_code}: "
+            f"{timer.count} queries em {timer.total_ms:.1f} ms"
+        )
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='provisional_reference',
+            field=models.CharField(blank=True, max_length=32, null=True, unique=True, verbose_name='Protocolo Provisório'),
+        ),
+    ]
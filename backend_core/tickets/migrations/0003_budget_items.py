@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0002_ticket_provisional_reference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='items',
+            field=models.JSONField(blank=True, default=list, verbose_name='Itens do Orçamento'),
+        ),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:20
+
+from django.db import migrations
+
+# Índice de texto completo sobre Ticket.problem_description, mantido pelo próprio banco
+# (também cobre inserções em lote via bulk_create, que não disparam signals):
+#   PostgreSQL -> coluna tsvector gerada (STORED) + índice GIN
+#   SQLite     -> tabela virtual FTS5 de conteúdo externo + triggers de sincronização
+# Atenção: no SQLite, migrações que recriam tickets_ticket (ex: AlterField) descartam os
+# triggers; nesses casos reaplique SQLITE_FORWARD na migração correspondente.
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE tickets_ticket ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector('portuguese', coalesce(problem_description, ''))) STORED
+    """,
+    "CREATE INDEX tickets_ticket_search_vector_gin ON tickets_ticket USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS tickets_ticket_search_vector_gin",
+    "ALTER TABLE tickets_ticket DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE tickets_ticket_fts USING fts5(
+        problem_description,
+        content='tickets_ticket',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER tickets_ticket_fts_ai AFTER INSERT ON tickets_ticket BEGIN
+        INSERT INTO tickets_ticket_fts(rowid, problem_description) VALUES (new.id, new.problem_description);
+    END
+    """,
+    """
+    CREATE TRIGGER tickets_ticket_fts_ad AFTER DELETE ON tickets_ticket BEGIN
+        INSERT INTO tickets_ticket_fts(tickets_ticket_fts, rowid, problem_description)
+        VALUES ('delete', old.id, old.problem_description);
+    END
+    """,
+    """
+    CREATE TRIGGER tickets_ticket_fts_au AFTER UPDATE OF problem_description ON tickets_ticket BEGIN
+        INSERT INTO tickets_ticket_fts(tickets_ticket_fts, rowid, problem_description)
+        VALUES ('delete', old.id, old.problem_description);
+        INSERT INTO tickets_ticket_fts(rowid, problem_description) VALUES (new.id, new.problem_description);
+    END
+    """,
+    # Indexa os tickets já existentes
+    "INSERT INTO tickets_ticket_fts(tickets_ticket_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_ai",
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_ad",
+    "DROP TRIGGER IF EXISTS tickets_ticket_fts_au",
+    "DROP TABLE IF EXISTS tickets_ticket_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def operation(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0003_budget_items'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            _run({'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}),
+        ),
+    ]
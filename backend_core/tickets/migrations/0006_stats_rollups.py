@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0005_ticket_parent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetServiceStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service_type', models.CharField(max_length=200, unique=True, verbose_name='Tipo de Serviço')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Valor Total (R$)')),
+            ],
+            options={
+                'verbose_name': 'Estatística de Orçamentos',
+                'verbose_name_plural': 'Estatísticas de Orçamentos',
+            },
+        ),
+        migrations.CreateModel(
+            name='TicketDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Dia de Abertura')),
+                ('status', models.CharField(choices=[('OPEN', 'Aberto'), ('IN_PROGRESS', 'Em Andamento'), ('RESOLVED', 'Resolvido'), ('CLOSED', 'Fechado')], max_length=20, verbose_name='Status')),
+                ('count', models.IntegerField(default=0, verbose_name='Quantidade')),
+            ],
+            options={
+                'verbose_name': 'Estatística Diária de Chamados',
+                'verbose_name_plural': 'Estatísticas Diárias de Chamados',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ticketdailystat',
+            constraint=models.UniqueConstraint(fields=('day', 'status'), name='unique_ticket_daily_stat'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0006_stats_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaqAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True, verbose_name='Chave')),
+                ('question', models.TextField(verbose_name='Pergunta')),
+                ('variants', models.JSONField(blank=True, default=list, verbose_name='Variantes')),
+                ('answer', models.TextField(verbose_name='Resposta')),
+                ('sources', models.JSONField(blank=True, default=list, verbose_name='Fontes')),
+                ('query_count', models.IntegerField(default=0, verbose_name='Ocorrências nos Logs')),
+                ('index_generation', models.CharField(max_length=255, verbose_name='Geração do Índice')),
+                ('generated_at', models.DateTimeField(auto_now=True, verbose_name='Gerada em')),
+            ],
+            options={
+                'verbose_name': 'Resposta Pré-gerada',
+                'verbose_name_plural': 'Respostas Pré-geradas',
+                'ordering': ['-query_count'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0007_faq_answer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticket_id', models.BigIntegerField(db_index=True, verbose_name='Chamado')),
+                ('customer_id', models.CharField(blank=True, db_index=True, max_length=100, null=True, verbose_name='ID do Cliente')),
+                ('event_type', models.CharField(choices=[('created', 'Chamado Criado'), ('status_changed', 'Status Alterado')], max_length=20, verbose_name='Tipo')),
+                ('status', models.CharField(choices=[('OPEN', 'Aberto'), ('IN_PROGRESS', 'Em Andamento'), ('RESOLVED', 'Resolvido'), ('CLOSED', 'Fechado')], max_length=20, verbose_name='Status')),
+                ('previous_status', models.CharField(blank=True, max_length=20, null=True, verbose_name='Status Anterior')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Data do Evento')),
+            ],
+            options={
+                'verbose_name': 'Evento de Chamado',
+                'verbose_name_plural': 'Eventos de Chamados',
+            },
+        ),
+    ]
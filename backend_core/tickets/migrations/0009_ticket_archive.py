@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0008_ticket_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['status', 'updated_at'], name='ticket_status_updated_idx'),
+        ),
+        migrations.CreateModel(
+            name='TicketArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('customer_name', models.CharField(max_length=255, verbose_name='Nome do Cliente')),
+                ('customer_id', models.CharField(blank=True, max_length=100, null=True, verbose_name='ID do Cliente')),
+                ('problem_description', models.TextField(verbose_name='Descrição do Problema')),
+                ('status', models.CharField(choices=[('OPEN', 'Aberto'), ('IN_PROGRESS', 'Em Andamento'), ('RESOLVED', 'Resolvido'), ('CLOSED', 'Fechado')], max_length=20, verbose_name='Status')),
+                ('created_at', models.DateTimeField(verbose_name='Data de Abertura')),
+                ('updated_at', models.DateTimeField(verbose_name='Última Atualização')),
+                ('provisional_reference', models.CharField(blank=True, db_index=True, max_length=32, null=True, verbose_name='Protocolo Provisório')),
+                ('parent_id', models.BigIntegerField(blank=True, null=True, verbose_name='Incidente Principal')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Data de Arquivamento')),
+            ],
+            options={
+                'verbose_name': 'Chamado Arquivado',
+                'verbose_name_plural': 'Chamados Arquivados',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 14:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tickets', '0009_ticket_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('chat', 'API de Chat'), ('webhook', 'Webhook do Dialogflow')], max_length=20, verbose_name='Origem')),
+                ('session_id', models.CharField(blank=True, db_index=True, default='', max_length=255, verbose_name='Sessão')),
+                ('query', models.TextField(verbose_name='Pergunta')),
+                ('answer', models.TextField(blank=True, default='', verbose_name='Resposta')),
+                ('outcome', models.CharField(choices=[('generated', 'Resposta Gerada'), ('faq', 'Resposta Pré-gerada'), ('degraded', 'Resposta Degradada'), ('error', 'Erro')], max_length=20, verbose_name='Resultado')),
+                ('doc_ids', models.JSONField(blank=True, default=list, verbose_name='Documentos Recuperados')),
+                ('timings', models.JSONField(blank=True, default=dict, verbose_name='Tempos por Etapa (ms)')),
+                ('model_id', models.CharField(blank=True, default='', max_length=255, verbose_name='Modelo')),
+                ('input_tokens', models.IntegerField(default=0, verbose_name='Tokens de Entrada')),
+                ('output_tokens', models.IntegerField(default=0, verbose_name='Tokens de Saída')),
+                ('cache_read_input_tokens', models.IntegerField(default=0, verbose_name='Tokens Lidos do Cache')),
+                ('cache_creation_input_tokens', models.IntegerField(default=0, verbose_name='Tokens Gravados no Cache')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Data da Pergunta')),
+            ],
+            options={
+                'verbose_name': 'Transcrição do Chat',
+                'verbose_name_plural': 'Transcrições do Chat',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # Modelo que representa um Ticket de Suporte no sistema
 # Armazena informações sobre solicitações de clientes, status e descrição do problema
@@ -29,6 +30,13 @@ class Ticket(models.Model):
     # Data e hora da última atualização do ticket (Automático)
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Última Atualização")
 
+    # Protocolo provisório entregue pelo Webhook no modo assíncrono (fila de chamados).
+    # Único para tornar idempotente o reprocessamento de mensagens da fila.
+    provisional_reference = models.CharField(max_length=32, unique=True, blank=True, null=True, verbose_name="Protocolo Provisório")
+
+    # Incidente principal quando o chamado é um quase duplicado de outro aberto (ver tickets/duplicates.py)
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, blank=True, null=True, related_name='duplicates', verbose_name="Incidente Principal")
+
     def __str__(self):
         # Representação em string do objeto (exibido no Admin do Django)
         return f"Ticket #{self.id} - {self.customer_name}"
@@ -37,6 +45,8 @@ class Ticket(models.Model):
         # Nome amigável para exibição no painel administrativo
         verbose_name = "Chamado"
         verbose_name_plural = "Chamados"
+        # Seleção dos chamados encerrados a arquivar (ver tickets/archive.py)
+        indexes = [models.Index(fields=['status', 'updated_at'], name='ticket_status_updated_idx')]
 
 
 # Modelo que representa um Orçamento gerado pelo sistema
@@ -51,7 +61,10 @@ class Budget(models.Model):
     # Valor total calculado para o orçamento (Decimal para precisão monetária)
     total_value = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Valor Total (R$)")
     
-    # Caminho ou URL para o arquivo PDF gerado (Opcional)
+    # Itens que compõem o valor total (serviço base e ajustes da tabela de preços)
+    items = models.JSONField(default=list, blank=True, verbose_name="Itens do Orçamento")
+
+    # URL do PDF da proposta, preenchida pelo renderizador em segundo plano (Opcional)
     pdf_url = models.URLField(verbose_name="URL do PDF", blank=True, null=True)
     
     # Data de criação do orçamento
@@ -63,3 +76,147 @@ class Budget(models.Model):
     class Meta:
         verbose_name = "Orçamento"
         verbose_name_plural = "Orçamentos"
+
+
+# --- Tabelas de Estatísticas (rollups) ---
+# Mantidas incrementalmente a cada gravação de Ticket/Budget (ver tickets/stats.py)
+# e recalculadas periodicamente pelo comando reconcile_stats.
+
+# Quantidade de chamados abertos em cada dia, agrupados pelo status atual
+class TicketDailyStat(models.Model):
+    day = models.DateField(verbose_name="Dia de Abertura")
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES, verbose_name="Status")
+    count = models.IntegerField(default=0, verbose_name="Quantidade")
+
+    class Meta:
+        verbose_name = "Estatística Diária de Chamados"
+        verbose_name_plural = "Estatísticas Diárias de Chamados"
+        constraints = [models.UniqueConstraint(fields=['day', 'status'], name='unique_ticket_daily_stat')]
+
+
+# Quantidade e valor total dos orçamentos por tipo de serviço
+class BudgetServiceStat(models.Model):
+    service_type = models.CharField(max_length=200, unique=True, verbose_name="Tipo de Serviço")
+    count = models.IntegerField(default=0, verbose_name="Quantidade")
+    total_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Valor Total (R$)")
+
+    class Meta:
+        verbose_name = "Estatística de Orçamentos"
+        verbose_name_plural = "Estatísticas de Orçamentos"
+
+
+# --- Respostas Pré-geradas (FAQ) ---
+# Preenchida pelo comando pregenerate_faq a partir das perguntas mais frequentes dos
+# logs. O Webhook e o Chat consultam estas respostas antes do fluxo RAG (ver
+# tickets/faq_store.py); só são servidas na mesma geração do índice em que foram geradas.
+class FaqAnswer(models.Model):
+    # Forma normalizada da pergunta principal do grupo
+    key = models.CharField(max_length=255, unique=True, verbose_name="Chave")
+    question = models.TextField(verbose_name="Pergunta")
+    # Formas normalizadas das perguntas quase idênticas agrupadas
+    variants = models.JSONField(default=list, blank=True, verbose_name="Variantes")
+    answer = models.TextField(verbose_name="Resposta")
+    # IDs dos documentos da base de conhecimento usados no contexto
+    sources = models.JSONField(default=list, blank=True, verbose_name="Fontes")
+    query_count = models.IntegerField(default=0, verbose_name="Ocorrências nos Logs")
+    index_generation = models.CharField(max_length=255, verbose_name="Geração do Índice")
+    generated_at = models.DateTimeField(auto_now=True, verbose_name="Gerada em")
+
+    def __str__(self):
+        return self.question
+
+    class Meta:
+        verbose_name = "Resposta Pré-gerada"
+        verbose_name_plural = "Respostas Pré-geradas"
+        ordering = ['-query_count']
+
+
+# --- Feed de Alterações de Chamados ---
+# Uma linha por criação ou mudança de status de chamado (ver tickets/events.py).
+# O id crescente é o id do evento no stream SSE (retomada via Last-Event-ID);
+# linhas antigas são removidas pelo comando prune_ticket_events.
+class TicketEvent(models.Model):
+    EVENT_TYPES = [
+        ('created', 'Chamado Criado'),
+        ('status_changed', 'Status Alterado'),
+    ]
+
+    # Sem chave estrangeira: o evento sobrevive à exclusão do chamado
+    ticket_id = models.BigIntegerField(db_index=True, verbose_name="Chamado")
+    customer_id = models.CharField(max_length=100, blank=True, null=True, db_index=True, verbose_name="ID do Cliente")
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES, verbose_name="Tipo")
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES, verbose_name="Status")
+    previous_status = models.CharField(max_length=20, blank=True, null=True, verbose_name="Status Anterior")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Data do Evento")
+
+    class Meta:
+        verbose_name = "Evento de Chamado"
+        verbose_name_plural = "Eventos de Chamados"
+
+
+# --- Arquivo de Chamados Encerrados ---
+# Chamados RESOLVED/CLOSED há mais de TICKET_ARCHIVE_AFTER_DAYS dias saem da tabela
+# principal para esta (comando archive_tickets), mantendo o mesmo id. A tabela
+# principal fica restrita aos chamados recentes; GET /api/tickets/<id>/ continua
+# encontrando o chamado arquivado (somente leitura).
+class TicketArchive(models.Model):
+    id = models.BigIntegerField(primary_key=True, verbose_name="ID")
+    customer_name = models.CharField(max_length=255, verbose_name="Nome do Cliente")
+    customer_id = models.CharField(max_length=100, blank=True, null=True, verbose_name="ID do Cliente")
+    problem_description = models.TextField(verbose_name="Descrição do Problema")
+    status = models.CharField(max_length=20, choices=Ticket.STATUS_CHOICES, verbose_name="Status")
+    created_at = models.DateTimeField(verbose_name="Data de Abertura")
+    updated_at = models.DateTimeField(verbose_name="Última Atualização")
+    provisional_reference = models.CharField(max_length=32, blank=True, null=True, db_index=True, verbose_name="Protocolo Provisório")
+    # Id do incidente principal (pode estar arquivado ou não; sem chave estrangeira)
+    parent_id = models.BigIntegerField(blank=True, null=True, verbose_name="Incidente Principal")
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Data de Arquivamento")
+
+    def __str__(self):
+        return f"Ticket #{self.id} (arquivado) - {self.customer_name}"
+
+    class Meta:
+        verbose_name = "Chamado Arquivado"
+        verbose_name_plural = "Chamados Arquivados"
+
+
+# --- Transcrições e Telemetria do Chat ---
+# Uma linha por pergunta respondida pela API de Chat ou pelo Webhook, gravada
+# em lotes fora da requisição (ver tickets/transcripts.py). created_at é o
+# instante da pergunta, não o da gravação.
+class ChatTranscript(models.Model):
+    SOURCES = [
+        ('chat', 'API de Chat'),
+        ('webhook', 'Webhook do Dialogflow'),
+    ]
+    OUTCOMES = [
+        ('generated', 'Resposta Gerada'),
+        ('faq', 'Resposta Pré-gerada'),
+        ('degraded', 'Resposta Degradada'),
+        ('error', 'Erro'),
+    ]
+
+    source = models.CharField(max_length=20, choices=SOURCES, verbose_name="Origem")
+    session_id = models.CharField(max_length=255, blank=True, default='', db_index=True, verbose_name="Sessão")
+    query = models.TextField(verbose_name="Pergunta")
+    answer = models.TextField(blank=True, default='', verbose_name="Resposta")
+    outcome = models.CharField(max_length=20, choices=OUTCOMES, verbose_name="Resultado")
+    # IDs dos documentos da base de conhecimento usados no contexto
+    doc_ids = models.JSONField(default=list, blank=True, verbose_name="Documentos Recuperados")
+    # Duração de cada etapa em ms (ex: {"faq": 3.1, "retrieval": 120.4, "generation": 1830.0})
+    timings = models.JSONField(default=dict, blank=True, verbose_name="Tempos por Etapa (ms)")
+    model_id = models.CharField(max_length=255, blank=True, default='', verbose_name="Modelo")
+    # Uso de tokens informado pela Messages API do Bedrock
+    input_tokens = models.IntegerField(default=0, verbose_name="Tokens de Entrada")
+    output_tokens = models.IntegerField(default=0, verbose_name="Tokens de Saída")
+    cache_read_input_tokens = models.IntegerField(default=0, verbose_name="Tokens Lidos do Cache")
+    cache_creation_input_tokens = models.IntegerField(default=0, verbose_name="Tokens Gravados no Cache")
+    created_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Data da Pergunta")
+
+    def __str__(self):
+        return f"{self.source} {self.created_at:%Y-%m-%d %H:%M} - {self.query[:50]}"
+
+    class Meta:
+        verbose_name = "Transcrição do Chat"
+        verbose_name_plural = "Transcrições do Chat"
+        ordering = ['-created_at']
@@ -0,0 +1,166 @@
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.template.loader import get_template
+
+from .models import Budget
+
+logger = logging.getLogger(__name__)
+
+# --- Renderização de PDFs de Orçamento ---
+# A renderização nunca ocorre na requisição que cria o orçamento: os IDs entram em
+# uma fila em memória, um despachante agrupa-os em lotes (por tamanho ou tempo de
+# espera) e um pool de threads gera os arquivos. Cada lote termina com um único
+# bulk_update do pdf_url. Orçamentos perdidos em um restart são recuperados pelo
+# comando `render_budget_pdfs`.
+
+# Template de texto puro (autoescape desligado: o PDF não interpreta entidades HTML)
+BUDGET_TEMPLATE = 'tickets/budget_proposal.txt'
+
+
+@lru_cache(maxsize=8)
+def _compiled_template(name):
+    """Cache dos templates compilados (evita reler e recompilar a cada documento)."""
+    return get_template(name)
+
+
+def _escape_pdf_text(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(lines):
+    """
+    Gera um PDF de uma página com as linhas de texto informadas.
+    Escrita direta do formato (fonte Helvetica padrão, codificação WinAnsi),
+    sem dependências externas de renderização.
+    """
+    text_ops = ''.join(f"({_escape_pdf_text(line)}) '\n" for line in lines)
+    stream = f"BT /F1 11 Tf 14 TL 50 800 Td\n{text_ops}ET".encode('cp1252', errors='replace')
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+    ]
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode()
+    output += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+    return bytes(output)
+
+
+def render_budget_pdf(budget):
+    """Renderiza o PDF de um orçamento, grava no storage e retorna a URL pública."""
+    text = _compiled_template(BUDGET_TEMPLATE).render({'budget': budget})
+    name = default_storage.save(f"budgets/orcamento_{budget.id}.pdf", ContentFile(build_pdf(text.splitlines())))
+    return f"{settings.PUBLIC_BASE_URL.rstrip('/')}{default_storage.url(name)}"
+
+
+def render_budgets(budgets, executor=None):
+    """
+    Renderiza um lote de orçamentos (em paralelo, se houver executor) e persiste
+    todos os pdf_url com um único bulk_update. Retorna a quantidade atualizada.
+    """
+    def _render(budget):
+        try:
+            budget.pdf_url = render_budget_pdf(budget)
+            return budget
+        except Exception as e:
+            logger.error(f"Falha ao renderizar PDF do orçamento #{budget.id}: {e}")
+            return None
+
+    results = executor.map(_render, budgets) if executor else map(_render, budgets)
+    rendered = [budget for budget in results if budget is not None]
+    if rendered:
+        Budget.objects.bulk_update(rendered, ['pdf_url'])
+    return len(rendered)
+
+
+class BudgetPdfRenderer:
+    """Despachante em segundo plano que agrupa orçamentos pendentes em lotes."""
+
+    def __init__(self, workers=None, batch_size=None, batch_wait=None):
+        self.batch_size = batch_size or settings.BUDGET_PDF_BATCH_SIZE
+        self.batch_wait = batch_wait if batch_wait is not None else settings.BUDGET_PDF_BATCH_WAIT
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or settings.BUDGET_PDF_WORKERS, thread_name_prefix='budget-pdf'
+        )
+        self._pending = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='budget-pdf-dispatcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, budget_id):
+        """Agenda a renderização do orçamento (retorna imediatamente)."""
+        self._pending.put(budget_id)
+
+    def _next_batch(self):
+        # Bloqueia até o primeiro item e depois aguarda no máximo batch_wait pelos demais
+        batch = [self._pending.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._pending.get(timeout=self.batch_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if None in batch:
+                batch = [budget_id for budget_id in batch if budget_id is not None]
+                self._render_ids(batch)
+                break
+            self._render_ids(batch)
+
+    def _render_ids(self, budget_ids):
+        if not budget_ids:
+            return
+        try:
+            budgets = list(Budget.objects.filter(id__in=budget_ids, pdf_url__isnull=True))
+            count = render_budgets(budgets, self._executor)
+            logger.info(f"Lote de PDFs renderizado: {count}/{len(budget_ids)} orçamentos.")
+        except Exception as e:
+            logger.error(f"Falha ao processar lote de PDFs {budget_ids}: {e}")
+        finally:
+            # Threads de segundo plano não passam pelo ciclo de requisição do Django
+            close_old_connections()
+
+    def shutdown(self, timeout=10):
+        """Processa o que já está na fila e encerra o despachante."""
+        self._pending.put(None)
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=True)
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_budget_pdf_renderer():
+    """Retorna o renderizador do processo, iniciando-o na primeira chamada."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = BudgetPdfRenderer()
+                atexit.register(_renderer.shutdown)
+    return _renderer
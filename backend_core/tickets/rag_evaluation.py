@@ -0,0 +1,138 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .metrics import percentile
+
+# --- Avaliação do Pipeline RAG ---
+# Executa um conjunto "golden" de perguntas (JSONL com as fontes esperadas) pelo
+# pipeline de recuperação + geração em um pool limitado de threads e calcula
+# recall@k, MRR e percentis de latência e tokens. O relatório pode ser comparado
+# com uma execução de referência para decidir ajustes de top-k, tamanho de
+# contexto e tipo de consulta com dados.
+# Este módulo não depende do Django: recuperação e geração são injetadas.
+
+
+def load_golden_set(path):
+    """
+    Lê o conjunto golden. Cada linha: {"question": "...", "expected_sources": ["id", ...]}.
+    Campos opcionais: "id" (identificador do caso).
+    """
+    cases = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            case = json.loads(line)
+            if not case.get('question') or not isinstance(case.get('expected_sources'), list):
+                raise ValueError(f"Linha {line_number}: 'question' e 'expected_sources' (lista) são obrigatórios.")
+            case.setdefault('id', f"caso-{line_number}")
+            cases.append(case)
+    return cases
+
+
+def recall_at_k(retrieved_ids, expected_ids, k):
+    """Fração das fontes esperadas presentes entre os k primeiros documentos."""
+    if not expected_ids:
+        return 0.0
+    return len(set(retrieved_ids[:k]) & set(expected_ids)) / len(set(expected_ids))
+
+
+def reciprocal_rank(retrieved_ids, expected_ids):
+    """Inverso da posição da primeira fonte esperada (0 se nenhuma foi recuperada)."""
+    expected = set(expected_ids)
+    for position, doc_id in enumerate(retrieved_ids, start=1):
+        if doc_id in expected:
+            return 1.0 / position
+    return 0.0
+
+
+def _distribution(values):
+    values = sorted(values)
+    return {
+        'p50': round(percentile(values, 50), 1),
+        'p95': round(percentile(values, 95), 1),
+        'p99': round(percentile(values, 99), 1),
+    }
+
+
+def evaluate_case(case, retrieve, generate, k, clock=time.perf_counter):
+    """
+    Avalia um caso. `retrieve(question)` retorna documentos {'id', 'content', ...}
+    ranqueados; `generate(question, documents)` retorna (resposta, tokens_prompt, tokens_resposta).
+    """
+    result = {'id': case['id'], 'question': case['question'], 'expected_sources': case['expected_sources']}
+    try:
+        started = clock()
+        documents = retrieve(case['question'])
+        retrieved_at = clock()
+        answer, prompt_tokens, completion_tokens = generate(case['question'], documents)
+        finished = clock()
+    except Exception as e:
+        result['error'] = str(e)
+        return result
+
+    retrieved_ids = [doc['id'] for doc in documents]
+    result.update({
+        'retrieved': retrieved_ids,
+        'recall_at_k': recall_at_k(retrieved_ids, case['expected_sources'], k),
+        'reciprocal_rank': reciprocal_rank(retrieved_ids[:k], case['expected_sources']),
+        'retrieval_ms': (retrieved_at - started) * 1000.0,
+        'generation_ms': (finished - retrieved_at) * 1000.0,
+        'total_ms': (finished - started) * 1000.0,
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'answer': answer,
+    })
+    return result
+
+
+def summarize(results):
+    """Agrega as métricas dos casos avaliados com sucesso."""
+    ok = [r for r in results if 'error' not in r]
+    summary = {'cases': len(results), 'errors': len(results) - len(ok)}
+    if not ok:
+        return summary
+
+    summary['recall_at_k'] = round(sum(r['recall_at_k'] for r in ok) / len(ok), 4)
+    summary['mrr'] = round(sum(r['reciprocal_rank'] for r in ok) / len(ok), 4)
+    for field in ('retrieval_ms', 'generation_ms', 'total_ms', 'prompt_tokens', 'completion_tokens'):
+        summary[field] = _distribution([r[field] for r in ok])
+    return summary
+
+
+def run_evaluation(cases, retrieve, generate, k, workers=4, config=None):
+    """Avalia todos os casos em paralelo (no máximo `workers` simultâneos)."""
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(lambda case: evaluate_case(case, retrieve, generate, k), cases))
+    return {
+        'config': dict(config or {}, k=k, workers=workers),
+        'wall_time_s': round(time.monotonic() - started, 3),
+        'summary': summarize(results),
+        'cases': results,
+    }
+
+
+def diff_reports(current, baseline):
+    """
+    Compara os resumos de duas execuções. Retorna {métrica: {'baseline', 'current', 'delta'}};
+    distribuições são comparadas pelo p95.
+    """
+    diff = {}
+    for metric, value in current['summary'].items():
+        reference = baseline.get('summary', {}).get(metric)
+        if reference is None:
+            continue
+        if isinstance(value, dict):
+            metric, value, reference = f"{metric}.p95", value['p95'], reference['p95']
+        diff[metric] = {'baseline': reference, 'current': value, 'delta': round(value - reference, 4)}
+
+    # Casos que passaram a perder alguma fonte esperada
+    baseline_cases = {case['id']: case for case in baseline.get('cases', [])}
+    diff['worse_cases'] = [
+        case['id'] for case in current['cases']
+        if case['id'] in baseline_cases
+        and case.get('recall_at_k', 0.0) < baseline_cases[case['id']].get('recall_at_k', 0.0)
+    ]
+    return diff
@@ -2,9 +2,22 @@ import boto3
 import json
 import os
 import logging
+import time
+from contextlib import contextmanager
 from opensearchpy import OpenSearch, RequestsHttpConnection
 from requests_aws4auth import AWS4Auth
 from django.conf import settings
+from django.db import connection
+from . import metrics
+from .bedrock_client import get_default_invoker
+from .bedrock_messages import USAGE_METRICS, build_messages_body, parse_messages_response
+from .conversation_memory import ConversationMemory
+from .faq_store import FAQ_ENABLED, FaqStore
+from .models import FaqAnswer
+from .reranker import RERANK_CANDIDATES, RERANK_ENABLED, get_default_reranker
+from .retrieval_cache import RETRIEVAL_CACHE_ENABLED, IndexGenerationTracker, RetrievalCache, fetch_index_generation
+from .token_usage import get_default_accountant
+from .transcripts import record_transcript
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +25,37 @@ logger = logging.getLogger(__name__)
 BEDROCK_REGION = os.environ.get('AWS_REGION', 'us-east-1')
 OPENSEARCH_HOST = os.environ.get('OPENSEARCH_HOST')
 OPENSEARCH_INDEX = os.environ.get('OPENSEARCH_INDEX', 'knowledge-base')
+OPENSEARCH_PORT = int(os.environ.get('OPENSEARCH_PORT', '443'))
+OPENSEARCH_USE_SSL = os.environ.get('OPENSEARCH_USE_SSL', 'True') == 'True'
+
+# Parâmetros da recuperação (ajustáveis com base no comando evaluate_rag)
+RAG_TOP_K = int(os.environ.get('RAG_TOP_K', '3'))
+RAG_QUERY_TYPE = os.environ.get('RAG_QUERY_TYPE', 'match')
+RAG_CONTEXT_MAX_CHARS = int(os.environ.get('RAG_CONTEXT_MAX_CHARS', '6000'))
+
+# Consultas suportadas: 'match' (OR entre termos), 'match_and' (todos os termos) e 'match_phrase'
+QUERY_TYPES = ('match', 'match_and', 'match_phrase')
+
+# Cache dos documentos recuperados, invalidado pela geração do índice (ver retrieval_cache.py)
+retrieval_cache = RetrievalCache()
+index_generation = IndexGenerationTracker()
+# Prazo (s) da consulta da geração do índice: com o OpenSearch lento a busca segue sem cache
+INDEX_GENERATION_TIMEOUT = float(os.environ.get('INDEX_GENERATION_TIMEOUT', '1.0'))
+
+def fetch_faq_entries():
+    """Entradas do FAQ para o FaqStore, lidas na thread de recarga (que encerra a própria conexão)."""
+    try:
+        return list(FaqAnswer.objects.values('question', 'variants', 'answer', 'index_generation'))
+    finally:
+        connection.close()
+
+# Respostas pré-geradas pelo comando pregenerate_faq, consultadas antes do fluxo RAG
+faq_store = FaqStore(fetch_faq_entries)
+
+SIMULATED_CONTEXT = "Manual técnico do servidor: Reinicie o serviço se a luz vermelha piscar. (Contexto Simulado - Sem conexão OpenSearch)"
+
+# Prazo máximo (segundos) de uma geração disparada pela API de Chat
+BEDROCK_CALL_TIMEOUT = float(os.environ.get('BEDROCK_CALL_TIMEOUT', '25'))
 
 def get_opensearch_client():
     """
@@ -31,82 +75,248 @@ def get_opensearch_client():
     awsauth = AWS4Auth(credentials.access_key, credentials.secret_key, region, service, session_token=credentials.token)
 
     return OpenSearch(
-        hosts=[{'host': OPENSEARCH_HOST, 'port': 443}],
+        hosts=[{'host': OPENSEARCH_HOST, 'port': OPENSEARCH_PORT}],
         http_auth=awsauth,
-        use_ssl=True,
-        verify_certs=True,
+        use_ssl=OPENSEARCH_USE_SSL,
+        verify_certs=OPENSEARCH_USE_SSL,
         connection_class=RequestsHttpConnection
     )
 
-def search_opensearch(query):
+def build_search_query(query, size=RAG_TOP_K, query_type=RAG_QUERY_TYPE):
+    """
+    Monta o corpo da busca no OpenSearch para o tipo de consulta escolhido.
+    """
+    if query_type not in QUERY_TYPES:
+        raise ValueError(f"Tipo de consulta inválido: {query_type}. Use um de {QUERY_TYPES}.")
+
+    if query_type == 'match_phrase':
+        clause = {"match_phrase": {"content": query}}
+    elif query_type == 'match_and':
+        clause = {"match": {"content": {"query": query, "operator": "and"}}}
+    else:
+        clause = {"match": {"content": query}}
+
+    return {"size": size, "query": clause}
+
+def retrieve_documents(query, size=RAG_TOP_K, query_type=RAG_QUERY_TYPE, rerank=RERANK_ENABLED,
+                       candidates=RERANK_CANDIDATES, use_cache=RETRIEVAL_CACHE_ENABLED):
     """
-    Executa busca no OpenSearch.
+    Executa busca no OpenSearch e retorna os documentos ranqueados
+    como dicionários {'id', 'content', 'score'}.
+    Com `rerank`, busca `candidates` documentos e mantém os `size` melhores após a reordenação.
+    Com `use_cache`, resultados da mesma pergunta e geração do índice são reaproveitados.
+    Retorna None se o OpenSearch não estiver configurado.
     """
     client = get_opensearch_client()
     if not client:
-        return "Manual técnico do servidor: Reinicie o serviço se a luz vermelha piscar. (Contexto Simulado - Sem conexão OpenSearch)"
+        return None
+
+    cache_key = None
+    if use_cache:
+        generation = current_index_generation(client)
+        if generation is not None:
+            variant = (size, query_type, rerank, candidates if rerank else None)
+            cache_key = RetrievalCache.key(query, OPENSEARCH_INDEX, generation, variant)
+            documents = retrieval_cache.get(cache_key)
+            metrics.increment('RetrievalCache', Result='hit' if documents is not None else 'miss')
+            if documents is not None:
+                return documents
+        else:
+            metrics.increment('RetrievalCache', Result='bypass')
+
+    documents = _search_documents(client, query, size, query_type, rerank, candidates)
+    if cache_key is not None:
+        retrieval_cache.set(cache_key, documents)
+    return documents
+
+def current_index_generation(client=None, timeout=INDEX_GENERATION_TIMEOUT):
+    """
+    Geração atual do índice (consultada no máximo a cada INDEX_GENERATION_TTL_SECONDS,
+    com prazo de `timeout` segundos) ou None.
+    """
+    client = client or get_opensearch_client()
+    if not client:
+        return None
+    return index_generation.current(lambda: fetch_index_generation(client, OPENSEARCH_INDEX, timeout=timeout))
+
+def lookup_faq_answer(message):
+    """Resposta pré-gerada para a pergunta na geração atual do índice, ou None."""
+    if not FAQ_ENABLED:
+        return None
+    try:
+        entry = faq_store.lookup(message, current_index_generation())
+    except Exception as e:
+        logger.error(f"Erro na consulta das respostas pré-geradas: {e}")
+        return None
+    metrics.increment('FaqAnswer', Result='hit' if entry else 'miss')
+    return entry['answer'] if entry else None
+
+def _search_documents(client, query, size, query_type, rerank, candidates):
+    fetch_size = max(size, candidates) if rerank else size
+    search_query = build_search_query(query, fetch_size, query_type)
+    search_query["_source"] = ["content"]
+    response = client.search(body=search_query, index=OPENSEARCH_INDEX)
+    documents = [
+        {'id': hit['_id'], 'content': hit['_source']['content'], 'score': hit.get('_score')}
+        for hit in response['hits']['hits']
+    ]
 
-    search_query = {
-        "size": 3,
-        "query": {
-            "match": {
-                "content": query
-            }
-        }
-    }
+    if rerank and len(documents) > size:
+        result = get_default_reranker().rerank(query, documents, top_n=size)
+        metrics.timing('RerankLatency', result.elapsed_ms)
+        if not result.complete:
+            metrics.increment('RerankTimeout')
+        return result.passages
+    return documents[:size]
+
+def build_context(documents, max_chars=RAG_CONTEXT_MAX_CHARS):
+    """
+    Concatena os documentos recuperados em ordem de relevância até `max_chars`.
+    """
+    parts, used = [], 0
+    for doc in documents:
+        remaining = max_chars - used
+        if remaining <= 0:
+            break
+        part = doc['content'][:remaining]
+        parts.append(part)
+        used += len(part) + 2
+    return "\n\n".join(parts)
 
+def search_opensearch(query, trace=None):
+    """
+    Executa busca no OpenSearch e retorna o contexto para o prompt.
+    Com `trace` (dicionário), registra os ids dos documentos usados em trace['doc_ids'].
+    """
     try:
-        response = client.search(body=search_query, index=OPENSEARCH_INDEX)
-        hits = response['hits']['hits']
-        context_parts = [hit['_source']['content'] for hit in hits]
-        return "\n\n".join(context_parts)
+        documents = retrieve_documents(query)
     except Exception as e:
         logger.error(f"Erro na busca do OpenSearch: {e}")
         return ""
 
-def generate_bedrock_response(query, context):
+    if documents is None:
+        return SIMULATED_CONTEXT
+    if trace is not None:
+        trace['doc_ids'] = [doc['id'] for doc in documents]
+    return build_context(documents)
+
+def generate_bedrock_answer(query, context, timeout=BEDROCK_CALL_TIMEOUT, history='', trace=None,
+                            intent='chat', client=''):
     """
-    Gera resposta usando Amazon Bedrock (Claude v2).
+    Gera a resposta no Amazon Bedrock (Claude, Messages API) e retorna (texto, uso de tokens).
+    O preâmbulo estático vai no system prompt, marcado para cache quando o tamanho dele alcança
+    o mínimo dos modelos (ver bedrock_messages.py).
+    Reutiliza os clientes do processo; o retry e o fallback de modelos respeitam o `timeout`.
+    Com `trace` (dicionário), registra o modelo e o uso de tokens em trace['model_id'] e trace['usage'].
+    O uso e o custo são contabilizados por `intent` (origem da chamada) e `client` (ver token_usage.py).
     """
-    bedrock_client = boto3.client(service_name='bedrock-runtime', region_name=BEDROCK_REGION)
-    
-    prompt = f"""Human: Você é um assistente técnico especialista da Nexus AI. Use o contexto abaixo para responder à pergunta do usuário de forma útil, precisa e concisa. Se a resposta não estiver no contexto, diga que não sabe.
-    
-    Contexto:
-    {context}
-    
-    Pergunta: {query}
-    
-    Assistant:"""
+    invoker = get_default_invoker()
+    body = build_messages_body(query, context, history, model_ids=invoker.model_ids)
+    response_body, model_id = invoker.invoke(body, timeout=timeout)
+    answer, usage = parse_messages_response(response_body)
+    usage = account_bedrock_usage(usage, body, answer, model_id, intent, client)
+    if trace is not None:
+        trace.update(model_id=model_id, usage=usage)
+    return answer, usage
 
-    body = json.dumps({
-        "prompt": prompt,
-        "max_tokens_to_sample": 500,
-        "temperature": 0.3,
-        "top_p": 0.9,
-    })
+def account_bedrock_usage(usage, body, answer, model_id, intent, client):
+    """
+    Contabiliza tokens e custo da invocação (uso estimado se a resposta não trouxer 'usage'),
+    atualiza as métricas do processo e registra a linha estruturada 'uso_bedrock'.
+    """
+    entry = get_default_accountant().record(usage, model_id, intent=intent, client=client, body=body, answer=answer)
+    usage = entry['usage']
+    for name, value in usage.items():
+        metrics.increment(USAGE_METRICS[name], value)
+    metrics.increment('BedrockPromptTokens', entry['prompt_tokens'], Intent=intent)
+    if entry['cost_usd'] is not None:
+        metrics.increment('BedrockCost', entry['cost_usd'], Intent=intent)
+    if entry['estimated']:
+        metrics.increment('BedrockUsageEstimated')
+    if entry['alerts']:
+        metrics.increment('TokenUsageAlert', len(entry['alerts']), Intent=intent)
+    logger.info(json.dumps({
+        'evento': 'uso_bedrock', 'origem': 'backend', 'intencao': intent, 'cliente': client, 'modelo': model_id,
+        'estimado': entry['estimated'], 'custo_usd': entry['cost_usd'], **usage,
+    }, ensure_ascii=False))
+    return usage
 
+def generate_bedrock_response(query, context, timeout=BEDROCK_CALL_TIMEOUT, history='', trace=None, client=''):
+    """
+    Gera resposta usando Amazon Bedrock (Claude).
+    O `history` (opcional) é o histórico já limitado em tokens da sessão de chat.
+    """
     try:
-        response = bedrock_client.invoke_model(
-            modelId='anthropic.claude-v2',
-            body=body
+        answer, _ = generate_bedrock_answer(
+            query, context, timeout=timeout, history=history, trace=trace, client=client
         )
-        response_body = json.loads(response['body'].read())
-        return response_body['completion'].strip()
+        if trace is not None:
+            trace['outcome'] = 'generated'
+        return answer
     except Exception as e:
         logger.error(f"Erro ao invocar Bedrock: {e}")
         # Fallback para dev local sem credenciais
         return f"Simulação local (Erro Bedrock): {query} - Resposta baseada no contexto: {context[:50]}..."
 
-def process_chat_message(message):
+@contextmanager
+def _timed(trace, stage):
+    """Registra a duração da etapa em trace['timings'][stage] (ms)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace['timings'][stage] = round((time.perf_counter() - started) * 1000.0, 1)
+
+def process_chat_message(message, session_id=None, client=''):
     """
     Orquestra o fluxo RAG.
+    Com `session_id`, usa a memória da conversa: o histórico limitado entra no prompt
+    e, se a pergunta continuar o mesmo assunto, o contexto da busca anterior é reutilizado.
+    A transcrição (documentos, tempos por etapa e tokens) é gravada em segundo plano.
+    O uso de tokens é contabilizado para `client` (ver throttling.client_identity).
     """
-    # 1. Recuperação
-    context = search_opensearch(message)
+    trace = {'outcome': 'error', 'doc_ids': [], 'timings': {}}
+    answer = ''
+    try:
+        with _timed(trace, 'total'):
+            answer = _answer_chat_message(message, session_id, trace, client)
+        return answer
+    finally:
+        record_transcript('chat', message, answer, session_id=session_id, **trace)
+
+def _answer_chat_message(message, session_id, trace, client=''):
+    memory = ConversationMemory.load(session_id) if session_id else None
+    # Registro estruturado da pergunta (fonte do comando pregenerate_faq)
+    logger.info(json.dumps({'evento': 'pergunta_rag', 'origem': 'chat', 'pergunta': message}, ensure_ascii=False))
+
+    # 0. Pergunta frequente com resposta pré-gerada na geração atual do índice
+    with _timed(trace, 'faq'):
+        answer = lookup_faq_answer(message)
+    if answer is not None:
+        trace['outcome'] = 'faq'
+        if memory is not None:
+            memory.add_turn(message, answer)
+            memory.save()
+        return answer
+
+    # 1. Recuperação (ou reutilização do contexto do turno anterior)
+    if memory is not None and memory.is_same_topic(message):
+        context = memory.context
+        logger.info(f"Sessão {session_id}: reutilizando contexto recuperado no turno anterior.")
+    else:
+        with _timed(trace, 'retrieval'):
+            context = search_opensearch(message, trace=trace)
+        if memory is not None and context:
+            memory.remember_retrieval(message, context)
     if not context:
         context = "Nenhuma informação específica encontrada."
 
-    # 2. Geração
-    answer = generate_bedrock_response(message, context)
+    # 2. Geração (sem sucesso, a resposta simulada fica registrada como 'error')
+    history = memory.render_history() if memory is not None else ''
+    with _timed(trace, 'generation'):
+        answer = generate_bedrock_response(message, context, history=history, trace=trace, client=client)
+
+    if memory is not None:
+        memory.add_turn(message, answer)
+        memory.save()
     return answer
@@ -0,0 +1,81 @@
+import json
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Opcional: sem o pacote, as classes delegam ao JSON padrão do DRF
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Opcional: settings.py só registra MessagePack com o pacote instalado
+    msgpack = None
+
+# --- Renderers e Parsers da API ---
+# A (de)serialização JSON é feita com orjson, com a mesma saída dos codecs
+# padrão do DRF: datas, Decimal, UUID, QuerySets e demais tipos não nativos
+# passam pelo JSONEncoder do DRF. Clientes de serviço (ex: o Webhook) podem
+# negociar MessagePack com Content-Type/Accept: application/msgpack.
+
+_encoder = JSONEncoder()
+
+# Datas vão para o encoder do DRF (formato ISO com 'Z', igual ao renderer padrão)
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dumps_json(data):
+    """JSON compacto em bytes, com a mesma conversão de tipos do renderer (ex: linhas NDJSON)."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class OrjsonRenderer(JSONRenderer):
+    """JSONRenderer com orjson; respostas indentadas (ex: ?indent) usam o renderer padrão."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps_json(data)
+
+
+class OrjsonParser(JSONParser):
+    """JSONParser com orjson (o corpo deve estar em UTF-8, o charset padrão da API)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """Resposta em MessagePack; tipos não nativos são convertidos como no JSON (datas em texto ISO)."""
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encoder.default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = 'application/msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
@@ -0,0 +1,161 @@
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import Counter, namedtuple
+
+# --- Reordenação (Rerank) de Passagens Recuperadas ---
+# Segunda etapa da recuperação: o OpenSearch devolve um conjunto maior de
+# candidatos (BM25) e este módulo os reordena com um avaliador léxico-semântico
+# leve, executado em CPU sobre o lote inteiro, mantendo apenas as melhores
+# passagens para o prompt. Combina:
+#   - BM25 recalculado no lote com radicais (prefixos) dos termos, que aproxima
+#     variações morfológicas ("reiniciar" / "reinicie" / "reinício");
+#   - cobertura dos termos da pergunta e pares de termos adjacentes na passagem;
+#   - similaridade de cosseno de trigramas de caracteres (erros de digitação);
+#   - a posição original no OpenSearch como desempate.
+# Se o orçamento de tempo estourar, a ordem original é mantida.
+# Mantenha sincronizado com lambda_functions/reranker.py.
+
+RERANK_ENABLED = os.environ.get('RERANK_ENABLED', 'True') == 'True'
+# Candidatos buscados no OpenSearch e passagens mantidas após a reordenação
+RERANK_CANDIDATES = int(os.environ.get('RERANK_CANDIDATES', '20'))
+RERANK_TOP_N = int(os.environ.get('RERANK_TOP_N', '3'))
+# Tempo máximo (ms) da reordenação; acima disso vale a ordem do OpenSearch
+RERANK_MAX_MS = float(os.environ.get('RERANK_MAX_MS', '50'))
+
+# Tamanho do radical (prefixo) usado como aproximação de stemming em português
+STEM_LENGTH = 5
+
+# Pesos de cada sinal na pontuação final (soma 1)
+DEFAULT_WEIGHTS = {'bm25': 0.45, 'coverage': 0.2, 'trigram': 0.2, 'bigram': 0.1, 'prior': 0.05}
+
+STOPWORDS = {
+    'a', 'o', 'as', 'os', 'de', 'da', 'do', 'das', 'dos', 'e', 'em', 'no', 'na', 'nos', 'nas',
+    'um', 'uma', 'para', 'por', 'com', 'que', 'se', 'como', 'qual', 'eu', 'meu', 'minha',
+    'ao', 'aos', 'ou', 'mais', 'esta', 'isso', 'pode', 'posso', 'ser',
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+RerankResult = namedtuple('RerankResult', ['passages', 'elapsed_ms', 'complete'])
+
+
+def _normalize(text):
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def stems(text):
+    """Radicais dos termos relevantes, na ordem em que aparecem no texto."""
+    return [
+        term[:STEM_LENGTH]
+        for term in re.findall(r'[a-z0-9]+', _normalize(text))
+        if term not in STOPWORDS and (len(term) > 1 or term.isdigit())
+    ]
+
+
+def trigrams(text):
+    text = f" {' '.join(re.findall(r'[a-z0-9]+', _normalize(text)))} "
+    return Counter(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def _cosine(first, second, first_norm):
+    if not first or not second:
+        return 0.0
+    dot = sum(count * second.get(gram, 0) for gram, count in first.items())
+    second_norm = math.sqrt(sum(count * count for count in second.values()))
+    return dot / (first_norm * second_norm) if dot else 0.0
+
+
+class Reranker:
+    """Reordena passagens ({'content': ..., ...}) pela relevância para a pergunta."""
+
+    def __init__(self, top_n=RERANK_TOP_N, max_ms=RERANK_MAX_MS, weights=None, clock=time.perf_counter):
+        self.top_n = top_n
+        self.max_ms = max_ms
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self._clock = clock
+
+    def rerank(self, query, passages, top_n=None, max_ms=None):
+        """
+        Retorna RerankResult com as `top_n` melhores passagens (cópias com 'rerank_score'),
+        o tempo gasto e se a reordenação foi concluída dentro de `max_ms`.
+        """
+        top_n = top_n or self.top_n
+        max_ms = self.max_ms if max_ms is None else max_ms
+        started = self._clock()
+        deadline = started + max_ms / 1000.0
+
+        query_stems = list(dict.fromkeys(stems(query)))
+        if not passages or not query_stems:
+            return RerankResult(list(passages[:top_n]), 0.0, True)
+        query_bigrams = set(zip(query_stems, query_stems[1:]))
+        query_trigrams = trigrams(query)
+        query_trigram_norm = math.sqrt(sum(count * count for count in query_trigrams.values()))
+
+        # Etapa 1: atributos de cada passagem (a parte proporcional ao tamanho do lote)
+        features = []
+        for passage in passages:
+            if self._clock() > deadline:
+                elapsed_ms = (self._clock() - started) * 1000.0
+                return RerankResult(list(passages[:top_n]), elapsed_ms, False)
+            passage_stems = stems(passage['content'])
+            features.append((
+                Counter(passage_stems),
+                len(passage_stems),
+                set(zip(passage_stems, passage_stems[1:])),
+                _cosine(query_trigrams, trigrams(passage['content']), query_trigram_norm),
+            ))
+
+        # Etapa 2: estatísticas do lote (IDF e tamanho médio) e pontuação combinada
+        total = len(features)
+        average_length = sum(length for _, length, _, _ in features) / total or 1.0
+        idf = {}
+        for stem in query_stems:
+            df = sum(1 for counts, _, _, _ in features if stem in counts)
+            idf[stem] = math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+        bm25_scores = []
+        for counts, length, _, _ in features:
+            score = 0.0
+            for stem in query_stems:
+                tf = counts.get(stem, 0)
+                if tf:
+                    score += idf[stem] * tf * (BM25_K1 + 1) / (
+                        tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                    )
+            bm25_scores.append(score)
+        max_bm25 = max(bm25_scores) or 1.0
+
+        weights = self.weights
+        scored = []
+        for position, (passage, (counts, _, passage_bigrams, trigram_similarity), bm25) in enumerate(
+            zip(passages, features, bm25_scores)
+        ):
+            coverage = sum(1 for stem in query_stems if stem in counts) / len(query_stems)
+            bigram = len(query_bigrams & passage_bigrams) / len(query_bigrams) if query_bigrams else 0.0
+            score = (
+                weights['bm25'] * bm25 / max_bm25
+                + weights['coverage'] * coverage
+                + weights['trigram'] * trigram_similarity
+                + weights['bigram'] * bigram
+                + weights['prior'] / (position + 1)
+            )
+            scored.append((score, position, passage))
+
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        ranked = [dict(passage, rerank_score=round(score, 4)) for score, _, passage in scored[:top_n]]
+        return RerankResult(ranked, (self._clock() - started) * 1000.0, True)
+
+
+_default_reranker = None
+
+
+def get_default_reranker():
+    """Reranker compartilhado do processo (configurado pelas variáveis RERANK_*)."""
+    global _default_reranker
+    if _default_reranker is None:
+        _default_reranker = Reranker()
+    return _default_reranker
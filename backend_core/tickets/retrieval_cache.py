@@ -0,0 +1,167 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# --- Cache de Recuperação (resultados do OpenSearch) ---
+# Para uma mesma pergunta normalizada, a busca devolve os mesmos documentos até
+# a base de conhecimento mudar. A chave inclui o índice e a sua "geração"
+# (nome do índice concreto por trás do alias + _meta.generation do mapeamento),
+# de modo que uma reindexação ou um bump de geração invalida todas as entradas.
+# A memória é limitada em número de entradas, bytes totais e bytes por entrada.
+# Mantenha sincronizado com lambda_functions/retrieval_cache.py.
+
+RETRIEVAL_CACHE_ENABLED = os.environ.get('RETRIEVAL_CACHE_ENABLED', 'True') == 'True'
+RETRIEVAL_CACHE_MAX_ENTRIES = int(os.environ.get('RETRIEVAL_CACHE_MAX_ENTRIES', '1024'))
+RETRIEVAL_CACHE_MAX_BYTES = int(os.environ.get('RETRIEVAL_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+RETRIEVAL_CACHE_MAX_ENTRY_BYTES = int(os.environ.get('RETRIEVAL_CACHE_MAX_ENTRY_BYTES', str(64 * 1024)))
+RETRIEVAL_CACHE_TTL_SECONDS = float(os.environ.get('RETRIEVAL_CACHE_TTL_SECONDS', '3600'))
+# Intervalo (s) entre consultas da geração do índice; 0 consulta a cada busca
+INDEX_GENERATION_TTL_SECONDS = float(os.environ.get('INDEX_GENERATION_TTL_SECONDS', '10'))
+
+# Custo fixo estimado (bytes) de cada entrada e de cada documento, além do texto
+_ENTRY_OVERHEAD = 200
+_DOCUMENT_OVERHEAD = 100
+
+
+def normalize_query(query):
+    """Minúsculas, sem acentos, sem pontuação e com espaços colapsados."""
+    text = unicodedata.normalize('NFKD', str(query or '')).encode('ascii', 'ignore').decode('ascii')
+    text = re.sub(r'[^\w\s]', ' ', text.lower())
+    return ' '.join(text.split())
+
+
+def documents_size(documents):
+    """Tamanho estimado (bytes) de uma lista de documentos {'id', 'content', ...}."""
+    return _ENTRY_OVERHEAD + sum(
+        _DOCUMENT_OVERHEAD + len(str(doc.get('id', ''))) + len(doc.get('content', '').encode('utf-8'))
+        for doc in documents
+    )
+
+
+def fetch_index_generation(client, index, timeout=None):
+    """
+    Geração atual do índice (ou alias): índices concretos com o _meta.generation de cada um.
+    Muda quando o alias passa a apontar para um novo índice ou quando a ingestão
+    incrementa _meta.generation (ver comando bump_index_generation do Backend).
+    """
+    kwargs = {'request_timeout': timeout} if timeout else {}
+    mappings = client.indices.get_mapping(index=index, **kwargs)
+    return '|'.join(
+        f"{name}:{body.get('mappings', {}).get('_meta', {}).get('generation', 0)}"
+        for name, body in sorted(mappings.items())
+    )
+
+
+class IndexGenerationTracker:
+    """
+    Mantém a geração do índice consultada no máximo a cada `ttl_seconds`. A consulta
+    roda fora do lock e uma só thread a executa por vez (single-flight): as demais
+    seguem com a geração anterior em vez de esperar pelo OpenSearch.
+    """
+
+    def __init__(self, ttl_seconds=INDEX_GENERATION_TTL_SECONDS, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._generation = None
+        self._checked_at = None
+        self._fetching = False
+        self._lock = threading.Lock()
+
+    def current(self, fetch):
+        """
+        Retorna a geração, chamando `fetch()` quando a leitura anterior expirou.
+        Se a consulta falhar (ou se a primeira consulta ainda estiver em andamento
+        em outra thread) retorna None: o chamador deve ignorar o cache.
+        """
+        with self._lock:
+            now = self._clock()
+            fresh = self._checked_at is not None and now - self._checked_at < self.ttl_seconds
+            if fresh or self._fetching:
+                return self._generation
+            self._fetching = True
+
+        try:
+            generation = fetch()
+        except Exception:
+            generation = None
+        with self._lock:
+            self._generation = generation
+            self._checked_at = now
+            self._fetching = False
+        return generation
+
+
+class RetrievalCache:
+    """Cache LRU de documentos recuperados, limitado em entradas e bytes, seguro entre threads."""
+
+    def __init__(self, max_entries=RETRIEVAL_CACHE_MAX_ENTRIES, max_bytes=RETRIEVAL_CACHE_MAX_BYTES,
+                 max_entry_bytes=RETRIEVAL_CACHE_MAX_ENTRY_BYTES, ttl_seconds=RETRIEVAL_CACHE_TTL_SECONDS,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'oversize': 0}
+
+    @staticmethod
+    def key(query, index, generation, variant=()):
+        """`variant` distingue parâmetros da busca (tamanho, tipo de consulta, rerank...)."""
+        return (normalize_query(query), index, generation, tuple(variant))
+
+    def get(self, key):
+        """Retorna os documentos armazenados ou None (ausente/expirado)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[2] > self.ttl_seconds:
+                self._discard(key)
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[0]
+
+    def set(self, key, documents):
+        """Armazena o resultado; entradas acima de max_entry_bytes não são guardadas."""
+        size = documents_size(documents)
+        with self._lock:
+            if size > self.max_entry_bytes:
+                self._stats['oversize'] += 1
+                return False
+            self._discard(key)
+            self._entries[key] = (list(documents), size, self._clock())
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self._stats['evictions'] += 1
+            return True
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Contadores do cache e taxa de acerto (hits / consultas)."""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries), bytes=self._bytes)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def __len__(self):
+        return len(self._entries)
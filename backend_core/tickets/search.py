@@ -0,0 +1,93 @@
+import logging
+import re
+
+from django.db import connection
+
+from .models import Ticket
+
+logger = logging.getLogger(__name__)
+
+# --- Busca de Texto Completo em Chamados ---
+# Consulta o índice criado pela migração 0004 (tsvector + GIN no PostgreSQL,
+# FTS5 no SQLite) com SQL direto e devolve os IDs ranqueados por relevância.
+# Os tickets são carregados em uma única consulta por chave primária.
+
+SEARCH_MAX_TERMS = 12
+
+
+def query_terms(text):
+    """Termos da busca (palavras alfanuméricas), limitados a SEARCH_MAX_TERMS."""
+    return re.findall(r'\w+', text.lower())[:SEARCH_MAX_TERMS]
+
+
+def _fts5_query(terms):
+    # Cada termo entre aspas vira um literal (sem operadores FTS5 vindos do usuário);
+    # o sufixo * no último termo permite busca por prefixo enquanto o usuário digita
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def _postgres_search(terms, limit, offset):
+    query = ' '.join(terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM tickets_ticket "
+            "WHERE search_vector @@ plainto_tsquery('portuguese', %s)",
+            [query],
+        )
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            "SELECT id, ts_rank_cd(search_vector, q) AS rank "
+            "FROM tickets_ticket, plainto_tsquery('portuguese', %s) AS q "
+            "WHERE search_vector @@ q ORDER BY rank DESC, id DESC LIMIT %s OFFSET %s",
+            [query, limit, offset],
+        )
+        return total, cursor.fetchall()
+
+
+def _sqlite_search(terms, limit, offset):
+    query = _fts5_query(terms)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM tickets_ticket_fts WHERE tickets_ticket_fts MATCH %s", [query])
+        total = cursor.fetchone()[0]
+        # bm25 retorna valores menores para documentos mais relevantes
+        cursor.execute(
+            "SELECT rowid, -bm25(tickets_ticket_fts) AS rank FROM tickets_ticket_fts "
+            "WHERE tickets_ticket_fts MATCH %s ORDER BY bm25(tickets_ticket_fts), rowid DESC LIMIT %s OFFSET %s",
+            [query, limit, offset],
+        )
+        return total, cursor.fetchall()
+
+
+def _scan_search(terms, limit, offset):
+    # Bancos sem índice de texto: varredura com LIKE (apenas para desenvolvimento)
+    logger.warning(f"Busca de chamados sem índice de texto completo no banco '{connection.vendor}'.")
+    queryset = Ticket.objects.all()
+    for term in terms:
+        queryset = queryset.filter(problem_description__icontains=term)
+    total = queryset.count()
+    ids = queryset.order_by('-id').values_list('id', flat=True)[offset:offset + limit]
+    return total, [(ticket_id, None) for ticket_id in ids]
+
+
+SEARCH_BACKENDS = {
+    'postgresql': _postgres_search,
+    'sqlite': _sqlite_search,
+}
+
+
+def search_tickets(text, limit=20, offset=0):
+    """
+    Busca chamados pelas palavras da descrição do problema.
+    Retorna (total, [(ticket, rank), ...]) em ordem de relevância.
+    """
+    terms = query_terms(text)
+    if not terms:
+        return 0, []
+
+    backend = SEARCH_BACKENDS.get(connection.vendor, _scan_search)
+    total, rows = backend(terms, limit, offset)
+
+    tickets = Ticket.objects.in_bulk([ticket_id for ticket_id, _ in rows])
+    return total, [(tickets[ticket_id], rank) for ticket_id, rank in rows if ticket_id in tickets]
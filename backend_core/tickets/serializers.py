@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Ticket, Budget
+from .models import Ticket, Budget, TicketArchive, ChatTranscript
 
 # Serializer para o modelo Ticket
 # Converte instâncias do modelo Ticket para JSON e valida dados de entrada
@@ -10,6 +10,18 @@ class TicketSerializer(serializers.ModelSerializer):
         # Inclui todos os campos do modelo na serialização
         fields = '__all__'
 
+# Serializer somente leitura dos chamados arquivados (mesmos campos do Ticket)
+class TicketArchiveSerializer(serializers.ModelSerializer):
+    parent = serializers.IntegerField(source='parent_id', read_only=True)
+    archived = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TicketArchive
+        exclude = ['parent_id']
+
+    def get_archived(self, obj):
+        return True
+
 # Serializer para o modelo Budget
 # Converte instâncias do modelo Budget para JSON e valida dados de entrada
 class BudgetSerializer(serializers.ModelSerializer):
@@ -18,3 +30,9 @@ class BudgetSerializer(serializers.ModelSerializer):
         model = Budget
         # Inclui todos os campos do modelo na serialização
         fields = '__all__'
+
+# Serializer das transcrições enviadas em lote pelo Webhook (POST /api/transcripts/)
+class ChatTranscriptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChatTranscript
+        fields = '__all__'
@@ -0,0 +1,56 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import events, stats
+from .models import Budget, Ticket
+
+# Mantém as tabelas de estatísticas (tickets/stats.py) e o feed de eventos
+# (tickets/events.py) a cada gravação pelo ORM. O estado anterior é lido no
+# pre_save para descontar o status/valor antigo e detectar mudanças de status.
+
+
+@receiver(pre_save, sender=Ticket)
+def remember_ticket_state(sender, instance, **kwargs):
+    if instance.pk and (settings.TICKET_EVENTS_ENABLED or not stats.rollups_suspended()):
+        instance._stats_previous = Ticket.objects.filter(pk=instance.pk).values_list('status', 'created_at').first()
+
+
+@receiver(post_save, sender=Ticket)
+def update_ticket_stats(sender, instance, created, raw=False, **kwargs):
+    if raw or stats.rollups_suspended():
+        return
+    stats.ticket_saved(instance, None if created else getattr(instance, '_stats_previous', None))
+
+
+@receiver(post_save, sender=Ticket)
+def publish_ticket_event(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = None if created else getattr(instance, '_stats_previous', None)
+    events.ticket_saved(instance, previous[0] if previous else None, created=created)
+
+
+@receiver(post_delete, sender=Ticket)
+def discount_ticket_stats(sender, instance, **kwargs):
+    if not stats.rollups_suspended():
+        stats.ticket_deleted(instance)
+
+
+@receiver(pre_save, sender=Budget)
+def remember_budget_state(sender, instance, **kwargs):
+    if instance.pk and not stats.rollups_suspended():
+        instance._stats_previous = Budget.objects.filter(pk=instance.pk).values_list('service_type', 'total_value').first()
+
+
+@receiver(post_save, sender=Budget)
+def update_budget_stats(sender, instance, created, raw=False, **kwargs):
+    if raw or stats.rollups_suspended():
+        return
+    stats.budget_saved(instance, None if created else getattr(instance, '_stats_previous', None))
+
+
+@receiver(post_delete, sender=Budget)
+def discount_budget_stats(sender, instance, **kwargs):
+    if not stats.rollups_suspended():
+        stats.budget_deleted(instance)
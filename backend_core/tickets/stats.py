@@ -0,0 +1,187 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Budget, BudgetServiceStat, Ticket, TicketArchive, TicketDailyStat
+
+# --- Estatísticas Incrementais de Chamados e Orçamentos ---
+# Cada gravação ajusta as tabelas de rollup com incrementos atômicos (F()),
+# de modo que o painel lê poucas linhas já agregadas em vez de executar
+# COUNT/SUM sobre as tabelas inteiras. Gravações em lote que não disparam
+# signals (bulk_create/update) devem chamar as funções record_* ou ser
+# seguidas de reconcile(). Chamados arquivados (TicketArchive) continuam contados.
+
+_state = threading.local()
+
+
+@contextmanager
+def suspend_rollups():
+    """
+    Desliga a atualização incremental na thread atual (ex: cargas em massa).
+    Execute reconcile() ao final para recalcular as tabelas.
+    """
+    previous = getattr(_state, 'suspended', False)
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def rollups_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+def _bump(model, lookup, **deltas):
+    """Soma `deltas` à linha de rollup identificada por `lookup` (criando-a se necessário)."""
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if not model.objects.filter(**lookup).update(**updates):
+        model.objects.get_or_create(**lookup)
+        model.objects.filter(**lookup).update(**updates)
+
+
+def _ticket_day(created_at):
+    return timezone.localdate(created_at)
+
+
+# --- Atualização incremental (chamada pelos signals) ---
+
+def ticket_saved(ticket, previous=None):
+    """`previous` é (status, created_at) antes da gravação, ou None para chamados novos."""
+    day = _ticket_day(ticket.created_at)
+    if previous is not None:
+        old_status, old_created_at = previous
+        if old_status == ticket.status:
+            return
+        _bump(TicketDailyStat, {'day': _ticket_day(old_created_at), 'status': old_status}, count=-1)
+    _bump(TicketDailyStat, {'day': day, 'status': ticket.status}, count=1)
+
+
+def ticket_deleted(ticket):
+    _bump(TicketDailyStat, {'day': _ticket_day(ticket.created_at), 'status': ticket.status}, count=-1)
+
+
+def budget_saved(budget, previous=None):
+    """`previous` é (service_type, total_value) antes da gravação, ou None para orçamentos novos."""
+    if previous is not None:
+        old_service_type, old_value = previous
+        if old_service_type == budget.service_type and old_value == budget.total_value:
+            return
+        _bump(BudgetServiceStat, {'service_type': old_service_type}, count=-1, total_value=-old_value)
+    _bump(BudgetServiceStat, {'service_type': budget.service_type}, count=1, total_value=Decimal(budget.total_value))
+
+
+def budget_deleted(budget):
+    _bump(BudgetServiceStat, {'service_type': budget.service_type}, count=-1, total_value=-budget.total_value)
+
+
+def record_tickets_created(tickets):
+    """Contabiliza chamados inseridos com bulk_create (que não dispara signals)."""
+    counter = Counter((_ticket_day(ticket.created_at), ticket.status) for ticket in tickets)
+    for (day, status), count in counter.items():
+        _bump(TicketDailyStat, {'day': day, 'status': status}, count=count)
+
+
+# --- Leitura ---
+
+def read_stats(days=30):
+    """Estatísticas a partir das tabelas de rollup (custo independente do volume de dados)."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    by_status = dict(
+        TicketDailyStat.objects.values_list('status').annotate(total=Sum('count')).values_list('status', 'total')
+    )
+    by_day = list(
+        TicketDailyStat.objects.filter(day__gte=since, count__gt=0)
+        .order_by('day', 'status').values('day', 'status', 'count')
+    )
+    by_service = list(
+        BudgetServiceStat.objects.filter(count__gt=0)
+        .order_by('-total_value').values('service_type', 'count', 'total_value')
+    )
+    return _format(by_status, by_day, by_service)
+
+
+def _ticket_counts_by_day():
+    """{(dia, status): quantidade} dos chamados ativos e arquivados."""
+    counts = Counter()
+    for model in (Ticket, TicketArchive):
+        rows = model.objects.annotate(day=TruncDate('created_at')).values('day', 'status').annotate(count=Count('id'))
+        for row in rows:
+            counts[(row['day'], row['status'])] += row['count']
+    return counts
+
+
+def live_stats(days=30):
+    """Mesmas estatísticas calculadas direto das tabelas principais (usado em benchmark/reconciliação)."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    counts = _ticket_counts_by_day()
+    by_status = Counter()
+    for (_, status), count in counts.items():
+        by_status[status] += count
+    by_day = [
+        {'day': day, 'status': status, 'count': count}
+        for (day, status), count in sorted(counts.items()) if day >= since
+    ]
+    by_service = list(
+        Budget.objects.values('service_type')
+        .annotate(count=Count('id'), total_value=Sum('total_value')).order_by('-total_value')
+    )
+    return _format(by_status, by_day, by_service)
+
+
+def _format(by_status, by_day, by_service):
+    return {
+        'tickets': {
+            'by_status': {status: by_status.get(status, 0) for status, _ in Ticket.STATUS_CHOICES},
+            'by_day': [{**row, 'day': row['day'].isoformat()} for row in by_day],
+        },
+        'budgets': {
+            'by_service_type': [{**row, 'total_value': str(row['total_value'])} for row in by_service],
+        },
+    }
+
+
+# --- Reconciliação ---
+
+@transaction.atomic
+def reconcile():
+    """
+    Recalcula as tabelas de rollup a partir dos dados. Corrige divergências causadas
+    por gravações em lote ou por alterações feitas fora do ORM.
+    Retorna o número de linhas de rollup que estavam divergentes.
+    """
+    # Trava as linhas de rollup antes de contar: incrementos dos signals confirmados
+    # entre a contagem e a regravação seriam sobrescritos
+    current_tickets = {(s.day, s.status): s.count for s in TicketDailyStat.objects.select_for_update()}
+    current_budgets = {
+        s.service_type: (s.count, s.total_value) for s in BudgetServiceStat.objects.select_for_update()
+    }
+
+    ticket_rows = dict(_ticket_counts_by_day())
+    budget_rows = {
+        row['service_type']: (row['count'], row['total_value'])
+        for row in Budget.objects.values('service_type').annotate(count=Count('id'), total_value=Sum('total_value'))
+    }
+    drift = sum(1 for key in current_tickets.keys() | ticket_rows.keys()
+                if current_tickets.get(key, 0) != ticket_rows.get(key, 0))
+    drift += sum(1 for key in current_budgets.keys() | budget_rows.keys()
+                 if current_budgets.get(key, (0, 0)) != budget_rows.get(key, (0, 0)))
+
+    if drift:
+        TicketDailyStat.objects.all().delete()
+        TicketDailyStat.objects.bulk_create(
+            TicketDailyStat(day=day, status=status, count=count) for (day, status), count in ticket_rows.items()
+        )
+        BudgetServiceStat.objects.all().delete()
+        BudgetServiceStat.objects.bulk_create(
+            BudgetServiceStat(service_type=service_type, count=count, total_value=total)
+            for service_type, (count, total) in budget_rows.items()
+        )
+    return drift
@@ -0,0 +1,128 @@
+import logging
+import math
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .admission import AdmissionController, MemoryBucketStore
+
+logger = logging.getLogger(__name__)
+
+# --- Integração do Controle de Admissão com a API de Chat ---
+# Os baldes ficam em memória do processo ('memory') ou no cache do Django
+# ('cache'), compartilhado entre workers quando o CACHE_BACKEND for compartilhado
+# (arquivo, banco, Redis...). Com 'memory' cada worker tem o próprio balde global:
+# a cota efetiva é CHAT_GLOBAL_RATE x WEB_CONCURRENCY. A fila de espera é sempre
+# local ao processo.
+
+
+class CacheBucketStore:
+    """Baldes no cache do Django; a atualização de cada balde é protegida por um lock (cache.add)."""
+
+    LOCK_TIMEOUT = 2
+    LOCK_ATTEMPTS = 50
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    def _cache(self):
+        return caches[self.alias]
+
+    @contextmanager
+    def _locked(self, cache, key):
+        """Lock do balde `key`; produz False se não for obtido a tempo."""
+        lock_key = f"admission-lock:{key}"
+        for _ in range(self.LOCK_ATTEMPTS):
+            if cache.add(lock_key, 1, self.LOCK_TIMEOUT):
+                break
+            time.sleep(0.002)
+        else:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            cache.delete(lock_key)
+
+    @staticmethod
+    def _save(cache, state_key, tokens, now, rate, burst):
+        # Expira quando o balde estaria cheio novamente (equivale a ausente)
+        timeout = math.ceil((burst - tokens) / rate) + 1 if rate > 0 else None
+        cache.set(state_key, (tokens, now), timeout)
+
+    def take(self, key, rate, burst, now, cost=1.0):
+        cache = self._cache()
+        state_key = f"admission:{key}"
+        # O relógio monotônico é por processo: o estado compartilhado usa o horário de parede
+        now = time.time()
+        with self._locked(cache, key) as locked:
+            if not locked:
+                # Lock indisponível (cache lento ou travado): não bloqueia a requisição
+                logger.warning(f"Lock do balde {key} indisponível; admitindo sem consumir ficha.")
+                return 0.0
+            tokens, updated_at = cache.get(state_key) or (burst, now)
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            taken = tokens >= cost
+            if taken:
+                tokens -= cost
+            self._save(cache, state_key, tokens, now, rate, burst)
+        if taken:
+            return 0.0
+        return (cost - tokens) / rate if rate > 0 else float('inf')
+
+    def refund(self, key, rate, burst, now, amount=1.0):
+        cache = self._cache()
+        state_key = f"admission:{key}"
+        now = time.time()
+        with self._locked(cache, key) as locked:
+            state = cache.get(state_key)
+            # Sem lock a ficha não é devolvida; balde ausente equivale a cheio
+            if not locked or state is None:
+                return
+            tokens = min(burst, state[0] + (now - state[1]) * rate + amount)
+            self._save(cache, state_key, tokens, now, rate, burst)
+
+
+_controller = None
+
+
+def get_admission_controller():
+    """Controlador do processo, criado a partir das configurações CHAT_ADMISSION_*."""
+    global _controller
+    if _controller is None:
+        if settings.CHAT_ADMISSION_STORE == 'cache':
+            store = CacheBucketStore(settings.CHAT_ADMISSION_CACHE_ALIAS)
+        else:
+            store = MemoryBucketStore()
+        _controller = AdmissionController(
+            classes=settings.CHAT_ADMISSION_CLASSES,
+            global_rate=settings.CHAT_GLOBAL_RATE,
+            global_burst=settings.CHAT_GLOBAL_BURST,
+            queue_size=settings.CHAT_ADMISSION_QUEUE_SIZE,
+            max_wait=settings.CHAT_ADMISSION_MAX_WAIT,
+            store=store,
+        )
+    return _controller
+
+
+def client_identity(request):
+    """
+    Retorna (chave, classe) do cliente: agentes autenticados pelo id do usuário,
+    chat anônimo pelo IP. Atrás de um balanceador vale a última entrada de
+    CHAT_CLIENT_IP_HEADER, acrescentada pelo próprio balanceador: as anteriores
+    vêm do cliente e podem ser forjadas para escapar do limite por IP.
+    """
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f"user-{user.pk}", 'agent'
+    address = ''
+    if settings.CHAT_CLIENT_IP_HEADER:
+        address = request.META.get(settings.CHAT_CLIENT_IP_HEADER, '').split(',')[-1].strip()
+    return address or request.META.get('REMOTE_ADDR', 'desconhecido'), 'anonymous'
+
+
+def retry_after_header(seconds):
+    """Valor do cabeçalho Retry-After (segundos inteiros, no mínimo 1)."""
+    return str(max(1, math.ceil(seconds)))
@@ -0,0 +1,109 @@
+import json
+import logging
+import sqlite3
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# --- Consumidor da Fila de Chamados ---
+# Lê as solicitações gravadas pelo Webhook (lambda_functions/ticket_queue.py).
+# O schema SQLite deve permanecer idêntico ao do produtor.
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticket_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reference TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL
+)
+"""
+
+# Mensagens reservadas há mais tempo que isso voltam a ficar visíveis
+# (consumidor interrompido antes de confirmar o lote)
+CLAIM_TIMEOUT_SECONDS = 300
+
+
+class SQSTicketQueueReader:
+    """Consumidor da fila Amazon SQS (até 10 mensagens por chamada, limite da API)."""
+
+    def __init__(self, queue_url, wait_seconds=10, client=None):
+        self.queue_url = queue_url
+        self.wait_seconds = wait_seconds
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('sqs')
+        return self._client
+
+    def receive(self, max_messages):
+        """Retorna uma lista de (recibo, payload) com até `max_messages` itens."""
+        messages = []
+        while len(messages) < max_messages:
+            response = self.client.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=min(10, max_messages - len(messages)),
+                # Long polling apenas na primeira leitura do lote
+                WaitTimeSeconds=0 if messages else self.wait_seconds,
+            )
+            batch = response.get('Messages', [])
+            if not batch:
+                break
+            messages.extend((msg['ReceiptHandle'], json.loads(msg['Body'])) for msg in batch)
+        return messages
+
+    def ack(self, receipts):
+        """Remove da fila as mensagens já persistidas."""
+        for start in range(0, len(receipts), 10):
+            entries = [
+                {'Id': str(index), 'ReceiptHandle': receipt}
+                for index, receipt in enumerate(receipts[start:start + 10])
+            ]
+            self.client.delete_message_batch(QueueUrl=self.queue_url, Entries=entries)
+
+
+class SQLiteTicketQueueReader:
+    """Consumidor do substituto local da fila (arquivo SQLite compartilhado com o Webhook)."""
+
+    def __init__(self, path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(SQLITE_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def receive(self, max_messages):
+        """
+        Reserva até `max_messages` mensagens livres e retorna (recibo, payload).
+        A leitura e a reserva ocorrem na mesma transação de escrita (BEGIN IMMEDIATE):
+        consumidores concorrentes nunca recebem a mesma mensagem.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            rows = conn.execute(
+                'SELECT id, payload FROM ticket_queue '
+                'WHERE claimed_at IS NULL OR claimed_at < ? ORDER BY id LIMIT ?',
+                (now - CLAIM_TIMEOUT_SECONDS, max_messages),
+            ).fetchall()
+            if rows:
+                conn.executemany('UPDATE ticket_queue SET claimed_at = ? WHERE id = ?', [(now, row[0]) for row in rows])
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def ack(self, receipts):
+        with self._connect() as conn:
+            conn.executemany('DELETE FROM ticket_queue WHERE id = ?', [(receipt,) for receipt in receipts])
+
+
+def get_ticket_queue_reader():
+    """Instancia o consumidor conforme settings (SQS tem prioridade sobre SQLite)."""
+    if settings.TICKET_QUEUE_URL:
+        return SQSTicketQueueReader(settings.TICKET_QUEUE_URL)
+    return SQLiteTicketQueueReader(settings.TICKET_QUEUE_PATH)
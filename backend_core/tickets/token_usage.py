@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import threading
+from collections import defaultdict, deque
+
+from .bedrock_messages import USAGE_METRICS, estimate_tokens
+
+# --- Contabilidade de Tokens e Custo do Bedrock ---
+# Cada invocação registra o uso de tokens devolvido pela Messages API (ou, se a
+# resposta não o trouxer, uma estimativa pelo tamanho do texto) e o custo
+# correspondente. Os totais são agregados no processo por intenção, cliente e
+# modelo. Um alerta é registrado quando o prompt de uma requisição passa do
+# limite absoluto ou quando a média de uma janela de requisições da intenção
+# cresce além de TOKEN_ALERT_REGRESSION_RATIO vezes a linha de base.
+# Mantenha sincronizado com lambda_functions/token_usage.py.
+logger = logging.getLogger(__name__)
+
+# Preço (USD por milhão de tokens de entrada e de saída) por trecho do modelId.
+# BEDROCK_MODEL_PRICES (JSON {"trecho": [entrada, saída]}) substitui ou completa a tabela.
+DEFAULT_MODEL_PRICES = {
+    'claude-3-7-sonnet': (3.00, 15.00),
+    'claude-3-5-sonnet': (3.00, 15.00),
+    'claude-3-5-haiku': (0.80, 4.00),
+    'claude-3-haiku': (0.25, 1.25),
+}
+MODEL_PRICES = dict(DEFAULT_MODEL_PRICES, **{
+    fragment: tuple(prices) for fragment, prices in json.loads(os.environ.get('BEDROCK_MODEL_PRICES') or '{}').items()
+})
+# Leitura do cache de prompt custa uma fração da entrada; a gravação, um acréscimo
+CACHE_READ_PRICE_RATIO = 0.1
+CACHE_WRITE_PRICE_RATIO = 1.25
+
+# Alertas: prompt máximo por requisição (0 desliga) e regressão da média por intenção
+TOKEN_ALERT_MAX_PROMPT_TOKENS = int(os.environ.get('TOKEN_ALERT_MAX_PROMPT_TOKENS', '0'))
+TOKEN_ALERT_REGRESSION_RATIO = float(os.environ.get('TOKEN_ALERT_REGRESSION_RATIO', '1.5'))
+TOKEN_ALERT_WINDOW = int(os.environ.get('TOKEN_ALERT_WINDOW', '50'))
+# Máximo de chaves distintas por dimensão (clientes novos além disso somam em OTHER_KEY)
+TOKEN_ACCOUNTING_MAX_KEYS = int(os.environ.get('TOKEN_ACCOUNTING_MAX_KEYS', '200'))
+OTHER_KEY = '<outros>'
+
+DIMENSIONS = ('intent', 'client', 'model')
+
+
+def estimate_usage(body, answer):
+    """Uso estimado a partir do corpo da Messages API (system e mensagens) e da resposta."""
+    texts = [block.get('text', '') for block in body.get('system', [])]
+    for message in body.get('messages', []):
+        content = message.get('content', '')
+        texts.extend([content] if isinstance(content, str) else [block.get('text', '') for block in content])
+    return dict(
+        {name: 0 for name in USAGE_METRICS},
+        input_tokens=sum(estimate_tokens(text) for text in texts),
+        output_tokens=estimate_tokens(answer),
+    )
+
+
+def prompt_tokens(usage):
+    """Tokens do prompt, incluindo os lidos e gravados no cache de prompt."""
+    return usage['input_tokens'] + usage['cache_read_input_tokens'] + usage['cache_creation_input_tokens']
+
+
+def model_prices(model_id, prices=None):
+    """(entrada, saída) em USD por milhão de tokens do trecho mais específico do modelId, ou None."""
+    prices = MODEL_PRICES if prices is None else prices
+    matches = [fragment for fragment in prices if fragment in (model_id or '')]
+    return prices[max(matches, key=len)] if matches else None
+
+
+def request_cost(model_id, usage, prices=None):
+    """Custo (USD) da invocação, ou None se o modelo não tiver preço conhecido."""
+    model_price = model_prices(model_id, prices)
+    if model_price is None:
+        return None
+    input_price, output_price = model_price
+    return (
+        usage['input_tokens'] * input_price
+        + usage['cache_read_input_tokens'] * input_price * CACHE_READ_PRICE_RATIO
+        + usage['cache_creation_input_tokens'] * input_price * CACHE_WRITE_PRICE_RATIO
+        + usage['output_tokens'] * output_price
+    ) / 1_000_000
+
+
+def _empty_totals():
+    return dict({name: 0 for name in USAGE_METRICS}, requests=0, estimated=0, cost_usd=0.0, unpriced=0)
+
+
+class TokenAccountant:
+    """Totais de tokens e custo por intenção, cliente e modelo, com alertas de regressão."""
+
+    def __init__(self, max_prompt_tokens=TOKEN_ALERT_MAX_PROMPT_TOKENS, regression_ratio=TOKEN_ALERT_REGRESSION_RATIO,
+                 window=TOKEN_ALERT_WINDOW, max_keys=TOKEN_ACCOUNTING_MAX_KEYS, prices=None):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.regression_ratio = regression_ratio
+        self.window = window
+        self.max_keys = max_keys
+        self.prices = prices
+        self._totals = {'total': _empty_totals()}
+        self._by = {dimension: {} for dimension in DIMENSIONS}
+        self._windows = defaultdict(deque)
+        self._baselines = {}
+        self._alerts = 0
+        self._lock = threading.Lock()
+
+    def record(self, usage, model_id, intent='', client='', body=None, answer=''):
+        """
+        Contabiliza uma invocação. Sem uso informado pela API (todos os campos zerados)
+        e com `body`, o uso é estimado pelo tamanho do prompt e da resposta.
+
+        Returns:
+            dict: {'usage', 'estimated', 'prompt_tokens', 'cost_usd', 'alerts'}.
+        """
+        estimated = body is not None and not any(usage.get(name) for name in USAGE_METRICS)
+        usage = estimate_usage(body, answer) if estimated else {name: int(usage.get(name) or 0) for name in USAGE_METRICS}
+        cost = request_cost(model_id, usage, self.prices)
+        tokens = prompt_tokens(usage)
+        labels = {'intent': intent or 'desconhecida', 'client': client or 'desconhecido', 'model': model_id or ''}
+
+        with self._lock:
+            buckets = [self._totals['total']]
+            for dimension, key in labels.items():
+                keys = self._by[dimension]
+                if key not in keys and len(keys) >= self.max_keys:
+                    key = OTHER_KEY
+                buckets.append(keys.setdefault(key, _empty_totals()))
+            for bucket in buckets:
+                bucket['requests'] += 1
+                bucket['estimated'] += int(estimated)
+                for name in USAGE_METRICS:
+                    bucket[name] += usage[name]
+                if cost is None:
+                    bucket['unpriced'] += 1
+                else:
+                    bucket['cost_usd'] += cost
+            alerts = self._check_alerts(labels['intent'], tokens)
+            self._alerts += len(alerts)
+
+        for alert in alerts:
+            logger.warning(alert)
+        return {'usage': usage, 'estimated': estimated, 'prompt_tokens': tokens, 'cost_usd': cost, 'alerts': alerts}
+
+    def _check_alerts(self, intent, tokens):
+        alerts = []
+        if self.max_prompt_tokens and tokens > self.max_prompt_tokens:
+            alerts.append(f"Prompt de {tokens} tokens na intenção '{intent}' acima do limite de "
+                          f"{self.max_prompt_tokens}.")
+
+        # Média por janela fechada; a linha de base acompanha devagar as janelas seguintes
+        window = self._windows[intent]
+        window.append(tokens)
+        if len(window) < self.window:
+            return alerts
+        mean = sum(window) / len(window)
+        window.clear()
+        baseline = self._baselines.get(intent)
+        if baseline and self.regression_ratio and mean > baseline * self.regression_ratio:
+            alerts.append(f"Regressão de tokens na intenção '{intent}': média de {mean:.0f} tokens de prompt "
+                          f"por requisição contra linha de base de {baseline:.0f}.")
+        self._baselines[intent] = mean if baseline is None else 0.8 * baseline + 0.2 * mean
+        return alerts
+
+    def stats(self):
+        """Cópia dos totais (geral e por dimensão) com médias por requisição."""
+        def summarize(totals):
+            requests = totals['requests'] or 1
+            return dict(
+                totals,
+                cost_usd=round(totals['cost_usd'], 6),
+                prompt_tokens_per_request=round(prompt_tokens(totals) / requests, 1),
+                output_tokens_per_request=round(totals['output_tokens'] / requests, 1),
+            )
+
+        with self._lock:
+            return {
+                'total': summarize(self._totals['total']),
+                **{dimension: {key: summarize(totals) for key, totals in sorted(self._by[dimension].items())}
+                   for dimension in DIMENSIONS},
+                'baselines': {intent: round(value, 1) for intent, value in sorted(self._baselines.items())},
+                'alerts': self._alerts,
+            }
+
+
+# Instância padrão compartilhada por todo o processo
+_default_accountant = None
+_default_accountant_lock = threading.Lock()
+
+
+def get_default_accountant():
+    """Retorna o contador de tokens compartilhado do processo, criando-o na primeira chamada."""
+    global _default_accountant
+    if _default_accountant is None:
+        with _default_accountant_lock:
+            if _default_accountant is None:
+                _default_accountant = TokenAccountant()
+    return _default_accountant
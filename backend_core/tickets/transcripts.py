@@ -0,0 +1,57 @@
+import atexit
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from . import metrics
+from .bedrock_messages import USAGE_METRICS
+from .models import ChatTranscript
+from .transcript_writer import TRANSCRIPTS_ENABLED, BatchWriter
+
+# --- Transcrições do Chat ---
+# record_transcript apenas enfileira o registro no writer do processo
+# (ver transcript_writer.py); a thread de fundo grava os lotes com bulk_create.
+# No encerramento do processo (atexit) os registros pendentes são gravados.
+# O Webhook envia os seus lotes para POST /api/transcripts/.
+
+_writer = None
+
+
+def write_transcripts(records):
+    """Grava um lote de registros (dicionários com os campos de ChatTranscript)."""
+    try:
+        ChatTranscript.objects.bulk_create([ChatTranscript(**record) for record in records])
+    finally:
+        # A thread do writer não passa pelo ciclo de requisição que recicla conexões
+        close_old_connections()
+
+
+def get_transcript_writer():
+    """Writer do processo, criado no primeiro uso e encerrado (com flush) na saída do processo."""
+    global _writer
+    if _writer is None:
+        _writer = BatchWriter(write_transcripts)
+        atexit.register(_writer.close)
+    return _writer
+
+
+def record_transcript(source, query, answer='', outcome='generated', session_id='', doc_ids=None,
+                      timings=None, model_id='', usage=None):
+    """Enfileira a transcrição de uma pergunta; nunca bloqueia além de TRANSCRIPT_SUBMIT_TIMEOUT."""
+    if not TRANSCRIPTS_ENABLED:
+        return
+    record = {
+        'source': source,
+        'session_id': session_id or '',
+        'query': query,
+        'answer': answer or '',
+        'outcome': outcome,
+        'doc_ids': list(doc_ids or []),
+        'timings': dict(timings or {}),
+        'model_id': model_id or '',
+        'created_at': timezone.now(),
+    }
+    record.update({name: value for name, value in (usage or {}).items() if name in USAGE_METRICS})
+    if not get_transcript_writer().submit(record):
+        # Descartes também aparecem em get_transcript_writer().stats() (/api/metrics/)
+        metrics.increment('TranscriptDropped', Source=source)
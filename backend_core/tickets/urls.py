@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TicketViewSet, BudgetViewSet, ChatAPIView
+from .views import TicketViewSet, BudgetViewSet, ChatAPIView, StatsAPIView, MetricsAPIView, FaqAPIView, TranscriptAPIView
 
 # Cria um roteador padrão do Django REST Framework
 # O roteador gera automaticamente as URLs para os ViewSets registrados
@@ -19,4 +19,12 @@ urlpatterns = [
     path('', include(router.urls)),
     # Endpoint customizado para Chat
     path('chat/', ChatAPIView.as_view(), name='chat'),
+    # Estatísticas do painel (tabelas de rollup)
+    path('stats/', StatsAPIView.as_view(), name='stats'),
+    # Métricas em memória do worker (latência do rerank, etc.)
+    path('metrics/', MetricsAPIView.as_view(), name='metrics'),
+    # Respostas pré-geradas das perguntas frequentes (consultadas pelo Webhook)
+    path('faq/', FaqAPIView.as_view(), name='faq'),
+    # Transcrições do Webhook enviadas em lote
+    path('transcripts/', TranscriptAPIView.as_view(), name='transcripts'),
 ]
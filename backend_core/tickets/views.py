@@ -1,16 +1,40 @@
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .models import Ticket, Budget
-from .serializers import TicketSerializer, BudgetSerializer
-from .rag_service import process_chat_message
+from rest_framework.utils.urls import replace_query_param
+from .models import Ticket, Budget, FaqAnswer, ChatTranscript
+from .serializers import TicketSerializer, TicketArchiveSerializer, BudgetSerializer, ChatTranscriptSerializer
+from .rag_service import current_index_generation, faq_store, process_chat_message, retrieval_cache
+from .conversation_memory import is_valid_session_id
+from .pdf_renderer import get_budget_pdf_renderer
+from .search import search_tickets
+from .duplicates import get_duplicate_detector
+from .stats import read_stats
+from .archive import get_archived_ticket
+from .transcripts import get_transcript_writer
+from .token_usage import get_default_accountant
+from .exports import EXPORT_FORMATS, budget_rows, export_response, ticket_rows
+from .admission import AdmissionRejected
+from .throttling import client_identity, get_admission_controller, retry_after_header
+from . import metrics
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
 
 
 class ChatAPIView(APIView):
     """
     Endpoint para interação via Chat (RAG com Bedrock + OpenSearch).
-    Recebe: {"message": "texto da pergunta"}
-    Retorna: {"response": "resposta gerada"}
+    Recebe: {"message": "texto da pergunta", "session_id": "opcional"}
+    Retorna: {"response": "resposta gerada", "session_id": "id da sessão"}
+    Sem session_id uma nova sessão é criada; reenvie o id devolvido para manter o contexto.
+    Acima do limite do cliente ou com a fila de espera cheia retorna 429 com Retry-After.
     """
 
     def post(self, request):
@@ -18,12 +42,98 @@ class ChatAPIView(APIView):
         if not message:
             return Response({"error": "Mensagem é obrigatória"}, status=status.HTTP_400_BAD_REQUEST)
 
+        session_id = request.data.get('session_id')
+        if session_id and not is_valid_session_id(session_id):
+            return Response({"error": "session_id inválido"}, status=status.HTTP_400_BAD_REQUEST)
+        session_id = session_id or uuid.uuid4().hex
+
+        # Controle de admissão antes de qualquer chamada ao OpenSearch/Bedrock
+        client_key, client_class = client_identity(request)
+        if settings.CHAT_ADMISSION_ENABLED:
+            try:
+                waited = get_admission_controller().acquire(client_key, client_class)
+            except AdmissionRejected as e:
+                metrics.increment('ChatAdmission', Result='rejected', Reason=e.reason, Class=client_class)
+                return Response(
+                    {"error": "Muitas requisições. Tente novamente em instantes."},
+                    status=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={'Retry-After': retry_after_header(e.retry_after)},
+                )
+            metrics.increment('ChatAdmission', Result='admitted', Class=client_class)
+            metrics.timing('ChatAdmissionWait', waited * 1000.0, Class=client_class)
+
         try:
-            response_text = process_chat_message(message)
-            return Response({"response": response_text})
+            response_text = process_chat_message(message, session_id=session_id, client=client_key)
+            return Response({"response": response_text, "session_id": session_id})
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+class StatsAPIView(APIView):
+    """
+    Estatísticas do painel (somente leitura), lidas das tabelas de rollup.
+    Ex: GET /api/stats/?days=30
+    Retorna chamados por status e por dia/status e orçamentos por tipo de serviço.
+    """
+
+    def get(self, request):
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({"error": "days deve ser inteiro"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= days <= 366:
+            return Response({"error": "days deve estar entre 1 e 366"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(read_stats(days))
+
+class MetricsAPIView(APIView):
+    """
+    Métricas do processo que atende a requisição (contadores, percentis de latência
+    e estado do cache de recuperação). Cada worker mantém as próprias métricas em memória.
+    """
+
+    def get(self, request):
+        return Response({
+            **metrics.snapshot(),
+            'retrieval_cache': retrieval_cache.stats(),
+            'faq_store': faq_store.stats(),
+            'chat_admission': {'waiting': get_admission_controller().waiting()},
+            'transcript_writer': get_transcript_writer().stats(),
+            'token_usage': get_default_accountant().stats(),
+        })
+
+class FaqAPIView(APIView):
+    """
+    Respostas pré-geradas das perguntas frequentes (comando pregenerate_faq).
+    GET /api/faq/ lista as entradas (snapshot carregado pelo Webhook).
+    GET /api/faq/?q=pergunta retorna a entrada válida na geração atual do índice ou 404.
+    """
+
+    FIELDS = ('question', 'variants', 'answer', 'sources', 'query_count', 'index_generation', 'generated_at')
+
+    def get(self, request):
+        query = request.query_params.get('q')
+        if query is None:
+            return Response(list(FaqAnswer.objects.values(*self.FIELDS)))
+
+        entry = faq_store.lookup(query, current_index_generation())
+        if entry is None:
+            return Response({"error": "Sem resposta pré-gerada para a pergunta"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(entry)
+
+class TranscriptAPIView(APIView):
+    """
+    Recebe as transcrições do Webhook em lote (lista de registros, enviada pelo
+    writer em segundo plano do Lambda). Ex: POST /api/transcripts/ [{"source": "webhook", ...}]
+    Retorna: {"created": <quantidade>}
+    """
+
+    def post(self, request):
+        serializer = ChatTranscriptSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        created = ChatTranscript.objects.bulk_create(
+            [ChatTranscript(**record) for record in serializer.validated_data]
+        )
+        return Response({"created": len(created)}, status=status.HTTP_201_CREATED)
+
 # ViewSet para o modelo Ticket
 # Fornece automaticamente as operações CRUD (Create, Read, Update, Delete) via API
 
@@ -40,6 +150,96 @@ class TicketViewSet(viewsets.ModelViewSet):
     # Define a classe Serializer usada para converter os dados
     serializer_class = TicketSerializer
 
+    def get_queryset(self):
+        # Permite localizar um chamado criado pela fila a partir do protocolo provisório
+        # Ex: GET /api/tickets/?provisional_reference=PRV-1A2B3C4D5E
+        queryset = super().get_queryset()
+        reference = self.request.query_params.get('provisional_reference')
+        if reference:
+            queryset = queryset.filter(provisional_reference=reference)
+        return queryset
+
+    def retrieve(self, request, *args, **kwargs):
+        # Chamados encerrados antigos ficam em TicketArchive (ver tickets/archive.py):
+        # a consulta por id os encontra de forma transparente, somente para leitura
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            try:
+                archived = get_archived_ticket(int(kwargs[self.lookup_field]))
+            except (TypeError, ValueError):
+                archived = None
+            if archived is None:
+                raise
+            return Response(TicketArchiveSerializer(archived).data)
+
+    def perform_create(self, serializer):
+        # Quase duplicados de um incidente aberto são vinculados a ele (campo parent)
+        detector = get_duplicate_detector()
+        parent_id = None
+        if detector is not None and serializer.validated_data.get('parent') is None:
+            parent_id = detector.find_parent(serializer.validated_data['problem_description'])
+        ticket = serializer.save(parent_id=parent_id) if parent_id else serializer.save()
+        if detector is not None:
+            detector.register(ticket)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Busca de texto completo na descrição do problema, ordenada por relevância.
+        Ex: GET /api/tickets/search/?q=servidor+luz+vermelha&limit=20&offset=0
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "Parâmetro 'q' é obrigatório"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(int(request.query_params.get('limit', SEARCH_DEFAULT_LIMIT)), SEARCH_MAX_LIMIT)
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response({"error": "limit e offset devem ser inteiros"}, status=status.HTTP_400_BAD_REQUEST)
+        if limit < 1 or offset < 0:
+            return Response({"error": "limit deve ser positivo e offset não negativo"}, status=status.HTTP_400_BAD_REQUEST)
+
+        total, matches = search_tickets(query, limit=limit, offset=offset)
+
+        url = request.build_absolute_uri()
+        results = []
+        for ticket, rank in matches:
+            data = self.get_serializer(ticket).data
+            data['rank'] = rank
+            results.append(data)
+        return Response({
+            "count": total,
+            "next": replace_query_param(url, 'offset', offset + limit) if offset + limit < total else None,
+            "previous": replace_query_param(url, 'offset', max(offset - limit, 0)) if offset > 0 else None,
+            "results": results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exportação em streaming (memória constante), em ordem de id.
+        Ex: GET /api/tickets/export/?export_format=csv&since=2026-01-01&until=2026-01-31&status=RESOLVED,CLOSED
+        Filtros opcionais: since/until (created_at), status, customer (customer_id)
+        e include_archived=true (inclui os chamados arquivados, ver tickets/archive.py).
+        """
+        return _export(request, 'chamados', lambda params: ticket_rows(
+            params, include_archived=params.get('include_archived', '').lower() in ('1', 'true')
+        ))
+
+# Parâmetro do formato da exportação ('format' é reservado pelo DRF para escolher o renderer)
+EXPORT_FORMAT_PARAM = 'export_format'
+
+def _export(request, name, build_rows):
+    export_format = request.query_params.get(EXPORT_FORMAT_PARAM, 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": f"{EXPORT_FORMAT_PARAM} deve ser csv ou ndjson"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        header, rows = build_rows(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return export_response(request, name, header, rows, export_format)
+
 # ViewSet para o modelo Budget
 # Fornece automaticamente as operações CRUD para Orçamentos
 
@@ -48,9 +248,25 @@ class BudgetViewSet(viewsets.ModelViewSet):
     """
     Endpoint da API para gerenciamento de Orçamentos.
     Permite listar e criar orçamentos gerados pelo sistema.
+    A criação agenda a renderização do PDF da proposta (pdf_url preenchido depois).
     """
     # Define o conjunto de objetos (QuerySet) base
     queryset = Budget.objects.all().order_by('-created_at')
 
     # Define a classe Serializer usada
     serializer_class = BudgetSerializer
+
+    def perform_create(self, serializer):
+        budget = serializer.save()
+        # O PDF é gerado em segundo plano, após o commit, para não bloquear a resposta.
+        # O campo pdf_url é preenchido quando a renderização termina.
+        transaction.on_commit(lambda: get_budget_pdf_renderer().submit(budget.id))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Exportação em streaming (memória constante), em ordem de id.
+        Ex: GET /api/budgets/export/?export_format=ndjson&since=2026-01-01&customer=Cliente+X
+        Filtros opcionais: since/until (created_at) e customer (customer_name).
+        """
+        return _export(request, 'orcamentos', budget_rows)
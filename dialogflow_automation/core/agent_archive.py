@@ -0,0 +1,305 @@
+import io
+import json
+import uuid
+import zipfile
+from .logger import setup_logger
+
+# Inicializa o logger para este módulo
+logger = setup_logger("agent_archive")
+
+# Formato de exportação/importação de agentes do Dialogflow ES (ZIP):
+#   agent.json, package.json
+#   intents/<nome>.json e intents/<nome>_usersays_<idioma>.json
+#   entities/<nome>.json e entities/<nome>_entries_<idioma>.json
+# O ZIP é montado em memória a partir da mesma configuração usada pelo modo
+# 'sync' e enviado em uma única operação (restore_agent/import_agent).
+
+DEFAULT_LANGUAGE = "pt-br"
+DEFAULT_TIMEZONE = "America/Sao_Paulo"
+PACKAGE_VERSION = "1.0.0"
+
+# Namespace dos IDs determinísticos: a mesma configuração gera sempre o mesmo ZIP
+ID_NAMESPACE = uuid.UUID("6f1c2a0e-4b7d-4e0a-9c53-2f7a1d9e8b10")
+
+# Data fixa das entradas do ZIP (o conteúdo não depende do momento da geração)
+ZIP_DATE_TIME = (2020, 1, 1, 0, 0, 0)
+
+# Campos ignorados na comparação de snapshots (variam entre exportações do mesmo agente)
+VOLATILE_FIELDS = {"id", "lastUpdate", "updated"}
+
+
+def _stable_id(*parts):
+    """ID (UUID) derivado do nome do recurso, estável entre gerações do arquivo."""
+    return str(uuid.uuid5(ID_NAMESPACE, "/".join(parts)))
+
+
+def _agent_json(display_name, language, time_zone, webhook_url):
+    return {
+        "description": "",
+        "language": language,
+        "shortDescription": "",
+        "examples": "",
+        "linkToDocs": "",
+        "displayName": display_name,
+        "disableInteractionLogs": False,
+        "disableStackdriverLogs": True,
+        "defaultTimezone": time_zone,
+        "isPrivate": True,
+        "mlMinConfidence": 0.3,
+        "supportedLanguages": [],
+        "enableOnePlatformApi": True,
+        "onePlatformApiVersion": "v2",
+        "apiVersion": "v2",
+        "webhook": {
+            "url": webhook_url or "",
+            "username": "",
+            "headers": {},
+            "available": bool(webhook_url),
+            "useForDomains": False,
+            "cloudFunctionsEnabled": False,
+            "cloudFunctionsInitialized": False,
+        },
+    }
+
+
+def _intent_json(intent, language):
+    name = intent["display_name"]
+    parameters = []
+    for param in intent.get("parameters") or []:
+        parameters.append({
+            "id": _stable_id("intent", name, "parameter", param["display_name"]),
+            "name": param["display_name"],
+            "required": param.get("mandatory", False),
+            "dataType": param["entity_type_display_name"],
+            "value": param.get("value", f"${param['display_name']}"),
+            "defaultValue": "",
+            "isList": False,
+            "prompts": [{"lang": language, "value": prompt} for prompt in param.get("prompts", [])],
+            "promptMessages": [],
+            "noMatchPromptMessages": [],
+            "noInputPromptMessages": [],
+            "outputDialogContexts": [],
+        })
+
+    return {
+        "id": _stable_id("intent", name),
+        "name": name,
+        "auto": True,
+        "contexts": list(intent.get("input_context_names") or []),
+        "responses": [{
+            "resetContexts": False,
+            "action": "",
+            "affectedContexts": [
+                {"name": ctx["name"], "lifespan": ctx.get("lifespan_count", 5)}
+                for ctx in intent.get("output_contexts") or []
+            ],
+            "parameters": parameters,
+            "messages": [{
+                "type": "0",
+                "title": "",
+                "textToSpeech": "",
+                "lang": language,
+                "speech": list(intent["messages"]),
+                "condition": "",
+            }],
+            "speech": [],
+        }],
+        "priority": 500000,
+        "webhookUsed": bool(intent.get("webhook", False)),
+        "webhookForSlotFilling": False,
+        "fallbackIntent": False,
+        "events": [{"name": event} for event in intent.get("events") or []],
+        "conditionalResponses": [],
+        "condition": "",
+        "conditionalFollowupEvents": [],
+    }
+
+
+def _usersays_json(intent, language):
+    name = intent["display_name"]
+    return [
+        {
+            "id": _stable_id("intent", name, "phrase", phrase),
+            "data": [{"text": phrase, "userDefined": False}],
+            "isTemplate": False,
+            "count": 0,
+            "lang": language,
+            "updated": 0,
+        }
+        for phrase in intent["training_phrases"]
+    ]
+
+
+def _entity_json(entity_type):
+    return {
+        "id": _stable_id("entity", entity_type["display_name"]),
+        "name": entity_type["display_name"],
+        "isOverridable": True,
+        # KIND_LIST: os valores não têm sinônimos (lista simples)
+        "isEnum": entity_type.get("kind") == "KIND_LIST",
+        "isRegexp": False,
+        "automatedExpansion": False,
+        "allowFuzzyExtraction": False,
+    }
+
+
+def _entries_json(entity_type):
+    entries = []
+    for entity in entity_type["entities"]:
+        # Em entidades de mapa o próprio valor precisa constar entre os sinônimos
+        synonyms = [entity["value"]] + [s for s in entity.get("synonyms", []) if s != entity["value"]]
+        entries.append({"value": entity["value"], "synonyms": synonyms})
+    return entries
+
+
+def _dump(content):
+    return json.dumps(content, ensure_ascii=False, indent=2, sort_keys=True).encode("utf-8")
+
+
+def build_agent_archive(intents, entity_types, display_name, language=DEFAULT_LANGUAGE,
+                        time_zone=DEFAULT_TIMEZONE, webhook_url=None):
+    """
+    Compila a configuração (intenções e entidades já validadas pelo ConfigParser)
+    no ZIP de agente do Dialogflow ES, em memória.
+
+    Args:
+        intents (list): Intenções no formato de config/intents.json.
+        entity_types (list): Entidades ({'display_name', 'kind', 'entities'}).
+        display_name (str): Nome de exibição do agente.
+        language (str): Idioma padrão do agente (ex: 'pt-br').
+        time_zone (str): Fuso horário padrão do agente.
+        webhook_url (str, optional): URL do fulfillment. O restore substitui o agente
+            inteiro: sem a URL, o webhook configurado no console é removido.
+
+    Returns:
+        bytes: Conteúdo do ZIP (determinístico para a mesma configuração).
+    """
+    files = {
+        "agent.json": _agent_json(display_name, language, time_zone, webhook_url),
+        "package.json": {"version": PACKAGE_VERSION},
+    }
+    for intent in intents:
+        name = intent["display_name"]
+        files[f"intents/{name}.json"] = _intent_json(intent, language)
+        if intent["training_phrases"]:
+            files[f"intents/{name}_usersays_{language}.json"] = _usersays_json(intent, language)
+    for entity_type in entity_types:
+        name = entity_type["display_name"]
+        files[f"entities/{name}.json"] = _entity_json(entity_type)
+        files[f"entities/{name}_entries_{language}.json"] = _entries_json(entity_type)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for path in sorted(files):
+            info = zipfile.ZipInfo(path, date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            archive.writestr(info, _dump(files[path]))
+
+    logger.info(f"Arquivo do agente gerado: {len(intents)} intenções, {len(entity_types)} entidades "
+                f"({buffer.tell()} bytes).")
+    return buffer.getvalue()
+
+
+def read_agent_archive(data):
+    """
+    Lê um ZIP de agente (gerado aqui ou exportado pelo Dialogflow).
+
+    Returns:
+        dict: Caminho do arquivo -> conteúdo JSON decodificado.
+
+    Raises:
+        ValueError: Se o conteúdo não for um ZIP ou algum arquivo não for JSON válido.
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            contents = {}
+            for path in archive.namelist():
+                if path.endswith("/"):
+                    continue
+                try:
+                    contents[path] = json.loads(archive.read(path).decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                    raise ValueError(f"Arquivo '{path}' não é um JSON válido: {e}")
+            return contents
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Conteúdo não é um ZIP de agente válido: {e}")
+
+
+def validate_agent_archive(data):
+    """
+    Valida a estrutura de um ZIP de agente sem acessar a API.
+
+    Verifica os arquivos obrigatórios, a correspondência entre frases de treinamento
+    e intenções, os tipos de entidade referenciados por parâmetros, a presença de
+    intenções sem frases nem eventos (que nunca seriam acionadas) e se alguma
+    intenção usa o webhook quando o agente tem URL de fulfillment.
+
+    Returns:
+        list: Mensagens de erro (lista vazia se o arquivo for válido).
+    """
+    try:
+        files = read_agent_archive(data)
+    except ValueError as e:
+        return [str(e)]
+
+    errors = [f"Arquivo obrigatório ausente: {path}" for path in ("agent.json", "package.json") if path not in files]
+    language = files.get("agent.json", {}).get("language", DEFAULT_LANGUAGE)
+
+    intents = {path[len("intents/"):-len(".json")]: content for path, content in files.items()
+               if path.startswith("intents/") and "_usersays_" not in path}
+    entities = {path[len("entities/"):-len(".json")] for path in files
+                if path.startswith("entities/") and "_entries_" not in path}
+
+    for path in files:
+        if "_usersays_" in path:
+            intent_name = path[len("intents/"):path.index("_usersays_")]
+            if intent_name not in intents:
+                errors.append(f"Frases de treinamento sem intenção correspondente: {path}")
+        elif "_entries_" in path:
+            entity_name = path[len("entities/"):path.index("_entries_")]
+            if entity_name not in entities:
+                errors.append(f"Valores sem entidade correspondente: {path}")
+
+    # O restore substitui o agente inteiro: sem webhookUsed nas intenções o fulfillment fica desligado
+    webhook = files.get("agent.json", {}).get("webhook") or {}
+    if webhook.get("url") and intents and not any(intent.get("webhookUsed") for intent in intents.values()):
+        errors.append("O agente tem URL de fulfillment, mas nenhuma intenção usa o webhook.")
+
+    for name, intent in intents.items():
+        if intent.get("name") != name:
+            errors.append(f"Intenção '{name}': campo 'name' ({intent.get('name')}) difere do nome do arquivo.")
+        has_phrases = f"intents/{name}_usersays_{language}.json" in files
+        if not has_phrases and not intent.get("events") and not intent.get("fallbackIntent"):
+            errors.append(f"Intenção '{name}' sem frases de treinamento nem eventos.")
+        for response in intent.get("responses", []):
+            for param in response.get("parameters", []):
+                data_type = param.get("dataType", "")
+                if data_type.startswith("@") and not data_type.startswith("@sys.") and data_type[1:] not in entities:
+                    errors.append(f"Intenção '{name}': parâmetro '{param.get('name')}' usa a entidade "
+                                  f"inexistente {data_type}.")
+    return errors
+
+
+def _normalize(content):
+    """Remove campos voláteis (IDs, datas) para comparar snapshots de exportações diferentes."""
+    if isinstance(content, dict):
+        return {key: _normalize(value) for key, value in content.items() if key not in VOLATILE_FIELDS}
+    if isinstance(content, list):
+        return [_normalize(value) for value in content]
+    return content
+
+
+def diff_agent_archives(old, new):
+    """
+    Compara dois ZIPs de agente arquivo a arquivo, ignorando IDs e datas.
+
+    Returns:
+        dict: {'added': [...], 'removed': [...], 'changed': [...]} com os caminhos dos arquivos.
+    """
+    old_files = {path: _normalize(content) for path, content in read_agent_archive(old).items()}
+    new_files = {path: _normalize(content) for path, content in read_agent_archive(new).items()}
+    return {
+        "added": sorted(set(new_files) - set(old_files)),
+        "removed": sorted(set(old_files) - set(new_files)),
+        "changed": sorted(path for path in set(old_files) & set(new_files) if old_files[path] != new_files[path]),
+    }
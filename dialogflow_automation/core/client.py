@@ -35,6 +35,8 @@ class DialogflowClient:
         self.intents_client = dialogflow.IntentsClient()
         self.entity_types_client = dialogflow.EntityTypesClient()
         self.agents_client = dialogflow.AgentsClient()
+        # Usado pela regressão de intenções (detect_intent); thread-safe
+        self.sessions_client = dialogflow.SessionsClient()
 
         # Define o caminho "pai" (parent) padrão para o agente no projeto
         # Formato: projects/<Project ID>/agent
@@ -43,7 +45,7 @@ class DialogflowClient:
         logger.info(
             f"Cliente Dialogflow inicializado para o projeto: {project_id}")
 
-    def create_intent(self, display_name, training_phrases_parts, message_texts, parameters=None, input_context_names=None, output_contexts=None):
+    def create_intent(self, display_name, training_phrases_parts, message_texts, parameters=None, input_context_names=None, output_contexts=None, events=None, webhook=False):
         """
         Cria uma nova intenção (Intent) no Dialogflow.
         Implementa idempotência verificando se a intenção já existe (pelo nome de exibição).
@@ -56,6 +58,8 @@ class DialogflowClient:
             parameters (list, optional): Lista de dicionários para extração de entidades (slots).
             input_context_names (list, optional): Lista de nomes de contextos de entrada.
             output_contexts (list, optional): Lista de dicionários definindo contextos de saída.
+            events (list, optional): Nomes de eventos que disparam a intenção (ex: follow-up do Webhook).
+            webhook (bool, optional): Habilita o fulfillment via Webhook para a intenção.
 
         Returns:
             google.cloud.dialogflow_v2.types.Intent: Objeto da intenção criada ou existente.
@@ -92,7 +96,8 @@ class DialogflowClient:
                         display_name=param['display_name'],
                         entity_type_display_name=param['entity_type_display_name'],
                         mandatory=param.get('mandatory', False),
-                        prompts=param.get('prompts', [])
+                        prompts=param.get('prompts', []),
+                        value=param.get('value', f"${param['display_name']}")
                     )
                     intent_parameters.append(new_param)
 
@@ -116,7 +121,10 @@ class DialogflowClient:
                 parameters=intent_parameters,
                 input_context_names=[
                     f"{self.parent}/sessions/-/contexts/{name}" for name in input_context_names] if input_context_names else [],
-                output_contexts=output_contexts_objects
+                output_contexts=output_contexts_objects,
+                events=events or [],
+                webhook_state=(dialogflow.Intent.WebhookState.WEBHOOK_STATE_ENABLED
+                               if webhook else dialogflow.Intent.WebhookState.WEBHOOK_STATE_UNSPECIFIED)
             )
 
             # 6. Chama a API para criar a intenção
@@ -193,6 +201,53 @@ class DialogflowClient:
                 logger.error(f"Erro ao criar entidade '{display_name}': {e}")
                 raise
 
+    def restore_agent(self, agent_content, timeout=300):
+        """
+        Substitui o agente inteiro pelo conteúdo do ZIP em uma única operação de longa duração.
+        Intenções e entidades que não estiverem no arquivo são removidas.
+
+        Args:
+            agent_content (bytes): ZIP do agente (ver agent_archive.build_agent_archive).
+            timeout (int): Tempo máximo (s) de espera pela conclusão da operação.
+        """
+        logger.info(f"Restaurando o agente do projeto {self.project_id} ({len(agent_content)} bytes)...")
+        operation = self.agents_client.restore_agent(
+            request={"parent": f"projects/{self.project_id}", "agent_content": agent_content}
+        )
+        operation.result(timeout=timeout)
+        logger.info("Agente restaurado com sucesso.")
+
+    def import_agent(self, agent_content, timeout=300):
+        """
+        Mescla o conteúdo do ZIP ao agente atual em uma única operação de longa duração.
+        Recursos com o mesmo nome são substituídos; os demais são mantidos.
+
+        Args:
+            agent_content (bytes): ZIP do agente.
+            timeout (int): Tempo máximo (s) de espera pela conclusão da operação.
+        """
+        logger.info(f"Importando para o agente do projeto {self.project_id} ({len(agent_content)} bytes)...")
+        operation = self.agents_client.import_agent(
+            request={"parent": f"projects/{self.project_id}", "agent_content": agent_content}
+        )
+        operation.result(timeout=timeout)
+        logger.info("Agente importado com sucesso.")
+
+    def export_agent(self, timeout=300):
+        """
+        Exporta o agente completo (snapshot para comparação ou cópia entre projetos).
+
+        Returns:
+            bytes: Conteúdo do ZIP do agente.
+        """
+        logger.info(f"Exportando o agente do projeto {self.project_id}...")
+        operation = self.agents_client.export_agent(
+            request={"parent": f"projects/{self.project_id}"}
+        )
+        agent_content = operation.result(timeout=timeout).agent_content
+        logger.info(f"Agente exportado ({len(agent_content)} bytes).")
+        return agent_content
+
     def _get_intent_by_display_name(self, display_name):
         """
         Método auxiliar privado para buscar uma intenção pelo nome de exibição.
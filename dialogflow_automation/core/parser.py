@@ -97,6 +97,12 @@ class ConfigParser:
             raise ValueError(
                 f"Intenção #{index} ({intent['display_name']}): 'messages' deve conter apenas strings.")
 
+        # Valida eventos opcionais (ex: eventos de follow-up disparados pelo Webhook)
+        if "events" in intent:
+            if not isinstance(intent["events"], list) or not all(isinstance(evt, str) for evt in intent["events"]):
+                raise ValueError(
+                    f"Intenção #{index} ({intent['display_name']}): 'events' deve ser uma lista de strings.")
+
         # Valida parâmetros opcionais
         if "parameters" in intent:
             if not isinstance(intent["parameters"], list):
@@ -0,0 +1,213 @@
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from .logger import setup_logger
+
+# Inicializa o logger para este módulo
+logger = setup_logger("regression")
+
+# Regressão de intenções: cada frase de treinamento de config/intents.json (e as
+# frases de teste separadas de config/test_phrases.json) passa por detect_intent
+# no agente publicado. As chamadas são feitas em paralelo (até `concurrency`) e
+# limitadas a `rate` por segundo para respeitar a cota de detect_intent do projeto.
+# Cada frase usa uma sessão própria: contextos de uma frase não afetam a seguinte.
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_RATE = 10.0
+DEFAULT_LANGUAGE = "pt-br"
+
+# Intenção prevista quando a chamada falha (erro de API, timeout)
+ERROR_LABEL = "<erro>"
+# Intenção prevista quando nenhuma intenção é reconhecida
+NO_MATCH_LABEL = "<nenhuma>"
+
+
+def load_test_cases(intents, held_out=None):
+    """
+    Monta os casos de teste a partir das intenções e das frases de teste separadas.
+
+    Args:
+        intents (list): Intenções no formato de config/intents.json.
+        held_out (dict, optional): Nome da intenção -> frases que não estão no treinamento.
+
+    Returns:
+        list: Tuplas (intenção esperada, frase, origem), com origem 'training' ou 'held_out'.
+
+    Raises:
+        ValueError: Se uma frase de teste referenciar uma intenção inexistente.
+    """
+    names = {intent["display_name"] for intent in intents}
+    cases = [
+        (intent["display_name"], phrase, "training")
+        for intent in intents
+        for phrase in intent["training_phrases"]
+    ]
+    for name, phrases in (held_out or {}).items():
+        if name not in names:
+            raise ValueError(f"Frases de teste para a intenção inexistente '{name}'.")
+        cases.extend((name, phrase, "held_out") for phrase in phrases)
+    return cases
+
+
+def load_held_out(path):
+    """Lê o JSON de frases de teste ({intenção: [frases]}); arquivo ausente retorna {}."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        held_out = json.load(f)
+    if not isinstance(held_out, dict) or not all(
+        isinstance(phrases, list) and all(isinstance(p, str) for p in phrases) for phrases in held_out.values()
+    ):
+        raise ValueError("O arquivo de frases de teste deve ser um objeto {intenção: [frases]}.")
+    return held_out
+
+
+class RateLimiter:
+    """
+    Limita as chamadas a `rate` por segundo entre todas as threads (intervalo fixo
+    entre inícios de chamada, sem rajadas).
+    """
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self._next = None
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = self.clock()
+            start = now if self._next is None else max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            self.sleep(start - now)
+
+
+def percentile(values, pct):
+    """Percentil pelo método do posto mais próximo (None se não houver valores)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def detect(sessions_client, project_id, text, language_code=DEFAULT_LANGUAGE, timeout=None):
+    """
+    Executa detect_intent em uma sessão nova.
+
+    Args:
+        sessions_client: dialogflow.SessionsClient (ou objeto com a mesma interface).
+
+    Returns:
+        tuple: (nome da intenção reconhecida, confiança).
+    """
+    session = f"projects/{project_id}/agent/sessions/regression-{uuid.uuid4().hex}"
+    response = sessions_client.detect_intent(
+        request={
+            "session": session,
+            "query_input": {"text": {"text": text, "language_code": language_code}},
+        },
+        timeout=timeout,
+    )
+    result = response.query_result
+    return (result.intent.display_name or NO_MATCH_LABEL), result.intent_detection_confidence
+
+
+def run_regression(sessions_client, project_id, cases, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                   language_code=DEFAULT_LANGUAGE, timeout=None, limiter=None, clock=time.perf_counter):
+    """
+    Executa todos os casos contra o agente e retorna um resultado por caso, na ordem de `cases`.
+
+    Cada resultado é um dict com expected, text, source, predicted, confidence,
+    latency_ms e error (mensagem, se a chamada falhou).
+    """
+    limiter = limiter or RateLimiter(rate)
+
+    def run_case(case):
+        expected, text, source = case
+        limiter.acquire()
+        started = clock()
+        try:
+            predicted, confidence = detect(sessions_client, project_id, text, language_code, timeout)
+            error = None
+        except Exception as e:
+            predicted, confidence, error = ERROR_LABEL, 0.0, str(e)
+            logger.warning(f"Falha no detect_intent para '{text}': {e}")
+        return {
+            "expected": expected,
+            "text": text,
+            "source": source,
+            "predicted": predicted,
+            "confidence": confidence,
+            "latency_ms": (clock() - started) * 1000,
+            "error": error,
+        }
+
+    logger.info(f"Executando {len(cases)} frases (concorrência {concurrency}, até {rate}/s)...")
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        return list(executor.map(run_case, cases))
+
+
+def build_report(results):
+    """
+    Consolida os resultados: matriz de confusão, acurácia geral e por intenção,
+    percentis de latência e lista de erros de classificação.
+    """
+    confusion = defaultdict(lambda: defaultdict(int))
+    per_intent = defaultdict(lambda: {"total": 0, "correct": 0})
+    per_source = defaultdict(lambda: {"total": 0, "correct": 0})
+    for result in results:
+        correct = result["predicted"] == result["expected"]
+        confusion[result["expected"]][result["predicted"]] += 1
+        for bucket in (per_intent[result["expected"]], per_source[result["source"]]):
+            bucket["total"] += 1
+            bucket["correct"] += int(correct)
+
+    def with_accuracy(counts):
+        return {key: {**value, "accuracy": value["correct"] / value["total"]} for key, value in sorted(counts.items())}
+
+    # Latência apenas das chamadas concluídas (falhas distorceriam os percentis)
+    latencies = [result["latency_ms"] for result in results if result["error"] is None]
+    correct = sum(1 for result in results if result["predicted"] == result["expected"])
+    return {
+        "total": len(results),
+        "correct": correct,
+        "accuracy": correct / len(results) if results else 0.0,
+        "errors": sum(1 for result in results if result["error"] is not None),
+        "per_intent": with_accuracy(per_intent),
+        "per_source": with_accuracy(per_source),
+        "confusion": {expected: dict(sorted(row.items())) for expected, row in sorted(confusion.items())},
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else None,
+        },
+        "misclassified": [
+            {key: result[key] for key in ("expected", "predicted", "confidence", "text", "source")}
+            for result in results if result["predicted"] != result["expected"]
+        ],
+    }
+
+
+def check_gates(report, min_accuracy=None, max_p95_ms=None):
+    """Retorna a lista de critérios de aprovação não atendidos (vazia se o agente passou)."""
+    failures = []
+    if min_accuracy is not None and report["accuracy"] < min_accuracy:
+        failures.append(f"Acurácia {report['accuracy']:.1%} abaixo do mínimo de {min_accuracy:.1%}.")
+    p95 = report["latency_ms"]["p95"]
+    if max_p95_ms is not None:
+        if p95 is None:
+            failures.append("Nenhuma chamada concluída para medir a latência.")
+        elif p95 > max_p95_ms:
+            failures.append(f"Latência p95 de {p95:.0f} ms acima do máximo de {max_p95_ms:.0f} ms.")
+    return failures
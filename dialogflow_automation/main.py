@@ -1,5 +1,6 @@
 import os
 import sys
+import json
 import argparse
 from dotenv import load_dotenv
 
@@ -10,51 +11,144 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from dialogflow_automation.core.logger import setup_logger
 from dialogflow_automation.core.parser import ConfigParser
 from dialogflow_automation.core.client import DialogflowClient
+from dialogflow_automation.core.agent_archive import build_agent_archive, diff_agent_archives, validate_agent_archive
+from dialogflow_automation.core.regression import (
+    DEFAULT_CONCURRENCY, DEFAULT_RATE, build_report, check_gates, load_held_out, load_test_cases, run_regression
+)
 
 # Inicializa o logger principal da aplicação
 logger = setup_logger("main")
 
-def main():
-    """
-    Função principal de entrada (Entry Point).
-    Gerencia o fluxo de execução da ferramenta de automação.
-    """
-    # Carrega variáveis de ambiente do arquivo .env na raiz do projeto
-    # Isso é essencial para obter credenciais sem hardcode
-    load_dotenv()
+# Modos de execução:
+#   sync    - cria entidades e intenções uma a uma (idempotente, não remove nada)
+#   build   - compila a configuração no ZIP do agente, sem acessar a API
+#   restore - substitui o agente inteiro pelo ZIP (uma operação)
+#   import  - mescla o ZIP ao agente atual (uma operação)
+#   export  - salva um snapshot ZIP do agente
+#   clone   - exporta o agente de --source-project-id e o restaura em --project-id
+#   diff    - compara dois ZIPs (ou um ZIP com a configuração atual), sem acessar a API
+#   regression - envia as frases de treinamento e de teste ao detect_intent e confere as intenções
+MODES = ("sync", "build", "restore", "import", "export", "clone", "diff", "regression")
+OFFLINE_MODES = ("build", "diff")
+
+# Simulação de carregamento de Entidades (poderia vir de entities.json)
+# Aqui definimos hardcoded para exemplo, mas deveria estar em config/
+ENTITY_TYPES = [
+    {
+        "display_name": "TipoServico",
+        "kind": "KIND_MAP",
+        "entities": [
+            {"value": "Consultoria Padrão", "synonyms": ["padrão", "básica", "standard"]},
+            {"value": "Consultoria Premium", "synonyms": ["premium", "completa", "avançada"]}
+        ]
+    }
+]
 
-    # Configuração do parser de argumentos da linha de comando (CLI)
+def parse_args():
+    """Configuração do parser de argumentos da linha de comando (CLI)."""
     parser = argparse.ArgumentParser(description="Automação de Setup do Dialogflow ES")
     parser.add_argument(
-        "--config-dir", 
-        type=str, 
+        "--mode",
+        choices=MODES,
+        default="sync",
+        help="Modo de execução (padrão: sync, intenção por intenção)"
+    )
+    parser.add_argument(
+        "--config-dir",
+        type=str,
         default="dialogflow_automation/config",
         help="Caminho para o diretório de configurações (JSONs)"
     )
     parser.add_argument(
-        "--project-id", 
-        type=str, 
+        "--project-id",
+        type=str,
         help="ID do Projeto no Google Cloud (sobrescreve env var DIALOGFLOW_PROJECT_ID)"
     )
     parser.add_argument(
-        "--credentials", 
-        type=str, 
+        "--credentials",
+        type=str,
         help="Caminho para o JSON da Service Account (sobrescreve env var GOOGLE_APPLICATION_CREDENTIALS)"
     )
-    
-    args = parser.parse_args()
-
-    logger.info("Iniciando processo de automação do Dialogflow...")
+    parser.add_argument(
+        "--archive",
+        type=str,
+        help="ZIP de agente existente (restore/import: envia este arquivo; diff: versão anterior)"
+    )
+    parser.add_argument(
+        "--against",
+        type=str,
+        help="diff: ZIP a comparar com --archive (padrão: a configuração atual compilada)"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="agent.zip",
+        help="build/export: caminho do ZIP gerado"
+    )
+    parser.add_argument(
+        "--source-project-id",
+        type=str,
+        help="clone: projeto de origem (ex: staging); o destino é --project-id"
+    )
+    parser.add_argument(
+        "--agent-name",
+        type=str,
+        default=os.getenv("DIALOGFLOW_AGENT_NAME", "Nexus AI"),
+        help="Nome de exibição do agente no ZIP compilado"
+    )
+    parser.add_argument(
+        "--webhook-url",
+        type=str,
+        default=os.getenv("DIALOGFLOW_WEBHOOK_URL"),
+        help="URL do fulfillment gravada no ZIP (o restore substitui a configuração do console)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=300,
+        help="Tempo máximo (s) de espera pelas operações de restore/import/export"
+    )
+    parser.add_argument(
+        "--test-phrases",
+        type=str,
+        help="regression: JSON {intenção: [frases]} fora do treinamento (padrão: <config-dir>/test_phrases.json)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="regression: chamadas de detect_intent simultâneas"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_RATE,
+        help="regression: máximo de chamadas de detect_intent por segundo (cota do projeto)"
+    )
+    parser.add_argument(
+        "--min-accuracy",
+        type=float,
+        help="regression: acurácia mínima (0-1); abaixo dela o processo sai com código 1"
+    )
+    parser.add_argument(
+        "--max-p95-ms",
+        type=float,
+        help="regression: latência p95 máxima (ms) do detect_intent; acima dela sai com código 1"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        help="regression: caminho do relatório JSON (matriz de confusão, acurácia, latências)"
+    )
+    return parser.parse_args()
 
-    # --- 1. Validação de Credenciais e Parâmetros ---
-    
-    # Obtém Project ID (Argumento > ENV > Erro)
+def resolve_credentials(args):
+    """Obtém Project ID e caminho das credenciais (Argumento > ENV > Erro)."""
     project_id = args.project_id or os.getenv("DIALOGFLOW_PROJECT_ID")
     if not project_id:
         logger.error("Project ID não fornecido via argumento ou variável de ambiente DIALOGFLOW_PROJECT_ID.")
         sys.exit(1)
 
-    # Obtém Caminho das Credenciais (Argumento > ENV > Erro)
     credentials_path = args.credentials or os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
     if not credentials_path:
         logger.error("Caminho das credenciais não fornecido. Defina GOOGLE_APPLICATION_CREDENTIALS ou use --credentials.")
@@ -63,59 +157,175 @@ def main():
     if not os.path.exists(credentials_path):
         logger.error(f"Arquivo de credenciais não encontrado no caminho: {credentials_path}")
         sys.exit(1)
+    return project_id, credentials_path
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def write_file(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+    logger.info(f"Arquivo salvo em: {path} ({len(content)} bytes)")
+
+def compile_agent(args, config_parser):
+    """Compila a configuração no ZIP do agente; encerra se o arquivo gerado for inválido."""
+    intents_list = config_parser.load_intents()
+    if not args.webhook_url:
+        logger.warning("Sem --webhook-url/DIALOGFLOW_WEBHOOK_URL: o ZIP não terá URL de fulfillment.")
+    content = build_agent_archive(
+        intents_list, ENTITY_TYPES, display_name=args.agent_name, webhook_url=args.webhook_url
+    )
+    return ensure_valid(content)
+
+def ensure_valid(content):
+    errors = validate_agent_archive(content)
+    if errors:
+        for error in errors:
+            logger.error(f"ZIP do agente inválido: {error}")
+        sys.exit(1)
+    return content
+
+def run_sync(df_client, config_parser):
+    """Criação incremental: uma chamada à API por entidade e por intenção."""
+    # Carrega a definição de intenções do arquivo JSON
+    # O parser valida a estrutura do JSON antes de retornar
+    intents_list = config_parser.load_intents()
+
+    logger.info("Iniciando criação de Entidades...")
+    for ent in ENTITY_TYPES:
+        df_client.create_entity_type(ent['display_name'], ent['kind'], ent['entities'])
+
+    logger.info(f"Iniciando sincronização de {len(intents_list)} intenções...")
+
+    # Itera sobre cada intenção definida e cria no Dialogflow
+    for intent_data in intents_list:
+        df_client.create_intent(
+            display_name=intent_data['display_name'],
+            training_phrases_parts=intent_data['training_phrases'],
+            message_texts=intent_data['messages'],
+            parameters=intent_data.get('parameters'),
+            input_context_names=intent_data.get('input_context_names'),
+            output_contexts=intent_data.get('output_contexts'),
+            events=intent_data.get('events'),
+            webhook=intent_data.get('webhook', False)
+        )
+
+def run_diff(args, config_parser):
+    """Compara dois snapshots (ou um snapshot com a configuração atual); sai com 1 se houver diferenças."""
+    if not args.archive:
+        logger.error("O modo diff requer --archive.")
+        sys.exit(1)
+    new_content = read_file(args.against) if args.against else compile_agent(args, config_parser)
+    changes = diff_agent_archives(read_file(args.archive), new_content)
+    for kind, label in (("added", "+"), ("removed", "-"), ("changed", "~")):
+        for path in changes[kind]:
+            logger.info(f"{label} {path}")
+    if any(changes.values()):
+        logger.info(f"{sum(len(paths) for paths in changes.values())} arquivos diferentes.")
+        sys.exit(1)
+    logger.info("Nenhuma diferença encontrada.")
+
+def run_intent_regression(args, df_client, config_parser):
+    """Regressão de intenções no agente publicado; sai com 1 se algum critério não for atendido."""
+    test_phrases = args.test_phrases or os.path.join(args.config_dir, "test_phrases.json")
+    cases = load_test_cases(config_parser.load_intents(), load_held_out(test_phrases))
+    results = run_regression(
+        df_client.sessions_client, df_client.project_id, cases,
+        concurrency=args.concurrency, rate=args.rate
+    )
+    report = build_report(results)
+
+    for name, stats in report["per_intent"].items():
+        logger.info(f"{name}: {stats['correct']}/{stats['total']} ({stats['accuracy']:.1%})")
+    for item in report["misclassified"]:
+        logger.warning(f"[{item['source']}] '{item['text']}': esperado {item['expected']}, "
+                       f"reconhecido {item['predicted']} ({item['confidence']:.2f})")
+    latency = report["latency_ms"]
+    if latency["p50"] is not None:
+        logger.info(f"Latência detect_intent: p50={latency['p50']:.0f} ms p95={latency['p95']:.0f} ms "
+                    f"p99={latency['p99']:.0f} ms")
+    logger.info(f"Acurácia geral: {report['correct']}/{report['total']} ({report['accuracy']:.1%}), "
+                f"{report['errors']} falhas de API.")
+    if args.report:
+        write_file(args.report, json.dumps(report, ensure_ascii=False, indent=2).encode("utf-8"))
+
+    failures = check_gates(report, args.min_accuracy, args.max_p95_ms)
+    for failure in failures:
+        logger.error(failure)
+    if failures:
+        sys.exit(1)
+
+def main():
+    """
+    Função principal de entrada (Entry Point).
+    Gerencia o fluxo de execução da ferramenta de automação.
+    """
+    # Carrega variáveis de ambiente do arquivo .env na raiz do projeto
+    # Isso é essencial para obter credenciais sem hardcode
+    load_dotenv()
+
+    args = parse_args()
+
+    logger.info(f"Iniciando processo de automação do Dialogflow (modo: {args.mode})...")
 
-    # --- 2. Inicialização dos Componentes ---
+    # --- 1. Inicialização dos Componentes ---
 
     try:
         # Inicializa o parser de configuração
         config_parser = ConfigParser(args.config_dir)
-        
+    except Exception as e:
+        logger.critical(f"Falha na inicialização dos componentes: {e}")
+        sys.exit(1)
+
+    # --- 2. Modos sem acesso à API ---
+
+    try:
+        if args.mode == "build":
+            write_file(args.output, compile_agent(args, config_parser))
+            return
+        if args.mode == "diff":
+            run_diff(args, config_parser)
+            return
+    except (ValueError, OSError) as e:
+        logger.error(f"Erro durante o processo de execução: {e}")
+        sys.exit(1)
+
+    # --- 3. Validação de Credenciais e Cliente ---
+
+    project_id, credentials_path = resolve_credentials(args)
+    try:
         # Inicializa o cliente do Dialogflow
         df_client = DialogflowClient(project_id, credentials_path)
-        
     except Exception as e:
         logger.critical(f"Falha na inicialização dos componentes: {e}")
         sys.exit(1)
 
-    # --- 3. Execução da Automação (Sync) ---
+    # --- 4. Execução da Automação ---
 
     try:
-        # Carrega a definição de intenções do arquivo JSON
-        # O parser valida a estrutura do JSON antes de retornar
-        intents_list = config_parser.load_intents()
-        
-        # Simulação de carregamento de Entidades (poderia vir de entities.json)
-        # Aqui definimos hardcoded para exemplo, mas deveria estar em config/
-        entities_config = [
-            {
-                "display_name": "TipoServico",
-                "kind": "KIND_MAP",
-                "entities": [
-                    {"value": "Consultoria Padrão", "synonyms": ["padrão", "básica", "standard"]},
-                    {"value": "Consultoria Premium", "synonyms": ["premium", "completa", "avançada"]}
-                ]
-            }
-        ]
+        if args.mode == "sync":
+            run_sync(df_client, config_parser)
+        elif args.mode in ("restore", "import"):
+            content = ensure_valid(read_file(args.archive)) if args.archive else compile_agent(args, config_parser)
+            if args.mode == "restore":
+                df_client.restore_agent(content, timeout=args.timeout)
+            else:
+                df_client.import_agent(content, timeout=args.timeout)
+        elif args.mode == "export":
+            write_file(args.output, df_client.export_agent(timeout=args.timeout))
+        elif args.mode == "clone":
+            if not args.source_project_id:
+                logger.error("O modo clone requer --source-project-id.")
+                sys.exit(1)
+            source_client = DialogflowClient(args.source_project_id, credentials_path)
+            content = ensure_valid(source_client.export_agent(timeout=args.timeout))
+            df_client.restore_agent(content, timeout=args.timeout)
+        elif args.mode == "regression":
+            run_intent_regression(args, df_client, config_parser)
 
-        logger.info("Iniciando criação de Entidades...")
-        for ent in entities_config:
-            df_client.create_entity_type(ent['display_name'], ent['kind'], ent['entities'])
-        
-        logger.info(f"Iniciando sincronização de {len(intents_list)} intenções...")
-
-        # Itera sobre cada intenção definida e cria no Dialogflow
-        for intent_data in intents_list:
-            df_client.create_intent(
-                display_name=intent_data['display_name'],
-                training_phrases_parts=intent_data['training_phrases'],
-                message_texts=intent_data['messages'],
-                parameters=intent_data.get('parameters'),
-                input_context_names=intent_data.get('input_context_names'),
-                output_contexts=intent_data.get('output_contexts')
-            )
-            
         logger.info("Processo de sincronização concluído com sucesso! 🚀")
-        logger.info("Verifique o agente no console: https://dialogflow.cloud.google.com/#/agent/nexus-ai-aws-v1-ahuj/intents")
+        logger.info(f"Verifique o agente no console: https://dialogflow.cloud.google.com/#/agent/{project_id}/intents")
 
     except Exception as e:
         logger.error(f"Erro durante o processo de execução: {e}")
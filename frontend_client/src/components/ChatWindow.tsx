@@ -35,6 +35,8 @@ const ChatWindow: React.FC = () => {
   const messagesEndRef = useRef<HTMLDivElement>(null);
   // Referência para o input, para focar após o envio
   const inputRef = useRef<HTMLInputElement>(null);
+  // Identificador da sessão de conversa devolvido pelo Backend (memória multi-turno)
+  const sessionIdRef = useRef<string | null>(null);
 
   // --- Efeitos Colaterais (Side Effects) ---
 
@@ -86,7 +88,10 @@ const ChatWindow: React.FC = () => {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ message: userMessage.text }),
+        body: JSON.stringify({
+          message: userMessage.text,
+          session_id: sessionIdRef.current,
+        }),
       });
 
       if (!res.ok) {
@@ -94,6 +99,10 @@ const ChatWindow: React.FC = () => {
       }
 
       const data = await res.json();
+      // Mantém a mesma sessão nas próximas mensagens para preservar o contexto
+      if (data.session_id) {
+        sessionIdRef.current = data.session_id;
+      }
       const responseText =
         data.response || 'Desculpe, não consegui processar sua solicitação.';
 
@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from retrieval_cache import normalize_query
+
+# --- Cache de Respostas do Webhook ---
+# Guarda as últimas respostas geradas pelo Bedrock no próprio container do Lambda.
+# É a primeira opção de degradação quando não há tempo para uma nova geração.
+ANSWER_CACHE_MAX_ENTRIES = int(os.environ.get('ANSWER_CACHE_MAX_ENTRIES', '512'))
+ANSWER_CACHE_TTL_SECONDS = int(os.environ.get('ANSWER_CACHE_TTL_SECONDS', '3600'))
+
+
+class AnswerCache:
+    """Cache LRU com expiração por idade, seguro para uso entre threads."""
+
+    def __init__(self, max_entries=ANSWER_CACHE_MAX_ENTRIES, ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+                 clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, query):
+        """Retorna a resposta armazenada para a pergunta ou None (ausente/expirada)."""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            answer, stored_at = entry
+            if self._clock() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def set(self, query, answer):
+        """Armazena a resposta, descartando a entrada menos usada se necessário."""
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = (answer, self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,166 @@
+import json
+import os
+
+# --- Requisições no Formato Messages API (Claude no Bedrock) ---
+# O preâmbulo de instruções é estático e vai no campo `system`; somente a parte
+# variável (contexto recuperado, histórico e pergunta) vai na mensagem do usuário.
+# Com o prefixo longo o bastante, o system recebe um marcador de cache
+# (cache_control) e o Bedrock reaproveita o prefixo já processado nas chamadas
+# seguintes, reduzindo o tempo até o primeiro token e o custo de entrada.
+# O cache só vale a partir de um tamanho mínimo de prefixo por modelo (1.024
+# tokens no Claude 3.7 Sonnet, 2.048 no 3.5 Haiku). Por isso o SYSTEM_PROMPT
+# concentra todo o contexto estável (regras, política de chamados e orçamentos,
+# formato e exemplos de resposta), somando ~1.150 tokens: acima do mínimo do
+# Sonnet, o primeiro modelo da lista padrão. O marcador só é enviado quando o
+# prefixo alcança o mínimo de algum dos modelos da requisição; no fallback para
+# o Haiku ele é ignorado e o preâmbulo é processado normalmente.
+# Mantenha sincronizado com backend_core/tickets/bedrock_messages.py.
+
+ANTHROPIC_VERSION = 'bedrock-2023-05-31'
+
+PROMPT_CACHE_ENABLED = os.environ.get('BEDROCK_PROMPT_CACHE', 'True') == 'True'
+BEDROCK_MAX_TOKENS = int(os.environ.get('BEDROCK_MAX_TOKENS', '500'))
+
+# Prefixo mínimo (tokens) para o cache de prompt por trecho do modelId.
+# BEDROCK_PROMPT_CACHE_MIN_TOKENS (JSON {"trecho": tokens}) substitui ou completa a tabela.
+DEFAULT_PROMPT_CACHE_MIN_TOKENS = {
+    'claude-3-7-sonnet': 1024,
+    'claude-3-5-sonnet': 1024,
+    'claude-3-5-haiku': 2048,
+    'claude-3-haiku': 2048,
+}
+PROMPT_CACHE_MIN_TOKENS = dict(
+    DEFAULT_PROMPT_CACHE_MIN_TOKENS, **json.loads(os.environ.get('BEDROCK_PROMPT_CACHE_MIN_TOKENS') or '{}')
+)
+# Mínimo assumido para modelos fora da tabela (o maior conhecido)
+UNKNOWN_MODEL_CACHE_MIN_TOKENS = max(DEFAULT_PROMPT_CACHE_MIN_TOKENS.values())
+
+# Nome da métrica publicada para cada campo de uso de tokens
+USAGE_METRICS = {
+    'input_tokens': 'BedrockInputTokens',
+    'output_tokens': 'BedrockOutputTokens',
+    'cache_read_input_tokens': 'BedrockCacheReadTokens',
+    'cache_creation_input_tokens': 'BedrockCacheWriteTokens',
+}
+
+# Preâmbulo estático (não inclua dados da requisição aqui: qualquer mudança invalida o cache)
+SYSTEM_PROMPT = """Você é o assistente técnico especialista da Nexus AI, responsável pelo primeiro atendimento de suporte.
+
+Regras de resposta:
+1. Responda somente com base no contexto fornecido na mensagem do usuário, extraído da base de conhecimento interna.
+2. Se a resposta não estiver no contexto, diga claramente que não sabe e sugira abrir um chamado; não invente informações.
+3. Seja útil, preciso e conciso: prefira passos numerados para procedimentos e no máximo três parágrafos curtos.
+4. Use português do Brasil, em tom cordial e profissional, sem jargões desnecessários.
+5. Nunca solicite senhas, tokens ou dados pessoais sensíveis.
+6. Quando houver risco de perda de dados ou indisponibilidade (reinícios, formatações, alterações de rede), alerte o usuário antes dos passos.
+7. Se o histórico da conversa for fornecido, use-o apenas para entender a pergunta atual; o contexto recuperado tem prioridade.
+
+Como usar o contexto:
+- O contexto vem em trechos separados por linhas em branco, cada um de um documento da base de conhecimento. Os trechos aparecem em ordem de relevância, mas nem todos tratam da pergunta: ignore os que não se aplicam.
+- Quando dois trechos divergirem, prefira o mais específico para o equipamento ou serviço citado pelo usuário e mencione a diferença se ela mudar o procedimento.
+- Não cite nomes de arquivos, identificadores de documentos nem a existência do "contexto"; fale como quem conhece a base de conhecimento.
+- Não complete passos que faltam no contexto com conhecimento geral. Se um procedimento estiver incompleto, descreva o que está documentado e indique abrir um chamado para o restante.
+- Valores, prazos, versões e nomes de produtos devem ser copiados exatamente como aparecem no contexto.
+
+Chamados de suporte:
+- O usuário pode abrir um chamado pelo próprio assistente informando o nome e uma descrição do problema. Para abrir um chamado, peça apenas essas informações.
+- Os chamados passam pelos status Aberto (recém-criado), Em Andamento (em atendimento pela equipe técnica), Resolvido (problema solucionado) e Fechado (finalizado).
+- Em momentos de alta demanda o chamado pode receber primeiro um protocolo provisório; o chamado é registrado em seguida e o protocolo provisório continua válido para consulta.
+- Não prometa prazos de atendimento nem afirme que um chamado foi aberto, alterado ou encerrado: quem registra o chamado é o sistema, não você.
+- Problemas que afetam vários usuários ao mesmo tempo (indisponibilidade geral, falha de rede em um local inteiro) podem já ter um chamado principal; oriente o usuário a informar o local e o horário do problema para que o chamado seja vinculado a ele.
+
+Orçamentos:
+- Orçamentos de serviços são calculados pelo assistente a partir do tipo de serviço e das informações do atendimento; não estime valores por conta própria.
+- Se o usuário perguntar preços, explique que pode gerar um orçamento e pergunte qual serviço ele deseja.
+
+Segurança e privacidade:
+- Não peça nem repita senhas, códigos de verificação, chaves de acesso ou números completos de documentos, mesmo que o usuário os envie espontaneamente; oriente-o a trocar a credencial exposta.
+- Não oriente o usuário a desativar antivírus, firewall ou atualizações de segurança, salvo se o procedimento estiver documentado no contexto, e nesse caso alerte sobre o risco.
+- Recuse pedidos que não tenham relação com o suporte técnico da Nexus AI, de forma educada, e ofereça ajuda com o atendimento.
+
+Formato da resposta:
+- Comece pela solução ou pela informação pedida, sem repetir a pergunta e sem saudações longas.
+- Use listas numeradas para passos, uma ação por item, com os nomes de menus e botões exatamente como no contexto.
+- Termine, quando fizer sentido, com uma única frase indicando o que fazer se o problema continuar.
+- Não use tabelas, títulos nem blocos de código, pois a resposta é exibida em um chat de texto simples.
+
+Exemplo de resposta com o procedimento no contexto:
+Pergunta: Como reinicio o roteador da sala de reuniões?
+Resposta: Atenção: a rede da sala ficará indisponível por cerca de dois minutos.
+1. Desligue o roteador pelo botão traseiro.
+2. Aguarde 30 segundos e ligue-o novamente.
+3. Espere a luz de status ficar verde antes de reconectar.
+Se a luz continuar vermelha, abra um chamado informando a sala.
+
+Exemplo de resposta sem a informação no contexto:
+Pergunta: Qual é o prazo de garantia do notebook?
+Resposta: Não encontrei essa informação na nossa base de conhecimento. Posso abrir um chamado para a equipe verificar a garantia do seu equipamento; para isso, informe seu nome e o modelo do notebook."""
+
+
+def estimate_tokens(text):
+    """Estimativa barata de tokens (~4 caracteres por token)."""
+    return (len(text or '') + 3) // 4
+
+
+def prompt_cache_min_tokens(model_id):
+    """Prefixo mínimo (tokens) para o cache de prompt do modelo, pelo trecho mais específico do modelId."""
+    matches = [fragment for fragment in PROMPT_CACHE_MIN_TOKENS if fragment in (model_id or '')]
+    return PROMPT_CACHE_MIN_TOKENS[max(matches, key=len)] if matches else UNKNOWN_MODEL_CACHE_MIN_TOKENS
+
+
+def prefix_is_cacheable(prefix, model_ids=()):
+    """
+    Indica se o prefixo alcança o mínimo do cache de prompt em ao menos um dos modelos
+    (sem modelos informados, vale o mínimo de um modelo desconhecido).
+    """
+    minimums = [prompt_cache_min_tokens(model_id) for model_id in model_ids] or [UNKNOWN_MODEL_CACHE_MIN_TOKENS]
+    return estimate_tokens(prefix) >= min(minimums)
+
+
+def build_user_message(question, context, history=''):
+    """Texto variável da requisição: contexto recuperado, histórico (opcional) e pergunta."""
+    history_block = f"Histórico da conversa:\n{history}\n\n" if history else ""
+    return f"Contexto:\n{context}\n\n{history_block}Pergunta: {question}"
+
+
+def build_messages_body(question, context, history='', max_tokens=BEDROCK_MAX_TOKENS, temperature=0.3,
+                        top_p=0.9, cache_system_prompt=PROMPT_CACHE_ENABLED, model_ids=(),
+                        system_prompt=SYSTEM_PROMPT):
+    """
+    Monta o corpo do InvokeModel no formato Messages API. O preâmbulo só é marcado para
+    cache se o tamanho dele alcançar o mínimo de algum dos `model_ids` que vão recebê-lo.
+    """
+    system_block = {'type': 'text', 'text': system_prompt}
+    if cache_system_prompt and prefix_is_cacheable(system_prompt, model_ids):
+        system_block['cache_control'] = {'type': 'ephemeral'}
+
+    return {
+        'anthropic_version': ANTHROPIC_VERSION,
+        'max_tokens': max_tokens,
+        'temperature': temperature,
+        'top_p': top_p,
+        'system': [system_block],
+        'messages': [
+            {'role': 'user', 'content': [{'type': 'text', 'text': build_user_message(question, context, history)}]},
+        ],
+    }
+
+
+def parse_messages_response(response_body):
+    """
+    Extrai o texto e o uso de tokens da resposta da Messages API.
+
+    Returns:
+        tuple: (texto da resposta, dict com input_tokens, output_tokens,
+                cache_read_input_tokens e cache_creation_input_tokens).
+    """
+    text = ''.join(
+        block.get('text', '') for block in response_body.get('content', []) if block.get('type') == 'text'
+    ).strip()
+    usage = response_body.get('usage') or {}
+    return text, {
+        'input_tokens': int(usage.get('input_tokens') or 0),
+        'output_tokens': int(usage.get('output_tokens') or 0),
+        'cache_read_input_tokens': int(usage.get('cache_read_input_tokens') or 0),
+        'cache_creation_input_tokens': int(usage.get('cache_creation_input_tokens') or 0),
+    }
@@ -0,0 +1,66 @@
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # Opcional: sem o pacote, usa o json da biblioteca padrão
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Opcional: sem o pacote, as chamadas ao Backend usam JSON
+    msgpack = None
+
+# --- Codificação do Webhook ---
+# O corpo do evento do API Gateway, a resposta ao Dialogflow e as chamadas ao
+# Backend são (de)serializados com orjson quando disponível, várias vezes mais
+# rápido que o json da biblioteca padrão e com a mesma saída válida (UTF-8 sem
+# escapes). Com DJANGO_API_FORMAT=msgpack as chamadas ao Backend trafegam em
+# MessagePack (negociado pelos cabeçalhos Content-Type/Accept; ver
+# backend_core/tickets/renderers.py).
+
+DJANGO_API_FORMAT = os.environ.get('DJANGO_API_FORMAT', 'json')
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+
+
+def loads(data):
+    """Decodifica JSON (str ou bytes)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj):
+    """Codifica em JSON e retorna str (chaves não textuais são convertidas, como no json padrão)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def api_format():
+    """Formato efetivo das chamadas ao Backend ('msgpack' exige o pacote instalado)."""
+    return 'msgpack' if DJANGO_API_FORMAT == 'msgpack' and msgpack is not None else 'json'
+
+
+def encode_request(payload):
+    """Retorna (corpo em bytes, cabeçalhos) de uma requisição ao Backend."""
+    if api_format() == 'msgpack':
+        return msgpack.packb(payload, use_bin_type=True), {
+            'Content-Type': MSGPACK_MEDIA_TYPE, 'Accept': MSGPACK_MEDIA_TYPE,
+        }
+    return dumps(payload).encode('utf-8'), {'Content-Type': JSON_MEDIA_TYPE, 'Accept': JSON_MEDIA_TYPE}
+
+
+def accept_headers():
+    """Cabeçalhos de requisições sem corpo (ex: GET) no formato configurado."""
+    return {'Accept': MSGPACK_MEDIA_TYPE if api_format() == 'msgpack' else JSON_MEDIA_TYPE}
+
+
+def decode_response(response):
+    """Decodifica a resposta do Backend conforme o Content-Type devolvido."""
+    content_type = response.headers.get('Content-Type', '')
+    if content_type.startswith(MSGPACK_MEDIA_TYPE) and msgpack is not None:
+        return msgpack.unpackb(response.content, raw=False)
+    return loads(response.content)
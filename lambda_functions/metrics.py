@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# --- Métricas do Webhook ---
+# As métricas são publicadas no formato CloudWatch Embedded Metric Format (EMF):
+# uma linha JSON impressa no stdout é convertida em métrica pelo CloudWatch Logs,
+# sem chamadas síncronas à API PutMetricData no caminho da requisição.
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'NexusAI/Webhook')
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+
+# Agregados do processo (sobrevivem entre invocações do mesmo container)
+_counters = defaultdict(float)
+_lock = threading.Lock()
+
+
+def _dimension_key(name, dimensions):
+    return (name,) + tuple(sorted(dimensions.items()))
+
+
+def emit(name, value, unit='Count', **dimensions):
+    """
+    Publica um valor de métrica em EMF e acumula o total no processo.
+
+    Args:
+        name (str): Nome da métrica (ex: 'DegradedResponse').
+        value (float): Valor observado.
+        unit (str): Unidade CloudWatch ('Count', 'Milliseconds', ...).
+        **dimensions: Dimensões da métrica (ex: Intent='duvida_tecnica').
+    """
+    dimensions = {key: str(val) for key, val in dimensions.items()}
+    with _lock:
+        _counters[_dimension_key(name, dimensions)] += value
+
+    if not METRICS_ENABLED:
+        return
+
+    payload = {
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [sorted(dimensions.keys())],
+                'Metrics': [{'Name': name, 'Unit': unit}],
+            }],
+        },
+        name: value,
+        **dimensions,
+    }
+    # print (e não logger) porque o EMF exige a linha JSON pura, sem prefixo de log
+    print(json.dumps(payload))
+
+
+def increment(name, **dimensions):
+    """Atalho para contadores (incrementa em 1)."""
+    emit(name, 1, 'Count', **dimensions)
+
+
+def timing(name, milliseconds, **dimensions):
+    """Atalho para latências em milissegundos."""
+    emit(name, round(milliseconds, 1), 'Milliseconds', **dimensions)
+
+
+def snapshot():
+    """Retorna uma cópia dos agregados do processo, para logs e testes."""
+    with _lock:
+        return {
+            '|'.join([key[0]] + [f"{dim}={val}" for dim, val in key[1:]]): total
+            for key, total in _counters.items()
+        }
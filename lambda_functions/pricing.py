@@ -0,0 +1,98 @@
+import json
+import os
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+
+from retrieval_cache import normalize_query
+
+# --- Motor de Precificação ---
+# As regras de preço ficam em uma tabela JSON (pricing_rules.json) para que o time
+# comercial altere valores sem mudar código. O cálculo é puro e memoizado por
+# (tipo de serviço, parâmetros relevantes), então cotações repetidas não recalculam nada.
+PRICING_RULES_PATH = os.environ.get(
+    'PRICING_RULES_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pricing_rules.json')
+)
+
+CENTS = Decimal('0.01')
+
+
+@lru_cache(maxsize=1)
+def load_rules(path=PRICING_RULES_PATH):
+    """Carrega (uma única vez por container) a tabela de regras de preço."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _match_service(rules, service_type):
+    """Escolhe o serviço cuja palavra-chave aparece no texto informado pelo usuário."""
+    normalized = normalize_query(service_type)
+    for service in rules['services']:
+        if any(normalize_query(keyword) in normalized for keyword in service['keywords']):
+            return service
+    return next(s for s in rules['services'] if s['name'] == rules['default_service'])
+
+
+def _relevant_parameters(rules, parameters):
+    """
+    Reduz os parâmetros do Dialogflow aos usados pelas regras, em forma hashable.
+    Parâmetros irrelevantes (ex: nome do cliente) não fragmentam o cache.
+    """
+    names = {adjustment['parameter'] for adjustment in rules['adjustments']}
+    return tuple(sorted(
+        (name, str(value).strip().lower()) for name, value in (parameters or {}).items()
+        if name in names and value not in (None, '')
+    ))
+
+
+@lru_cache(maxsize=1024)
+def _quote_cached(service_type, frozen_parameters):
+    rules = load_rules()
+    service = _match_service(rules, service_type)
+    parameters = dict(frozen_parameters)
+
+    total = Decimal(service['base_price'])
+    items = [{'description': service['name'], 'value': str(total.quantize(CENTS))}]
+
+    for adjustment in rules['adjustments']:
+        value = parameters.get(adjustment['parameter'])
+        if value is None:
+            continue
+        if 'multiplier' in adjustment:
+            if normalize_query(value) in {normalize_query(v) for v in adjustment.get('values', [])}:
+                extra = total * (Decimal(adjustment['multiplier']) - 1)
+                total += extra
+                items.append({'description': adjustment['description'], 'value': str(extra.quantize(CENTS))})
+        elif 'unit_price' in adjustment:
+            try:
+                units = Decimal(value) - adjustment.get('included_units', 0)
+                # NaN e infinito ("NaN" no corpo JSON) não são quantidades: ignorados como texto inválido
+                valid = units.is_finite()
+            except ArithmeticError:
+                valid = False
+            if valid and units > 0:
+                extra = units * Decimal(adjustment['unit_price'])
+                total += extra
+                items.append({'description': adjustment['description'], 'value': str(extra.quantize(CENTS))})
+
+    return {
+        'service_name': service['name'],
+        'total_value': str(total.quantize(CENTS, rounding=ROUND_HALF_UP)),
+        'items': items,
+    }
+
+
+def quote(service_type, parameters=None):
+    """
+    Calcula o orçamento de um serviço.
+
+    Args:
+        service_type (str): Texto do tipo de serviço informado pelo usuário.
+        parameters (dict, optional): Parâmetros do Dialogflow (urgencia, horas_adicionais, ...).
+
+    Returns:
+        dict: service_name, total_value (string decimal) e itens que compõem o valor.
+    """
+    rules = load_rules()
+    result = _quote_cached(normalize_query(service_type), _relevant_parameters(rules, parameters))
+    # Cópia rasa: o resultado memoizado é compartilhado e não pode ser alterado pelo chamador
+    return {**result, 'items': [dict(item) for item in result['items']]}
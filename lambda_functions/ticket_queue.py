@@ -0,0 +1,88 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# --- Fila de Criação de Chamados ---
+# No modo assíncrono o Webhook apenas grava a solicitação na fila e devolve um
+# protocolo provisório; o comando `drain_ticket_queue` do Backend consome a fila
+# em lotes. Produção usa Amazon SQS; localmente um arquivo SQLite faz o papel da fila.
+#
+# O schema SQLite deve permanecer idêntico ao de backend_core/tickets/ticket_queue.py.
+TICKET_QUEUE_URL = os.environ.get('TICKET_QUEUE_URL')
+TICKET_QUEUE_PATH = os.environ.get('TICKET_QUEUE_PATH')
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticket_queue (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reference TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL
+)
+"""
+
+
+def new_provisional_reference():
+    """Gera o protocolo provisório devolvido ao usuário antes da gravação no banco."""
+    return f"PRV-{uuid.uuid4().hex[:10].upper()}"
+
+
+class SQSTicketQueue:
+    """Produtor da fila em produção (Amazon SQS)."""
+
+    def __init__(self, queue_url, client=None):
+        self.queue_url = queue_url
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('sqs')
+        return self._client
+
+    def enqueue(self, payload):
+        self.client.send_message(QueueUrl=self.queue_url, MessageBody=json.dumps(payload))
+
+
+class SQLiteTicketQueue:
+    """Substituto local e durável da fila: um arquivo SQLite em modo WAL."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(SQLITE_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        # WAL permite que o consumidor leia enquanto o Webhook grava
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def enqueue(self, payload):
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT INTO ticket_queue (reference, payload, enqueued_at) VALUES (?, ?, ?)',
+                (payload['provisional_reference'], json.dumps(payload), time.time()),
+            )
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_ticket_queue():
+    """
+    Retorna a fila configurada no ambiente (SQS tem prioridade sobre SQLite)
+    ou None se nenhuma estiver configurada.
+    """
+    global _queue
+    if _queue is None and (TICKET_QUEUE_URL or TICKET_QUEUE_PATH):
+        with _queue_lock:
+            if _queue is None:
+                _queue = SQSTicketQueue(TICKET_QUEUE_URL) if TICKET_QUEUE_URL else SQLiteTicketQueue(TICKET_QUEUE_PATH)
+    return _queue
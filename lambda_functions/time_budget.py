@@ -0,0 +1,80 @@
+import os
+import time
+from contextlib import contextmanager
+
+# --- Orçamento de Tempo do Webhook ---
+# O Dialogflow ES aguarda no máximo ~5s pela resposta do Webhook. Se esse limite
+# for ultrapassado, o usuário recebe a mensagem de erro padrão do agente, idêntica
+# a uma falha. Este módulo distribui o tempo restante entre as etapas do fluxo.
+
+# Limite de tempo do Webhook imposto pelo Dialogflow ES (ms)
+DIALOGFLOW_WEBHOOK_TIMEOUT_MS = int(os.environ.get('DIALOGFLOW_WEBHOOK_TIMEOUT_MS', '5000'))
+
+# Margem (ms) reservada para serializar e devolver a resposta
+RESPONSE_MARGIN_MS = int(os.environ.get('RESPONSE_MARGIN_MS', '500'))
+
+
+class TimeBudget:
+    """
+    Prazo absoluto de uma requisição, consultado e repartido entre as etapas.
+
+    O prazo é o menor entre o tempo restante do Lambda e o limite do Dialogflow,
+    descontada a margem de resposta. Cada etapa pede uma fração do que resta,
+    de modo que atrasos nas etapas iniciais encolhem automaticamente as seguintes.
+    """
+
+    def __init__(self, total_seconds, clock=time.monotonic):
+        self._clock = clock
+        self.started_at = clock()
+        self.deadline = self.started_at + max(0.0, total_seconds)
+        # Duração (ms) de cada etapa executada via stage()
+        self.timings = {}
+
+    @classmethod
+    def from_context(cls, context, webhook_timeout_ms=DIALOGFLOW_WEBHOOK_TIMEOUT_MS,
+                     margin_ms=RESPONSE_MARGIN_MS):
+        """
+        Cria o orçamento a partir do objeto de contexto do Lambda.
+        Fora do Lambda (context None), usa apenas o limite do Dialogflow.
+        """
+        available_ms = webhook_timeout_ms
+        if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+            available_ms = min(available_ms, context.get_remaining_time_in_millis())
+        return cls((available_ms - margin_ms) / 1000.0)
+
+    def remaining(self):
+        """Segundos restantes até o prazo (nunca negativo)."""
+        return max(0.0, self.deadline - self._clock())
+
+    def elapsed_ms(self):
+        """Milissegundos decorridos desde a criação do orçamento."""
+        return (self._clock() - self.started_at) * 1000.0
+
+    def allocate(self, share, cap=None):
+        """
+        Reserva uma fração do tempo restante para a próxima etapa.
+
+        Args:
+            share (float): Fração (0-1] do tempo restante.
+            cap (float, optional): Teto em segundos para a etapa.
+
+        Returns:
+            float: Segundos concedidos à etapa.
+        """
+        seconds = self.remaining() * share
+        if cap is not None:
+            seconds = min(seconds, cap)
+        return seconds
+
+    def can_afford(self, seconds):
+        """Indica se ainda há pelo menos `seconds` disponíveis."""
+        return self.remaining() >= seconds
+
+    @contextmanager
+    def stage(self, name):
+        """Mede a duração de uma etapa e a registra em `timings`."""
+        stage_started = self._clock()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((self._clock() - stage_started) * 1000.0, 1)
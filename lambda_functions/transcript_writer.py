@@ -0,0 +1,141 @@
+import collections
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- Gravação em Lote de Transcrições do Chat ---
+# A requisição apenas coloca o registro (pergunta, documentos recuperados,
+# tempos por etapa e uso de tokens) em um buffer em memória. Uma thread de fundo
+# grava os registros em lotes quando o buffer atinge TRANSCRIPT_BATCH_SIZE ou o
+# registro mais antigo espera TRANSCRIPT_FLUSH_INTERVAL segundos. O buffer tem
+# tamanho máximo. Quando está cheio, o produtor espera no máximo
+# TRANSCRIPT_SUBMIT_TIMEOUT segundos por espaço; se ainda não houver, o registro
+# é descartado e contabilizado. A resposta ao usuário nunca espera pelo banco.
+# Mantenha sincronizado com backend_core/tickets/transcript_writer.py.
+
+TRANSCRIPTS_ENABLED = os.environ.get('TRANSCRIPTS_ENABLED', 'True') == 'True'
+TRANSCRIPT_BATCH_SIZE = int(os.environ.get('TRANSCRIPT_BATCH_SIZE', '100'))
+TRANSCRIPT_FLUSH_INTERVAL = float(os.environ.get('TRANSCRIPT_FLUSH_INTERVAL', '2'))
+TRANSCRIPT_MAX_PENDING = int(os.environ.get('TRANSCRIPT_MAX_PENDING', '5000'))
+TRANSCRIPT_SUBMIT_TIMEOUT = float(os.environ.get('TRANSCRIPT_SUBMIT_TIMEOUT', '0.05'))
+
+
+class BatchWriter:
+    """
+    Buffer limitado com gravação em lotes por uma thread de fundo.
+
+    `write(records)` recebe uma lista de registros e os persiste (ex: bulk_create).
+    Um lote que falha é descartado e contabilizado em `failed`; os seguintes continuam.
+    """
+
+    def __init__(self, write, batch_size=TRANSCRIPT_BATCH_SIZE, flush_interval=TRANSCRIPT_FLUSH_INTERVAL,
+                 max_pending=TRANSCRIPT_MAX_PENDING, submit_timeout=TRANSCRIPT_SUBMIT_TIMEOUT,
+                 name='transcript-writer', clock=time.monotonic):
+        self._write = write
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self.name = name
+        self._clock = clock
+        self._pending = collections.deque()
+        self._oldest_at = None
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread = None
+        self._condition = threading.Condition()
+        self._stats = {'submitted': 0, 'written': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+    def submit(self, record):
+        """Enfileira o registro; retorna False se foi descartado (buffer cheio ou writer encerrado)."""
+        with self._condition:
+            deadline = self._clock() + self.submit_timeout
+            while not self._closed and len(self._pending) >= self.max_pending:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if self._closed or len(self._pending) >= self.max_pending:
+                self._stats['dropped'] += 1
+                return False
+            if not self._pending:
+                self._oldest_at = self._clock()
+            self._pending.append(record)
+            self._stats['submitted'] += 1
+            self._ensure_started()
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+            return True
+
+    def flush(self, timeout=None):
+        """Grava imediatamente o que estiver pendente; retorna False se o prazo acabar antes."""
+        with self._condition:
+            if self._thread is None:
+                return not self._pending
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self, timeout=5.0):
+        """Recusa novos registros, grava os pendentes e encerra a thread (ex: atexit)."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        with self._condition:
+            return dict(self._stats, pending=len(self._pending) + self._in_flight)
+
+    def _ensure_started(self):
+        # Iniciada no primeiro registro: em servidores com fork, cada worker tem a sua
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _next_batch(self):
+        """Aguarda até haver um lote pronto; retorna None quando o writer foi encerrado e está vazio."""
+        with self._condition:
+            while not self._closed and not self._flush_requested and len(self._pending) < self.batch_size:
+                if not self._pending:
+                    self._condition.wait()
+                    continue
+                remaining = self._oldest_at + self.flush_interval - self._clock()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if not self._pending:
+                self._flush_requested = False
+                self._condition.notify_all()
+                return None if self._closed else []
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            self._oldest_at = self._clock() if self._pending else None
+            self._in_flight = len(batch)
+            # Libera produtores que aguardam espaço no buffer
+            self._condition.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+                outcome = 'written'
+            except Exception as e:
+                logger.error(f"Falha ao gravar lote de {len(batch)} registros ({self.name}): {e}")
+                outcome = 'failed'
+            with self._condition:
+                self._stats[outcome] += len(batch)
+                self._stats['batches'] += 1
+                self._in_flight = 0
+                self._condition.notify_all()
@@ -0,0 +1,66 @@
+import logging
+import os
+import time
+
+logger = logging.getLogger()
+
+# --- Aquecimento do Container (warm-up) ---
+# Eventos agendados (regra do EventBridge) e invocações de aquecimento não trazem
+# 'body' do Dialogflow. Em vez de seguir o fluxo normal, o handler executa as
+# etapas de aquecimento: cria e verifica os clientes (Bedrock, OpenSearch, sessão
+# HTTP do Backend), carrega os caches locais e monta os prompts, sem invocar o
+# modelo. Com concorrência provisionada o aquecimento roda já na inicialização do
+# container (AWS_LAMBDA_INITIALIZATION_TYPE), antes da primeira requisição real.
+
+WARMUP_ON_INIT = os.environ.get('WARMUP_ON_INIT', 'True') == 'True'
+# Prazo (s) de cada chamada de rede feita durante o aquecimento
+WARMUP_STEP_TIMEOUT = float(os.environ.get('WARMUP_STEP_TIMEOUT', '2.0'))
+
+# Origem dos eventos de aquecimento reconhecidos (além de {"warmup": true})
+WARMUP_SOURCES = {'aws.events', 'serverless-plugin-warmup'}
+
+
+def is_warmup_event(event):
+    """
+    Indica se o evento é de aquecimento: {"warmup": true}, evento agendado do
+    EventBridge ou do serverless-plugin-warmup. Requisições do Dialogflow (com 'body') nunca são.
+    """
+    if not isinstance(event, dict) or 'body' in event:
+        return False
+    return bool(event.get('warmup')) or event.get('source') in WARMUP_SOURCES
+
+
+def is_provisioned_init():
+    """Container sendo inicializado para concorrência provisionada."""
+    return os.environ.get('AWS_LAMBDA_INITIALIZATION_TYPE') == 'provisioned-concurrency'
+
+
+def run_warmup(steps, clock=time.perf_counter):
+    """
+    Executa as etapas de aquecimento em ordem; a falha de uma etapa não interrompe as demais.
+
+    Args:
+        steps (list): Pares (nome, função sem argumentos). O retorno da função, se
+            houver, é incluído no relatório como 'detail'.
+
+    Returns:
+        dict: {'ready': bool, 'total_ms': float, 'steps': {nome: {'ok', 'ms', 'detail'|'error'}}}.
+    """
+    started = clock()
+    report = {}
+    for name, step in steps:
+        step_started = clock()
+        try:
+            detail = step()
+            report[name] = {'ok': True}
+            if detail is not None:
+                report[name]['detail'] = detail
+        except Exception as e:
+            logger.warning(f"Falha na etapa de aquecimento '{name}': {e}")
+            report[name] = {'ok': False, 'error': str(e)}
+        report[name]['ms'] = round((clock() - step_started) * 1000, 1)
+    return {
+        'ready': all(result['ok'] for result in report.values()),
+        'total_ms': round((clock() - started) * 1000, 1),
+        'steps': report,
+    }
@@ -1,10 +1,27 @@
-import json
 import boto3
 import os
 import logging
+import math
+import threading
+import time
 import requests
+from datetime import datetime, timezone
 from opensearchpy import OpenSearch, RequestsHttpConnection
 from requests_aws4auth import AWS4Auth
+import json_codec
+import metrics
+from answer_cache import AnswerCache
+from bedrock_client import BedrockUnavailableError, get_default_invoker
+from bedrock_messages import USAGE_METRICS, build_messages_body, parse_messages_response
+from faq_store import FAQ_ENABLED, FaqStore
+from pricing import load_rules, quote
+from reranker import RERANK_CANDIDATES, RERANK_ENABLED, RERANK_TOP_N, get_default_reranker
+from retrieval_cache import RETRIEVAL_CACHE_ENABLED, IndexGenerationTracker, RetrievalCache, fetch_index_generation
+from ticket_queue import get_ticket_queue, new_provisional_reference
+from time_budget import DIALOGFLOW_WEBHOOK_TIMEOUT_MS, TimeBudget
+from token_usage import get_default_accountant
+from transcript_writer import TRANSCRIPTS_ENABLED, BatchWriter
+from warmup import WARMUP_ON_INIT, WARMUP_STEP_TIMEOUT, is_provisioned_init, is_warmup_event, run_warmup
 
 # Configuração de Logs para monitoramento no CloudWatch
 # O nível de log INFO é adequado para ambientes de produção.
@@ -18,16 +35,94 @@ logger.setLevel(logging.INFO)
 BEDROCK_REGION = os.environ.get('BEDROCK_REGION', 'us-east-1')
 OPENSEARCH_HOST = os.environ.get('OPENSEARCH_HOST')
 OPENSEARCH_INDEX = os.environ.get('OPENSEARCH_INDEX', 'knowledge-base')
+# Porta/SSL do OpenSearch (padrão do domínio gerenciado; alteráveis para ambientes locais)
+OPENSEARCH_PORT = int(os.environ.get('OPENSEARCH_PORT', '443'))
+OPENSEARCH_USE_SSL = os.environ.get('OPENSEARCH_USE_SSL', 'True') == 'True'
 DJANGO_API_URL = os.environ.get('DJANGO_API_URL', 'http://localhost:8000/api') # URL base da API Django
+# Modo de criação de chamados: 'sync' (POST direto no Django) ou 'async' (fila + protocolo provisório)
+TICKET_CREATION_MODE = os.environ.get('TICKET_CREATION_MODE', 'sync')
+
+# --- Orçamento de Tempo do Fluxo RAG ---
+# Fração do tempo restante concedida à busca no OpenSearch (com teto em segundos)
+RETRIEVAL_BUDGET_SHARE = float(os.environ.get('RETRIEVAL_BUDGET_SHARE', '0.35'))
+RETRIEVAL_MAX_SECONDS = float(os.environ.get('RETRIEVAL_MAX_SECONDS', '1.5'))
+# Tempos mínimos para que valha a pena iniciar cada etapa
+MIN_RETRIEVAL_SECONDS = float(os.environ.get('MIN_RETRIEVAL_SECONDS', '0.3'))
+MIN_GENERATION_SECONDS = float(os.environ.get('MIN_GENERATION_SECONDS', '1.5'))
+# Prazo (s) da carga da lista de respostas pré-geradas (FAQ) do Backend
+FAQ_FETCH_TIMEOUT = float(os.environ.get('FAQ_FETCH_TIMEOUT', '1.0'))
+# Prazo (s) do envio de um lote de transcrições ao Backend (feito em segundo plano)
+TRANSCRIPT_POST_TIMEOUT = float(os.environ.get('TRANSCRIPT_POST_TIMEOUT', '3.0'))
+# Evento do Dialogflow usado para adiar a resposta (reinvoca o Webhook com um novo prazo)
+FOLLOWUP_EVENT_NAME = os.environ.get('FOLLOWUP_EVENT_NAME', 'RESPOSTA_PENDENTE')
+# Intervalo (s) entre as linhas 'resumo_tokens' com os totais de tokens do container (0 desliga)
+TOKEN_SUMMARY_INTERVAL = float(os.environ.get('TOKEN_SUMMARY_INTERVAL', '300'))
 
 # --- Inicialização de Clientes AWS ---
-# Inicializa o cliente do AWS Bedrock Runtime.
-# Este cliente é responsável por invocar os modelos de IA (Foundation Models) para inferência.
-bedrock_client = boto3.client(service_name='bedrock-runtime', region_name=BEDROCK_REGION)
+# O invocador do Bedrock reutiliza os clientes (um por read timeout, derivado do prazo),
+# limita a concorrência do processo e aplica fallback entre modelos (ver bedrock_client.py).
+bedrock_invoker = get_default_invoker()
+
+# Cache das últimas respostas geradas neste container (primeira opção de degradação)
+answer_cache = AnswerCache()
+
+# Cache dos documentos recuperados, invalidado pela geração do índice (ver retrieval_cache.py)
+retrieval_cache = RetrievalCache()
+index_generation = IndexGenerationTracker()
+
+# Sessão HTTP do Backend reutilizada entre invocações (conexões keep-alive no pool do urllib3)
+http_session = requests.Session()
+
+def django_api(method, path, payload=None, timeout=None):
+    """
+    Requisição à API do Backend no formato de DJANGO_API_FORMAT (JSON ou MessagePack).
+    O corpo da resposta é lido com json_codec.decode_response.
+    """
+    if payload is None:
+        data, headers = None, json_codec.accept_headers()
+    else:
+        data, headers = json_codec.encode_request(payload)
+    return http_session.request(method, f"{DJANGO_API_URL}{path}", data=data, headers=headers, timeout=timeout)
+
+def fetch_faq_entries():
+    """Lista de respostas pré-geradas do Backend (comando pregenerate_faq)."""
+    response = django_api('GET', '/faq/', timeout=FAQ_FETCH_TIMEOUT)
+    response.raise_for_status()
+    return json_codec.decode_response(response)
+
+# Respostas pré-geradas das perguntas frequentes, recarregadas periodicamente (ver faq_store.py)
+faq_store = FaqStore(fetch_faq_entries)
+
+def post_transcripts(records):
+    """Envia um lote de transcrições ao Backend (POST /api/transcripts/)."""
+    response = django_api('POST', '/transcripts/', records, timeout=TRANSCRIPT_POST_TIMEOUT)
+    response.raise_for_status()
+
+# Transcrições das dúvidas técnicas, enviadas em lote por uma thread de fundo (ver transcript_writer.py).
+# O Lambda congela o container entre invocações: o envio pendente continua na invocação
+# seguinte, e registros ainda no buffer quando o container é reciclado são perdidos.
+transcript_writer = BatchWriter(post_transcripts)
+
+# Cliente OpenSearch compartilhado pelo container (criado na primeira busca ou no aquecimento)
+_opensearch_client = None
+_opensearch_client_lock = threading.Lock()
 
 def get_opensearch_client():
     """
-    Cria e retorna um cliente OpenSearch configurado com autenticação AWS (SigV4).
+    Retorna o cliente OpenSearch do container, criando-o na primeira chamada.
+    Reutilizar o cliente mantém as conexões TLS abertas entre invocações; as credenciais
+    do Lambda (variáveis de ambiente da Role) valem por toda a vida do container.
+    """
+    global _opensearch_client
+    if _opensearch_client is None:
+        with _opensearch_client_lock:
+            if _opensearch_client is None:
+                _opensearch_client = create_opensearch_client()
+    return _opensearch_client
+
+def create_opensearch_client():
+    """
+    Cria um cliente OpenSearch configurado com autenticação AWS (SigV4).
     A autenticação SigV4 é necessária para acessar domínios do OpenSearch protegidos por políticas IAM.
     """
     region = os.environ.get('AWS_REGION', 'us-east-1')
@@ -39,10 +134,10 @@ def get_opensearch_client():
 
     # Criação do cliente OpenSearch de baixo nível
     client = OpenSearch(
-        hosts=[{'host': OPENSEARCH_HOST, 'port': 443}],
+        hosts=[{'host': OPENSEARCH_HOST, 'port': OPENSEARCH_PORT}],
         http_auth=awsauth,
-        use_ssl=True,
-        verify_certs=True,
+        use_ssl=OPENSEARCH_USE_SSL,
+        verify_certs=OPENSEARCH_USE_SSL,
         connection_class=RequestsHttpConnection
     )
     return client
@@ -52,12 +147,19 @@ def lambda_handler(event, context):
     Função principal (Entry Point) do AWS Lambda para o Webhook do Dialogflow.
     Recebe eventos JSON do Dialogflow, processa a intenção detectada e retorna uma resposta formatada.
     """
-    logger.info(f"Evento recebido: {json.dumps(event)}")
+    # Eventos agendados/de aquecimento não vêm do Dialogflow: apenas preparam o container
+    if is_warmup_event(event):
+        return handle_warmup()
+
+    logger.info(f"Evento recebido: {json_codec.dumps(event)}")
+
+    # Prazo desta requisição: o menor entre o tempo restante do Lambda e o limite do Dialogflow
+    budget = TimeBudget.from_context(context)
 
     try:
         # --- Parsing do Evento ---
         # Extrai o corpo da requisição, que contém os detalhes da conversa do Dialogflow
-        body = json.loads(event['body'])
+        body = json_codec.loads(event['body'])
         query_result = body.get('queryResult', {})
         
         # Identifica a intenção (Intent) detectada pelo Dialogflow
@@ -75,23 +177,37 @@ def lambda_handler(event, context):
         # Direciona o fluxo de execução com base na intenção identificada
         if intent_name == 'duvida_tecnica':
             # Caso seja uma dúvida técnica, aciona o fluxo RAG (Retrieval-Augmented Generation)
-            response_text = handle_rag_query(user_query)
+            response_text = handle_rag_query(
+                user_query, budget=budget, session_id=body.get('session'), intent=intent_name, client=request_client(body)
+            )
+
+        elif intent_name == 'duvida_tecnica_continuacao':
+            # Reentrada via evento de follow-up: a pergunta original chega como parâmetro.
+            # Não é permitido adiar novamente, evitando ciclos de eventos.
+            original_query = parameters.get('query') or user_query
+            response_text = handle_rag_query(
+                original_query, budget=budget, allow_defer=False, session_id=body.get('session'),
+                intent=intent_name, client=request_client(body)
+            )
         
         elif intent_name == 'abrir_chamado':
             # Caso seja solicitação de abertura de chamado, integra com o Backend Django
-            response_text = handle_create_ticket(parameters)
+            response_text = handle_create_ticket(parameters, budget=budget)
             
         elif intent_name == 'gerar_orcamento':
             # Caso seja solicitação de orçamento, executa a lógica de precificação
-            response_text = handle_budget_quote(parameters)
+            response_text = handle_budget_quote(parameters, budget=budget)
 
         # --- Resposta para o Dialogflow ---
-        # Formata a resposta no padrão esperado pelo Webhook do Dialogflow ES
+        # Formata a resposta no padrão esperado pelo Webhook do Dialogflow ES.
+        # Handlers podem devolver um dicionário completo (ex: followupEventInput).
+        if isinstance(response_text, dict):
+            fulfillment = response_text
+        else:
+            fulfillment = {'fulfillmentText': response_text}
         return {
             'statusCode': 200,
-            'body': json.dumps({
-                'fulfillmentText': response_text
-            })
+            'body': json_codec.dumps(fulfillment)
         }
 
     except Exception as e:
@@ -100,13 +216,90 @@ def lambda_handler(event, context):
         # Retorna uma mensagem de erro genérica para o usuário final
         return {
             'statusCode': 500,
-            'body': json.dumps({'fulfillmentText': 'Erro interno no servidor Nexus AI. Por favor, tente novamente mais tarde.'})
+            'body': json_codec.dumps({'fulfillmentText': 'Erro interno no servidor Nexus AI. Por favor, tente novamente mais tarde.'})
         }
 
-def search_opensearch(query):
+def request_client(body):
+    """Integração de origem da requisição (ex: 'telegram'); 'dialogflow' para o console e a API."""
+    return (body.get('originalDetectIntentRequest') or {}).get('source') or 'dialogflow'
+
+def handle_warmup():
+    """Executa o aquecimento e devolve os tempos de cada etapa (503 se alguma falhou)."""
+    report = warm_up()
+    return {
+        'statusCode': 200 if report['ready'] else 503,
+        'body': json_codec.dumps(dict(report, warmup=True)),
+    }
+
+def warm_up():
+    """
+    Prepara o container sem invocar o modelo: clientes, conexões, caches e prompts.
+    Cada etapa é medida separadamente (ver warmup.run_warmup).
+    """
+    steps = [('bedrock', warm_bedrock), ('django', warm_django), ('prompts', warm_prompts),
+             ('pricing', warm_pricing), ('reranker', warm_reranker)]
+    if OPENSEARCH_HOST:
+        steps.insert(1, ('opensearch', warm_opensearch))
+    if TICKET_CREATION_MODE == 'async':
+        steps.append(('ticket_queue', warm_ticket_queue))
+
+    report = run_warmup(steps)
+    metrics.timing('WarmupLatency', report['total_ms'], Ready=report['ready'])
+    logger.info(f"Aquecimento concluído: {json_codec.dumps(report)}")
+    return report
+
+def warm_bedrock():
+    """Cria os clientes do Bedrock (um por read timeout cabível no prazo do Dialogflow) e resolve as credenciais."""
+    for seconds in range(1, math.ceil(DIALOGFLOW_WEBHOOK_TIMEOUT_MS / 1000) + 1):
+        bedrock_invoker.client_for(seconds)
+    if boto3.Session().get_credentials() is None:
+        raise RuntimeError("Credenciais AWS não encontradas para o Bedrock.")
+    return {'models': bedrock_invoker.model_ids}
+
+def warm_opensearch():
+    """Abre a conexão com o cluster e consulta a geração atual do índice."""
+    client = get_opensearch_client()
+    if not client.ping(request_timeout=WARMUP_STEP_TIMEOUT):
+        raise RuntimeError(f"OpenSearch não respondeu em {OPENSEARCH_HOST}.")
+    return {'index_generation': current_index_generation(client, timeout=WARMUP_STEP_TIMEOUT)}
+
+def warm_django():
+    """Abre a sessão HTTP com o Backend carregando as respostas pré-geradas (FAQ)."""
+    entries = fetch_faq_entries()
+    if FAQ_ENABLED:
+        faq_store.load(entries)
+    return {'faq_entries': len(entries)}
+
+def warm_prompts():
+    """Monta e serializa um corpo de requisição completo (prompt de sistema e mensagem)."""
+    return {'bytes': len(json_codec.dumps(build_messages_body('aquecimento', 'aquecimento', model_ids=bedrock_invoker.model_ids)))}
+
+def warm_pricing():
+    """Carrega a tabela de preços e calcula a cotação padrão (memoizada)."""
+    load_rules()
+    return {'total_value': quote('Consultoria Padrão')['total_value']}
+
+def warm_reranker():
+    """Cria o reranker e executa uma reordenação mínima."""
+    passages = [{'id': '1', 'content': 'Reinicie o servidor pelo painel.'}, {'id': '2', 'content': 'Erro de acesso.'}]
+    get_default_reranker().rerank('como reiniciar o servidor', passages, top_n=1)
+
+def warm_ticket_queue():
+    """Cria o produtor da fila de chamados (cliente SQS ou arquivo SQLite)."""
+    queue = get_ticket_queue()
+    if queue is None:
+        raise RuntimeError("Modo assíncrono sem fila configurada.")
+    if hasattr(queue, 'client'):
+        # Propriedade preguiçosa: cria o cliente boto3 do SQS
+        queue.client
+    return {'queue': type(queue).__name__}
+
+def search_opensearch(query, timeout=None, trace=None):
     """
     Executa uma busca no Amazon OpenSearch para encontrar documentos relevantes.
     Serve como a etapa de "Recuperação" (Retrieval) no pipeline RAG.
+    O parâmetro `timeout` (segundos) limita a espera pela resposta do cluster.
+    Com `trace` (dicionário), registra os ids dos documentos usados em trace['doc_ids'].
     """
     # Verifica se o host do OpenSearch está configurado
     if not OPENSEARCH_HOST:
@@ -114,12 +307,32 @@ def search_opensearch(query):
         return "Manual técnico do servidor: Reinicie o serviço se a luz vermelha piscar."
 
     client = get_opensearch_client()
-    
+
+    # Cache de recuperação: mesma pergunta normalizada e mesma geração do índice
+    # devolvem os mesmos documentos (sem geração conhecida, o cache é ignorado)
+    cache_key = None
+    if RETRIEVAL_CACHE_ENABLED:
+        generation = current_index_generation(client, timeout=timeout)
+        if generation is not None:
+            cache_key = RetrievalCache.key(
+                query, OPENSEARCH_INDEX, generation, ('match', RERANK_ENABLED, RERANK_CANDIDATES, RERANK_TOP_N)
+            )
+            passages = retrieval_cache.get(cache_key)
+            metrics.increment('RetrievalCache', Result='hit' if passages is not None else 'miss')
+            if passages is not None:
+                if trace is not None:
+                    trace['doc_ids'] = [passage['id'] for passage in passages]
+                return "\n\n".join(passage['content'] for passage in passages)
+        else:
+            metrics.increment('RetrievalCache', Result='bypass')
+
     # Constrói a query DSL do OpenSearch.
     # Em um cenário ideal, usaríamos busca vetorial (k-NN) comparando embeddings.
     # Aqui, usamos uma busca textual simples (match) para simplificação do exemplo.
+    # Com o rerank ativo, busca um conjunto maior de candidatos e mantém os melhores (ver reranker.py).
     search_query = {
-        "size": 3, # Retorna os top 3 documentos mais relevantes
+        "size": RERANK_CANDIDATES if RERANK_ENABLED else RERANK_TOP_N,
+        "_source": ["content"],
         "query": {
             "match": {
                 "content": query # Busca o termo da query no campo 'content' dos documentos
@@ -129,70 +342,254 @@ def search_opensearch(query):
 
     try:
         # Executa a busca no índice configurado
+        search_kwargs = {'request_timeout': timeout} if timeout else {}
         response = client.search(
             body=search_query,
-            index=OPENSEARCH_INDEX
+            index=OPENSEARCH_INDEX,
+            **search_kwargs
         )
         
         # Processa os resultados (hits)
-        hits = response['hits']['hits']
+        passages = [
+            {'id': hit['_id'], 'content': hit['_source']['content'], 'score': hit.get('_score')}
+            for hit in response['hits']['hits']
+        ]
+        if RERANK_ENABLED and len(passages) > RERANK_TOP_N:
+            result = get_default_reranker().rerank(query, passages)
+            metrics.timing('RerankLatency', result.elapsed_ms, Complete=result.complete)
+            passages = result.passages
+        passages = passages[:RERANK_TOP_N]
+        if cache_key is not None:
+            retrieval_cache.set(cache_key, passages)
+        if trace is not None:
+            trace['doc_ids'] = [passage['id'] for passage in passages]
         # Concatena o conteúdo dos documentos encontrados para formar o contexto
-        context_parts = [hit['_source']['content'] for hit in hits]
-        return "\n\n".join(context_parts)
+        return "\n\n".join(passage['content'] for passage in passages)
     except Exception as e:
         logger.error(f"Erro na busca do OpenSearch: {e}")
         return ""
 
-def handle_rag_query(query):
+def current_index_generation(client, timeout=None):
+    """Geração atual do índice (consultada no máximo a cada INDEX_GENERATION_TTL_SECONDS) ou None."""
+    return index_generation.current(lambda: fetch_index_generation(client, OPENSEARCH_INDEX, timeout=timeout))
+
+def lookup_faq_answer(query, timeout=None):
+    """
+    Resposta pré-gerada para a pergunta, válida na geração atual do índice, ou None.
+    Sem OpenSearch configurado não há geração conhecida e nada é servido.
+    """
+    if not FAQ_ENABLED or not OPENSEARCH_HOST:
+        return None
+    try:
+        entry = faq_store.lookup(query, current_index_generation(get_opensearch_client(), timeout=timeout))
+    except Exception as e:
+        logger.error(f"Erro na consulta das respostas pré-geradas: {e}")
+        return None
+    metrics.increment('FaqAnswer', Result='hit' if entry else 'miss')
+    return entry['answer'] if entry else None
+
+def handle_rag_query(query, budget=None, allow_defer=True, session_id=None, intent='duvida_tecnica', client=None):
     """
     Fluxo RAG (Retrieval-Augmented Generation) completo:
     1. Retrieval: Busca informações relevantes na base de conhecimento (OpenSearch).
     2. Augmentation: Constrói um prompt enriquecido com o contexto recuperado.
     3. Generation: Envia o prompt para o LLM (Claude) gerar a resposta final.
+
+    Cada etapa recebe uma fração do orçamento de tempo (`budget`). Quando o tempo
+    restante não comporta a próxima etapa, o fluxo degrada para caminhos mais
+    baratos (ver degraded_rag_response) em vez de estourar o prazo do Dialogflow.
+    A transcrição (documentos, tempos por etapa e tokens) é enviada em segundo plano.
+    O uso de tokens e o custo são contabilizados por intenção e cliente (`intent`, `client`).
     """
-    # Passo 1: Recuperação de Contexto
-    context_docs = search_opensearch(query)
-    
+    if budget is None:
+        budget = TimeBudget.from_context(None)
+
+    trace = {'outcome': 'error', 'doc_ids': [], 'intent': intent, 'client': client}
+    response = None
+    try:
+        response = run_rag_pipeline(query, budget, allow_defer, trace)
+        return response
+    finally:
+        record_transcript(query, response, budget, trace, session_id)
+
+def record_transcript(query, response, budget, trace, session_id=None):
+    """Enfileira a transcrição da pergunta no writer de fundo (nunca bloqueia a resposta)."""
+    if not TRANSCRIPTS_ENABLED:
+        return
+    usage = trace.get('usage') or {}
+    record = {
+        'source': 'webhook',
+        'session_id': (session_id or '')[:255],
+        'query': query or '',
+        # Respostas adiadas (evento de follow-up) não têm texto
+        'answer': response if isinstance(response, str) else '',
+        'outcome': trace['outcome'],
+        'doc_ids': trace['doc_ids'],
+        'timings': dict(budget.timings, total=round(budget.elapsed_ms(), 1)),
+        'model_id': trace.get('model_id', ''),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        **{name: value for name, value in usage.items() if name in USAGE_METRICS},
+    }
+    if not transcript_writer.submit(record):
+        metrics.increment('TranscriptDropped')
+
+def run_rag_pipeline(query, budget, allow_defer, trace):
+    """Etapas do fluxo RAG de handle_rag_query; registra o resultado em `trace`."""
+    # Registro estruturado da pergunta (fonte do comando pregenerate_faq do Backend)
+    logger.info(json_codec.dumps({'evento': 'pergunta_rag', 'origem': 'webhook', 'pergunta': query}))
+
+    # Passo 0: Pergunta frequente com resposta pré-gerada (sem busca nem geração)
+    with budget.stage('faq'):
+        faq_answer = lookup_faq_answer(
+            query, timeout=budget.allocate(RETRIEVAL_BUDGET_SHARE, cap=RETRIEVAL_MAX_SECONDS)
+        )
+    if faq_answer is not None:
+        trace['outcome'] = 'faq'
+        return faq_answer
+
+    # Sem tempo nem para a busca: responde direto pelo caminho degradado
+    if not budget.can_afford(MIN_RETRIEVAL_SECONDS):
+        trace['outcome'] = 'degraded'
+        return degraded_rag_response(query, None, budget, 'sem_tempo_recuperacao', allow_defer)
+
+    # Passo 1: Recuperação de Contexto (limitada a uma fração do tempo restante)
+    with budget.stage('retrieval'):
+        context_docs = search_opensearch(
+            query, timeout=budget.allocate(RETRIEVAL_BUDGET_SHARE, cap=RETRIEVAL_MAX_SECONDS), trace=trace
+        )
+
+    # A geração é a etapa mais cara: só é iniciada se houver tempo mínimo para concluí-la
+    if not budget.can_afford(MIN_GENERATION_SECONDS):
+        trace['outcome'] = 'degraded'
+        return degraded_rag_response(query, context_docs, budget, 'sem_tempo_geracao', allow_defer)
+
+    retrieved_docs = context_docs
     if not context_docs:
         context_docs = "Nenhuma informação específica encontrada na base de conhecimento interna."
 
     # Passo 2: Engenharia de Prompt (Prompt Engineering)
-    # Define a persona do assistente e instrui a usar apenas o contexto fornecido (Grounding)
-    prompt = f"""Human: Você é um assistente técnico especialista da Nexus AI. Use o contexto abaixo para responder à pergunta do usuário de forma útil, precisa e concisa. Se a resposta não estiver no contexto, diga que não sabe, não invente informações (alucinação).
-    
-    Contexto:
-    {context_docs}
-    
-    Pergunta: {query}
-    
-    Assistant:"""
-
-    # Configuração do payload para o modelo Anthropic Claude v2
-    body = json.dumps({
-        "prompt": prompt,
-        "max_tokens_to_sample": 500, # Limite de tamanho da resposta
-        "temperature": 0.3, # Baixa temperatura para respostas mais determinísticas e factuais
-        "top_p": 0.9,
-    })
+    # Messages API: o preâmbulo estático (persona e regras de grounding) vai no system
+    # prompt, com marcador de cache se alcançar o mínimo dos modelos; a mensagem do
+    # usuário leva apenas contexto e pergunta
+    body = build_messages_body(query, context_docs, model_ids=bedrock_invoker.model_ids)
 
     try:
-        # Passo 3: Geração (Inferência)
-        response = bedrock_client.invoke_model(
-            modelId='anthropic.claude-v2', # Identificador do modelo no Bedrock
-            body=body
-        )
-        
-        # Processa a resposta do modelo
-        response_body = json.loads(response['body'].read())
-        return response_body['completion'].strip()
+        # Passo 3: Geração (Inferência) com todo o tempo que resta
+        with budget.stage('generation'):
+            response_body, model_id = bedrock_invoker.invoke(body, timeout=budget.remaining())
+        answer, usage = parse_messages_response(response_body)
+        usage = account_bedrock_usage(usage, body, answer, model_id, trace)
+        trace.update(outcome='generated', model_id=model_id, usage=usage)
+        answer_cache.set(query, answer)
+        return answer
+    except BedrockUnavailableError as e:
+        logger.error(f"Bedrock indisponível dentro do prazo: {e}")
+        trace['outcome'] = 'degraded'
+        return degraded_rag_response(query, retrieved_docs, budget, 'bedrock_indisponivel', allow_defer)
     except Exception as e:
         logger.error(f"Erro ao invocar Bedrock: {e}")
         return "Desculpe, estou tendo dificuldades para processar sua pergunta no momento devido a uma instabilidade no sistema de IA."
 
-def handle_create_ticket(params):
+def account_bedrock_usage(usage, body, answer, model_id, trace):
+    """
+    Contabiliza tokens e custo da invocação (uso estimado se a resposta não trouxer 'usage'),
+    publica as métricas e registra a linha estruturada 'uso_bedrock'. Retorna o uso considerado.
+    """
+    intent, client = trace.get('intent'), trace.get('client')
+    entry = get_default_accountant().record(usage, model_id, intent=intent, client=client, body=body, answer=answer)
+    usage = entry['usage']
+    for name, value in usage.items():
+        metrics.emit(USAGE_METRICS[name], value, 'Count', Model=model_id)
+    metrics.emit('BedrockPromptTokens', entry['prompt_tokens'], 'Count', Intent=intent)
+    if entry['cost_usd'] is not None:
+        metrics.emit('BedrockCost', entry['cost_usd'], 'None', Model=model_id, Intent=intent)
+    if entry['estimated']:
+        metrics.increment('BedrockUsageEstimated', Model=model_id)
+    if entry['alerts']:
+        metrics.emit('TokenUsageAlert', len(entry['alerts']), 'Count', Intent=intent)
+    # Cliente apenas no log (dimensão de cardinalidade alta para o CloudWatch)
+    logger.info(json_codec.dumps({
+        'evento': 'uso_bedrock', 'origem': 'webhook', 'intencao': intent, 'cliente': client, 'modelo': model_id,
+        'estimado': entry['estimated'], 'custo_usd': entry['cost_usd'], **usage,
+    }))
+    log_token_summary()
+    return usage
+
+# Início do intervalo do resumo de tokens corrente (None até a primeira invocação contabilizada)
+_token_summary_started = None
+_token_summary_lock = threading.Lock()
+
+def log_token_summary(clock=time.monotonic):
+    """
+    Registra a linha estruturada 'resumo_tokens' com os totais do container (por intenção,
+    cliente e modelo, linhas de base e alertas) a cada TOKEN_SUMMARY_INTERVAL segundos.
+    Os totais ficam em log, e não em EMF, porque a dimensão de cliente tem cardinalidade alta.
+    Retorna True se o resumo foi registrado nesta chamada.
+    """
+    global _token_summary_started
+    if not TOKEN_SUMMARY_INTERVAL:
+        return False
+    now = clock()
+    with _token_summary_lock:
+        if _token_summary_started is None:
+            _token_summary_started = now
+            return False
+        if now - _token_summary_started < TOKEN_SUMMARY_INTERVAL:
+            return False
+        _token_summary_started = now
+    logger.info(json_codec.dumps({'evento': 'resumo_tokens', 'origem': 'webhook', **get_default_accountant().stats()}))
+    return True
+
+def degraded_rag_response(query, context_docs, budget, reason, allow_defer=True):
+    """
+    Caminhos de degradação do fluxo RAG, do mais útil ao mais barato:
+    1. Resposta já gerada para a mesma pergunta (cache do container).
+    2. Apenas os trechos recuperados da base de conhecimento, sem geração.
+    3. Evento de follow-up do Dialogflow, que reinvoca o Webhook com um novo prazo.
+    Toda resposta degradada é registrada em log e em métrica.
+    """
+    cached_answer = answer_cache.get(query)
+    if cached_answer:
+        mode, response = 'cache', cached_answer
+    elif context_docs:
+        mode, response = 'trechos', format_snippets(context_docs)
+    elif allow_defer:
+        mode = 'followup'
+        response = {
+            'followupEventInput': {
+                'name': FOLLOWUP_EVENT_NAME,
+                'languageCode': 'pt-BR',
+                'parameters': {'query': query},
+            }
+        }
+    else:
+        mode = 'mensagem_padrao'
+        response = "Desculpe, estou tendo dificuldades para processar sua pergunta no momento devido a uma instabilidade no sistema de IA."
+
+    logger.warning(json_codec.dumps({
+        'evento': 'resposta_degradada',
+        'motivo': reason,
+        'modo': mode,
+        'tempo_decorrido_ms': round(budget.elapsed_ms(), 1),
+        'etapas_ms': budget.timings,
+    }))
+    metrics.increment('DegradedResponse', Intent='duvida_tecnica', Reason=reason, Mode=mode)
+    return response
+
+def format_snippets(context_docs, max_snippets=2, max_chars=300):
+    """Monta uma resposta curta apenas com os trechos recuperados (sem LLM)."""
+    snippets = [part.strip() for part in context_docs.split("\n\n") if part.strip()][:max_snippets]
+    lines = [snippet if len(snippet) <= max_chars else snippet[:max_chars].rstrip() + "..." for snippet in snippets]
+    return "Encontrei estas informações na nossa base de conhecimento:\n\n" + "\n\n".join(lines)
+
+def handle_create_ticket(params, budget=None):
     """
     Integração com o Backend Django para criação de tickets de suporte.
     Envia uma requisição HTTP POST para a API REST do sistema core.
+
+    No modo assíncrono (TICKET_CREATION_MODE=async), a solicitação é gravada na
+    fila de chamados e o usuário recebe um protocolo provisório imediatamente;
+    a latência deixa de depender da saúde do banco do Backend.
     """
     # Extração segura de parâmetros recebidos do Dialogflow
     customer_name = params.get('person', {}).get('name', 'Cliente Não Identificado')
@@ -205,14 +602,36 @@ def handle_create_ticket(params):
         "status": "OPEN"
     }
 
+    if TICKET_CREATION_MODE == 'async':
+        queue = get_ticket_queue()
+        if queue is None:
+            logger.warning("Modo assíncrono sem fila configurada. Usando criação síncrona.")
+        else:
+            payload['provisional_reference'] = new_provisional_reference()
+            try:
+                queue.enqueue(payload)
+                return f"Chamado registrado! Protocolo provisório: {payload['provisional_reference']}. Nossa equipe entrará em contato em breve."
+            except Exception as e:
+                # Falha na fila: tenta o caminho síncrono antes de desistir
+                logger.error(f"Falha ao enfileirar chamado: {e}. Usando criação síncrona.")
+
+    # Timeout limitado ao orçamento restante para evitar que o Lambda exceda seu tempo de execução
+    timeout = 5
+    if budget is not None:
+        timeout = max(0.5, min(timeout, budget.remaining()))
+
     try:
         # Realiza a chamada HTTP para a API interna
-        # Timeout configurado para 5s para evitar que o Lambda exceda seu tempo de execução
-        response = requests.post(f"{DJANGO_API_URL}/tickets/", json=payload, timeout=5)
+        response = django_api('POST', '/tickets/', payload, timeout=timeout)
         
         if response.status_code == 201:
             # Sucesso: Retorna o ID do ticket criado
-            ticket_id = response.json().get('id', 'N/A')
+            created = json_codec.decode_response(response)
+            ticket_id = created.get('id', 'N/A')
+            if created.get('parent'):
+                # O Backend vinculou o chamado a um incidente aberto com o mesmo problema
+                return (f"Chamado #{ticket_id} registrado e vinculado ao incidente #{created['parent']}, "
+                        "que já está sendo tratado pela nossa equipe. Você será avisado assim que for resolvido.")
             return f"Chamado criado com sucesso! ID do ticket: #{ticket_id}. Nossa equipe entrará em contato em breve."
         else:
             # Erro na API: Loga o erro e informa o usuário
@@ -223,21 +642,44 @@ def handle_create_ticket(params):
         logger.error(f"Falha de conexão com API Django: {e}")
         return "Erro de comunicação com o sistema de chamados. Tente mais tarde."
 
-def handle_budget_quote(params):
+def handle_budget_quote(params, budget=None):
     """
     Lógica de negócio para geração automática de orçamentos.
-    Calcula valores com base em regras predefinidas e simula o envio de uma proposta.
+    Calcula valores pela tabela de regras (pricing.py) e persiste o orçamento no
+    Backend Django, que gera o PDF da proposta em segundo plano e preenche o pdf_url.
     """
     # Extrai o tipo de serviço solicitado
     service_type = params.get('service_type', 'Consultoria Padrão')
-    
-    # Lógica de precificação simples (Mock)
-    base_price = 1000.00
-    if 'premium' in str(service_type).lower():
-        base_price *= 1.5 # Adicional de 50% para serviços Premium
-    
-    # Em produção, aqui seria invocado um serviço de geração de PDF (ex: ReportLab ou API externa)
-    # e envio de email (ex: Amazon SES).
-    # generate_pdf_and_email(customer_email, service_type, base_price)
-    
-    return f"O orçamento estimado para {service_type} é de R$ {base_price:.2f}. Um PDF detalhado com a proposta comercial foi enviado para seu e-mail cadastrado."
+    customer_name = params.get('person', {}).get('name', 'Cliente Não Identificado')
+
+    # Cálculo memoizado por (tipo de serviço, parâmetros relevantes)
+    quotation = quote(service_type, params)
+
+    payload = {
+        "customer_name": customer_name,
+        "service_type": quotation['service_name'],
+        "total_value": quotation['total_value'],
+        "items": quotation['items'],
+    }
+
+    # Timeout limitado ao orçamento restante; a geração do PDF não ocorre nesta requisição
+    timeout = 5
+    if budget is not None:
+        timeout = max(0.5, min(timeout, budget.remaining()))
+
+    summary = f"O orçamento estimado para {quotation['service_name']} é de R$ {quotation['total_value']}."
+    try:
+        response = django_api('POST', '/budgets/', payload, timeout=timeout)
+        if response.status_code == 201:
+            budget_id = json_codec.decode_response(response).get('id', 'N/A')
+            return f"{summary} Proposta #{budget_id} registrada; o PDF detalhado ficará disponível em instantes."
+        logger.error(f"Erro na API Django ao registrar orçamento: {response.status_code} - {response.text}")
+    except requests.RequestException as e:
+        logger.error(f"Falha de conexão com API Django ao registrar orçamento: {e}")
+
+    # O valor calculado continua válido mesmo sem persistência; apenas não há PDF
+    return f"{summary} Não consegui registrar a proposta agora; tente novamente em alguns minutos para receber o PDF."
+
+# Concorrência provisionada: aquece o container ainda na inicialização, antes da primeira requisição
+if WARMUP_ON_INIT and is_provisioned_init():
+    warm_up()
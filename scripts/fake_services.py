@@ -0,0 +1,261 @@
+"""
+Servidores HTTP falsos (somente biblioteca padrão) para testes locais do Webhook.
+
+Imitam as APIs usadas pelo lambda_handler com latência e taxa de erro configuráveis:
+    FakeOpenSearch -> POST /<indice>/_search e GET /<indice>/_mapping (geração do índice)
+    FakeBedrock    -> POST /model/<modelId>/invoke (formato Messages API do Claude)
+    FakeDjango     -> POST /api/tickets/, POST /api/budgets/ e GET /api/faq/
+
+Cada servidor roda em uma thread própria em 127.0.0.1 com porta dinâmica.
+"""
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+# Base de conhecimento mínima servida pelo OpenSearch falso
+DEFAULT_CORPUS = [
+    {'_id': 'manual-servidor-01', 'content': "Se a luz vermelha do servidor piscar, reinicie o serviço pelo painel."},
+    {'_id': 'manual-servidor-02', 'content': "Para reiniciar o servidor, desligue pelo botão frontal e aguarde 30 segundos."},
+    {'_id': 'manual-banco-01', 'content': "Falhas de acesso ao banco de dados costumam indicar credenciais expiradas."},
+    {'_id': 'manual-rede-01', 'content': "Erros de conexão intermitentes podem ser causados pelo firewall da rede."},
+]
+
+
+class FaultProfile:
+    """Latência (média e variação, em ms) e probabilidade de erro de um serviço falso."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def apply(self):
+        """Dorme a latência sorteada e indica se a requisição deve falhar."""
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay / 1000.0)
+        return fail
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        # Silencia o log de acesso padrão (poluiria a saída do teste de carga)
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        return json.loads(raw) if raw else {}
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = self._read_json()
+        if self.server.fault.apply():
+            return self.server.service.error_response(self)
+        return self.server.service.handle(self, payload)
+
+    def do_GET(self):
+        if self.server.fault.apply():
+            return self.server.service.error_response(self)
+        return self.server.service.handle(self, {})
+
+
+class FakeService:
+    """Base dos serviços falsos: inicia/para o servidor e expõe a URL base."""
+
+    def __init__(self, fault=None):
+        self.fault = fault or FaultProfile()
+        self.requests = 0
+        self._counter_lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.service = self
+        self._server.fault = self.fault
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def count(self):
+        with self._counter_lock:
+            self.requests += 1
+
+    def error_response(self, handler):
+        handler._send_json(503, {'message': 'Falha injetada'})
+
+    def handle(self, handler, payload):
+        raise NotImplementedError
+
+
+class FakeOpenSearch(FakeService):
+    """Busca por sobreposição de termos sobre um corpus em memória."""
+
+    def __init__(self, corpus=None, fault=None):
+        super().__init__(fault)
+        self.corpus = corpus or DEFAULT_CORPUS
+        # Incrementar simula uma reindexação (invalida o cache de recuperação)
+        self.generation = 1
+
+    def handle(self, handler, payload):
+        self.count()
+        path = handler.path.split('?')[0]
+        if path.endswith('/_mapping'):
+            index = path.strip('/').split('/')[0]
+            return handler._send_json(200, {index: {'mappings': {'_meta': {'generation': self.generation}}}})
+        if not path.endswith('/_search'):
+            return handler._send_json(200, {'version': {'number': '2.11.0'}})
+
+        query = json.dumps(payload.get('query', {})).lower()
+        terms = set(re.findall(r'\w{3,}', query)) - {'match', 'content', 'query', 'multi_match'}
+        size = payload.get('size', 3)
+
+        scored = []
+        for doc in self.corpus:
+            score = len(terms & set(re.findall(r'\w{3,}', doc['content'].lower())))
+            if score:
+                scored.append((score, doc))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        hits = [
+            {'_id': doc['_id'], '_score': float(score), '_source': {'content': doc['content']}}
+            for score, doc in scored[:size]
+        ]
+        handler._send_json(200, {'hits': {'total': {'value': len(hits)}, 'hits': hits}})
+
+
+class FakeBedrock(FakeService):
+    """
+    InvokeModel do Bedrock Runtime no formato Messages API; erros injetados chegam como
+    ThrottlingException. Simula o cache de prompt: a primeira requisição com um
+    system marcado com cache_control grava o prefixo, as seguintes o leem. Como no
+    Bedrock, prefixos abaixo do mínimo do modelo ignoram o marcador e são cobrados
+    como entrada comum.
+    """
+
+    # Prefixo mínimo (tokens) para o cache de prompt por trecho do modelId
+    CACHE_MIN_TOKENS = {
+        'claude-3-7-sonnet': 1024,
+        'claude-3-5-sonnet': 1024,
+        'claude-3-5-haiku': 2048,
+        'claude-3-haiku': 2048,
+    }
+    UNKNOWN_MODEL_CACHE_MIN_TOKENS = 2048
+
+    def __init__(self, fault=None):
+        super().__init__(fault)
+        self._cached_prefixes = set()
+        self._cache_lock = threading.Lock()
+
+    def error_response(self, handler):
+        # O botocore identifica o tipo de erro pelo cabeçalho x-amzn-ErrorType
+        handler._send_json(429, {'message': 'Rate exceeded'}, {'x-amzn-ErrorType': 'ThrottlingException'})
+
+    @staticmethod
+    def _tokens(text):
+        # Estimativa grosseira (~4 caracteres por token)
+        return max(1, len(text) // 4)
+
+    @classmethod
+    def cache_min_tokens(cls, model_id):
+        matches = [fragment for fragment in cls.CACHE_MIN_TOKENS if fragment in model_id]
+        return cls.CACHE_MIN_TOKENS[max(matches, key=len)] if matches else cls.UNKNOWN_MODEL_CACHE_MIN_TOKENS
+
+    def handle(self, handler, payload):
+        self.count()
+        parts = handler.path.split('/')
+        model_id = unquote(parts[2]) if len(parts) >= 3 else 'fake'
+        system_blocks = payload.get('system') or []
+        system_text = ''.join(block.get('text', '') for block in system_blocks)
+        user_text = ''.join(
+            block.get('text', '')
+            for message in payload.get('messages', [])
+            for block in (message.get('content') or [])
+            if isinstance(block, dict)
+        )
+
+        usage = {'input_tokens': self._tokens(user_text), 'cache_creation_input_tokens': 0, 'cache_read_input_tokens': 0}
+        cacheable = self._tokens(system_text) >= self.cache_min_tokens(model_id)
+        if cacheable and any('cache_control' in block for block in system_blocks):
+            digest = hashlib.sha256(system_text.encode('utf-8')).hexdigest()
+            with self._cache_lock:
+                hit = digest in self._cached_prefixes
+                self._cached_prefixes.add(digest)
+            usage['cache_read_input_tokens' if hit else 'cache_creation_input_tokens'] = self._tokens(system_text)
+        elif system_text:
+            usage['input_tokens'] += self._tokens(system_text)
+
+        answer = f"Resposta simulada ({len(user_text)} caracteres de pergunta e contexto)."
+        usage['output_tokens'] = self._tokens(answer)
+        handler._send_json(200, {
+            'id': f"msg_fake_{self.requests}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': model_id,
+            'content': [{'type': 'text', 'text': answer}],
+            'stop_reason': 'end_turn',
+            'usage': usage,
+        })
+
+
+class FakeDjango(FakeService):
+    """Endpoints de criação de tickets e orçamentos com IDs sequenciais, a lista de FAQ e as transcrições."""
+
+    def __init__(self, fault=None, faq_entries=None):
+        super().__init__(fault)
+        # Respostas pré-geradas servidas em GET /api/faq/
+        self.faq_entries = faq_entries or []
+        # Transcrições recebidas em lote em POST /api/transcripts/
+        self.transcripts = []
+        self._ids = itertools.count(1)
+        self._ids_lock = threading.Lock()
+
+    def error_response(self, handler):
+        handler._send_json(500, {'detail': 'Falha injetada'})
+
+    def handle(self, handler, payload):
+        self.count()
+        with self._ids_lock:
+            new_id = next(self._ids)
+        if handler.command == 'POST' and handler.path.rstrip('/').endswith(('/tickets', '/budgets')):
+            return handler._send_json(201, {**payload, 'id': new_id})
+        if handler.path.split('?')[0].rstrip('/').endswith('/faq'):
+            return handler._send_json(200, self.faq_entries)
+        if handler.command == 'POST' and handler.path.rstrip('/').endswith('/transcripts'):
+            with self._ids_lock:
+                self.transcripts.extend(payload)
+            return handler._send_json(201, {'created': len(payload)})
+        handler._send_json(200, {})
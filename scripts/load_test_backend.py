@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Teste de carga HTTP do Backend Django (somente biblioteca padrão).
+
+Dispara requisições concorrentes contra um ou mais alvos por um tempo fixo e
+reporta requisições por segundo, percentis de latência e erros. Usado para
+comparar o servidor de desenvolvimento (runserver) com os perfis de produção.
+
+Exemplos:
+    # Um alvo
+    python scripts/load_test_backend.py --target dev=http://localhost:8000/api/tickets/
+
+    # Comparação entre perfis (suba cada backend em uma porta diferente)
+    python scripts/load_test_backend.py \\
+        --target runserver=http://localhost:8000/api/tickets/ \\
+        --target gunicorn=http://localhost:8001/api/tickets/ \\
+        --concurrency 32 --duration 30 --output resultado.json
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Percentil compartilhado com o Backend (tickets/metrics.py não depende do Django)
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend_core'))
+
+from tickets.metrics import percentile  # noqa: E402
+
+
+def _worker(url, stop_at, method, body):
+    """Executa requisições em uma conexão keep-alive até o fim do tempo."""
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    path = parts.path or '/'
+    if parts.query:
+        path += f"?{parts.query}"
+    headers = {'Content-Type': 'application/json'} if body else {}
+
+    latencies, errors = [], 0
+    conn = connection_class(parts.netloc, timeout=30)
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            else:
+                latencies.append((time.perf_counter() - started) * 1000.0)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = connection_class(parts.netloc, timeout=30)
+    conn.close()
+    return latencies, errors
+
+
+def run_target(name, url, concurrency, duration, method='GET', body=None):
+    """Executa o teste de carga em um alvo e retorna o resumo das métricas."""
+    stop_at = time.monotonic() + duration
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [executor.submit(_worker, url, stop_at, method, body) for _ in range(concurrency)]
+        results = [future.result() for future in futures]
+    elapsed = time.monotonic() - started
+
+    latencies = sorted(lat for worker_latencies, _ in results for lat in worker_latencies)
+    errors = sum(worker_errors for _, worker_errors in results)
+    return {
+        'name': name,
+        'url': url,
+        'concurrency': concurrency,
+        'duration_s': round(elapsed, 2),
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga HTTP do Backend Nexus AI")
+    parser.add_argument('--target', action='append', required=True,
+                        help="Alvo no formato nome=url (repita para comparar perfis)")
+    parser.add_argument('--concurrency', type=int, default=16, help="Conexões simultâneas")
+    parser.add_argument('--duration', type=float, default=15, help="Duração por alvo (s)")
+    parser.add_argument('--method', default='GET')
+    parser.add_argument('--body', help="Corpo JSON (ex: para POST /api/chat/)")
+    parser.add_argument('--output', help="Arquivo JSON para salvar os resultados")
+    args = parser.parse_args()
+
+    body = args.body.encode('utf-8') if args.body else None
+    results = []
+    for target in args.target:
+        name, separator, url = target.partition('=')
+        if not separator:
+            # Alvo sem nome: usa a própria URL como identificador
+            name = url = target
+        print(f"Executando '{name}' ({url}) por {args.duration:.0f}s com {args.concurrency} conexões...")
+        results.append(run_target(name, url, args.concurrency, args.duration, args.method, body))
+
+    print(f"\n{'alvo':<16}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'erros':>8}")
+    for result in results:
+        print(f"{result['name']:<16}{result['rps']:>10}{result['p50_ms']:>10}"
+              f"{result['p95_ms']:>10}{result['p99_ms']:>10}{result['errors']:>8}")
+
+    if len(results) > 1 and results[0]['rps']:
+        baseline = results[0]
+        for result in results[1:]:
+            print(f"{result['name']} vs {baseline['name']}: {result['rps'] / baseline['rps']:.2f}x req/s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados salvos em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Teste de carga de ponta a ponta do lambda_handler com serviços falsos locais.
+
+Gera (ou reproduz de um arquivo JSONL) eventos de Webhook do Dialogflow ES para as
+intenções duvida_tecnica, abrir_chamado e gerar_orcamento e executa o handler de
+forma concorrente contra OpenSearch, Bedrock e Django falsos (scripts/fake_services.py),
+com latência e injeção de erros configuráveis. O resultado (vazão e p50/p95/p99 por
+intenção) é salvo em JSON e pode ser comparado com uma execução de referência.
+
+Requer as dependências do Lambda: pip install -r lambda_functions/requirements.txt
+
+Exemplos:
+    python scripts/webhook_load_test.py --requests 500 --concurrency 16 --output atual.json
+    python scripts/webhook_load_test.py --bedrock-latency 1500 --bedrock-errors 0.1
+    python scripts/webhook_load_test.py --replay eventos.jsonl --baseline referencia.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPTS_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(SCRIPTS_DIR), 'lambda_functions'))
+sys.path.append(os.path.join(os.path.dirname(SCRIPTS_DIR), 'backend_core'))
+
+from fake_services import FakeBedrock, FakeDjango, FakeOpenSearch, FaultProfile  # noqa: E402
+from tickets.metrics import percentile  # noqa: E402
+
+SAMPLE_QUERIES = [
+    "A luz vermelha do servidor está piscando",
+    "Como reinicio o servidor?",
+    "Não consigo acessar o banco de dados",
+    "Erro de conexão na rede",
+]
+
+
+def build_event(intent, rng):
+    """Monta um evento do API Gateway com o corpo de Webhook do Dialogflow ES."""
+    parameters = {}
+    query_text = rng.choice(SAMPLE_QUERIES)
+    if intent == 'abrir_chamado':
+        query_text = "Quero abrir um chamado"
+        parameters = {'person': {'name': 'Cliente Teste'}, 'problem_description': rng.choice(SAMPLE_QUERIES)}
+    elif intent == 'gerar_orcamento':
+        query_text = "Gostaria de um orçamento"
+        parameters = {'service_type': rng.choice(['Consultoria Padrão', 'Consultoria Premium', 'Desenvolvimento'])}
+
+    body = {
+        'responseId': str(uuid.uuid4()),
+        'session': f"projects/nexus-load-test/agent/sessions/{uuid.uuid4().hex}",
+        'queryResult': {
+            'queryText': query_text,
+            'parameters': parameters,
+            'intent': {'displayName': intent},
+            'languageCode': 'pt-br',
+        },
+    }
+    return {'body': json.dumps(body)}
+
+
+def load_events(path):
+    """Lê eventos de um JSONL (evento do API Gateway com 'body' ou corpo do Dialogflow)."""
+    events = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                events.append(record if 'body' in record else {'body': json.dumps(record)})
+    return events
+
+
+def event_intent(event):
+    return json.loads(event['body']).get('queryResult', {}).get('intent', {}).get('displayName', 'desconhecida')
+
+
+class FakeLambdaContext:
+    """Contexto mínimo do Lambda com prazo fixo a partir da criação."""
+
+    def __init__(self, timeout_ms):
+        self._deadline = time.monotonic() + timeout_ms / 1000.0
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+def configure_environment(opensearch, bedrock, django):
+    """Aponta o Webhook para os serviços falsos (antes de importar o handler)."""
+    os.environ.update({
+        'OPENSEARCH_HOST': '127.0.0.1',
+        'OPENSEARCH_PORT': str(opensearch.port),
+        'OPENSEARCH_USE_SSL': 'False',
+        'BEDROCK_ENDPOINT_URL': bedrock.url,
+        'DJANGO_API_URL': f"{django.url}/api",
+        'AWS_ACCESS_KEY_ID': 'teste',
+        'AWS_SECRET_ACCESS_KEY': 'teste',
+        'AWS_REGION': 'us-east-1',
+        'METRICS_ENABLED': 'False',
+        'TICKET_CREATION_MODE': 'sync',
+    })
+
+
+def run(events, concurrency, lambda_timeout_ms):
+    """Executa todos os eventos no handler e agrega as métricas por intenção."""
+    import webhook_handler
+
+    # O handler eleva o log raiz para INFO na importação; durante a carga apenas alertas interessam
+    logging.getLogger().setLevel(logging.WARNING)
+
+    def _invoke(event):
+        started = time.perf_counter()
+        response = webhook_handler.lambda_handler(event, FakeLambdaContext(lambda_timeout_ms))
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        body = json.loads(response['body'])
+        return event_intent(event), response['statusCode'], 'followupEventInput' in body, elapsed_ms
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(_invoke, events))
+    wall_time = time.monotonic() - started
+
+    per_intent = defaultdict(lambda: {'latencies': [], 'errors': 0, 'followups': 0})
+    for intent, status_code, followup, elapsed_ms in outcomes:
+        stats = per_intent[intent]
+        stats['latencies'].append(elapsed_ms)
+        stats['errors'] += status_code != 200
+        stats['followups'] += followup
+
+    report = {'requests': len(outcomes), 'wall_time_s': round(wall_time, 3),
+              'throughput_rps': round(len(outcomes) / wall_time, 2) if wall_time else 0.0, 'intents': {}}
+    for intent, stats in sorted(per_intent.items()):
+        latencies = sorted(stats['latencies'])
+        report['intents'][intent] = {
+            'count': len(latencies),
+            'errors': stats['errors'],
+            'followups': stats['followups'],
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+        }
+    return report
+
+
+def compare(report, baseline, max_regression):
+    """Lista regressões de p95 por intenção e de vazão acima da tolerância relativa."""
+    regressions = []
+    for intent, stats in report['intents'].items():
+        reference = baseline.get('intents', {}).get(intent)
+        if reference and reference['p95_ms'] and stats['p95_ms'] > reference['p95_ms'] * (1 + max_regression):
+            regressions.append(f"{intent}: p95 {reference['p95_ms']} -> {stats['p95_ms']} ms")
+    if baseline.get('throughput_rps') and report['throughput_rps'] < baseline['throughput_rps'] * (1 - max_regression):
+        regressions.append(f"vazão {baseline['throughput_rps']} -> {report['throughput_rps']} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do Webhook com serviços falsos")
+    parser.add_argument('--requests', type=int, default=300, help="Eventos gerados (ignorado com --replay)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mix', default='duvida_tecnica=0.6,abrir_chamado=0.2,gerar_orcamento=0.2',
+                        help="Proporção das intenções nos eventos gerados")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--replay', help="Arquivo JSONL com eventos a reproduzir")
+    parser.add_argument('--record', help="Salva os eventos gerados em JSONL para reprodução futura")
+    parser.add_argument('--lambda-timeout-ms', type=int, default=10000)
+    for service, latency in (('opensearch', 40), ('bedrock', 600), ('django', 30)):
+        parser.add_argument(f'--{service}-latency', type=float, default=latency, help="Latência média (ms)")
+        parser.add_argument(f'--{service}-jitter', type=float, default=None,
+                            help="Variação (ms); padrão: 1/4 da latência informada")
+        parser.add_argument(f'--{service}-errors', type=float, default=0.0, help="Taxa de erro (0-1)")
+    parser.add_argument('--output', help="Arquivo JSON com o relatório")
+    parser.add_argument('--baseline', help="Relatório de referência para detectar regressões")
+    parser.add_argument('--max-regression', type=float, default=0.2, help="Tolerância relativa (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.replay:
+        events = load_events(args.replay)
+    else:
+        weights = {name: float(share) for name, share in (item.split('=') for item in args.mix.split(','))}
+        intents = rng.choices(list(weights), weights=list(weights.values()), k=args.requests)
+        events = [build_event(intent, rng) for intent in intents]
+    if args.record:
+        with open(args.record, 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(event) + '\n' for event in events)
+
+    def profile(service):
+        latency = getattr(args, f'{service}_latency')
+        if getattr(args, f'{service}_jitter') is None:
+            # Registrado em args para o relatório trazer a variação efetiva
+            setattr(args, f'{service}_jitter', latency / 4)
+        return FaultProfile(latency, getattr(args, f'{service}_jitter'), getattr(args, f'{service}_errors'),
+                            seed=args.seed)
+
+    services = [FakeOpenSearch(fault=profile('opensearch')).start(),
+                FakeBedrock(fault=profile('bedrock')).start(),
+                FakeDjango(fault=profile('django')).start()]
+    try:
+        configure_environment(*services)
+        report = run(events, args.concurrency, args.lambda_timeout_ms)
+    finally:
+        for service in services:
+            service.stop()
+
+    report['config'] = {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print("Regressões detectadas:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+        print("Sem regressões em relação à referência.", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
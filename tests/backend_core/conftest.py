@@ -0,0 +1,22 @@
+import os
+import sys
+
+import django
+import pytest
+
+# Testes dos módulos Django do Backend: usam core.settings e um banco de testes
+# criado uma vez por sessão (SQLite em memória, como no `manage.py test`).
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'backend_core')))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+django.setup()
+
+
+@pytest.fixture(scope='session', autouse=True)
+def django_test_database():
+    from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+
+    setup_test_environment()
+    config = setup_databases(verbosity=0, interactive=False)
+    yield
+    teardown_databases(config, verbosity=0)
+    teardown_test_environment()
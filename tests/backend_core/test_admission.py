@@ -0,0 +1,131 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend_core'))
+
+from django.core.cache import caches
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from tickets.admission import AdmissionController, AdmissionRejected, MemoryBucketStore
+from tickets.throttling import CacheBucketStore, client_identity
+
+CLASSES = {
+    'agent': {'rate': 100.0, 'burst': 100, 'priority': 0},
+    'anonymous': {'rate': 1.0, 'burst': 2, 'priority': 1},
+}
+
+
+class TestMemoryBucketStore(unittest.TestCase):
+    def test_refill_and_wait_estimate(self):
+        store = MemoryBucketStore()
+        self.assertEqual([store.take('c', rate=2.0, burst=2, now=0.0) for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(store.take('c', rate=2.0, burst=2, now=0.0), 0.5)
+        self.assertEqual(store.take('c', rate=2.0, burst=2, now=0.5), 0.0)
+
+    def test_full_buckets_are_discarded_when_over_capacity(self):
+        store = MemoryBucketStore(max_keys=2)
+        for key in ('a', 'b', 'c'):
+            store.take(key, rate=1.0, burst=1, now=0.0)
+        store.take('d', rate=1.0, burst=1, now=10.0)
+        self.assertEqual(list(store._buckets), ['d'])
+
+    def test_refund_is_capped_at_burst(self):
+        store = MemoryBucketStore()
+        store.take('c', rate=1.0, burst=2, now=0.0)
+        store.refund('c', rate=1.0, burst=2, now=0.0)
+        store.refund('c', rate=1.0, burst=2, now=0.0)
+        self.assertEqual(store._buckets['c'][0], 2)
+        store.refund('ausente', rate=1.0, burst=2, now=0.0)
+        self.assertNotIn('ausente', store._buckets)
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_client_limit_rejects_with_retry_after(self):
+        controller = AdmissionController(CLASSES, global_rate=100.0, global_burst=100)
+        controller.acquire('1.2.3.4', 'anonymous')
+        controller.acquire('1.2.3.4', 'anonymous')
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.acquire('1.2.3.4', 'anonymous')
+        self.assertEqual(raised.exception.reason, 'limite_cliente')
+        self.assertGreater(raised.exception.retry_after, 0)
+        # Outro cliente não é afetado
+        self.assertEqual(controller.acquire('5.6.7.8', 'anonymous'), 0.0)
+
+    def test_queue_full_and_wait_timeout_shed_load(self):
+        controller = AdmissionController(CLASSES, global_rate=0.01, global_burst=1, queue_size=0, max_wait=0.05)
+        controller.acquire('agente', 'agent')
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.acquire('agente', 'agent')
+        self.assertEqual(raised.exception.reason, 'fila_cheia')
+
+        controller.queue_size = 1
+        with self.assertRaises(AdmissionRejected) as raised:
+            controller.acquire('agente', 'agent')
+        self.assertEqual(raised.exception.reason, 'tempo_de_espera')
+        self.assertEqual(controller.waiting(), 0)
+
+    def test_global_rejection_refunds_client_token(self):
+        controller = AdmissionController(CLASSES, global_rate=0.01, global_burst=1, queue_size=0)
+        controller.acquire('1.2.3.4', 'anonymous')
+        # A sobrecarga global não consome o balde do cliente (burst 2, taxa 1/s)
+        for _ in range(5):
+            with self.assertRaises(AdmissionRejected) as raised:
+                controller.acquire('1.2.3.4', 'anonymous')
+            self.assertEqual(raised.exception.reason, 'fila_cheia')
+
+    def test_agents_are_served_before_anonymous(self):
+        controller = AdmissionController(CLASSES, global_rate=20.0, global_burst=1, queue_size=10, max_wait=2.0)
+        controller.acquire('inicial', 'agent')
+        order = []
+
+        def request(key, client_class):
+            controller.acquire(key, client_class)
+            order.append(client_class)
+
+        anonymous = threading.Thread(target=request, args=('anonimo', 'anonymous'))
+        anonymous.start()
+        while controller.waiting() < 1:
+            time.sleep(0.001)
+        agents = [threading.Thread(target=request, args=(f"agente-{i}", 'agent')) for i in range(2)]
+        for thread in agents:
+            thread.start()
+        while controller.waiting() < 3 and len(order) == 0:
+            time.sleep(0.001)
+        for thread in [anonymous] + agents:
+            thread.join()
+
+        self.assertEqual(order[-1], 'anonymous')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestCacheBucketStore(SimpleTestCase):
+    def test_take_and_refund(self):
+        store = CacheBucketStore()
+        self.assertEqual([store.take('c', rate=0.001, burst=2, now=0.0) for _ in range(2)], [0.0, 0.0])
+        self.assertGreater(store.take('c', rate=0.001, burst=2, now=0.0), 0)
+
+        store.refund('c', rate=0.001, burst=2, now=0.0)
+        self.assertEqual(store.take('c', rate=0.001, burst=2, now=0.0), 0.0)
+        # Balde ausente equivale a cheio: a devolução não cria fichas além do burst
+        store.refund('outro', rate=0.001, burst=2, now=0.0)
+        self.assertIsNone(caches['default'].get('admission:outro'))
+
+
+class TestClientIdentity(unittest.TestCase):
+    @override_settings(CHAT_CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_uses_address_appended_by_load_balancer(self):
+        # A primeira entrada vem do cliente e pode ser forjada a cada requisição
+        request = RequestFactory().post('/api/chat/', HTTP_X_FORWARDED_FOR='1.2.3.4, 203.0.113.7')
+        self.assertEqual(client_identity(request), ('203.0.113.7', 'anonymous'))
+
+    @override_settings(CHAT_CLIENT_IP_HEADER='')
+    def test_remote_addr_without_header(self):
+        request = RequestFactory().post('/api/chat/', HTTP_X_FORWARDED_FOR='1.2.3.4', REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(client_identity(request), ('10.0.0.9', 'anonymous'))
+
+
+if __name__ == '__main__':
+    unittest.main()
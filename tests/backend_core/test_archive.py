@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from tickets.archive import archivable_tickets, archive_closed_tickets, get_archived_ticket
+from tickets.models import Ticket, TicketArchive, TicketDailyStat
+
+
+def new_ticket(status='CLOSED', age_days=40, **fields):
+    ticket = Ticket.objects.create(customer_name='Ana', problem_description='Sem rede', status=status, **fields)
+    # updated_at é auto_now: a idade é ajustada direto no banco
+    Ticket.objects.filter(pk=ticket.pk).update(updated_at=timezone.now() - timedelta(days=age_days))
+    return ticket
+
+
+def ticket_total():
+    return sum(TicketDailyStat.objects.values_list('count', flat=True))
+
+
+class ArchivableTicketsTest(TestCase):
+    def test_only_old_closed_tickets_without_open_duplicates(self):
+        closed = new_ticket('CLOSED')
+        resolved = new_ticket('RESOLVED')
+        new_ticket('OPEN')
+        new_ticket('CLOSED', age_days=5)
+        parent = new_ticket('CLOSED')
+        new_ticket('OPEN', parent=parent)
+
+        self.assertEqual(set(archivable_tickets(30).values_list('id', flat=True)), {closed.id, resolved.id})
+
+
+class ArchiveClosedTicketsTest(TestCase):
+    def test_moves_in_batches_and_keeps_stats(self):
+        tickets = [new_ticket() for _ in range(5)]
+        recent = new_ticket(age_days=1)
+        total_before = ticket_total()
+        progress = []
+
+        moved = archive_closed_tickets(30, batch_size=2, progress=progress.append)
+
+        self.assertEqual(moved, 5)
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual(list(Ticket.objects.values_list('id', flat=True)), [recent.id])
+        self.assertEqual(TicketArchive.objects.count(), 5)
+        # Os arquivados continuam nas estatísticas do painel
+        self.assertEqual(ticket_total(), total_before)
+
+        archived = get_archived_ticket(tickets[0].id)
+        self.assertEqual((archived.customer_name, archived.status), ('Ana', 'CLOSED'))
+        self.assertIsNotNone(archived.archived_at)
+        self.assertIsNone(get_archived_ticket(recent.id))
+
+        self.assertEqual(archive_closed_tickets(30, batch_size=2), 0)
+
+    def test_max_batches(self):
+        for _ in range(5):
+            new_ticket()
+        self.assertEqual(archive_closed_tickets(30, batch_size=2, max_batches=1), 2)
+        self.assertEqual(Ticket.objects.count(), 3)
+
+    def test_parent_waits_for_duplicates(self):
+        parent = new_ticket()
+        duplicate = new_ticket(parent=parent)
+
+        # O duplicado sai no primeiro lote; o principal, no seguinte, já sem duplicados na tabela
+        self.assertEqual(archive_closed_tickets(30, batch_size=10), 2)
+        self.assertEqual(get_archived_ticket(duplicate.id).parent_id, parent.id)
+        self.assertIsNotNone(get_archived_ticket(parent.id))
@@ -0,0 +1,89 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend_core'))
+
+from tickets.changefeed import CLOSED, ChangeFeedHub, format_sse
+
+
+def event(event_id, ticket_id=1, customer_id='cliente-1', status='IN_PROGRESS'):
+    return {'id': event_id, 'type': 'status_changed', 'ticket_id': ticket_id, 'customer_id': customer_id,
+            'status': status}
+
+
+class FakeEventTable:
+    """Tabela de eventos em memória; `hidden` simula ids ainda não confirmados."""
+
+    def __init__(self, events):
+        self.events = events
+        self.hidden = set()
+
+    async def since(self, after_id, missing_ids):
+        return [e for e in self.events if e['id'] not in self.hidden and (e['id'] > after_id or e['id'] in missing_ids)]
+
+    async def latest(self):
+        return max((e['id'] for e in self.events), default=None)
+
+
+class TestChangeFeed(unittest.IsolatedAsyncioTestCase):
+    def make_hub(self, table):
+        hub = ChangeFeedHub(table.since, table.latest, poll_interval=3600)
+        # Sem laço de consulta: os testes chamam poll_once diretamente
+        hub._task = asyncio.get_running_loop().create_future()
+        return hub
+
+    async def test_dispatch_by_ticket_and_customer(self):
+        table = FakeEventTable([event(1)])
+        hub = self.make_hub(table)
+        by_ticket = hub.subscribe(ticket_id=1)
+        by_customer = hub.subscribe(customer_id='cliente-2')
+        await hub.poll_once()  # ponto de partida: último id existente
+
+        table.events += [event(2), event(3, ticket_id=7, customer_id='cliente-2')]
+        await hub.poll_once()
+
+        self.assertEqual(by_ticket.queue.get_nowait()['id'], 2)
+        self.assertTrue(by_ticket.queue.empty())
+        self.assertEqual(by_customer.queue.get_nowait()['id'], 3)
+
+        hub.unsubscribe(by_ticket)
+        hub.unsubscribe(by_customer)
+        self.assertEqual(len(hub), 0)
+        self.assertEqual((dict(hub._by_ticket), dict(hub._by_customer)), ({}, {}))
+
+    async def test_late_committed_id_is_delivered(self):
+        table = FakeEventTable([])
+        hub = self.make_hub(table)
+        subscription = hub.subscribe(ticket_id=1)
+        await hub.poll_once()
+
+        table.events += [event(1), event(2)]
+        table.hidden.add(1)  # id 1 ainda não confirmado quando o 2 já está visível
+        await hub.poll_once()
+        table.hidden.clear()
+        await hub.poll_once()
+
+        delivered = [subscription.queue.get_nowait()['id'] for _ in range(subscription.queue.qsize())]
+        self.assertEqual(delivered, [2, 1])
+        self.assertEqual(hub._missing, {})
+
+    async def test_slow_consumer_is_closed(self):
+        table = FakeEventTable([])
+        hub = self.make_hub(table)
+        subscription = hub.subscribe(customer_id='cliente-1', max_queued=2)
+        hub.dispatch([event(i) for i in range(1, 4)])
+
+        self.assertTrue(subscription.overflowed)
+        self.assertIs(subscription.queue.get_nowait(), CLOSED)
+
+    def test_format_sse(self):
+        self.assertEqual(
+            format_sse({'id': 5, 'type': 'created', 'status': 'OPEN'}),
+            b'id: 5\nevent: created\ndata: {"id": 5, "type": "created", "status": "OPEN"}\n\n',
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from tickets.conversation_memory import ConversationMemory, content_terms
+
+
+@override_settings(CHAT_MEMORY_TOPIC_OVERLAP=0.3, CHAT_MEMORY_CONTEXT_MAX_CHARS=6000)
+class TopicTest(SimpleTestCase):
+    def memory(self, question):
+        memory = ConversationMemory('sessao-teste')
+        memory.remember_retrieval(question, 'Reinicie o servidor pelo painel de controle.')
+        return memory
+
+    def test_message_without_terms_continues_topic(self):
+        memory = self.memory('A luz vermelha do servidor está piscando')
+        self.assertTrue(memory.is_same_topic('E depois?'))
+        self.assertTrue(memory.is_same_topic('Não é isso'))
+
+    def test_short_message_requires_shared_term(self):
+        memory = self.memory('A luz vermelha do servidor está piscando')
+        self.assertTrue(memory.is_same_topic('E o servidor?'))
+        self.assertFalse(memory.is_same_topic('E a impressora?'))
+        self.assertFalse(memory.is_same_topic('Impressora travada'))
+
+    def test_long_message_uses_term_overlap(self):
+        memory = self.memory('A luz vermelha do servidor está piscando')
+        self.assertTrue(memory.is_same_topic('A luz vermelha do servidor continua piscando'))
+        self.assertFalse(memory.is_same_topic('Como emitir a segunda via do boleto do servidor?'))
+
+    def test_without_context_never_reuses(self):
+        self.assertFalse(ConversationMemory('sessao-teste').is_same_topic('E depois?'))
+
+
+@override_settings(CHAT_MEMORY_WINDOW=1, CHAT_MEMORY_SUMMARY_MAX_TOKENS=60)
+class SummaryTest(SimpleTestCase):
+    def test_summary_drops_whole_entries(self):
+        memory = ConversationMemory('sessao-teste')
+        for index in range(6):
+            memory.add_turn(f"Pergunta número {index} sobre o servidor", f"Resposta número {index}.")
+
+        entries = memory.summary.split('\n')
+        self.assertLessEqual(len(memory.summary), 60 * 4)
+        self.assertTrue(all(entry.startswith('Usuário perguntou: ') for entry in entries))
+        # As entradas mantidas são as mais recentes, em ordem, sem a que ainda está na janela
+        self.assertEqual(entries[-1], 'Usuário perguntou: Pergunta número 4 sobre o servidor / '
+                                      'Assistente: Resposta número 4.')
+        self.assertLess(len(entries), 5)
+        self.assertEqual(memory.turns, [['Pergunta número 5 sobre o servidor', 'Resposta número 5.']])
+
+
+class PersistenceTest(SimpleTestCase):
+    def test_round_trip(self):
+        memory = ConversationMemory('sessao-persistencia')
+        memory.add_turn('Como reinicio o servidor?', 'Pelo painel.')
+        memory.remember_retrieval('Como reinicio o servidor?', 'contexto')
+        memory.save()
+        try:
+            loaded = ConversationMemory.load('sessao-persistencia')
+            self.assertEqual(loaded.turns, memory.turns)
+            self.assertEqual(loaded.retrieval_terms, content_terms('Como reinicio o servidor?'))
+            self.assertEqual(loaded.context, 'contexto')
+        finally:
+            caches['default'].clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
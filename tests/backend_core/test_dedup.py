@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend_core'))
+
+from tickets.dedup import LSHIndex, MinHasher, shingles
+
+
+class TestDedup(unittest.TestCase):
+    def test_shingles_ignore_accents_order_and_stopwords(self):
+        self.assertEqual(
+            shingles("A luz vermelha do servidor está piscando!"),
+            shingles("servidor: LUZ vermelha piscando"),
+        )
+
+    def test_signature_is_deterministic(self):
+        terms = shingles("impressora do financeiro sem toner")
+        self.assertEqual(MinHasher(seed=3).signature(terms), MinHasher(seed=3).signature(terms))
+
+    def test_query_finds_near_duplicates_only(self):
+        index = LSHIndex(threshold=0.6)
+        index.add(1, "Servidor com luz vermelha piscando no rack principal")
+        index.add(2, "Impressora do setor financeiro sem toner")
+
+        matches = index.query("luz vermelha piscando no servidor do rack principal")
+        self.assertEqual([key for key, _ in matches], [1])
+        self.assertEqual(index.query("VPN não conecta desde ontem à noite"), [])
+
+    def test_short_descriptions_and_removal(self):
+        index = LSHIndex()
+        self.assertFalse(index.add(1, "erro"))
+        self.assertEqual(index.query("erro"), [])
+
+        index.add(2, "banco de dados recusando conexões externas")
+        index.remove(2)
+        self.assertNotIn(2, index)
+        self.assertEqual(index.query("banco de dados recusando conexões externas"), [])
+
+    def test_query_is_fast_with_many_entries(self):
+        index = LSHIndex()
+        for i in range(5000):
+            index.add(i, f"cliente {i} relata falha modulo{i % 97} sistema{i % 89} filial{i}")
+
+        started = time.perf_counter()
+        for _ in range(100):
+            index.query("servidor com luz vermelha piscando no rack")
+        self.assertLess((time.perf_counter() - started) / 100, 0.005)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from tickets import events
+from tickets.management.commands.drain_ticket_queue import Command
+from tickets.models import Ticket, TicketDailyStat, TicketEvent
+from tickets.ticket_queue import SQLITE_SCHEMA, SQLiteTicketQueueReader
+
+
+def payload(reference, description="Servidor não liga"):
+    return {'customer_name': 'Ana', 'problem_description': description, 'provisional_reference': reference}
+
+
+class QueueFileTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'fila.sqlite3')
+        # Mesmo schema gravado pelo Webhook (lambda_functions/ticket_queue.py)
+        conn = sqlite3.connect(self.path)
+        conn.execute(SQLITE_SCHEMA)
+        conn.commit()
+        conn.close()
+
+    def enqueue(self, *payloads):
+        conn = sqlite3.connect(self.path)
+        conn.executemany(
+            'INSERT INTO ticket_queue (reference, payload, enqueued_at) VALUES (?, ?, ?)',
+            [(item['provisional_reference'], json.dumps(item), time.time()) for item in payloads],
+        )
+        conn.commit()
+        conn.close()
+
+
+class SQLiteTicketQueueReaderTest(QueueFileTestCase):
+    def test_claimed_messages_are_not_received_again(self):
+        self.enqueue(payload('PRV-1'), payload('PRV-2'), payload('PRV-3'))
+        reader = SQLiteTicketQueueReader(self.path)
+
+        first = reader.receive(2)
+        self.assertEqual([item['provisional_reference'] for _, item in first], ['PRV-1', 'PRV-2'])
+        self.assertEqual([item['provisional_reference'] for _, item in reader.receive(10)], ['PRV-3'])
+        self.assertEqual(reader.receive(10), [])
+
+        reader.ack([receipt for receipt, _ in first])
+        conn = sqlite3.connect(self.path)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM ticket_queue').fetchone()[0], 1)
+        conn.close()
+
+    def test_concurrent_consumers_receive_disjoint_messages(self):
+        self.enqueue(*[payload(f'PRV-{index}') for index in range(200)])
+        received = []
+        lock = threading.Lock()
+
+        def consume():
+            reader = SQLiteTicketQueueReader(self.path)
+            while True:
+                messages = reader.receive(7)
+                if not messages:
+                    return
+                with lock:
+                    received.extend(receipt for receipt, _ in messages)
+
+        threads = [threading.Thread(target=consume) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(received), 200)
+        self.assertEqual(len(set(received)), 200)
+
+
+@override_settings(TICKET_QUEUE_URL=None, TICKET_DEDUP_ENABLED=False)
+class DrainTicketQueueTest(QueueFileTestCase):
+    def drain(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with override_settings(TICKET_QUEUE_PATH=self.path):
+            call_command('drain_ticket_queue', stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_persists_queue_and_acks(self):
+        self.enqueue(payload('PRV-1'), payload('PRV-2'))
+        stdout, stderr = self.drain()
+
+        self.assertIn("2 chamados persistidos", stdout)
+        self.assertEqual(stderr, '')
+        self.assertEqual(
+            sorted(Ticket.objects.values_list('provisional_reference', flat=True)), ['PRV-1', 'PRV-2']
+        )
+        self.assertEqual(SQLiteTicketQueueReader(self.path).receive(10), [])
+
+    def test_redelivered_message_is_idempotent_success(self):
+        Ticket.objects.create(**payload('PRV-1'))
+        self.enqueue(payload('PRV-1'), payload('PRV-2'))
+        stdout, stderr = self.drain()
+
+        self.assertIn("1 chamados persistidos a partir da fila (1 reentregas já persistidas)", stdout)
+        self.assertEqual(stderr, '')
+        self.assertEqual(Ticket.objects.filter(provisional_reference='PRV-1').count(), 1)
+        self.assertEqual(SQLiteTicketQueueReader(self.path).receive(10), [])
+
+    def test_duplicate_inside_batch_and_invalid_message(self):
+        messages = [(1, payload('PRV-1')), (2, payload('PRV-1')), (3, {'provisional_reference': 'PRV-3'})]
+        stderr = io.StringIO()
+        created, redelivered = Command(stderr=stderr)._persist_batch(messages)
+
+        self.assertEqual((created, redelivered), (1, 1))
+        self.assertIn("Mensagem 3 descartada", stderr.getvalue())
+        self.assertEqual(Ticket.objects.count(), 1)
+
+
+class InsertedTicketsTest(TestCase):
+    def test_conflict_with_other_consumer_is_not_counted(self):
+        # Outro consumidor gravou PRV-1 entre a verificação e o bulk_create deste lote
+        Ticket.objects.create(**payload('PRV-1'))
+        tickets = [
+            Ticket(**payload('PRV-1')), Ticket(**payload('PRV-2')), Ticket(customer_name='Ana', problem_description='x'),
+        ]
+        Ticket.objects.bulk_create(tickets, ignore_conflicts=True)
+
+        inserted = Command._inserted(tickets)
+        self.assertEqual([ticket.provisional_reference for ticket in inserted], ['PRV-2', None])
+        self.assertEqual(inserted[0].pk, Ticket.objects.get(provisional_reference='PRV-2').pk)
+
+    def test_batch_stats_count_only_inserted_rows(self):
+        messages = [(1, payload('PRV-1')), (2, payload('PRV-2'))]
+        Command()._persist_batch(messages)
+        self.assertEqual(sum(TicketDailyStat.objects.values_list('count', flat=True)), 2)
+
+    @override_settings(TICKET_EVENTS_ENABLED=True)
+    def test_created_events_only_for_inserted_rows(self):
+        existing = Ticket.objects.create(**payload('PRV-1'))
+        TicketEvent.objects.all().delete()
+        tickets = [Ticket(**payload('PRV-1')), Ticket(**payload('PRV-2'))]
+        Ticket.objects.bulk_create(tickets, ignore_conflicts=True)
+        events.record_tickets_created(Command._inserted(tickets))
+
+        created = Ticket.objects.get(provisional_reference='PRV-2')
+        self.assertEqual(
+            list(TicketEvent.objects.values_list('ticket_id', 'event_type')), [(created.pk, 'created')]
+        )
+        self.assertNotEqual(created.pk, existing.pk)
@@ -0,0 +1,42 @@
+import threading
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tickets.dedup import LSHIndex
+from tickets.duplicates import DuplicateDetector
+
+DESCRIPTION = "Servidor com luz vermelha piscando no rack principal"
+
+
+def new_ticket(ticket_id, created_at=None):
+    return SimpleNamespace(id=ticket_id, problem_description=DESCRIPTION, status='OPEN', parent_id=None,
+                           created_at=created_at or timezone.now())
+
+
+@override_settings(TICKET_DEDUP_WINDOW_HOURS=24, TICKET_DEDUP_SYNC_INTERVAL=60)
+class DuplicateDetectorTest(TestCase):
+    def setUp(self):
+        self.detector = DuplicateDetector(index=LSHIndex(threshold=0.6))
+
+    def test_register_waits_for_running_sync(self):
+        with self.detector._sync_lock:
+            worker = threading.Thread(target=self.detector.register, args=(new_ticket(1),))
+            worker.start()
+            worker.join(0.1)
+            self.assertTrue(worker.is_alive())
+            self.assertEqual(self.detector.index.query(DESCRIPTION), [])
+        worker.join(1)
+        self.assertEqual([key for key, _ in self.detector.index.query(DESCRIPTION)], [1])
+
+    def test_sync_drops_tickets_outside_window(self):
+        self.detector.register(new_ticket(1, created_at=timezone.now() - timedelta(hours=25)))
+        self.detector.register(new_ticket(2))
+
+        self.detector.sync(force=True)
+
+        self.assertEqual([key for key, _ in self.detector.index.query(DESCRIPTION)], [2])
+        self.detector.forget(2)
+        self.assertEqual(self.detector.index.query(DESCRIPTION), [])
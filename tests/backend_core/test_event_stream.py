@@ -0,0 +1,42 @@
+import asyncio
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import SimpleTestCase, override_settings
+
+from tickets import event_stream
+
+
+class FlakyEventTable:
+    """Consulta de eventos cuja primeira chamada perde a conexão com o banco."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def since(self, after_id, missing_ids=()):
+        self.calls += 1
+        if self.calls == 1:
+            raise OperationalError("server closed the connection unexpectedly")
+        return [{'id': after_id + 1, 'type': 'created', 'ticket_id': 1, 'customer_id': 'cliente-1'}]
+
+
+@override_settings(TICKET_EVENTS_POLL_INTERVAL=0)
+class ChangeFeedConnectionTest(SimpleTestCase):
+    async def test_poll_recovers_after_operational_error(self):
+        table = FlakyEventTable()
+        with mock.patch.object(event_stream, '_hub', None), \
+                mock.patch.object(event_stream, 'close_old_connections') as close_old_connections, \
+                mock.patch.object(event_stream.events, 'events_since', table.since), \
+                mock.patch.object(event_stream.events, 'latest_event_id', lambda: 0), \
+                self.assertLogs('tickets.changefeed', 'ERROR') as logs:
+            hub = event_stream.get_hub()
+            subscription = hub.subscribe(ticket_id=1)
+            event = await asyncio.wait_for(subscription.queue.get(), timeout=5)
+            hub.unsubscribe(subscription)
+            await hub._task
+
+        self.assertEqual(event['id'], 1)
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("server closed the connection", logs.records[0].getMessage())
+        # Antes e depois de cada consulta, inclusive a que falhou
+        self.assertGreaterEqual(close_old_connections.call_count, 2 * table.calls + 2)
@@ -0,0 +1,36 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from tickets.exports import csv_chunks, ndjson_chunks
+
+HEADER = ('id', 'problem_description', 'total_value', 'created_at')
+CREATED_AT = datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+
+
+def read_csv(rows):
+    text = b''.join(csv_chunks(HEADER, iter(rows), flush_bytes=64)).decode('utf-8')
+    return list(csv.reader(io.StringIO(text)))
+
+
+class CsvExportTest(SimpleTestCase):
+    def test_formula_cells_are_escaped(self):
+        rows = [(index, text, Decimal('-5.00'), CREATED_AT)
+                for index, text in enumerate(['=HYPERLINK("http://x")', '+1', '-1', '@SUM(A1)', 'Servidor parado'])]
+        descriptions = [row[1] for row in read_csv(rows)[1:]]
+
+        self.assertEqual(descriptions, ["'=HYPERLINK(\"http://x\")", "'+1", "'-1", "'@SUM(A1)", 'Servidor parado'])
+        # Números não são textos digitados pelo cliente: o sinal negativo é mantido
+        self.assertEqual(read_csv(rows)[1][2], '-5.00')
+
+    def test_dates_match_ndjson(self):
+        row = (1, 'Servidor parado', Decimal('10.00'), CREATED_AT)
+        csv_date = read_csv([row])[1][3]
+        ndjson_date = json.loads(b''.join(ndjson_chunks(HEADER, iter([row]), flush_bytes=64)))['created_at']
+
+        self.assertEqual(csv_date, ndjson_date)
+        self.assertEqual(csv_date, '2026-03-01T12:30:15.123456Z')
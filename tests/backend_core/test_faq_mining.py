@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend_core'))
+
+from tickets.faq_mining import RateLimiter, cluster_queries, extract_query, mine_queries
+
+
+def dialogflow_event(query, intent='duvida_tecnica'):
+    body = {'queryResult': {'queryText': query, 'intent': {'displayName': intent}}}
+    return "Evento recebido: " + json.dumps({'body': json.dumps(body)})
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+
+
+class TestFaqMining(unittest.TestCase):
+    def test_extract_query_from_supported_log_formats(self):
+        structured = '2026-10-19T10:00:00Z abc INFO ' + json.dumps({'evento': 'pergunta_rag', 'pergunta': ' Como  reinicio? '})
+        self.assertEqual(extract_query(structured), "Como reinicio?")
+        self.assertEqual(extract_query(dialogflow_event("Luz vermelha piscando")), "Luz vermelha piscando")
+        self.assertIsNone(extract_query(dialogflow_event("Quero um orçamento", intent='gerar_orcamento')))
+        self.assertIsNone(extract_query("START RequestId: 123 Version: $LATEST"))
+
+    def test_clusters_near_identical_questions_by_frequency(self):
+        lines = (
+            [dialogflow_event("Como reiniciar o servidor principal?")] * 3
+            + [dialogflow_event("como reiniciar o servidor principal")] * 2
+            + [dialogflow_event("Reiniciar servidor principal, como?")]
+            + [dialogflow_event("Erro de acesso ao banco de dados")] * 2
+            + [dialogflow_event("Pergunta rara sobre impressora")]
+        )
+        clusters = cluster_queries(mine_queries(lines), threshold=0.8, min_count=2)
+
+        self.assertEqual([cluster['count'] for cluster in clusters], [6, 2])
+        self.assertEqual(clusters[0]['question'], "Como reiniciar o servidor principal?")
+        self.assertEqual(clusters[0]['variants'], [
+            'como reiniciar o servidor principal', 'reiniciar servidor principal como',
+        ])
+
+    def test_rate_limiter_spaces_calls(self):
+        clock = FakeClock()
+        limiter = RateLimiter(2.0, clock=clock, sleep=clock.sleep)
+        waits = [limiter.acquire() for _ in range(3)]
+        self.assertEqual(waits, [0.0, 0.5, 1.0])
+        self.assertEqual(RateLimiter(0).acquire(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from tickets.metrics import percentile
+
+
+class PercentileTest(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99.5), 100)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertEqual(percentile([1, 2, 3, 4], 50), 2)
+
+    def test_empty(self):
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import tempfile
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from tickets.models import Budget
+from tickets.pdf_renderer import BUDGET_TEMPLATE, _compiled_template, build_pdf, render_budgets
+
+
+def make_budget():
+    return Budget.objects.create(
+        customer_name="Silva & Filhos <Ltda>",
+        service_type="Manutenção",
+        total_value=Decimal('450.00'),
+        items=[{'description': "Troca do cabo \"RJ45\" d'água", 'value': '450.00'}],
+    )
+
+
+class BudgetTemplateTest(TestCase):
+    def test_text_is_not_html_escaped(self):
+        text = _compiled_template(BUDGET_TEMPLATE).render({'budget': make_budget()})
+
+        self.assertTrue(text.startswith("NEXUS AI - PROPOSTA COMERCIAL\n"))
+        self.assertIn("Cliente: Silva & Filhos <Ltda>", text)
+        self.assertIn("  - Troca do cabo \"RJ45\" d'água: R$ 450.00", text)
+        self.assertNotIn('&amp;', text)
+        self.assertNotIn('&#x27;', text)
+        self.assertTrue(text.endswith("a partir da data de emissão.\n"))
+
+
+class BuildPdfTest(TestCase):
+    def test_pdf_escapes_only_pdf_delimiters(self):
+        pdf = build_pdf(["Cliente: Silva & Filhos (matriz)", "Valor total: R$ 450,00"])
+
+        self.assertTrue(pdf.startswith(b"%PDF-1.4\n"))
+        self.assertTrue(pdf.endswith(b"%%EOF\n"))
+        self.assertIn(b"(Cliente: Silva & Filhos \\(matriz\\)) '", pdf)
+        # Deslocamento do xref aponta para a tabela
+        xref_offset = int(pdf.rsplit(b'startxref\n', 1)[1].split(b'\n')[0])
+        self.assertEqual(pdf[xref_offset:xref_offset + 4], b'xref')
+
+
+class RenderBudgetsTest(TestCase):
+    def test_renders_batch_and_updates_pdf_url(self):
+        budget = make_budget()
+        with tempfile.TemporaryDirectory() as media_root, \
+                override_settings(MEDIA_ROOT=media_root, PUBLIC_BASE_URL='https://api.exemplo.com/'):
+            self.assertEqual(render_budgets([budget]), 1)
+
+            budget.refresh_from_db()
+            self.assertTrue(budget.pdf_url.startswith(f"https://api.exemplo.com/media/budgets/orcamento_{budget.id}"))
+            with open(f"{media_root}/budgets/orcamento_{budget.id}.pdf", 'rb') as f:
+                content = f.read()
+        self.assertIn("Cliente: Silva & Filhos <Ltda>".encode('cp1252'), content)
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'backend_core'))
+
+from tickets.rag_evaluation import diff_reports, recall_at_k, reciprocal_rank, run_evaluation
+
+CORPUS = {
+    'servidor': [{'id': 'manual-servidor-01', 'content': 'Reinicie o serviço.'},
+                 {'id': 'manual-rede-01', 'content': 'Verifique o firewall.'}],
+    'banco': [{'id': 'manual-rede-01', 'content': 'Verifique o firewall.'},
+              {'id': 'manual-banco-01', 'content': 'Renove as credenciais.'}],
+}
+
+
+def fake_retrieve(question):
+    if question == 'falha':
+        raise RuntimeError('OpenSearch indisponível')
+    return CORPUS[question]
+
+
+def fake_generate(question, documents):
+    return documents[0]['content'], 10, 3
+
+
+class TestRagEvaluation(unittest.TestCase):
+    def test_recall_and_reciprocal_rank(self):
+        self.assertEqual(recall_at_k(['a', 'b', 'c'], ['b', 'x'], k=2), 0.5)
+        self.assertEqual(recall_at_k(['a', 'b', 'c'], ['c'], k=2), 0.0)
+        self.assertEqual(reciprocal_rank(['a', 'b', 'c'], ['c', 'b']), 0.5)
+        self.assertEqual(reciprocal_rank(['a'], ['z']), 0.0)
+
+    def test_run_evaluation_summary_and_errors(self):
+        cases = [
+            {'id': 'c1', 'question': 'servidor', 'expected_sources': ['manual-servidor-01']},
+            {'id': 'c2', 'question': 'banco', 'expected_sources': ['manual-banco-01']},
+            {'id': 'c3', 'question': 'falha', 'expected_sources': ['manual-banco-01']},
+        ]
+        report = run_evaluation(cases, fake_retrieve, fake_generate, k=2, workers=2)
+        summary = report['summary']
+
+        self.assertEqual(summary['cases'], 3)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['recall_at_k'], 1.0)
+        self.assertEqual(summary['mrr'], 0.75)
+        self.assertEqual(summary['prompt_tokens']['p95'], 10)
+        self.assertIn('error', report['cases'][2])
+
+    def test_diff_reports_flags_worse_cases(self):
+        cases = [{'id': 'c2', 'question': 'banco', 'expected_sources': ['manual-banco-01']}]
+        baseline = run_evaluation(cases, fake_retrieve, fake_generate, k=2, workers=1)
+        current = run_evaluation(cases, fake_retrieve, fake_generate, k=1, workers=1)
+
+        diff = diff_reports(current, baseline)
+        self.assertEqual(diff['recall_at_k']['delta'], -1.0)
+        self.assertEqual(diff['worse_cases'], ['c2'])
+        self.assertIn('total_ms.p95', diff)
+
+
+if __name__ == '__main__':
+    unittest.main()
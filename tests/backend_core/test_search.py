@@ -0,0 +1,74 @@
+from django.test import TestCase
+
+from tickets import search
+from tickets.models import Ticket
+from tickets.search import SEARCH_MAX_TERMS, query_terms, search_tickets
+
+
+def new_ticket(description):
+    return Ticket.objects.create(customer_name='Ana', problem_description=description)
+
+
+class QueryTermsTest(TestCase):
+    def test_words_are_lowercased_and_limited(self):
+        self.assertEqual(query_terms('Impressora SEM toner!'), ['impressora', 'sem', 'toner'])
+        self.assertEqual(len(query_terms(' '.join(f'termo{n}' for n in range(30)))), SEARCH_MAX_TERMS)
+
+    def test_fts5_query_quotes_terms_and_prefixes_last(self):
+        self.assertEqual(search._fts5_query(['luz', 'verm']), '"luz" "verm"*')
+
+
+class SqliteSearchTest(TestCase):
+    """Busca pelo índice FTS5 criado pela migração 0004 (banco de testes em SQLite)."""
+
+    def setUp(self):
+        self.printer = new_ticket('Impressora do financeiro sem toner')
+        self.printer_jam = new_ticket('Impressora atolando papel, toner novo')
+        self.server = new_ticket('Servidor com luz vermelha piscando')
+
+    def ids(self, text, **kwargs):
+        total, results = search_tickets(text, **kwargs)
+        return total, [ticket.id for ticket, _ in results]
+
+    def test_ranks_matching_tickets_only(self):
+        total, results = search_tickets('impressora toner')
+        self.assertEqual(total, 2)
+        self.assertEqual({ticket.id for ticket, _ in results}, {self.printer.id, self.printer_jam.id})
+        ranks = [rank for _, rank in results]
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+        self.assertEqual(self.ids('vermelha'), (1, [self.server.id]))
+        self.assertEqual(self.ids('teclado'), (0, []))
+
+    def test_last_term_matches_as_prefix(self):
+        self.assertEqual(self.ids('servidor verm'), (1, [self.server.id]))
+
+    def test_pagination_keeps_total(self):
+        first = self.ids('impressora', limit=1)
+        second = self.ids('impressora', limit=1, offset=1)
+        self.assertEqual((first[0], second[0]), (2, 2))
+        self.assertEqual(sorted(first[1] + second[1]), sorted([self.printer.id, self.printer_jam.id]))
+
+    def test_index_follows_updates_and_deletes(self):
+        self.server.problem_description = 'Servidor sem acesso à rede'
+        self.server.save()
+        self.printer.delete()
+
+        self.assertEqual(self.ids('vermelha'), (0, []))
+        self.assertEqual(self.ids('rede'), (1, [self.server.id]))
+        self.assertEqual(self.ids('financeiro'), (0, []))
+
+    def test_user_operators_are_literals(self):
+        self.assertEqual(search_tickets('"'), (0, []))
+        self.assertEqual(self.ids('toner OR servidor NOT'), (0, []))
+        self.assertEqual(self.ids('toner AND'), (0, []))
+
+
+class ScanSearchTest(TestCase):
+    def test_like_fallback(self):
+        server = new_ticket('Servidor com luz vermelha piscando')
+        new_ticket('Impressora sem toner')
+
+        with self.assertLogs('tickets.search', level='WARNING'):
+            total, rows = search._scan_search(['servidor', 'vermelha'], limit=10, offset=0)
+        self.assertEqual((total, rows), (1, [(server.id, None)]))
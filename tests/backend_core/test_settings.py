@@ -0,0 +1,66 @@
+import os
+import runpy
+import unittest
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+
+SETTINGS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'backend_core', 'core', 'settings.py')
+SHARED_CACHE = 'django.core.cache.backends.db.DatabaseCache'
+
+
+def load_settings(**env):
+    """Executa core/settings.py com as variáveis de ambiente informadas (cache compartilhado por padrão)."""
+    env.setdefault('CACHE_BACKEND', SHARED_CACHE)
+    with mock.patch.dict(os.environ, env):
+        return runpy.run_path(SETTINGS_PATH)
+
+
+class TestAdmissionQueueSize(unittest.TestCase):
+    def test_queue_is_sized_to_gunicorn_threads(self):
+        settings = load_settings(SERVER_PROFILE='wsgi', GUNICORN_THREADS='4', CHAT_ADMISSION_QUEUE_SIZE='20')
+        self.assertEqual(settings['CHAT_ADMISSION_QUEUE_SIZE'], 3)
+        settings = load_settings(SERVER_PROFILE='wsgi', GUNICORN_THREADS='16', CHAT_ADMISSION_QUEUE_SIZE='5')
+        self.assertEqual(settings['CHAT_ADMISSION_QUEUE_SIZE'], 5)
+
+    def test_asgi_rejects_immediately(self):
+        settings = load_settings(SERVER_PROFILE='asgi', CHAT_ADMISSION_QUEUE_SIZE='20')
+        self.assertEqual(settings['CHAT_ADMISSION_QUEUE_SIZE'], 0)
+
+    def test_dev_keeps_configured_queue(self):
+        settings = load_settings(SERVER_PROFILE='dev', CHAT_ADMISSION_QUEUE_SIZE='20')
+        self.assertEqual(settings['CHAT_ADMISSION_QUEUE_SIZE'], 20)
+
+
+class TestConnMaxAge(unittest.TestCase):
+    def test_persistent_connections_outside_asgi(self):
+        for profile in ('dev', 'wsgi'):
+            settings = load_settings(SERVER_PROFILE=profile, DB_CONN_MAX_AGE='120')
+            self.assertEqual(settings['DATABASES']['default']['CONN_MAX_AGE'], 120)
+
+    def test_asgi_closes_connections_per_request(self):
+        settings = load_settings(SERVER_PROFILE='asgi', DB_CONN_MAX_AGE='120')
+        self.assertEqual(settings['DATABASES']['default']['CONN_MAX_AGE'], 0)
+        settings = load_settings(SERVER_PROFILE='asgi', DB_CONN_MAX_AGE='120', DB_ENGINE='django.db.backends.postgresql')
+        self.assertEqual(settings['DATABASES']['default']['CONN_MAX_AGE'], 0)
+
+
+class TestSharedCacheRequirement(unittest.TestCase):
+    def test_local_cache_rejected_with_several_workers(self):
+        local = 'django.core.cache.backends.locmem.LocMemCache'
+        for profile in ('wsgi', 'asgi'):
+            with self.subTest(profile=profile), self.assertRaises(ImproperlyConfigured):
+                load_settings(SERVER_PROFILE=profile, WEB_CONCURRENCY='4', CACHE_BACKEND=local)
+
+    def test_local_cache_allowed_in_single_process(self):
+        local = 'django.core.cache.backends.locmem.LocMemCache'
+        load_settings(SERVER_PROFILE='dev', WEB_CONCURRENCY='4', CACHE_BACKEND=local)
+        load_settings(SERVER_PROFILE='wsgi', WEB_CONCURRENCY='1', CACHE_BACKEND=local)
+
+    def test_shared_cache_accepted(self):
+        settings = load_settings(SERVER_PROFILE='wsgi', WEB_CONCURRENCY='4', CACHE_LOCATION='nexus_cache')
+        self.assertEqual(settings['CACHES']['default']['BACKEND'], SHARED_CACHE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from tickets import stats
+from tickets.models import Budget, BudgetServiceStat, Ticket, TicketArchive, TicketDailyStat
+
+
+def ticket_counts():
+    return {(row.day, row.status): row.count for row in TicketDailyStat.objects.all() if row.count}
+
+
+def budget_counts():
+    return {row.service_type: (row.count, row.total_value) for row in BudgetServiceStat.objects.all() if row.count}
+
+
+def new_ticket(**fields):
+    return Ticket.objects.create(**{'customer_name': 'Ana', 'problem_description': 'Sem rede', **fields})
+
+
+class TicketSignalsTest(TestCase):
+    def test_create_status_change_and_delete(self):
+        today = timezone.localdate()
+        ticket = new_ticket()
+        new_ticket()
+        self.assertEqual(ticket_counts(), {(today, 'OPEN'): 2})
+
+        ticket.status = 'RESOLVED'
+        ticket.save()
+        self.assertEqual(ticket_counts(), {(today, 'OPEN'): 1, (today, 'RESOLVED'): 1})
+
+        # Gravação sem mudança de status não altera os contadores
+        ticket.problem_description = 'Sem rede no andar 2'
+        ticket.save()
+        self.assertEqual(ticket_counts(), {(today, 'OPEN'): 1, (today, 'RESOLVED'): 1})
+
+        ticket.delete()
+        self.assertEqual(ticket_counts(), {(today, 'OPEN'): 1})
+        self.assertEqual(stats.read_stats(), stats.live_stats())
+
+    def test_budget_value_and_service_changes(self):
+        budget = Budget.objects.create(customer_name='Ana', service_type='Manutenção', total_value=Decimal('100.00'))
+        Budget.objects.create(customer_name='Bia', service_type='Manutenção', total_value=Decimal('50.00'))
+        self.assertEqual(budget_counts(), {'Manutenção': (2, Decimal('150.00'))})
+
+        budget.service_type = 'Consultoria'
+        budget.total_value = Decimal('300.00')
+        budget.save()
+        self.assertEqual(budget_counts(), {'Manutenção': (1, Decimal('50.00')), 'Consultoria': (1, Decimal('300.00'))})
+
+        budget.delete()
+        self.assertEqual(budget_counts(), {'Manutenção': (1, Decimal('50.00'))})
+
+    def test_suspended_rollups_are_not_updated(self):
+        with stats.suspend_rollups():
+            new_ticket()
+            self.assertTrue(stats.rollups_suspended())
+        self.assertFalse(stats.rollups_suspended())
+        self.assertEqual(ticket_counts(), {})
+
+
+class RecordTicketsCreatedTest(TestCase):
+    def test_counts_bulk_inserted_tickets_by_day_and_status(self):
+        tickets = [Ticket(customer_name='Ana', problem_description='x', status=status)
+                   for status in ('OPEN', 'OPEN', 'IN_PROGRESS')]
+        Ticket.objects.bulk_create(tickets)
+        stats.record_tickets_created(tickets)
+
+        today = timezone.localdate()
+        self.assertEqual(ticket_counts(), {(today, 'OPEN'): 2, (today, 'IN_PROGRESS'): 1})
+        self.assertEqual(stats.reconcile(), 0)
+
+
+class ReconcileTest(TestCase):
+    def test_consistent_tables_report_no_drift(self):
+        new_ticket()
+        Budget.objects.create(customer_name='Ana', service_type='Manutenção', total_value=Decimal('10.00'))
+        self.assertEqual(stats.reconcile(), 0)
+
+    def test_recomputes_drifted_rows_including_archive(self):
+        now = timezone.now()
+        with stats.suspend_rollups():
+            new_ticket()
+            Budget.objects.create(customer_name='Ana', service_type='Manutenção', total_value=Decimal('10.00'))
+        TicketArchive.objects.create(
+            id=999, customer_name='Bia', problem_description='antigo', status='CLOSED', created_at=now, updated_at=now,
+        )
+        # Linha de rollup sem dados correspondentes
+        TicketDailyStat.objects.create(day=timezone.localdate(), status='IN_PROGRESS', count=5)
+
+        self.assertEqual(stats.reconcile(), 4)
+        today = timezone.localdate()
+        self.assertEqual(ticket_counts(), {(today, 'OPEN'): 1, (today, 'CLOSED'): 1})
+        self.assertEqual(budget_counts(), {'Manutenção': (1, Decimal('10.00'))})
+        self.assertEqual(stats.reconcile(), 0)
+        self.assertEqual(stats.read_stats()['tickets'], stats.live_stats()['tickets'])
+
+    def test_rollup_rows_are_locked_before_counting(self):
+        calls = []
+        select_for_update = TicketDailyStat.objects.select_for_update
+        count_by_day = stats._ticket_counts_by_day
+
+        def lock():
+            calls.append('trava')
+            return select_for_update()
+
+        def count():
+            calls.append('contagem')
+            return count_by_day()
+
+        with mock.patch.object(TicketDailyStat.objects, 'select_for_update', lock), \
+                mock.patch.object(stats, '_ticket_counts_by_day', count):
+            stats.reconcile()
+        self.assertEqual(calls, ['trava', 'contagem'])
+
+    def test_command_reports_result(self):
+        out = StringIO()
+        call_command('reconcile_stats', stdout=out)
+        self.assertIn("Estatísticas consistentes", out.getvalue())
@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import unittest
+import zipfile
+from dialogflow_automation.core.agent_archive import (
+    build_agent_archive, diff_agent_archives, read_agent_archive, validate_agent_archive
+)
+from dialogflow_automation.core.parser import ConfigParser
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'dialogflow_automation', 'config')
+
+ENTITY_TYPES = [
+    {
+        "display_name": "TipoServico",
+        "kind": "KIND_MAP",
+        "entities": [{"value": "Consultoria Padrão", "synonyms": ["padrão", "básica"]}]
+    }
+]
+
+
+def rewrite(content, path, new_value):
+    """Cópia do ZIP com um arquivo substituído (None remove o arquivo)."""
+    files = read_agent_archive(content)
+    if new_value is None:
+        files.pop(path)
+    else:
+        files[path] = new_value
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, value in files.items():
+            archive.writestr(name, json.dumps(value))
+    return buffer.getvalue()
+
+
+class TestAgentArchive(unittest.TestCase):
+    def setUp(self):
+        self.intents = ConfigParser(CONFIG_DIR).load_intents()
+        self.content = build_agent_archive(self.intents, ENTITY_TYPES, "Nexus AI", webhook_url="https://exemplo/webhook")
+
+    def test_project_config_compiles_to_valid_archive(self):
+        files = read_agent_archive(self.content)
+
+        self.assertEqual(validate_agent_archive(self.content), [])
+        self.assertEqual(files["agent.json"]["webhook"]["url"], "https://exemplo/webhook")
+        self.assertEqual(files["package.json"], {"version": "1.0.0"})
+        for intent in self.intents:
+            name = intent["display_name"]
+            self.assertEqual(files[f"intents/{name}.json"]["responses"][0]["messages"][0]["speech"], intent["messages"])
+            if intent["training_phrases"]:
+                phrases = [item["data"][0]["text"] for item in files[f"intents/{name}_usersays_pt-br.json"]]
+                self.assertEqual(phrases, intent["training_phrases"])
+
+    def test_followup_intent_keeps_event_webhook_and_parameter_value(self):
+        intent = read_agent_archive(self.content)["intents/duvida_tecnica_continuacao.json"]
+
+        self.assertEqual(intent["events"], [{"name": "RESPOSTA_PENDENTE"}])
+        self.assertTrue(intent["webhookUsed"])
+        self.assertEqual(intent["responses"][0]["parameters"][0]["value"], "#RESPOSTA_PENDENTE.query")
+
+    def test_intents_served_by_lambda_use_webhook(self):
+        files = read_agent_archive(self.content)
+        for name in ("duvida_tecnica", "duvida_tecnica_continuacao", "abrir_chamado", "gerar_orcamento"):
+            self.assertTrue(files[f"intents/{name}.json"]["webhookUsed"], name)
+
+    def test_validation_rejects_webhook_url_without_webhook_intents(self):
+        intents = [dict(intent, webhook=False) for intent in self.intents]
+        content = build_agent_archive(intents, ENTITY_TYPES, "Nexus AI", webhook_url="https://exemplo/webhook")
+        self.assertIn("O agente tem URL de fulfillment, mas nenhuma intenção usa o webhook.",
+                      validate_agent_archive(content))
+
+    def test_map_entity_includes_value_among_synonyms(self):
+        entries = read_agent_archive(self.content)["entities/TipoServico_entries_pt-br.json"]
+        self.assertEqual(entries, [{"value": "Consultoria Padrão", "synonyms": ["Consultoria Padrão", "padrão", "básica"]}])
+
+    def test_build_is_deterministic(self):
+        again = build_agent_archive(self.intents, ENTITY_TYPES, "Nexus AI", webhook_url="https://exemplo/webhook")
+        self.assertEqual(again, self.content)
+
+    def test_validation_reports_structural_errors(self):
+        self.assertEqual(validate_agent_archive(b"nao e zip")[0][:20], "Conteúdo não é um ZI")
+
+        broken = rewrite(self.content, "intents/abrir_chamado.json", None)
+        self.assertIn("Frases de treinamento sem intenção correspondente: intents/abrir_chamado_usersays_pt-br.json",
+                      validate_agent_archive(broken))
+
+        intent = read_agent_archive(self.content)["intents/gerar_orcamento.json"]
+        intent["responses"][0]["parameters"][0]["dataType"] = "@Inexistente"
+        errors = validate_agent_archive(rewrite(self.content, "intents/gerar_orcamento.json", intent))
+        self.assertEqual(len(errors), 1)
+        self.assertIn("@Inexistente", errors[0])
+
+    def test_diff_ignores_ids_and_reports_changed_files(self):
+        files = read_agent_archive(self.content)
+        renumbered = files["intents/abrir_chamado.json"]
+        renumbered["id"] = "outro-id"
+        self.assertEqual(diff_agent_archives(self.content, rewrite(self.content, "intents/abrir_chamado.json", renumbered)),
+                         {"added": [], "removed": [], "changed": []})
+
+        changed = dict(self.intents[0], messages=["Nova resposta"])
+        new_content = build_agent_archive([changed] + self.intents[1:], [], "Nexus AI", webhook_url="https://exemplo/webhook")
+        self.assertEqual(diff_agent_archives(self.content, new_content), {
+            "added": [],
+            "removed": ["entities/TipoServico.json", "entities/TipoServico_entries_pt-br.json"],
+            "changed": ["intents/duvida_tecnica.json"],
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from dialogflow_automation.core.parser import ConfigParser
+from dialogflow_automation.core.regression import (
+    ERROR_LABEL, NO_MATCH_LABEL, RateLimiter, build_report, check_gates, load_held_out, load_test_cases,
+    percentile, run_regression
+)
+
+CONFIG_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'dialogflow_automation', 'config')
+
+
+class FakeSessionsClient:
+    """SessionsClient falso: reconhece a intenção por uma tabela frase -> intenção."""
+
+    def __init__(self, answers, delay=0.0, failures=()):
+        self.answers = answers
+        self.delay = delay
+        self.failures = set(failures)
+        self.sessions = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def detect_intent(self, request, timeout=None):
+        text = request["query_input"]["text"]["text"]
+        with self._lock:
+            self.sessions.append(request["session"])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if text in self.failures:
+                raise RuntimeError("429 Quota exceeded")
+            intent = SimpleNamespace(display_name=self.answers.get(text, ""))
+            return SimpleNamespace(query_result=SimpleNamespace(intent=intent, intent_detection_confidence=0.9))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class TestRegression(unittest.TestCase):
+    def setUp(self):
+        self.intents = ConfigParser(CONFIG_DIR).load_intents()
+        self.held_out = load_held_out(os.path.join(CONFIG_DIR, 'test_phrases.json'))
+        self.cases = load_test_cases(self.intents, self.held_out)
+        self.answers = {text: expected for expected, text, _ in self.cases}
+
+    def test_test_cases_cover_training_and_held_out_phrases(self):
+        sources = {source for _, _, source in self.cases}
+        self.assertEqual(sources, {'training', 'held_out'})
+        training = sum(len(intent['training_phrases']) for intent in self.intents)
+        self.assertEqual(len(self.cases), training + sum(len(p) for p in self.held_out.values()))
+
+        with self.assertRaises(ValueError):
+            load_test_cases(self.intents, {'intencao_inexistente': ['oi']})
+
+    def test_perfect_agent_passes_with_bounded_concurrency(self):
+        client = FakeSessionsClient(self.answers, delay=0.01)
+        results = run_regression(client, 'projeto', self.cases, concurrency=4, rate=0)
+        report = build_report(results)
+
+        self.assertEqual(report['accuracy'], 1.0)
+        self.assertEqual([r['text'] for r in results], [text for _, text, _ in self.cases])
+        self.assertLessEqual(client.max_active, 4)
+        self.assertGreater(client.max_active, 1)
+        # Uma sessão por frase: contextos não vazam entre os casos
+        self.assertEqual(len(set(client.sessions)), len(self.cases))
+        self.assertEqual(check_gates(report, min_accuracy=0.95, max_p95_ms=5000), [])
+
+    def test_confusion_matrix_and_failures(self):
+        answers = dict(self.answers)
+        answers['Gostaria de um orçamento'] = 'abrir_chamado'
+        answers['Registrar um problema'] = ''
+        client = FakeSessionsClient(answers, failures={'Erro no sistema'})
+        report = build_report(run_regression(client, 'projeto', self.cases, concurrency=2, rate=0))
+
+        self.assertEqual(report['errors'], 1)
+        self.assertEqual(report['total'] - report['correct'], 3)
+        self.assertEqual(report['confusion']['gerar_orcamento']['abrir_chamado'], 1)
+        self.assertEqual(report['confusion']['abrir_chamado'][NO_MATCH_LABEL], 1)
+        self.assertEqual(report['confusion']['duvida_tecnica'][ERROR_LABEL], 1)
+        self.assertLess(report['per_intent']['gerar_orcamento']['accuracy'], 1.0)
+        self.assertEqual(report['per_source']['held_out']['accuracy'], 1.0)
+        self.assertEqual(len(report['misclassified']), 3)
+        self.assertEqual(len(check_gates(report, min_accuracy=1.0)), 1)
+
+    def test_rate_limiter_spaces_calls(self):
+        now = [0.0]
+        sleeps = []
+        limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleeps.append)
+        for _ in range(3):
+            limiter.acquire()
+        self.assertEqual(sleeps, [0.25, 0.5])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertIsNone(percentile([], 95))
+
+    def test_latency_percentiles(self):
+        results = [
+            {"expected": "a", "text": str(ms), "source": "training", "predicted": "a", "confidence": 0.9,
+             "latency_ms": float(ms), "error": None}
+            for ms in range(100, 0, -1)
+        ]
+        latency = build_report(results)["latency_ms"]
+        self.assertEqual((latency["p50"], latency["p95"], latency["max"]), (50.0, 95.0, 100.0))
+
+        failed = [dict(result, error="429 Quota exceeded") for result in results]
+        self.assertIsNone(build_report(failed)["latency_ms"]["p95"])
+        self.assertEqual(check_gates(build_report(failed), max_p95_ms=1000),
+                         ["Nenhuma chamada concluída para medir a latência."])
+
+
+if __name__ == '__main__':
+    unittest.main()
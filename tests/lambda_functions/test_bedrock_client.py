@@ -0,0 +1,160 @@
+import io
+import json
+import os
+import sys
+import threading
+import unittest
+
+# Os módulos do Lambda são empacotados na raiz do ZIP, então importamos pelo diretório
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from bedrock_client import BedrockInvoker, BedrockUnavailableError
+
+
+class FakeClientError(Exception):
+    """Imita a botocore ClientError (atributo `response` com o código de erro)."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {'Error': {'Code': code, 'Message': code}}
+
+
+class StubBedrockClient:
+    """Cliente stub: cada modelId responde com um erro ou com um texto fixo."""
+
+    def __init__(self, behaviors):
+        self.behaviors = behaviors
+        self.calls = []
+
+    def invoke_model(self, modelId, body, **kwargs):
+        self.calls.append((modelId, json.loads(body)))
+        behavior = self.behaviors[modelId]
+        if isinstance(behavior, Exception):
+            raise behavior
+        return {'body': io.BytesIO(json.dumps({'completion': behavior}).encode('utf-8'))}
+
+
+class TestBedrockInvoker(unittest.TestCase):
+    def test_returns_first_model_response(self):
+        client = StubBedrockClient({'model-a': ' resposta ', 'model-b': 'outra'})
+        invoker = BedrockInvoker(client=client, model_ids=['model-a', 'model-b'])
+
+        body, model_id = invoker.invoke({'prompt': 'oi'})
+
+        self.assertEqual(model_id, 'model-a')
+        self.assertEqual(body['completion'], ' resposta ')
+        self.assertEqual(len(client.calls), 1)
+
+    def test_falls_back_on_throttling(self):
+        client = StubBedrockClient({
+            'model-a': FakeClientError('ThrottlingException'),
+            'model-b': 'resposta fallback',
+        })
+        invoker = BedrockInvoker(client=client, model_ids=['model-a', 'model-b'])
+
+        body, model_id = invoker.invoke({'prompt': 'oi'})
+
+        self.assertEqual(model_id, 'model-b')
+        self.assertEqual([call[0] for call in client.calls], ['model-a', 'model-b'])
+
+    def test_non_fallback_error_is_raised(self):
+        client = StubBedrockClient({
+            'model-a': FakeClientError('ValidationException'),
+            'model-b': 'nunca chamado',
+        })
+        invoker = BedrockInvoker(client=client, model_ids=['model-a', 'model-b'])
+
+        with self.assertRaises(FakeClientError):
+            invoker.invoke({'prompt': 'oi'})
+        self.assertEqual(len(client.calls), 1)
+
+    def test_all_models_unavailable(self):
+        client = StubBedrockClient({
+            'model-a': FakeClientError('ThrottlingException'),
+            'model-b': FakeClientError('ServiceUnavailableException'),
+        })
+        sleeps = []
+        invoker = BedrockInvoker(client=client, model_ids=['model-a', 'model-b'], max_attempts=3,
+                                 retry_backoff=0.1, sleep=sleeps.append)
+
+        with self.assertRaises(BedrockUnavailableError):
+            invoker.invoke({'prompt': 'oi'})
+        # O retry é feito aqui, em passadas pela lista de modelos com backoff
+        self.assertEqual([call[0] for call in client.calls], ['model-a', 'model-b'] * 3)
+        self.assertEqual(sleeps, [0.1, 0.2])
+
+    def test_permission_error_is_not_retried_on_other_models(self):
+        client = StubBedrockClient({
+            'model-a': FakeClientError('AccessDeniedException'),
+            'model-b': 'nunca chamado',
+        })
+        invoker = BedrockInvoker(client=client, model_ids=['model-a', 'model-b'])
+
+        with self.assertRaises(FakeClientError):
+            invoker.invoke({'prompt': 'oi'})
+        self.assertEqual(len(client.calls), 1)
+
+    def test_read_timeout_follows_deadline(self):
+        created = []
+
+        def factory(read_timeout):
+            created.append(read_timeout)
+            return StubBedrockClient({'model-a': FakeClientError('ThrottlingException'), 'model-b': 'ok'})
+
+        invoker = BedrockInvoker(model_ids=['model-a', 'model-b'], min_call_seconds=0.1, client_factory=factory)
+
+        body, model_id = invoker.invoke({'prompt': 'oi'}, timeout=2.5)
+
+        # Throttling no primeiro modelo não consome o prazo: o fallback é chamado
+        self.assertEqual(model_id, 'model-b')
+        self.assertEqual(created, [3])
+        invoker.invoke({'prompt': 'oi'}, timeout=2.5)
+        self.assertEqual(created, [3])
+        self.assertEqual(invoker.client_for(None), invoker.client_for(60))
+
+    def test_backoff_stops_at_deadline(self):
+        client = StubBedrockClient({'model-a': FakeClientError('ThrottlingException')})
+        sleeps = []
+        invoker = BedrockInvoker(client=client, model_ids=['model-a'], min_call_seconds=0.5,
+                                 retry_backoff=1.0, sleep=sleeps.append)
+
+        with self.assertRaises(BedrockUnavailableError):
+            invoker.invoke({'prompt': 'oi'}, timeout=1.0)
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual(sleeps, [])
+
+    def test_insufficient_deadline_skips_call(self):
+        client = StubBedrockClient({'model-a': 'resposta'})
+        invoker = BedrockInvoker(client=client, model_ids=['model-a'], min_call_seconds=1.0)
+
+        with self.assertRaises(BedrockUnavailableError):
+            invoker.invoke({'prompt': 'oi'}, timeout=0.2)
+        self.assertEqual(client.calls, [])
+
+    def test_concurrency_limit_respects_deadline(self):
+        entered = threading.Event()
+        release = threading.Event()
+
+        class BlockingClient(StubBedrockClient):
+            def invoke_model(self, modelId, body, **kwargs):
+                entered.set()
+                release.wait(2)
+                return super().invoke_model(modelId, body, **kwargs)
+
+        client = BlockingClient({'model-a': 'resposta'})
+        invoker = BedrockInvoker(client=client, model_ids=['model-a'], max_concurrency=1, min_call_seconds=0)
+
+        worker = threading.Thread(target=invoker.invoke, args=({'prompt': 'primeira'},))
+        worker.start()
+        entered.wait(2)
+        try:
+            # A única vaga está ocupada: a segunda chamada deve desistir ao fim do prazo
+            with self.assertRaises(BedrockUnavailableError):
+                invoker.invoke({'prompt': 'segunda'}, timeout=0.05)
+        finally:
+            release.set()
+            worker.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
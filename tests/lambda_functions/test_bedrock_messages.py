@@ -0,0 +1,86 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from bedrock_client import BEDROCK_MODEL_IDS
+from bedrock_messages import (
+    ANTHROPIC_VERSION, SYSTEM_PROMPT, build_messages_body, parse_messages_response, prefix_is_cacheable,
+    prompt_cache_min_tokens
+)
+
+SONNET = 'us.anthropic.claude-3-7-sonnet-20250219-v1:0'
+HAIKU = 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+# Preâmbulo com ~1.500 tokens: acima do mínimo do Sonnet, abaixo do mínimo do Haiku
+LONG_PROMPT = "Regra de atendimento. " * 275
+
+
+class TestBuildMessagesBody(unittest.TestCase):
+    def test_static_system_prompt_goes_to_system_and_variable_part_to_user(self):
+        body = build_messages_body("Como reinicio o servidor?", "Desligue pelo botão frontal.", model_ids=[SONNET])
+
+        self.assertEqual(body['anthropic_version'], ANTHROPIC_VERSION)
+        self.assertEqual(body['system'][0]['text'], SYSTEM_PROMPT)
+        user_text = body['messages'][0]['content'][0]['text']
+        self.assertIn("Desligue pelo botão frontal.", user_text)
+        self.assertTrue(user_text.endswith("Pergunta: Como reinicio o servidor?"))
+        self.assertNotIn("Histórico", user_text)
+
+    def test_system_prompt_is_identical_across_requests(self):
+        first = build_messages_body("pergunta 1", "contexto 1")
+        second = build_messages_body("pergunta 2", "contexto 2", history="Usuário: oi")
+        self.assertEqual(first['system'], second['system'])
+        self.assertIn("Histórico da conversa:\nUsuário: oi", second['messages'][0]['content'][0]['text'])
+
+    def test_default_configuration_marks_system_prompt_for_cache(self):
+        # Preâmbulo padrão com a lista de modelos padrão: o Sonnet aceita o prefixo
+        body = build_messages_body("pergunta", "contexto", model_ids=BEDROCK_MODEL_IDS)
+        self.assertEqual(body['system'], [
+            {'type': 'text', 'text': SYSTEM_PROMPT, 'cache_control': {'type': 'ephemeral'}},
+        ])
+
+    def test_short_prefix_is_not_marked_for_cache(self):
+        body = build_messages_body("pergunta", "contexto", model_ids=[SONNET, HAIKU], system_prompt="Seja breve.")
+        self.assertNotIn('cache_control', body['system'][0])
+
+    def test_long_prefix_is_cached_when_some_model_accepts_it(self):
+        body = build_messages_body("pergunta", "contexto", model_ids=[SONNET, HAIKU], system_prompt=LONG_PROMPT)
+        self.assertEqual(body['system'], [
+            {'type': 'text', 'text': LONG_PROMPT, 'cache_control': {'type': 'ephemeral'}},
+        ])
+        body = build_messages_body("pergunta", "contexto", model_ids=[HAIKU], system_prompt=LONG_PROMPT)
+        self.assertNotIn('cache_control', body['system'][0])
+
+    def test_cache_can_be_disabled(self):
+        body = build_messages_body("pergunta", "contexto", cache_system_prompt=False, model_ids=[SONNET],
+                                   system_prompt=LONG_PROMPT)
+        self.assertNotIn('cache_control', body['system'][0])
+
+    def test_minimum_prefix_by_model(self):
+        self.assertEqual(prompt_cache_min_tokens(SONNET), 1024)
+        self.assertEqual(prompt_cache_min_tokens(HAIKU), 2048)
+        self.assertEqual(prompt_cache_min_tokens('amazon.titan-text-express-v1'), 2048)
+        self.assertFalse(prefix_is_cacheable(LONG_PROMPT))
+
+
+class TestParseMessagesResponse(unittest.TestCase):
+    def test_joins_text_blocks_and_reads_cache_usage(self):
+        text, usage = parse_messages_response({
+            'content': [{'type': 'text', 'text': ' Reinicie '}, {'type': 'text', 'text': 'o serviço. '}],
+            'usage': {'input_tokens': 40, 'output_tokens': 12, 'cache_read_input_tokens': 300},
+        })
+        self.assertEqual(text, "Reinicie o serviço.")
+        self.assertEqual(usage, {
+            'input_tokens': 40, 'output_tokens': 12,
+            'cache_read_input_tokens': 300, 'cache_creation_input_tokens': 0,
+        })
+
+    def test_missing_usage_defaults_to_zero(self):
+        text, usage = parse_messages_response({'content': []})
+        self.assertEqual(text, '')
+        self.assertEqual(set(usage.values()), {0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from faq_store import FaqStore
+
+ENTRY = {
+    'question': "Como reiniciar o servidor?",
+    'variants': ['reiniciar servidor como'],
+    'answer': "Desligue pelo botão frontal e aguarde 30 segundos.",
+    'index_generation': 'kb-v3:1',
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFaqStore(unittest.TestCase):
+    def test_lookup_by_variant_only_in_same_generation(self):
+        store = FaqStore(lambda: [ENTRY], background=False)
+
+        self.assertEqual(store.lookup("COMO reiniciar o servidor", 'kb-v3:1'), ENTRY)
+        self.assertEqual(store.lookup("Reiniciar servidor, como?", 'kb-v3:1'), ENTRY)
+        self.assertIsNone(store.lookup("Como reiniciar o servidor?", 'kb-v3:2'))
+        self.assertIsNone(store.lookup("Como reiniciar o servidor?", None))
+        self.assertEqual(store.stats()['stale'], 2)
+
+    def test_refresh_failure_keeps_previous_snapshot(self):
+        clock = FakeClock()
+        responses = [[ENTRY], ConnectionError("Backend indisponível"), []]
+
+        def fetch():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        store = FaqStore(fetch, refresh_seconds=60, clock=clock, background=False)
+        self.assertIsNotNone(store.lookup("como reiniciar o servidor", 'kb-v3:1'))
+        clock.now = 61
+        self.assertIsNotNone(store.lookup("como reiniciar o servidor", 'kb-v3:1'))
+        self.assertEqual(store.stats()['refresh_errors'], 1)
+        clock.now = 122
+        self.assertIsNone(store.lookup("como reiniciar o servidor", 'kb-v3:1'))
+
+    def test_background_refresh_serves_previous_snapshot(self):
+        clock = FakeClock()
+        started, release = threading.Event(), threading.Event()
+
+        def slow_fetch():
+            started.set()
+            release.wait(5)
+            return []
+
+        store = FaqStore(slow_fetch, refresh_seconds=60, clock=clock)
+        store.load([ENTRY])
+        clock.now = 61
+        # A consulta não espera pela recarga e responde com o snapshot anterior
+        self.assertEqual(store.lookup("como reiniciar o servidor", 'kb-v3:1'), ENTRY)
+        self.assertTrue(started.wait(5))
+        release.set()
+        for _ in range(500):
+            if len(store) == 0:
+                break
+            time.sleep(0.01)
+        self.assertIsNone(store.lookup("como reiniciar o servidor", 'kb-v3:1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+import json_codec
+
+
+class FakeResponse:
+    def __init__(self, content, content_type):
+        self.content = content
+        self.headers = {'Content-Type': content_type}
+
+
+class TestJsonCodec(unittest.TestCase):
+    def test_dumps_matches_stdlib_json_content(self):
+        payload = {'fulfillmentText': "Reinicie o serviço (luz vermelha)", 'itens': [1, 2.5, None, True], 3: 'x'}
+
+        encoded = json_codec.dumps(payload)
+
+        self.assertIsInstance(encoded, str)
+        self.assertEqual(json.loads(encoded), json.loads(json.dumps(payload)))
+        self.assertEqual(json_codec.loads(encoded.encode('utf-8')), json_codec.loads(encoded))
+
+    def test_stdlib_fallback_without_orjson(self):
+        with mock.patch.object(json_codec, 'orjson', None):
+            encoded = json_codec.dumps({'pergunta': "Não liga"})
+            self.assertEqual(encoded, '{"pergunta": "Não liga"}')
+            self.assertEqual(json_codec.loads(encoded), {'pergunta': "Não liga"})
+
+    def test_msgpack_format_requires_package(self):
+        with mock.patch.object(json_codec, 'DJANGO_API_FORMAT', 'msgpack'), \
+                mock.patch.object(json_codec, 'msgpack', None):
+            body, headers = json_codec.encode_request({'status': 'OPEN'})
+
+        self.assertEqual(headers['Content-Type'], json_codec.JSON_MEDIA_TYPE)
+        self.assertEqual(json.loads(body), {'status': 'OPEN'})
+
+    def test_decode_response_by_content_type(self):
+        response = FakeResponse(b'{"id": 42, "parent": null}', 'application/json; charset=utf-8')
+        self.assertEqual(json_codec.decode_response(response), {'id': 42, 'parent': None})
+
+        packer = mock.Mock()
+        packer.unpackb.return_value = {'id': 7}
+        with mock.patch.object(json_codec, 'msgpack', packer):
+            self.assertEqual(json_codec.decode_response(FakeResponse(b'\x81', 'application/msgpack')), {'id': 7})
+        packer.unpackb.assert_called_once_with(b'\x81', raw=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
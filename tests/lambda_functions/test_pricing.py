@@ -0,0 +1,45 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+import pricing
+
+
+class TestPricing(unittest.TestCase):
+    def test_service_matching_by_keyword(self):
+        self.assertEqual(pricing.quote('Consultoria Premium')['total_value'], '1500.00')
+        self.assertEqual(pricing.quote('consultoria padrao')['total_value'], '1000.00')
+        # Texto desconhecido cai no serviço padrão da tabela
+        self.assertEqual(pricing.quote('algo diferente')['service_name'], 'Consultoria Padrão')
+
+    def test_adjustments_compose_total(self):
+        result = pricing.quote('Consultoria Padrão', {'urgencia': 'Alta', 'horas_adicionais': 5.0})
+
+        self.assertEqual(result['total_value'], '1950.00')
+        self.assertEqual([item['value'] for item in result['items']], ['1000.00', '200.00', '750.00'])
+
+    def test_invalid_quantities_are_ignored(self):
+        for value in ('NaN', 'sNaN', 'Infinity', '-inf', 'duas'):
+            with self.subTest(value=value):
+                result = pricing.quote('Consultoria Padrão', {'horas_adicionais': value, 'usuarios': value})
+                self.assertEqual(result['total_value'], '1000.00')
+                self.assertEqual(len(result['items']), 1)
+
+    def test_irrelevant_parameters_share_cache_entry(self):
+        pricing._quote_cached.cache_clear()
+        pricing.quote('premium', {'person': {'name': 'Ana'}})
+        pricing.quote('premium', {'person': {'name': 'Bruno'}})
+
+        info = pricing._quote_cached.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_result_is_a_copy(self):
+        first = pricing.quote('premium')
+        first['items'][0]['value'] = '0'
+        self.assertEqual(pricing.quote('premium')['items'][0]['value'], '1500.00')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import itertools
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from reranker import Reranker, stems
+
+PASSAGES = [
+    {'id': 'rede', 'content': "O servidor de arquivos usa a rede principal. Erros de rede indicam firewall."},
+    {'id': 'impressora', 'content': "A impressora do servidor fica no segundo andar."},
+    {'id': 'reinicio', 'content': "Luz vermelha piscando: reinicie o servidor pelo painel e aguarde o reinício."},
+    {'id': 'banco', 'content': "Credenciais expiradas impedem o acesso ao banco de dados."},
+]
+
+
+class TestReranker(unittest.TestCase):
+    def test_stems_cover_morphological_variants(self):
+        self.assertEqual(stems("reiniciar")[0], stems("Reinício")[0])
+        self.assertNotIn('de', stems("erro de rede"))
+
+    def test_best_passage_moves_to_top(self):
+        result = Reranker(top_n=2).rerank("como reiniciar o servidor com a luz vermelha piscando", PASSAGES)
+        self.assertTrue(result.complete)
+        self.assertEqual(len(result.passages), 2)
+        self.assertEqual(result.passages[0]['id'], 'reinicio')
+        self.assertGreaterEqual(result.passages[0]['rerank_score'], result.passages[1]['rerank_score'])
+
+    def test_keeps_original_order_when_budget_is_exceeded(self):
+        ticks = itertools.count(0, 1.0)
+        reranker = Reranker(top_n=2, max_ms=10, clock=lambda: next(ticks))
+        result = reranker.rerank("luz vermelha piscando", PASSAGES)
+        self.assertFalse(result.complete)
+        self.assertEqual([p['id'] for p in result.passages], ['rede', 'impressora'])
+
+    def test_query_without_terms_returns_prefix(self):
+        result = Reranker(top_n=1).rerank("o que?", PASSAGES)
+        self.assertEqual(result.passages, PASSAGES[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
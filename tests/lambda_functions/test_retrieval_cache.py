@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from retrieval_cache import IndexGenerationTracker, RetrievalCache, fetch_index_generation
+
+DOCS = [{'id': 'manual-servidor-01', 'content': "Reinicie o serviço se a luz vermelha piscar."}]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeIndices:
+    def __init__(self):
+        self.generation = 1
+
+    def get_mapping(self, index, **kwargs):
+        return {f"{index}-v3": {'mappings': {'_meta': {'generation': self.generation}}}}
+
+
+class FakeClient:
+    def __init__(self):
+        self.indices = FakeIndices()
+
+
+class TestRetrievalCache(unittest.TestCase):
+    def test_key_normalizes_query_and_generation_invalidates(self):
+        cache = RetrievalCache()
+        cache.set(RetrievalCache.key("Luz VERMELHA piscando?", 'kb', 'g1'), DOCS)
+
+        self.assertEqual(cache.get(RetrievalCache.key("luz vermelha piscando", 'kb', 'g1')), DOCS)
+        self.assertIsNone(cache.get(RetrievalCache.key("luz vermelha piscando", 'kb', 'g2')))
+        self.assertEqual(cache.stats()['hit_rate'], 0.5)
+
+    def test_entry_and_total_size_limits(self):
+        cache = RetrievalCache(max_entries=10, max_bytes=1000, max_entry_bytes=600)
+        big = [{'id': 'x', 'content': 'a' * 700}]
+        self.assertFalse(cache.set(('grande',), big))
+
+        medium = [{'id': 'x', 'content': 'a' * 250}]
+        cache.set(('q1',), medium)
+        cache.set(('q2',), medium)
+        self.assertEqual(len(cache), 1)
+        self.assertIsNone(cache.get(('q1',)))
+        stats = cache.stats()
+        self.assertEqual((stats['evictions'], stats['oversize']), (1, 1))
+        self.assertLessEqual(stats['bytes'], 1000)
+
+    def test_ttl_expiration(self):
+        clock = FakeClock()
+        cache = RetrievalCache(ttl_seconds=60, clock=clock)
+        cache.set(('q',), DOCS)
+        clock.now = 61
+        self.assertIsNone(cache.get(('q',)))
+        self.assertEqual(len(cache), 0)
+
+    def test_generation_tracker_refreshes_after_ttl(self):
+        clock = FakeClock()
+        client = FakeClient()
+        tracker = IndexGenerationTracker(ttl_seconds=10, clock=clock)
+        fetch = lambda: fetch_index_generation(client, 'kb')
+
+        self.assertEqual(tracker.current(fetch), 'kb-v3:1')
+        client.indices.generation = 2
+        self.assertEqual(tracker.current(fetch), 'kb-v3:1')
+        clock.now = 11
+        self.assertEqual(tracker.current(fetch), 'kb-v3:2')
+
+    def test_generation_tracker_failure_disables_cache(self):
+        def failing_fetch():
+            raise ConnectionError("OpenSearch indisponível")
+
+        self.assertIsNone(IndexGenerationTracker(ttl_seconds=0).current(failing_fetch))
+
+    def test_generation_tracker_fetches_outside_lock_once(self):
+        clock = FakeClock()
+        tracker = IndexGenerationTracker(ttl_seconds=10, clock=clock)
+        self.assertEqual(tracker.current(lambda: 'kb-v3:1'), 'kb-v3:1')
+
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow_fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'kb-v3:2'
+
+        clock.now = 11
+        refresher = threading.Thread(target=tracker.current, args=(slow_fetch,))
+        refresher.start()
+        started.wait(5)
+        # Enquanto a consulta está em andamento as outras threads seguem com a geração anterior
+        self.assertEqual(tracker.current(slow_fetch), 'kb-v3:1')
+        release.set()
+        refresher.join()
+
+        self.assertEqual(calls, [1])
+        self.assertEqual(tracker.current(slow_fetch), 'kb-v3:2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import glob
+import os
+import re
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+LAMBDA_DIR = os.path.join(ROOT, 'lambda_functions')
+BACKEND_DIR = os.path.join(ROOT, 'backend_core', 'tickets')
+
+# Módulos duplicados entre o Webhook (imports absolutos, ZIP plano) e o Backend
+# (imports relativos ao app tickets) são marcados com esta linha de cabeçalho
+SYNC_MARKER = re.compile(r'^# Mantenha sincronizado com (?:backend_core/tickets|lambda_functions)/\w+\.py\.$', re.M)
+
+
+def shared_modules():
+    """Módulos do Webhook que declaram uma cópia sincronizada no Backend."""
+    names = []
+    for path in sorted(glob.glob(os.path.join(LAMBDA_DIR, '*.py'))):
+        with open(path, encoding='utf-8') as f:
+            if SYNC_MARKER.search(f.read()):
+                names.append(os.path.basename(path))
+    return names
+
+
+def normalized(path):
+    """Conteúdo sem a linha de sincronização e com os imports do app tickets tornados absolutos."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    text = SYNC_MARKER.sub('', text)
+    return re.sub(r'^from \.(\w+) import', r'from \1 import', text, flags=re.M)
+
+
+class TestSharedModules(unittest.TestCase):
+    def test_known_modules_are_shared(self):
+        self.assertTrue({
+            'bedrock_client.py', 'bedrock_messages.py', 'faq_store.py', 'reranker.py',
+            'retrieval_cache.py', 'token_usage.py', 'transcript_writer.py',
+        } <= set(shared_modules()))
+
+    def test_copies_differ_only_in_imports(self):
+        for name in shared_modules():
+            with self.subTest(module=name):
+                backend_path = os.path.join(BACKEND_DIR, name)
+                self.assertTrue(os.path.exists(backend_path), f"Cópia do Backend ausente: {name}")
+                self.assertEqual(normalized(os.path.join(LAMBDA_DIR, name)), normalized(backend_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
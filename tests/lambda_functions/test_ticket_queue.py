@@ -0,0 +1,53 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from ticket_queue import SQLiteTicketQueue, SQSTicketQueue, new_provisional_reference
+
+
+class FakeSQSClient:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, QueueUrl, MessageBody):
+        self.sent.append((QueueUrl, json.loads(MessageBody)))
+
+
+class TestTicketQueue(unittest.TestCase):
+    def test_provisional_reference_format(self):
+        reference = new_provisional_reference()
+        self.assertRegex(reference, r'^PRV-[0-9A-F]{10}$')
+        self.assertNotEqual(reference, new_provisional_reference())
+
+    def test_sqlite_queue_persists_payload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'fila.sqlite3')
+            queue = SQLiteTicketQueue(path)
+            payload = {'customer_name': 'Ana', 'problem_description': 'Sem rede', 'provisional_reference': 'PRV-1'}
+            queue.enqueue(payload)
+
+            conn = sqlite3.connect(path)
+            rows = conn.execute('SELECT reference, payload, claimed_at FROM ticket_queue').fetchall()
+            conn.close()
+        self.assertEqual(rows, [('PRV-1', json.dumps(payload), None)])
+
+    def test_sqlite_queue_rejects_duplicate_reference(self):
+        with tempfile.TemporaryDirectory() as directory:
+            queue = SQLiteTicketQueue(os.path.join(directory, 'fila.sqlite3'))
+            queue.enqueue({'provisional_reference': 'PRV-1'})
+            with self.assertRaises(sqlite3.IntegrityError):
+                queue.enqueue({'provisional_reference': 'PRV-1'})
+
+    def test_sqs_queue_sends_json_body(self):
+        client = FakeSQSClient()
+        SQSTicketQueue('https://sqs.exemplo/fila', client=client).enqueue({'provisional_reference': 'PRV-2'})
+        self.assertEqual(client.sent, [('https://sqs.exemplo/fila', {'provisional_reference': 'PRV-2'})])
+
+
+if __name__ == '__main__':
+    unittest.main()
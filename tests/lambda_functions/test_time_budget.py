@@ -0,0 +1,81 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from answer_cache import AnswerCache
+from retrieval_cache import normalize_query
+from time_budget import TimeBudget
+
+
+class FakeClock:
+    """Relógio controlado manualmente pelos testes."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLambdaContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+class TestTimeBudget(unittest.TestCase):
+    def test_from_context_uses_smallest_limit(self):
+        budget = TimeBudget.from_context(FakeLambdaContext(2000), webhook_timeout_ms=5000, margin_ms=500)
+        self.assertAlmostEqual(budget.remaining(), 1.5, places=1)
+
+        budget = TimeBudget.from_context(FakeLambdaContext(60000), webhook_timeout_ms=5000, margin_ms=500)
+        self.assertAlmostEqual(budget.remaining(), 4.5, places=1)
+
+    def test_allocation_shrinks_after_slow_stage(self):
+        clock = FakeClock()
+        budget = TimeBudget(4.0, clock=clock)
+        self.assertAlmostEqual(budget.allocate(0.5), 2.0)
+
+        with budget.stage('retrieval'):
+            clock.now += 3.0
+
+        self.assertEqual(budget.timings['retrieval'], 3000.0)
+        self.assertAlmostEqual(budget.allocate(0.5), 0.5)
+        self.assertFalse(budget.can_afford(1.5))
+        self.assertEqual(budget.allocate(1.0, cap=0.2), 0.2)
+
+    def test_remaining_never_negative(self):
+        clock = FakeClock()
+        budget = TimeBudget(1.0, clock=clock)
+        clock.now += 10
+        self.assertEqual(budget.remaining(), 0.0)
+
+
+class TestAnswerCache(unittest.TestCase):
+    def test_normalized_lookup_and_expiry(self):
+        clock = FakeClock()
+        cache = AnswerCache(max_entries=10, ttl_seconds=60, clock=clock)
+        cache.set("Como reinicio o servidor?", "Desligue e ligue.")
+
+        self.assertEqual(cache.get("  como REINICIO o servidor "), "Desligue e ligue.")
+        clock.now += 61
+        self.assertIsNone(cache.get("como reinicio o servidor"))
+
+    def test_lru_eviction(self):
+        cache = AnswerCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+        self.assertEqual(normalize_query("Ação!"), "acao")
+
+
+if __name__ == '__main__':
+    unittest.main()
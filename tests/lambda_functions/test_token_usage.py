@@ -0,0 +1,87 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from bedrock_messages import build_messages_body
+from token_usage import OTHER_KEY, TokenAccountant, estimate_usage, model_prices, request_cost
+
+SONNET = 'us.anthropic.claude-3-7-sonnet-20250219-v1:0'
+HAIKU = 'us.anthropic.claude-3-5-haiku-20241022-v1:0'
+
+
+def usage(input_tokens=0, output_tokens=0, cache_read=0, cache_write=0):
+    return {
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'cache_read_input_tokens': cache_read,
+        'cache_creation_input_tokens': cache_write,
+    }
+
+
+class CostTest(unittest.TestCase):
+    def test_prices_by_model_fragment(self):
+        self.assertEqual(model_prices(SONNET), (3.00, 15.00))
+        self.assertEqual(model_prices(HAIKU), (0.80, 4.00))
+        self.assertIsNone(model_prices('amazon.titan-text-express-v1'))
+
+    def test_cost_includes_prompt_cache(self):
+        cost = request_cost(SONNET, usage(1000, 200, cache_read=2000, cache_write=0))
+        # 1000 * 3 + 2000 * 3 * 0.1 + 200 * 15 = 6600 por milhão
+        self.assertAlmostEqual(cost, 0.0066)
+        self.assertIsNone(request_cost('modelo-desconhecido', usage(10, 10)))
+
+
+class TokenAccountantTest(unittest.TestCase):
+    def test_aggregates_by_intent_client_and_model(self):
+        accountant = TokenAccountant(window=100)
+        accountant.record(usage(1000, 100), SONNET, intent='duvida_tecnica', client='telegram')
+        accountant.record(usage(3000, 300), HAIKU, intent='duvida_tecnica', client='dialogflow')
+
+        stats = accountant.stats()
+        self.assertEqual(stats['total']['requests'], 2)
+        self.assertEqual(stats['total']['input_tokens'], 4000)
+        self.assertEqual(stats['intent']['duvida_tecnica']['prompt_tokens_per_request'], 2000.0)
+        self.assertEqual(stats['client']['telegram']['output_tokens'], 100)
+        self.assertEqual(set(stats['model']), {SONNET, HAIKU})
+        self.assertGreater(stats['total']['cost_usd'], 0)
+
+    def test_estimates_when_response_has_no_usage(self):
+        body = build_messages_body('Como reinicio o servidor?', 'Reinicie o serviço pelo painel.')
+        entry = TokenAccountant().record(usage(), SONNET, body=body, answer='Reinicie pelo painel.')
+
+        self.assertTrue(entry['estimated'])
+        self.assertEqual(entry['usage'], estimate_usage(body, 'Reinicie pelo painel.'))
+        self.assertGreater(entry['usage']['input_tokens'], 100)
+        self.assertEqual(entry['usage']['output_tokens'], 6)
+
+        reported = TokenAccountant().record(usage(50, 5), SONNET, body=body, answer='x')
+        self.assertFalse(reported['estimated'])
+
+    def test_limits_distinct_keys(self):
+        accountant = TokenAccountant(max_keys=2, window=100)
+        for client in ('a', 'b', 'c', 'd'):
+            accountant.record(usage(10, 1), SONNET, intent='chat', client=client)
+        clients = accountant.stats()['client']
+        self.assertEqual(set(clients), {'a', 'b', OTHER_KEY})
+        self.assertEqual(clients[OTHER_KEY]['requests'], 2)
+
+    def test_alerts_on_absolute_limit_and_regression(self):
+        accountant = TokenAccountant(max_prompt_tokens=5000, regression_ratio=1.5, window=3)
+        entry = accountant.record(usage(6000, 10), SONNET, intent='chat')
+        self.assertEqual(len(entry['alerts']), 1)
+
+        accountant = TokenAccountant(regression_ratio=1.5, window=3)
+        alerts = [accountant.record(usage(1000, 10), SONNET, intent='chat')['alerts'] for _ in range(3)]
+        self.assertEqual(alerts, [[], [], []])
+        # Janela seguinte com o dobro de tokens por requisição
+        alerts = [accountant.record(usage(2000, 10), SONNET, intent='chat')['alerts'] for _ in range(3)]
+        self.assertEqual(alerts[:2], [[], []])
+        self.assertEqual(len(alerts[2]), 1)
+        self.assertIn("Regressão de tokens na intenção 'chat'", alerts[2][0])
+        self.assertEqual(accountant.stats()['alerts'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
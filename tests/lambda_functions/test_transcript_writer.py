@@ -0,0 +1,99 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from transcript_writer import BatchWriter
+
+
+class RecordingSink:
+    """Destino dos lotes; `gate` permite segurar a gravação para encher o buffer."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+
+    def __call__(self, records):
+        self.entered.set()
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("banco indisponível")
+        self.batches.append(list(records))
+
+
+class TestBatchWriter(unittest.TestCase):
+    def test_flushes_full_batches_without_waiting_for_interval(self):
+        sink = RecordingSink()
+        writer = BatchWriter(sink, batch_size=3, flush_interval=60)
+
+        for i in range(6):
+            self.assertTrue(writer.submit({'query': i}))
+        self.assertTrue(writer.flush(timeout=5))
+
+        self.assertEqual([[r['query'] for r in batch] for batch in sink.batches], [[0, 1, 2], [3, 4, 5]])
+        writer.close()
+
+    def test_partial_batch_is_written_after_interval(self):
+        sink = RecordingSink()
+        writer = BatchWriter(sink, batch_size=100, flush_interval=0.05)
+
+        writer.submit({'query': 'a'})
+        writer.submit({'query': 'b'})
+        sink.entered.wait(5)
+        writer.flush(timeout=5)
+
+        self.assertEqual(sink.batches, [[{'query': 'a'}, {'query': 'b'}]])
+        self.assertEqual(writer.stats()['written'], 2)
+        writer.close()
+
+    def test_full_buffer_drops_after_submit_timeout(self):
+        sink = RecordingSink()
+        sink.gate.clear()
+        writer = BatchWriter(sink, batch_size=1, flush_interval=0, max_pending=2, submit_timeout=0.01)
+
+        # O primeiro registro fica preso na gravação; os dois seguintes enchem o buffer
+        writer.submit({'query': 0})
+        sink.entered.wait(5)
+        self.assertTrue(writer.submit({'query': 1}))
+        self.assertTrue(writer.submit({'query': 2}))
+        self.assertFalse(writer.submit({'query': 3}))
+
+        sink.gate.set()
+        writer.flush(timeout=5)
+        stats = writer.stats()
+        self.assertEqual((stats['written'], stats['dropped'], stats['pending']), (3, 1, 0))
+        writer.close()
+
+    def test_close_writes_pending_records_and_rejects_new_ones(self):
+        sink = RecordingSink()
+        writer = BatchWriter(sink, batch_size=100, flush_interval=60)
+
+        writer.submit({'query': 'pendente'})
+        writer.close(timeout=5)
+
+        self.assertEqual(sink.batches, [[{'query': 'pendente'}]])
+        self.assertFalse(writer.submit({'query': 'tarde demais'}))
+
+    def test_failed_batch_is_counted_and_writer_keeps_running(self):
+        sink = RecordingSink(fail=True)
+        writer = BatchWriter(sink, batch_size=2, flush_interval=60)
+
+        writer.submit({'query': 1})
+        writer.submit({'query': 2})
+        writer.flush(timeout=5)
+        sink.fail = False
+        writer.submit({'query': 3})
+        writer.flush(timeout=5)
+
+        stats = writer.stats()
+        self.assertEqual((stats['failed'], stats['written'], stats['batches']), (2, 1, 2))
+        writer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+from warmup import is_provisioned_init, is_warmup_event, run_warmup
+
+
+class WarmupEventTest(unittest.TestCase):
+    def test_recognizes_warmup_events(self):
+        self.assertTrue(is_warmup_event({'warmup': True}))
+        self.assertTrue(is_warmup_event({'source': 'aws.events', 'detail-type': 'Scheduled Event', 'detail': {}}))
+        self.assertTrue(is_warmup_event({'source': 'serverless-plugin-warmup'}))
+
+    def test_dialogflow_requests_are_not_warmup(self):
+        self.assertFalse(is_warmup_event({'body': '{"queryResult": {}}'}))
+        self.assertFalse(is_warmup_event({'body': '{}', 'warmup': True}))
+        self.assertFalse(is_warmup_event({}))
+        self.assertFalse(is_warmup_event(None))
+
+    def test_provisioned_init(self):
+        with mock.patch.dict(os.environ, {'AWS_LAMBDA_INITIALIZATION_TYPE': 'provisioned-concurrency'}):
+            self.assertTrue(is_provisioned_init())
+        with mock.patch.dict(os.environ, {'AWS_LAMBDA_INITIALIZATION_TYPE': 'on-demand'}):
+            self.assertFalse(is_provisioned_init())
+
+
+class RunWarmupTest(unittest.TestCase):
+    def test_reports_timings_and_isolates_failures(self):
+        ticks = iter([0.0, 0.0, 0.010, 0.010, 0.025, 0.025, 0.030, 0.030])
+        calls = []
+
+        def failing():
+            calls.append('opensearch')
+            raise RuntimeError('sem conexão')
+
+        steps = [
+            ('bedrock', lambda: calls.append('bedrock')),
+            ('opensearch', failing),
+            ('django', lambda: calls.append('django') or {'faq_entries': 3}),
+        ]
+        report = run_warmup(steps, clock=lambda: next(ticks))
+
+        self.assertEqual(calls, ['bedrock', 'opensearch', 'django'])
+        self.assertFalse(report['ready'])
+        self.assertEqual(report['steps']['bedrock'], {'ok': True, 'ms': 10.0})
+        self.assertEqual(report['steps']['opensearch'], {'ok': False, 'error': 'sem conexão', 'ms': 15.0})
+        self.assertEqual(report['steps']['django']['detail'], {'faq_entries': 3})
+        self.assertEqual(report['total_ms'], 30.0)
+
+    def test_ready_when_all_steps_succeed(self):
+        report = run_warmup([('prompts', lambda: None)])
+        self.assertTrue(report['ready'])
+        self.assertGreaterEqual(report['steps']['prompts']['ms'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
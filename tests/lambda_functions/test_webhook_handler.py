@@ -0,0 +1,180 @@
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'lambda_functions'))
+
+import webhook_handler
+from answer_cache import AnswerCache
+from bedrock_client import BedrockUnavailableError
+from time_budget import TimeBudget
+
+CONTEXT = "Desligue pelo botão frontal.\n\nAguarde 30 segundos antes de religar.\n\nVerifique a luz de status."
+MODEL_ID = 'us.anthropic.claude-3-7-sonnet-20250219-v1:0'
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeInvoker:
+    """Invocador falso do Bedrock: devolve uma resposta fixa ou levanta o erro informado."""
+
+    model_ids = [MODEL_ID]
+
+    def __init__(self, answer="Reinicie pelo botão frontal.", error=None):
+        self.answer = answer
+        self.error = error
+        self.calls = []
+
+    def invoke(self, body, timeout=None):
+        self.calls.append((body, timeout))
+        if self.error is not None:
+            raise self.error
+        return {
+            'content': [{'type': 'text', 'text': self.answer}],
+            'usage': {'input_tokens': 300, 'output_tokens': 20},
+        }, MODEL_ID
+
+
+class WebhookTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.invoker = FakeInvoker()
+        self.search_seconds = 0.2
+        patches = [
+            mock.patch.object(webhook_handler, 'bedrock_invoker', self.invoker),
+            mock.patch.object(webhook_handler, 'answer_cache', AnswerCache()),
+            mock.patch.object(webhook_handler, 'search_opensearch', self.fake_search),
+            mock.patch.object(webhook_handler, 'lookup_faq_answer', lambda query, timeout=None: None),
+            mock.patch.object(webhook_handler, 'metrics'),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def fake_search(self, query, timeout=None, trace=None):
+        # A busca consome tempo do orçamento, como a chamada real ao OpenSearch
+        self.clock.now += self.search_seconds
+        self.search_timeout = timeout
+        if trace is not None:
+            trace['doc_ids'] = ['manual-01']
+        return CONTEXT
+
+    def run_pipeline(self, total_seconds=4.0, allow_defer=True, query="Como reinicio o servidor?"):
+        budget = TimeBudget(total_seconds, clock=self.clock)
+        trace = {'outcome': 'error', 'doc_ids': [], 'intent': 'duvida_tecnica', 'client': 'dialogflow'}
+        return webhook_handler.run_rag_pipeline(query, budget, allow_defer, trace), trace, budget
+
+
+class RunRagPipelineTest(WebhookTestCase):
+    def test_generates_with_remaining_budget(self):
+        response, trace, budget = self.run_pipeline(total_seconds=4.0)
+
+        self.assertEqual(response, "Reinicie pelo botão frontal.")
+        self.assertEqual(trace['outcome'], 'generated')
+        self.assertEqual(trace['model_id'], MODEL_ID)
+        self.assertEqual(trace['doc_ids'], ['manual-01'])
+        # A busca recebe uma fração limitada; a geração recebe todo o tempo que resta
+        self.assertLessEqual(self.search_timeout, webhook_handler.RETRIEVAL_MAX_SECONDS)
+        body, timeout = self.invoker.calls[0]
+        self.assertAlmostEqual(timeout, 3.8)
+        self.assertIn(CONTEXT, body['messages'][0]['content'][0]['text'])
+        self.assertEqual(set(budget.timings), {'faq', 'retrieval', 'generation'})
+        self.assertEqual(webhook_handler.answer_cache.get("como reinicio o servidor"), response)
+
+    def test_slow_retrieval_degrades_to_snippets_without_generation(self):
+        self.search_seconds = 3.0
+        response, trace, _ = self.run_pipeline(total_seconds=4.0)
+
+        self.assertEqual(trace['outcome'], 'degraded')
+        self.assertEqual(self.invoker.calls, [])
+        self.assertTrue(response.startswith("Encontrei estas informações"))
+        self.assertIn("Desligue pelo botão frontal.", response)
+
+    def test_no_time_for_retrieval_defers_with_followup_event(self):
+        response, trace, _ = self.run_pipeline(total_seconds=0.1)
+
+        self.assertEqual(trace['outcome'], 'degraded')
+        self.assertEqual(response['followupEventInput']['name'], webhook_handler.FOLLOWUP_EVENT_NAME)
+        self.assertEqual(response['followupEventInput']['parameters'], {'query': "Como reinicio o servidor?"})
+
+        # Já reinvocado pelo evento de follow-up: não adia de novo
+        response, _, _ = self.run_pipeline(total_seconds=0.1, allow_defer=False)
+        self.assertIn("Desculpe", response)
+
+    def test_bedrock_unavailable_falls_back_to_snippets(self):
+        self.invoker.error = BedrockUnavailableError("Throttling em todos os modelos")
+        response, trace, _ = self.run_pipeline(total_seconds=4.0)
+
+        self.assertEqual(trace['outcome'], 'degraded')
+        self.assertTrue(response.startswith("Encontrei estas informações"))
+        webhook_handler.metrics.increment.assert_any_call(
+            'DegradedResponse', Intent='duvida_tecnica', Reason='bedrock_indisponivel', Mode='trechos'
+        )
+
+
+class DegradedResponseTest(WebhookTestCase):
+    def test_cached_answer_has_priority(self):
+        webhook_handler.answer_cache.set("Como reinicio o servidor?", "Resposta anterior.")
+        budget = TimeBudget(1.0, clock=self.clock)
+        response = webhook_handler.degraded_rag_response("como reinicio o servidor", CONTEXT, budget, 'teste')
+        self.assertEqual(response, "Resposta anterior.")
+
+    def test_snippets_before_followup(self):
+        budget = TimeBudget(1.0, clock=self.clock)
+        response = webhook_handler.degraded_rag_response("pergunta", CONTEXT, budget, 'teste')
+        self.assertEqual(response, webhook_handler.format_snippets(CONTEXT))
+
+
+class TokenSummaryTest(unittest.TestCase):
+    def setUp(self):
+        patch = mock.patch.object(webhook_handler, '_token_summary_started', None)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_logs_container_totals_once_per_interval(self):
+        clock = FakeClock()
+        with mock.patch.object(webhook_handler, 'TOKEN_SUMMARY_INTERVAL', 300), \
+                self.assertLogs(level='INFO') as logs:
+            # A primeira chamada apenas inicia o intervalo
+            self.assertFalse(webhook_handler.log_token_summary(clock))
+            clock.now = 299.0
+            self.assertFalse(webhook_handler.log_token_summary(clock))
+            clock.now = 300.0
+            self.assertTrue(webhook_handler.log_token_summary(clock))
+            self.assertFalse(webhook_handler.log_token_summary(clock))
+
+        summaries = [json.loads(record.getMessage()) for record in logs.records]
+        self.assertEqual(len(summaries), 1)
+        self.assertEqual(summaries[0]['evento'], 'resumo_tokens')
+        self.assertIn('client', summaries[0])
+        self.assertIn('requests', summaries[0]['total'])
+
+    def test_disabled_with_zero_interval(self):
+        with mock.patch.object(webhook_handler, 'TOKEN_SUMMARY_INTERVAL', 0):
+            self.assertFalse(webhook_handler.log_token_summary(FakeClock()))
+            self.assertFalse(webhook_handler.log_token_summary(FakeClock()))
+
+
+class FormatSnippetsTest(unittest.TestCase):
+    def test_limits_snippets_and_length(self):
+        response = webhook_handler.format_snippets("a" * 10 + "\n\n" + "b" * 400 + "\n\n" + "c", max_chars=300)
+        parts = response.split("\n\n")
+
+        self.assertEqual(parts[0], "Encontrei estas informações na nossa base de conhecimento:")
+        self.assertEqual(parts[1:], ["a" * 10, "b" * 300 + "..."])
+
+    def test_ignores_blank_parts(self):
+        response = webhook_handler.format_snippets("\n\n  \n\nÚnico trecho.\n\n")
+        self.assertTrue(response.endswith("\n\nÚnico trecho."))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SCRIPT = os.path.join(os.path.dirname(__file__), '..', '..', 'scripts', 'webhook_load_test.py')
+
+
+def run_load_test(*args):
+    # Processo próprio: o handler lê os endereços dos serviços falsos na importação
+    return subprocess.run(
+        [sys.executable, SCRIPT, '--requests', '12', '--concurrency', '4', '--opensearch-latency', '5',
+         '--bedrock-latency', '20', '--django-latency', '5', *args],
+        capture_output=True, text=True, timeout=120,
+    )
+
+
+class WebhookLoadTestSmokeTest(unittest.TestCase):
+    def test_report_against_fake_services(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'relatorio.json')
+            result = run_load_test('--bedrock-errors', '0.5', '--django-errors', '0.5', '--output', output)
+            self.assertEqual(result.returncode, 0, result.stderr)
+            with open(output, encoding='utf-8') as f:
+                report = json.load(f)
+
+            self.assertEqual(report['requests'], 12)
+            self.assertGreater(report['throughput_rps'], 0)
+            self.assertEqual(sum(stats['count'] for stats in report['intents'].values()), 12)
+            self.assertLessEqual(set(report['intents']), {'duvida_tecnica', 'abrir_chamado', 'gerar_orcamento'})
+            for stats in report['intents'].values():
+                self.assertTrue(0 <= stats['errors'] <= stats['count'])
+                self.assertTrue(0 <= stats['followups'] <= stats['count'])
+                self.assertTrue(0 < stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'])
+            # Jitter padrão registrado como 1/4 da latência
+            self.assertEqual(report['config']['bedrock_jitter'], 5.0)
+
+            # O próprio relatório como referência não acusa regressão
+            result = run_load_test('--baseline', output, '--max-regression', '10')
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertIn("Sem regressões", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()